@@ -34,6 +34,7 @@ from lightrag.constants import (
     DEFAULT_SUMMARY_CONTEXT_SIZE,
     DEFAULT_SUMMARY_LANGUAGE,
     DEFAULT_EMBEDDING_FUNC_MAX_ASYNC,
+    DEFAULT_QUERY_RESERVED_SLOTS,
     DEFAULT_EMBEDDING_BATCH_NUM,
     DEFAULT_OLLAMA_MODEL_NAME,
     DEFAULT_OLLAMA_MODEL_TAG,
@@ -291,6 +292,7 @@ def parse_args() -> argparse.Namespace:
     args.kv_storage = get_env_value(
         "LIGHTRAG_KV_STORAGE", DefaultRAGStorageConfig.KV_STORAGE
     )
+    args.llm_cache_storage = get_env_value("LIGHTRAG_LLM_CACHE_STORAGE", None)
     args.doc_status_storage = get_env_value(
         "LIGHTRAG_DOC_STATUS_STORAGE", DefaultRAGStorageConfig.DOC_STATUS_STORAGE
     )
@@ -342,6 +344,36 @@ def parse_args() -> argparse.Namespace:
     # Select Document loading tool (DOCLING, DEFAULT)
     args.document_loading_engine = get_env_value("DOCUMENT_LOADING_ENGINE", "DEFAULT")
 
+    # Document extraction process pool (0 workers = min(4, CPU count), 0 = no limit)
+    args.document_extraction_workers = get_env_value(
+        "DOCUMENT_EXTRACTION_WORKERS", 0, int
+    )
+    args.document_extraction_timeout = get_env_value(
+        "DOCUMENT_EXTRACTION_TIMEOUT", 300, int
+    )
+    args.document_extraction_max_memory = get_env_value(
+        "DOCUMENT_EXTRACTION_MAX_MEMORY_MB", 0, int
+    )
+    args.document_extraction_cache = get_env_value(
+        "DOCUMENT_EXTRACTION_CACHE", True, bool
+    )
+
+    # /graphs subgraph cache (0 entries = disabled)
+    args.graph_cache_size = get_env_value("GRAPH_CACHE_SIZE", 64, int)
+    args.graph_precompute_labels = get_env_value("GRAPH_PRECOMPUTE_LABELS", 10, int)
+    args.graph_cache_refresh_interval = get_env_value(
+        "GRAPH_CACHE_REFRESH_INTERVAL", 10, int
+    )
+    args.graph_cache_ttl = get_env_value("GRAPH_CACHE_TTL", 60, int)
+
+    # Multi-workspace pool (0 = serve the default workspace only, 0 MB = no limit)
+    args.workspace_pool_size = get_env_value("WORKSPACE_POOL_SIZE", 0, int)
+    args.workspace_pool_max_memory = get_env_value(
+        "WORKSPACE_POOL_MAX_MEMORY_MB", 0, int
+    )
+    args.workspace_header = get_env_value("WORKSPACE_HEADER", "LIGHTRAG-WORKSPACE")
+    args.workspace_allowlist = get_env_value("WORKSPACE_ALLOWLIST", [], list)
+
     # Add environment variables that were previously read directly
     args.cors_origins = get_env_value("CORS_ORIGINS", "*")
     args.summary_language = get_env_value("SUMMARY_LANGUAGE", DEFAULT_SUMMARY_LANGUAGE)
@@ -393,6 +425,9 @@ def parse_args() -> argparse.Namespace:
     args.embedding_func_max_async = get_env_value(
         "EMBEDDING_FUNC_MAX_ASYNC", DEFAULT_EMBEDDING_FUNC_MAX_ASYNC, int
     )
+    args.query_reserved_slots = get_env_value(
+        "QUERY_RESERVED_SLOTS", DEFAULT_QUERY_RESERVED_SLOTS, int
+    )
     args.embedding_batch_num = get_env_value(
         "EMBEDDING_BATCH_NUM", DEFAULT_EMBEDDING_BATCH_NUM, int
     )
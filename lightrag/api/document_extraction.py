@@ -0,0 +1,322 @@
+"""
+Text extraction for uploaded and scanned documents.
+
+PDF, DOCX, PPTX and XLSX files are parsed in a process pool so that a large
+file never blocks the server's event loop, and several files can be parsed in
+parallel. Each parse is bounded by a timeout and an optional address-space
+limit, and its output is cached by content hash so re-uploads and re-scans of
+the same file skip parsing.
+
+Workers are spawned rather than forked: a forked worker would inherit the
+server's whole address space (so the limit would cap memory that is already
+in use) and the state of its threads. Optional parser packages are installed
+by the server process before a file is submitted, never inside a worker.
+
+This module is imported by the pool's worker processes and therefore must not
+import the server configuration (which parses the command line on import).
+"""
+
+import asyncio
+import gzip
+import hashlib
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+
+from lightrag.utils import ensure_packages, logger
+
+
+class DocumentExtractionError(Exception):
+    """Extraction failure carrying the texts recorded in the error document"""
+
+    def __init__(self, error_description: str, original_error: str):
+        super().__init__(error_description, original_error)
+        self.error_description = error_description
+        self.original_error = original_error
+
+
+def _init_worker(max_memory_mb: int) -> None:
+    """Pool initializer: cap the worker's address space so a runaway parse fails alone"""
+    if max_memory_mb <= 0:
+        return
+    try:
+        import resource
+
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"[File Extraction]Cannot apply worker memory limit: {e}")
+
+
+def _docling_to_markdown(file_path: str) -> str:
+    from docling.document_converter import DocumentConverter  # type: ignore
+
+    converter = DocumentConverter()
+    result = converter.convert(file_path)
+    return result.document.export_to_markdown()
+
+
+def _extract_pdf(file: bytes) -> str:
+    from PyPDF2 import PdfReader  # type: ignore
+
+    content = ""
+    reader = PdfReader(BytesIO(file))
+    for page in reader.pages:
+        content += page.extract_text() + "\n"
+    return content
+
+
+def _extract_docx(file: bytes) -> str:
+    from docx import Document  # type: ignore
+
+    doc = Document(BytesIO(file))
+    return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+
+
+def _extract_pptx(file: bytes) -> str:
+    from pptx import Presentation  # type: ignore
+
+    content = ""
+    prs = Presentation(BytesIO(file))
+    for slide in prs.slides:
+        for shape in slide.shapes:
+            if hasattr(shape, "text"):
+                content += shape.text + "\n"
+    return content
+
+
+def _extract_xlsx(file: bytes) -> str:
+    from openpyxl import load_workbook  # type: ignore
+
+    content = ""
+    wb = load_workbook(BytesIO(file))
+    for sheet in wb:
+        content += f"Sheet: {sheet.title}\n"
+        for row in sheet.iter_rows(values_only=True):
+            content += (
+                "\t".join(str(cell) if cell is not None else "" for cell in row) + "\n"
+            )
+        content += "\n"
+    return content
+
+
+_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".pptx": _extract_pptx,
+    ".xlsx": _extract_xlsx,
+}
+
+# Packages of each extractor, installed by the server process before submitting
+_EXTRACTOR_PACKAGES = {
+    ".pdf": ["pypdf2"],
+    ".docx": ["python-docx"],
+    ".pptx": ["python-pptx"],
+    ".xlsx": ["openpyxl"],
+}
+_DOCLING_PACKAGES = ["docling"]
+
+
+def extract_document_content(
+    file: bytes, file_path: str, ext: str, loading_engine: str = "DEFAULT"
+) -> str:
+    """Extract the text of a binary document, runs inside a pool worker
+
+    Raises:
+        DocumentExtractionError: if the document cannot be parsed
+    """
+    kind = ext[1:].upper()
+    try:
+        if loading_engine == "DOCLING":
+            return _docling_to_markdown(file_path)
+        return _EXTRACTORS[ext](file)
+    except MemoryError:
+        raise DocumentExtractionError(
+            "[File Extraction]Memory limit exceeded",
+            f"Extracting text from {kind} exceeded the worker memory limit",
+        ) from None
+    except Exception as e:
+        raise DocumentExtractionError(
+            f"[File Extraction]{kind} processing error",
+            f"Failed to extract text from {kind}: {str(e)}",
+        ) from None
+
+
+# Attempts of a job whose worker pool is discarded for another job's timeout
+_MAX_ATTEMPTS = 3
+
+
+class DocumentExtractor:
+    """Runs document extraction in a process pool with timeouts and a result cache
+
+    Args:
+        max_workers: Number of worker processes, 0 picks min(4, CPU count)
+        timeout: Seconds allowed per file, 0 disables the timeout
+        max_memory_mb: Address-space limit of each worker in MB, 0 disables it
+        cache_dir: Directory of the content-hash cache, None disables caching
+        loading_engine: DEFAULT or DOCLING
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 0,
+        timeout: float = 300,
+        max_memory_mb: int = 0,
+        cache_dir: str | None = None,
+        loading_engine: str = "DEFAULT",
+    ):
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.loading_engine = loading_engine
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._pool: ProcessPoolExecutor | None = None
+        # Pools killed because one of their jobs timed out, the other jobs are retried
+        self._timed_out_pools: weakref.WeakSet = weakref.WeakSet()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.max_memory_mb,),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, timed_out: bool = False) -> None:
+        """Kill a pool whose worker hangs or died, the next job starts a fresh one"""
+        if self._pool is pool:
+            self._pool = None
+        if timed_out:
+            self._timed_out_pools.add(pool)
+        # A running task cannot be cancelled, terminating the workers is the only way out
+        for process in list((pool._processes or {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _cache_key(self, file: bytes, ext: str) -> str:
+        digest = hashlib.sha256(file)
+        digest.update(f"|{ext}|{self.loading_engine}".encode())
+        return digest.hexdigest()
+
+    def _read_cache(self, key: str) -> str | None:
+        cache_file = self.cache_dir / f"{key}.txt.gz"
+        try:
+            with gzip.open(cache_file, "rt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(
+                f"[File Extraction]Ignoring unreadable cache entry {key}: {e}"
+            )
+            return None
+
+    def _write_cache(self, key: str, content: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self.cache_dir / f"{key}.txt.gz"
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp_file, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(content)
+        os.replace(tmp_file, cache_file)
+
+    async def _ensure_packages(self, ext: str) -> None:
+        """Install the parser packages of a file type in the server process"""
+        if self.loading_engine == "DOCLING":
+            packages = _DOCLING_PACKAGES
+        else:
+            packages = _EXTRACTOR_PACKAGES.get(ext, [])
+        try:
+            await asyncio.to_thread(ensure_packages, packages)
+        except Exception as e:
+            kind = ext[1:].upper()
+            raise DocumentExtractionError(
+                f"[File Extraction]{kind} processing error",
+                f"Failed to install the packages to extract {kind}: {str(e)}",
+            ) from None
+
+    async def _run_in_pool(self, file: bytes, file_path: Path, ext: str) -> str:
+        loop = asyncio.get_running_loop()
+        for attempt in range(_MAX_ATTEMPTS):
+            pool = self._get_pool()
+            future = loop.run_in_executor(
+                pool,
+                extract_document_content,
+                file,
+                str(file_path),
+                ext,
+                self.loading_engine,
+            )
+            # asyncio.wait instead of wait_for: a future cancelled by the shutdown of
+            # a discarded pool must not surface as cancellation of this task
+            done, _ = await asyncio.wait({future}, timeout=self.timeout or None)
+            if not done:
+                self._discard_pool(pool, timed_out=True)
+                raise DocumentExtractionError(
+                    "[File Extraction]Extraction timeout",
+                    f"Extracting text from {file_path.name} took longer than {self.timeout}s",
+                )
+
+            # Jobs lost because another job timed out run again on a fresh pool. A
+            # worker that crashed is not retried, its job would most likely crash again
+            lost_with_pool = (
+                pool in self._timed_out_pools and attempt < _MAX_ATTEMPTS - 1
+            )
+            if future.cancelled():
+                if lost_with_pool:
+                    continue
+                raise DocumentExtractionError(
+                    "[File Extraction]Extraction cancelled",
+                    f"Extraction of {file_path.name} was cancelled",
+                )
+            try:
+                return future.result()
+            except BrokenProcessPool as e:
+                if lost_with_pool:
+                    continue
+                self._discard_pool(pool)
+                raise DocumentExtractionError(
+                    "[File Extraction]Extraction worker crashed",
+                    f"Worker process died while extracting {file_path.name}: {str(e)}",
+                ) from None
+
+    async def extract(self, file: bytes, file_path: Path, ext: str) -> str:
+        """Extract the text of a binary document without blocking the event loop
+
+        Raises:
+            DocumentExtractionError: if the document cannot be parsed
+        """
+        key = None
+        if self.cache_dir is not None:
+            key = await asyncio.to_thread(self._cache_key, file, ext)
+            cached = await asyncio.to_thread(self._read_cache, key)
+            if cached is not None:
+                logger.info(
+                    f"[File Extraction]Reusing cached extraction for {file_path.name}"
+                )
+                return cached
+
+        await self._ensure_packages(ext)
+        content = await self._run_in_pool(file, file_path, ext)
+
+        if key is not None and content and content.strip():
+            try:
+                await asyncio.to_thread(self._write_cache, key, content)
+            except Exception as e:
+                logger.warning(
+                    f"[File Extraction]Failed to cache extraction of {file_path.name}: {e}"
+                )
+        return content
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
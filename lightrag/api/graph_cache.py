@@ -0,0 +1,212 @@
+"""
+Cache of /graphs subgraph responses.
+
+Subgraphs are cached as gzip-compressed JSON, keyed by workspace, label, depth
+and node limit, and tagged with the graph version reported by the graph
+storage. Every index_done_callback that changes the graph bumps the version,
+which invalidates all cached subgraphs of the workspace. The version only
+counts the changes made by this server, so subgraphs of graphs other servers
+can write to (shared databases) also expire after a TTL, and are not cached
+when the TTL is 0. After the graph changes and the document pipeline is idle
+again, the whole-graph overview ("*") and the neighborhoods of the most popular
+labels are recomputed in the background so the graph explorer's first requests
+are served from cache.
+
+ETags are derived from the subgraph content, so they stay valid across
+restarts and never match a different subgraph.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from lightrag.kg.shared_storage import get_namespace_data
+from lightrag.types import KnowledgeGraph
+from lightrag.utils import logger
+
+
+class SubgraphCache:
+    """LRU cache of serialized knowledge-graph responses
+
+    Args:
+        rag: The LightRAG instance (or workspace proxy) serving /graphs
+        max_entries: Maximum number of cached subgraphs, 0 disables the cache
+        precompute_labels: Number of popular labels whose neighborhoods are precomputed
+        refresh_interval: Seconds between checks of the graph version
+        max_depth: Depth used for precomputed subgraphs
+        ttl: Seconds a subgraph of a shared graph stays cached, 0 disables caching
+            of shared graphs
+    """
+
+    def __init__(
+        self,
+        rag,
+        max_entries: int = 64,
+        precompute_labels: int = 10,
+        refresh_interval: float = 10,
+        max_depth: int = 3,
+        ttl: float = 60,
+    ):
+        self.rag = rag
+        self.max_entries = max_entries
+        self.precompute_labels = precompute_labels
+        self.refresh_interval = refresh_interval
+        self.max_depth = max_depth
+        self.ttl = ttl
+        # key -> (graph version, cached at, etag, payload)
+        self._entries: OrderedDict[tuple, tuple[int, float, str, bytes]] = OrderedDict()
+        self._pending: dict[tuple, asyncio.Future] = {}
+        self._precomputed_version: int | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def _effective_max_nodes(self, max_nodes: int | None) -> int:
+        # Mirrors LightRAG.get_knowledge_graph so requests above the cap share an entry
+        if max_nodes is None:
+            return self.rag.max_graph_nodes
+        return min(max_nodes, self.rag.max_graph_nodes)
+
+    async def get(
+        self, label: str, max_depth: int, max_nodes: int | None
+    ) -> tuple[bytes, str]:
+        """Get the gzip-compressed JSON of a subgraph
+
+        Returns:
+            (payload, etag): etag is a hash of the subgraph JSON
+        """
+        max_nodes = self._effective_max_nodes(max_nodes)
+        graph = self.rag.chunk_entity_relation_graph
+        version = await graph.get_graph_version()
+        shared = graph.is_shared_graph()
+        if version is None or self.max_entries <= 0 or (shared and self.ttl <= 0):
+            return await self._compute(label, max_depth, max_nodes)
+
+        key = (self.rag.workspace, label, max_depth, max_nodes)
+        cached = self._entries.get(key)
+        if (
+            cached is not None
+            and cached[0] == version
+            and not (shared and time.monotonic() - cached[1] > self.ttl)
+        ):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[3], cached[2]
+
+        # Concurrent requests for the same subgraph share one traversal
+        pending = self._pending.get((key, version))
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(key, version)] = future
+        try:
+            payload, etag = await self._compute(label, max_depth, max_nodes)
+            future.set_result((payload, etag))
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not reported
+            future.exception()
+            raise
+        finally:
+            self._pending.pop((key, version), None)
+
+        self._store(key, version, etag, payload)
+        return payload, etag
+
+    async def _compute(
+        self, label: str, max_depth: int, max_nodes: int
+    ) -> tuple[bytes, str]:
+        kg = await self.rag.get_knowledge_graph(
+            node_label=label, max_depth=max_depth, max_nodes=max_nodes
+        )
+        return await asyncio.to_thread(self._serialize, kg)
+
+    @staticmethod
+    def _serialize(kg: KnowledgeGraph) -> tuple[bytes, str]:
+        data = kg.model_dump_json().encode("utf-8")
+        etag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+        return gzip.compress(data, compresslevel=5), etag
+
+    def _store(self, key: tuple, version: int, etag: str, payload: bytes) -> None:
+        self._entries[key] = (version, time.monotonic(), etag, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def precompute(self) -> int:
+        """Cache the "*" overview and the neighborhoods of the most popular labels
+
+        Returns:
+            int: Number of subgraphs computed
+        """
+        graph = self.rag.chunk_entity_relation_graph
+        if graph.is_shared_graph() and self.ttl <= 0:
+            return 0
+        labels = ["*"]
+        if self.precompute_labels > 0:
+            labels += await graph.get_popular_labels(self.precompute_labels)
+
+        computed = 0
+        for label in labels[: self.max_entries]:
+            misses = self.misses
+            await self.get(label, self.max_depth, None)
+            computed += self.misses - misses
+        return computed
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                version = await self.rag.chunk_entity_relation_graph.get_graph_version()
+                if version is None or version == self._precomputed_version:
+                    continue
+                # Wait for the running ingestion batch to finish before warming up
+                pipeline_status = await get_namespace_data(
+                    self.rag.pipeline_status_namespace
+                )
+                if pipeline_status.get("busy", False):
+                    continue
+                computed = await self.precompute()
+                self._precomputed_version = version
+                if computed:
+                    logger.info(
+                        f"[{self.rag.workspace}] Precomputed {computed} subgraphs for graph version {version}"
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    f"[{self.rag.workspace}] Subgraph precompute failed: {e}"
+                )
+
+    def start(self) -> None:
+        """Start refreshing precomputed subgraphs in the background"""
+        if self.max_entries > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "bytes": sum(len(entry[3]) for entry in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -11,10 +11,10 @@ import logging.config
 import signal
 import sys
 import uvicorn
-import pipmaster as pm
 import inspect
+from functools import partial
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, PlainTextResponse
 from pathlib import Path
 import configparser
 from ascii_colors import ASCIIColors
@@ -22,6 +22,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from lightrag.api.utils_api import (
+    check_credentials,
     get_combined_auth_dependency,
     display_splash_screen,
     check_env_file,
@@ -36,6 +37,7 @@ from lightrag import LightRAG, __version__ as core_version
 from lightrag.api import __api_version__
 from lightrag.types import GPTKeywordExtractionFormat
 from lightrag.utils import EmbeddingFunc
+from lightrag.llm import ensure_binding_packages
 from lightrag.constants import (
     DEFAULT_LOG_MAX_BYTES,
     DEFAULT_LOG_BACKUP_COUNT,
@@ -46,10 +48,20 @@ from lightrag.constants import (
 from lightrag.api.routers.document_routes import (
     DocumentManager,
     create_document_routes,
+    shutdown_document_extractor,
 )
 from lightrag.api.routers.query_routes import create_query_routes
 from lightrag.api.routers.graph_routes import create_graph_routes
 from lightrag.api.routers.ollama_api import OllamaAPI
+from lightrag.api.graph_cache import SubgraphCache
+from lightrag.tracing import is_tracing_enabled, render_prometheus
+from lightrag.api.tenant_pool import (
+    LightRAGPool,
+    Tenant,
+    TenantMiddleware,
+    TenantProxy,
+    share_func_queue,
+)
 
 from lightrag.utils import logger, set_verbose_debug
 from lightrag.kg.shared_storage import (
@@ -296,6 +308,10 @@ def create_app(args):
     ]:
         raise Exception("embedding binding not supported")
 
+    # Binding modules are imported on first use, install their client libraries now
+    ensure_binding_packages(args.llm_binding)
+    ensure_binding_packages(args.embedding_binding)
+
     # Set default hosts if not provided
     if args.llm_binding_host is None:
         args.llm_binding_host = get_default_host(args.llm_binding)
@@ -329,16 +345,29 @@ def create_app(args):
         try:
             # Initialize database connections
             await rag.initialize_storages()
-            await initialize_pipeline_status()
+            await initialize_pipeline_status(rag.pipeline_status_namespace)
 
             # Data migration regardless of storage implementation
             await rag.check_and_migrate_data()
 
+            if graph_cache is not None:
+                graph_cache.start()
+
             ASCIIColors.green("\nServer is ready to accept connections! 🚀\n")
 
             yield
 
         finally:
+            # Stop document extraction workers
+            shutdown_document_extractor()
+
+            if graph_cache is not None:
+                await graph_cache.stop()
+
+            # Unload the workspaces loaded on demand
+            if tenant_pool is not None:
+                await tenant_pool.close()
+
             # Clean up database connections
             await rag.finalize_storages()
 
@@ -694,7 +723,11 @@ def create_app(args):
                     args.rerank_binding_host = default_base_url
 
         async def server_rerank_func(
-            query: str, documents: list, top_n: int = None, extra_body: dict = None
+            query: str,
+            documents: list,
+            top_n: int = None,
+            extra_body: dict = None,
+            document_ids: list = None,
         ):
             """Server rerank function with configuration from environment variables"""
             return await selected_rerank_func(
@@ -705,6 +738,7 @@ def create_app(args):
                 model=args.rerank_model,
                 base_url=args.rerank_binding_host,
                 extra_body=extra_body,
+                document_ids=document_ids,
             )
 
         rerank_model_func = server_rerank_func
@@ -721,14 +755,32 @@ def create_app(args):
         name=args.simulated_model_name, tag=args.simulated_model_tag
     )
 
-    # Initialize RAG with unified configuration
-    try:
-        rag = LightRAG(
+    llm_model_func = create_llm_model_func(args.llm_binding)
+    if args.workspace_pool_size > 0:
+        # One queue per function for all workspaces bounds the server's total concurrency
+        llm_model_func = share_func_queue(
+            llm_model_func,
+            args.max_async,
+            llm_timeout,
+            "LLM func",
+            args.query_reserved_slots,
+        )
+        embedding_func = share_func_queue(
+            embedding_func,
+            args.embedding_func_max_async,
+            embedding_timeout,
+            "Embedding func",
+            args.query_reserved_slots,
+        )
+
+    def create_rag(workspace: str, **kwargs) -> LightRAG:
+        return LightRAG(
             working_dir=args.working_dir,
-            workspace=args.workspace,
-            llm_model_func=create_llm_model_func(args.llm_binding),
+            workspace=workspace,
+            llm_model_func=llm_model_func,
             llm_model_name=args.llm_model,
             llm_model_max_async=args.max_async,
+            query_reserved_slots=args.query_reserved_slots,
             summary_max_tokens=args.summary_max_tokens,
             summary_context_size=args.summary_context_size,
             chunk_token_size=int(args.chunk_size),
@@ -740,6 +792,7 @@ def create_app(args):
             default_llm_timeout=llm_timeout,
             default_embedding_timeout=embedding_timeout,
             kv_storage=args.kv_storage,
+            llm_cache_storage=args.llm_cache_storage,
             graph_storage=args.graph_storage,
             vector_storage=args.vector_storage,
             doc_status_storage=args.doc_status_storage,
@@ -756,11 +809,51 @@ def create_app(args):
                 "entity_types": args.entity_types,
             },
             ollama_server_infos=ollama_server_infos,
+            **kwargs,
         )
+
+    # Initialize RAG with unified configuration
+    try:
+        rag = create_rag(args.workspace)
     except Exception as e:
         logger.error(f"Failed to initialize LightRAG: {e}")
         raise
 
+    tenant_pool = None
+    if args.workspace_pool_size > 0:
+        shared_tokenizer = rag.tokenizer
+
+        def create_tenant(workspace: str):
+            return (
+                create_rag(
+                    workspace,
+                    tokenizer=shared_tokenizer,
+                    pipeline_status_namespace=f"{workspace}_pipeline_status",
+                ),
+                DocumentManager(args.input_dir, workspace=workspace),
+            )
+
+        tenant_pool = LightRAGPool(
+            Tenant(workspace=args.workspace, rag=rag, doc_manager=doc_manager),
+            create_tenant,
+            max_instances=args.workspace_pool_size,
+            max_memory_mb=args.workspace_pool_max_memory,
+        )
+        app.add_middleware(
+            TenantMiddleware,
+            pool=tenant_pool,
+            header_name=args.workspace_header,
+            # Whitelisted paths must not load workspaces without credentials
+            authenticate=partial(check_credentials, None, api_key=api_key),
+            allowed_workspaces=args.workspace_allowlist,
+        )
+        # Routers resolve the instance of the request's workspace on every access
+        rag = TenantProxy(tenant_pool, "rag")
+        doc_manager = TenantProxy(tenant_pool, "doc_manager")
+        logger.info(
+            f"Workspace pool enabled: up to {args.workspace_pool_size} workspaces selected by the {args.workspace_header} header"
+        )
+
     # Add routes
     app.include_router(
         create_document_routes(
@@ -770,7 +863,16 @@ def create_app(args):
         )
     )
     app.include_router(create_query_routes(rag, api_key, args.top_k))
-    app.include_router(create_graph_routes(rag, api_key))
+    graph_cache = None
+    if args.graph_cache_size > 0:
+        graph_cache = SubgraphCache(
+            rag,
+            max_entries=args.graph_cache_size,
+            precompute_labels=args.graph_precompute_labels,
+            refresh_interval=args.graph_cache_refresh_interval,
+            ttl=args.graph_cache_ttl,
+        )
+    app.include_router(create_graph_routes(rag, api_key, graph_cache))
 
     # Add Ollama API routes
     ollama_api = OllamaAPI(rag, top_k=args.top_k, api_key=api_key)
@@ -850,7 +952,7 @@ def create_app(args):
     async def get_status():
         """Get current system status"""
         try:
-            pipeline_status = await get_namespace_data("pipeline_status")
+            pipeline_status = await get_namespace_data(rag.pipeline_status_namespace)
 
             if not auth_configured:
                 auth_mode = "disabled"
@@ -861,7 +963,8 @@ def create_app(args):
             keyed_lock_info = cleanup_keyed_lock()
 
             return {
-                "status": "healthy",
+                # Still loading storages of LAZY_LOAD_NAMESPACES in the background
+                "status": "warming" if rag.storages_warming else "healthy",
                 "working_directory": str(args.working_dir),
                 "input_directory": str(args.input_dir),
                 "configuration": {
@@ -876,12 +979,13 @@ def create_app(args):
                     "summary_max_tokens": args.summary_max_tokens,
                     "summary_context_size": args.summary_context_size,
                     "kv_storage": args.kv_storage,
+                    "llm_cache_storage": args.llm_cache_storage or args.kv_storage,
                     "doc_status_storage": args.doc_status_storage,
                     "graph_storage": args.graph_storage,
                     "vector_storage": args.vector_storage,
                     "enable_llm_cache_for_extract": args.enable_llm_cache_for_extract,
                     "enable_llm_cache": args.enable_llm_cache,
-                    "workspace": args.workspace,
+                    "workspace": rag.workspace,
                     "max_graph_nodes": args.max_graph_nodes,
                     # Rerank configuration
                     "enable_rerank": rerank_model_func is not None,
@@ -899,10 +1003,14 @@ def create_app(args):
                     "related_chunk_number": args.related_chunk_number,
                     "max_async": args.max_async,
                     "embedding_func_max_async": args.embedding_func_max_async,
+                    "query_reserved_slots": args.query_reserved_slots,
                     "embedding_batch_num": args.embedding_batch_num,
                 },
                 "auth_mode": auth_mode,
                 "pipeline_busy": pipeline_status.get("busy", False),
+                "workspace_pool": tenant_pool.stats() if tenant_pool else None,
+                "graph_cache": graph_cache.stats() if graph_cache else None,
+                "tracing": is_tracing_enabled(),
                 "keyed_locks": keyed_lock_info,
                 "core_version": core_version,
                 "api_version": __api_version__,
@@ -913,6 +1021,15 @@ def create_app(args):
             logger.error(f"Error getting health status: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    if is_tracing_enabled():
+
+        @app.get("/metrics", dependencies=[Depends(combined_auth)])
+        async def get_metrics():
+            """Span duration histograms in the Prometheus text format (ENABLE_TRACING=true)"""
+            return PlainTextResponse(
+                render_prometheus(), media_type="text/plain; version=0.0.4"
+            )
+
     # Custom StaticFiles class for smart caching
     class SmartStaticFiles(StaticFiles):  # Renamed from NoCacheStaticFiles
         async def get_response(self, path: str, scope):
@@ -1046,6 +1163,8 @@ def configure_logging():
 
 def check_and_install_dependencies():
     """Check and install required dependencies"""
+    import pipmaster as pm
+
     required_packages = [
         "uvicorn",
         "tiktoken",
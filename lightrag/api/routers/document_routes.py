@@ -3,11 +3,11 @@ This module contains all document-related routes for the LightRAG API.
 """
 
 import asyncio
+import os
 from lightrag.utils import logger, get_pinyin_sort_key
 import aiofiles
 import shutil
 import traceback
-import pipmaster as pm
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Literal
@@ -23,8 +23,10 @@ from pydantic import BaseModel, Field, field_validator
 
 from lightrag import LightRAG
 from lightrag.base import DeletionResult, DocProcessingStatus, DocStatus
+from lightrag.chunk_id_set import release_chunk_ids
 from lightrag.utils import generate_track_id
 from lightrag.api.utils_api import get_combined_auth_dependency
+from lightrag.api.document_extraction import DocumentExtractor, DocumentExtractionError
 from ..config import global_args
 
 
@@ -61,6 +63,35 @@ router = APIRouter(
 # Temporary file prefix
 temp_prefix = "__tmp__"
 
+# Process-pool extractor shared by uploads and directory scans, see get_document_extractor()
+_document_extractor: Optional[DocumentExtractor] = None
+
+
+def get_document_extractor() -> DocumentExtractor:
+    """Get the document extractor, creating it from the server configuration on first use"""
+    global _document_extractor
+    if _document_extractor is None:
+        _document_extractor = DocumentExtractor(
+            max_workers=global_args.document_extraction_workers,
+            timeout=global_args.document_extraction_timeout,
+            max_memory_mb=global_args.document_extraction_max_memory,
+            cache_dir=(
+                os.path.join(global_args.working_dir, "extraction_cache")
+                if global_args.document_extraction_cache
+                else None
+            ),
+            loading_engine=global_args.document_loading_engine,
+        )
+    return _document_extractor
+
+
+def shutdown_document_extractor() -> None:
+    """Stop the extraction worker processes"""
+    global _document_extractor
+    if _document_extractor is not None:
+        _document_extractor.shutdown()
+        _document_extractor = None
+
 
 def sanitize_filename(filename: str, input_dir: Path) -> str:
     """
@@ -1070,73 +1101,17 @@ async def pipeline_enqueue_file(
                         )
                         return False, track_id
 
-                case ".pdf":
+                case ".pdf" | ".docx" | ".pptx" | ".xlsx":
                     try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("pypdf2"):  # type: ignore
-                                pm.install("pypdf2")
-                            from PyPDF2 import PdfReader  # type: ignore
-                            from io import BytesIO
-
-                            pdf_file = BytesIO(file)
-                            reader = PdfReader(pdf_file)
-                            for page in reader.pages:
-                                content += page.extract_text() + "\n"
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]PDF processing error",
-                                "original_error": f"Failed to extract text from PDF: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing PDF {file_path.name}: {str(e)}"
+                        content = await get_document_extractor().extract(
+                            file, file_path, ext
                         )
-                        return False, track_id
-
-                case ".docx":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("python-docx"):  # type: ignore
-                                try:
-                                    pm.install("python-docx")
-                                except Exception:
-                                    pm.install("docx")
-                            from docx import Document  # type: ignore
-                            from io import BytesIO
-
-                            docx_file = BytesIO(file)
-                            doc = Document(docx_file)
-                            content = "\n".join(
-                                [paragraph.text for paragraph in doc.paragraphs]
-                            )
-                    except Exception as e:
+                    except DocumentExtractionError as e:
                         error_files = [
                             {
                                 "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]DOCX processing error",
-                                "original_error": f"Failed to extract text from DOCX: {str(e)}",
+                                "error_description": e.error_description,
+                                "original_error": e.original_error,
                                 "file_size": file_size,
                             }
                         ]
@@ -1144,92 +1119,7 @@ async def pipeline_enqueue_file(
                             error_files, track_id
                         )
                         logger.error(
-                            f"[File Extraction]Error processing DOCX {file_path.name}: {str(e)}"
-                        )
-                        return False, track_id
-
-                case ".pptx":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("python-pptx"):  # type: ignore
-                                pm.install("pptx")
-                            from pptx import Presentation  # type: ignore
-                            from io import BytesIO
-
-                            pptx_file = BytesIO(file)
-                            prs = Presentation(pptx_file)
-                            for slide in prs.slides:
-                                for shape in slide.shapes:
-                                    if hasattr(shape, "text"):
-                                        content += shape.text + "\n"
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]PPTX processing error",
-                                "original_error": f"Failed to extract text from PPTX: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing PPTX {file_path.name}: {str(e)}"
-                        )
-                        return False, track_id
-
-                case ".xlsx":
-                    try:
-                        if global_args.document_loading_engine == "DOCLING":
-                            if not pm.is_installed("docling"):  # type: ignore
-                                pm.install("docling")
-                            from docling.document_converter import DocumentConverter  # type: ignore
-
-                            converter = DocumentConverter()
-                            result = converter.convert(file_path)
-                            content = result.document.export_to_markdown()
-                        else:
-                            if not pm.is_installed("openpyxl"):  # type: ignore
-                                pm.install("openpyxl")
-                            from openpyxl import load_workbook  # type: ignore
-                            from io import BytesIO
-
-                            xlsx_file = BytesIO(file)
-                            wb = load_workbook(xlsx_file)
-                            for sheet in wb:
-                                content += f"Sheet: {sheet.title}\n"
-                                for row in sheet.iter_rows(values_only=True):
-                                    content += (
-                                        "\t".join(
-                                            str(cell) if cell is not None else ""
-                                            for cell in row
-                                        )
-                                        + "\n"
-                                    )
-                                content += "\n"
-                    except Exception as e:
-                        error_files = [
-                            {
-                                "file_path": str(file_path.name),
-                                "error_description": "[File Extraction]XLSX processing error",
-                                "original_error": f"Failed to extract text from XLSX: {str(e)}",
-                                "file_size": file_size,
-                            }
-                        ]
-                        await rag.apipeline_enqueue_error_documents(
-                            error_files, track_id
-                        )
-                        logger.error(
-                            f"[File Extraction]Error processing XLSX {file_path.name}: {str(e)}"
+                            f"[File Extraction]Error processing {ext[1:].upper()} {file_path.name}: {e.original_error}"
                         )
                         return False, track_id
 
@@ -1390,7 +1280,10 @@ async def pipeline_index_file(rag: LightRAG, file_path: Path, track_id: str = No
 async def pipeline_index_files(
     rag: LightRAG, file_paths: List[Path], track_id: str = None
 ):
-    """Index multiple files sequentially to avoid high CPU load
+    """Index multiple files, parsing them in parallel in the extraction process pool
+
+    Each file is enqueued as soon as its text is extracted, and the processing
+    pipeline starts with the first enqueued file instead of waiting for the rest.
 
     Args:
         rag: LightRAG instance
@@ -1400,22 +1293,35 @@ async def pipeline_index_files(
     if not file_paths:
         return
     try:
-        enqueued = False
+        processing_task = None
 
         # Use get_pinyin_sort_key for Chinese pinyin sorting
         sorted_file_paths = sorted(
             file_paths, key=lambda p: get_pinyin_sort_key(str(p))
         )
 
-        # Process files sequentially with track_id
-        for file_path in sorted_file_paths:
-            success, _ = await pipeline_enqueue_file(rag, file_path, track_id)
-            if success:
-                enqueued = True
+        # Bound the number of files held in memory while waiting for a worker
+        semaphore = asyncio.Semaphore(get_document_extractor().max_workers * 2)
+
+        async def _enqueue(file_path: Path) -> bool:
+            nonlocal processing_task
+            async with semaphore:
+                success, _ = await pipeline_enqueue_file(rag, file_path, track_id)
+            if success and processing_task is None:
+                processing_task = asyncio.create_task(
+                    rag.apipeline_process_enqueue_documents()
+                )
+            return success
+
+        results = await asyncio.gather(
+            *(_enqueue(file_path) for file_path in sorted_file_paths)
+        )
 
-        # Process the queue only if at least one file was successfully enqueued
-        if enqueued:
+        # Pick up files enqueued after the pipeline started (flags a pending request if busy)
+        if any(results):
             await rag.apipeline_process_enqueue_documents()
+        if processing_task is not None:
+            await processing_task
     except Exception as e:
         logger.error(f"Error indexing files: {str(e)}")
         logger.error(traceback.format_exc())
@@ -1521,7 +1427,7 @@ async def background_delete_documents(
         get_pipeline_status_lock,
     )
 
-    pipeline_status = await get_namespace_data("pipeline_status")
+    pipeline_status = await get_namespace_data(rag.pipeline_status_namespace)
     pipeline_status_lock = get_pipeline_status_lock()
 
     total_docs = len(doc_ids)
@@ -2015,7 +1921,7 @@ def create_document_routes(
         )
 
         # Get pipeline status and lock
-        pipeline_status = await get_namespace_data("pipeline_status")
+        pipeline_status = await get_namespace_data(rag.pipeline_status_namespace)
         pipeline_status_lock = get_pipeline_status_lock()
 
         # Check and set status with lock
@@ -2073,6 +1979,9 @@ def create_document_routes(
 
             # Wait for all drop tasks to complete
             drop_results = await asyncio.gather(*drop_tasks, return_exceptions=True)
+            if rag.chunks_bm25 is not None:
+                await rag.chunks_bm25.drop()
+            release_chunk_ids(rag.workspace)
 
             # Check for errors and log results
             errors = []
@@ -2210,7 +2119,7 @@ def create_document_routes(
                 get_all_update_flags_status,
             )
 
-            pipeline_status = await get_namespace_data("pipeline_status")
+            pipeline_status = await get_namespace_data(rag.pipeline_status_namespace)
 
             # Get update flags status for all namespaces
             update_status = await get_all_update_flags_status()
@@ -2417,7 +2326,7 @@ def create_document_routes(
         try:
             from lightrag.kg.shared_storage import get_namespace_data
 
-            pipeline_status = await get_namespace_data("pipeline_status")
+            pipeline_status = await get_namespace_data(rag.pipeline_status_namespace)
 
             # Check if pipeline is busy
             if pipeline_status.get("busy", False):
@@ -2824,7 +2733,7 @@ def create_document_routes(
                 get_pipeline_status_lock,
             )
 
-            pipeline_status = await get_namespace_data("pipeline_status")
+            pipeline_status = await get_namespace_data(rag.pipeline_status_namespace)
             pipeline_status_lock = get_pipeline_status_lock()
 
             async with pipeline_status_lock:
@@ -3,11 +3,14 @@ This module contains all graph-related routes for the LightRAG API.
 """
 
 from typing import Optional, Dict, Any
+import gzip
 import traceback
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
 from lightrag.utils import logger
+from ..graph_cache import SubgraphCache
 from ..utils_api import get_combined_auth_dependency
 
 router = APIRouter(tags=["graph"])
@@ -85,7 +88,9 @@ class RelationCreateRequest(BaseModel):
     )
 
 
-def create_graph_routes(rag, api_key: Optional[str] = None):
+def create_graph_routes(
+    rag, api_key: Optional[str] = None, graph_cache: Optional[SubgraphCache] = None
+):
     combined_auth = get_combined_auth_dependency(api_key)
 
     @router.get("/graph/label/list", dependencies=[Depends(combined_auth)])
@@ -157,6 +162,7 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
 
     @router.get("/graphs", dependencies=[Depends(combined_auth)])
     async def get_knowledge_graph(
+        request: Request,
         label: str = Query(..., description="Label to get knowledge graph for"),
         max_depth: int = Query(3, description="Maximum depth of graph", ge=1),
         max_nodes: int = Query(1000, description="Maximum nodes to return", ge=1),
@@ -181,10 +187,25 @@ def create_graph_routes(rag, api_key: Optional[str] = None):
                 f"get_knowledge_graph called with label: '{label}' (length: {len(label)}, repr: {repr(label)})"
             )
 
-            return await rag.get_knowledge_graph(
-                node_label=label,
-                max_depth=max_depth,
-                max_nodes=max_nodes,
+            if graph_cache is None:
+                return await rag.get_knowledge_graph(
+                    node_label=label,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                )
+
+            payload, etag = await graph_cache.get(label, max_depth, max_nodes)
+            headers = {"Vary": "Accept-Encoding"}
+            if etag:
+                headers["ETag"] = etag
+                if request.headers.get("if-none-match") == etag:
+                    return Response(status_code=304, headers=headers)
+            if "gzip" in request.headers.get("accept-encoding", ""):
+                headers["Content-Encoding"] = "gzip"
+            else:
+                payload = gzip.decompress(payload)
+            return Response(
+                content=payload, media_type="application/json", headers=headers
             )
         except Exception as e:
             logger.error(f"Error getting knowledge graph for label '{label}': {str(e)}")
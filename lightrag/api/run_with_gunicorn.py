@@ -6,7 +6,6 @@ Start LightRAG server with Gunicorn
 import os
 import sys
 import signal
-import pipmaster as pm
 from lightrag.api.utils_api import display_splash_screen, check_env_file
 from lightrag.api.config import global_args
 from lightrag.utils import get_env_value
@@ -20,6 +19,8 @@ from lightrag.constants import (
 
 def check_and_install_dependencies():
     """Check and install required dependencies"""
+    import pipmaster as pm
+
     required_packages = [
         "gunicorn",
         "tiktoken",
@@ -0,0 +1,398 @@
+"""
+Per-workspace LightRAG instances for a multi-tenant API server.
+
+A request selects its workspace through a header. The pool creates the
+workspace's LightRAG instance and document manager on first use, initializes
+its storages lazily, and unloads the least recently used workspaces (calling
+finalize_storages) when the number of loaded workspaces or the process memory
+exceeds the configured budget. All instances share the server's LLM and
+embedding functions, so the concurrency queues and HTTP clients are shared too.
+
+The routers keep working with a single object: TenantProxy forwards every
+attribute access to the instance bound to the current request.
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Collection
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.security.utils import get_authorization_scheme_param
+
+from lightrag import LightRAG
+from lightrag.kg.shared_storage import (
+    get_namespace_data,
+    initialize_pipeline_status,
+    release_namespaces,
+)
+from lightrag.utils import logger, priority_limit_async_func_call
+
+# Same constraint as the WORKSPACE setting, the name is used in paths and table names
+WORKSPACE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+class TenantPoolFullError(Exception):
+    """Raised when a workspace cannot be loaded because no loaded one can be unloaded"""
+
+
+@dataclass
+class Tenant:
+    """A loaded workspace: its LightRAG instance and document manager"""
+
+    workspace: str
+    rag: LightRAG
+    doc_manager: Any
+    leases: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    initialized: bool = False
+    _init_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    async def ensure_initialized(self) -> None:
+        async with self._init_lock:
+            if self.initialized:
+                return
+            start = time.perf_counter()
+            await self.rag.initialize_storages()
+            await initialize_pipeline_status(self.rag.pipeline_status_namespace)
+            await self.rag.check_and_migrate_data()
+            self.initialized = True
+            logger.info(
+                f"[{self.workspace}] Workspace loaded in {time.perf_counter() - start:.2f}s"
+            )
+
+
+_current_tenant: ContextVar[Tenant | None] = ContextVar("_current_tenant", default=None)
+
+
+def share_func_queue(
+    func: Callable,
+    max_async: int,
+    timeout: int | None,
+    queue_name: str,
+    reserved_slots: int = 0,
+) -> Callable:
+    """Wrap an LLM or embedding function with one priority queue used by all instances
+
+    LightRAG keeps a function marked as shared as it is instead of wrapping it in a
+    queue of its own, so max_async bounds the calls of all workspaces together.
+    Calls are queued fairly between workspaces, each LightRAG instance queues its
+    calls under its workspace's flow.
+    """
+    limited = priority_limit_async_func_call(
+        max_async,
+        llm_timeout=timeout,
+        queue_name=queue_name,
+        reserved_slots=reserved_slots,
+    )(func)
+    limited.shared_queue = True
+    return limited
+
+
+class LightRAGPool:
+    """LRU pool of per-workspace LightRAG instances
+
+    Args:
+        default: The server's default workspace, always loaded and never unloaded
+        factory: Builds the (rag, doc_manager) pair of a workspace, without initializing it
+        max_instances: Maximum number of loaded workspaces besides the default one
+        max_memory_mb: Resident memory of the process in MB above which idle
+            workspaces are unloaded, 0 disables the memory budget
+    """
+
+    def __init__(
+        self,
+        default: Tenant,
+        factory: Callable[[str], tuple[LightRAG, Any]],
+        max_instances: int,
+        max_memory_mb: int = 0,
+    ):
+        self.default = default
+        self.default.initialized = True
+        self.factory = factory
+        self.max_instances = max_instances
+        self.max_memory_mb = max_memory_mb
+        self._tenants: OrderedDict[str, Tenant] = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._process = None
+        self.loads = 0
+        self.evictions = 0
+
+        if max_memory_mb > 0:
+            try:
+                import psutil
+
+                self._process = psutil.Process()
+            except ImportError:
+                logger.warning(
+                    "psutil not installed, workspace pool memory budget is disabled"
+                )
+
+    def current(self) -> Tenant:
+        """The workspace bound to the running request, the default one outside requests"""
+        return _current_tenant.get() or self.default
+
+    def _memory_mb(self) -> float:
+        if self._process is None:
+            return 0
+        return self._process.memory_info().rss / (1024 * 1024)
+
+    async def _is_idle(self, tenant: Tenant) -> bool:
+        if tenant.leases > 0 or not tenant.initialized:
+            return False
+        pipeline_status = await get_namespace_data(tenant.rag.pipeline_status_namespace)
+        return not pipeline_status.get("busy", False)
+
+    async def _checkout(self, workspace: str) -> Tenant:
+        async with self._lock:
+            tenant = self._tenants.get(workspace)
+            if tenant is None:
+                if len(self._tenants) >= self.max_instances:
+                    await self._evict(len(self._tenants) - self.max_instances + 1)
+                if len(self._tenants) >= self.max_instances:
+                    raise TenantPoolFullError(
+                        f"All {self.max_instances} loaded workspaces are busy"
+                    )
+                rag, doc_manager = self.factory(workspace)
+                tenant = Tenant(workspace=workspace, rag=rag, doc_manager=doc_manager)
+                self._tenants[workspace] = tenant
+                self.loads += 1
+            self._tenants.move_to_end(workspace)
+            tenant.leases += 1
+
+        try:
+            await tenant.ensure_initialized()
+        except Exception:
+            tenant.leases -= 1
+            async with self._lock:
+                if not tenant.initialized and self._tenants.get(workspace) is tenant:
+                    del self._tenants[workspace]
+            raise
+        return tenant
+
+    async def _evict(self, count: int) -> int:
+        """Unload up to count idle workspaces, least recently used first (pool lock held)"""
+        victims = []
+        for tenant in list(self._tenants.values()):
+            if len(victims) >= count:
+                break
+            if await self._is_idle(tenant):
+                del self._tenants[tenant.workspace]
+                victims.append(tenant)
+
+        for tenant in victims:
+            await self._unload(tenant)
+        return len(victims)
+
+    async def _unload(self, tenant: Tenant) -> None:
+        rag = tenant.rag
+        namespaces = [rag.pipeline_status_namespace]
+        for storage in (
+            rag.full_docs,
+            rag.text_chunks,
+            rag.full_entities,
+            rag.full_relations,
+            rag.entity_chunks,
+            rag.relation_chunks,
+            rag.entities_vdb,
+            rag.relationships_vdb,
+            rag.chunks_vdb,
+            rag.chunk_entity_relation_graph,
+            rag.llm_response_cache,
+            rag.doc_status,
+        ):
+            final_namespace = getattr(storage, "final_namespace", None)
+            if final_namespace:
+                namespaces.append(final_namespace)
+        try:
+            await rag.finalize_storages()
+        except Exception as e:
+            logger.error(f"[{tenant.workspace}] Failed to finalize workspace: {e}")
+        await release_namespaces(namespaces)
+        self.evictions += 1
+        logger.info(
+            f"[{tenant.workspace}] Workspace unloaded after {time.monotonic() - tenant.last_used:.0f}s idle"
+        )
+
+    async def _enforce_memory_budget(self) -> None:
+        if self._process is None or self._memory_mb() <= self.max_memory_mb:
+            return
+        async with self._lock:
+            while self._tenants and self._memory_mb() > self.max_memory_mb:
+                if not await self._evict(1):
+                    logger.warning(
+                        f"Process memory {self._memory_mb():.0f}MB exceeds the workspace pool budget of {self.max_memory_mb}MB, but no loaded workspace is idle"
+                    )
+                    break
+
+    @asynccontextmanager
+    async def lease(self, workspace: str):
+        """Bind a workspace to the running request, loading it if needed
+
+        Raises:
+            TenantPoolFullError: if the pool is full and no workspace can be unloaded
+        """
+        if workspace == self.default.workspace:
+            tenant = self.default
+            tenant.leases += 1
+        else:
+            tenant = await self._checkout(workspace)
+        token = _current_tenant.set(tenant)
+        try:
+            yield tenant
+        finally:
+            _current_tenant.reset(token)
+            tenant.leases -= 1
+            tenant.last_used = time.monotonic()
+            if tenant is not self.default:
+                await self._enforce_memory_budget()
+
+    async def close(self) -> None:
+        """Finalize every loaded workspace except the default one"""
+        async with self._lock:
+            tenants = list(self._tenants.values())
+            self._tenants.clear()
+        for tenant in tenants:
+            if tenant.initialized:
+                await self._unload(tenant)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "loaded": len(self._tenants),
+            "max_instances": self.max_instances,
+            "memory_mb": round(self._memory_mb()) if self._process else None,
+            "max_memory_mb": self.max_memory_mb,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "workspaces": list(self._tenants),
+        }
+
+
+class TenantProxy:
+    """Stands in for the LightRAG instance or document manager given to the routers
+
+    Attribute access is forwarded to the object of the workspace bound to the
+    running request.
+    """
+
+    def __init__(self, pool: LightRAGPool, attr: str):
+        self._pool = pool
+        self._attr = attr
+
+    def __getattr__(self, name: str):
+        return getattr(getattr(self._pool.current(), self._attr), name)
+
+
+class TenantMiddleware:
+    """ASGI middleware binding each request to the workspace named in a header
+
+    Requests without the header use the default workspace. The lease covers the
+    whole request including its background tasks, so a workspace is never
+    unloaded while one of its requests is still running.
+
+    Loading a workspace creates its directories and storages and may unload
+    other workspaces, so requests naming a workspace are authenticated before
+    it is loaded, whatever the route, and may be restricted to a list of
+    workspaces.
+
+    Args:
+        pool: The workspace pool
+        header_name: Name of the header selecting the workspace
+        authenticate: Checks the bearer token and X-API-Key header value of a
+            request, raising HTTPException if they are not valid
+        allowed_workspaces: Workspaces requests may select, None allows any name
+    """
+
+    def __init__(
+        self,
+        app,
+        pool: LightRAGPool,
+        header_name: str,
+        authenticate: Callable[[str | None, str | None], None] | None = None,
+        allowed_workspaces: Collection[str] | None = None,
+    ):
+        self.app = app
+        self.pool = pool
+        self.header_name = header_name.lower().encode("latin-1")
+        self.authenticate = authenticate
+        self.allowed_workspaces = (
+            set(allowed_workspaces) if allowed_workspaces else None
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        workspace = None
+        authorization = None
+        api_key = None
+        for key, value in scope["headers"]:
+            if key == self.header_name:
+                workspace = value.decode("latin-1").strip()
+            elif key == b"authorization":
+                authorization = value.decode("latin-1")
+            elif key == b"x-api-key":
+                api_key = value.decode("latin-1")
+        if not workspace or workspace == self.pool.default.workspace:
+            await self.app(scope, receive, send)
+            return
+
+        if self.authenticate is not None:
+            scheme, token = get_authorization_scheme_param(authorization)
+            try:
+                self.authenticate(
+                    token if scheme.lower() == "bearer" else None, api_key
+                )
+            except HTTPException as e:
+                response = JSONResponse(
+                    status_code=e.status_code,
+                    content={"detail": e.detail},
+                    headers=e.headers,
+                )
+                await response(scope, receive, send)
+                return
+
+        if not WORKSPACE_NAME_PATTERN.match(workspace):
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"Invalid workspace name: {workspace}"},
+            )
+            await response(scope, receive, send)
+            return
+        if (
+            self.allowed_workspaces is not None
+            and workspace not in self.allowed_workspaces
+        ):
+            response = JSONResponse(
+                status_code=403,
+                content={"detail": f"Workspace not allowed: {workspace}"},
+            )
+            await response(scope, receive, send)
+            return
+
+        lease = self.pool.lease(workspace)
+        try:
+            await lease.__aenter__()
+        except TenantPoolFullError as e:
+            response = JSONResponse(status_code=503, content={"detail": str(e)})
+            await response(scope, receive, send)
+            return
+        except Exception as e:
+            logger.error(f"[{workspace}] Failed to load workspace: {e}")
+            response = JSONResponse(
+                status_code=500,
+                content={"detail": f"Failed to load workspace {workspace}: {e}"},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            await lease.__aexit__(None, None, None)
@@ -56,6 +56,94 @@ for path in whitelist_paths:
 auth_configured = bool(auth_handler.accounts)
 
 
+def check_credentials(
+    path: Optional[str],
+    token: Optional[str],
+    api_key_header_value: Optional[str],
+    api_key: Optional[str] = None,
+) -> None:
+    """
+    Authenticate a request by its path, OAuth2 token and API key header value.
+
+    Args:
+        path (Optional[str]): Request path, None to ignore the whitelist paths
+        token (Optional[str]): Bearer token of the request
+        api_key_header_value (Optional[str]): Value of the X-API-Key header
+        api_key (Optional[str]): API key for validation
+
+    Raises:
+        HTTPException: 401 or 403 if the request is not authenticated
+    """
+    api_key_configured = bool(api_key)
+
+    # 1. Check if path is in whitelist
+    if path is not None:
+        for pattern, is_prefix in whitelist_patterns:
+            if (is_prefix and path.startswith(pattern)) or (
+                not is_prefix and path == pattern
+            ):
+                return  # Whitelist path, allow access
+
+    # 2. Validate token first if provided in the request (Ensure 401 error if token is invalid)
+    if token:
+        try:
+            token_info = auth_handler.validate_token(token)
+            # Accept guest token if no auth is configured
+            if not auth_configured and token_info.get("role") == "guest":
+                return
+            # Accept non-guest token if auth is configured
+            if auth_configured and token_info.get("role") != "guest":
+                return
+
+            # Token validation failed, immediately return 401 error
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token. Please login again.",
+            )
+        except HTTPException as e:
+            # If already a 401 error, re-raise it
+            if e.status_code == status.HTTP_401_UNAUTHORIZED:
+                raise
+            # For other exceptions, continue processing
+
+    # 3. Acept all request if no API protection needed
+    if not auth_configured and not api_key_configured:
+        return
+
+    # 4. Validate API key if provided and API-Key authentication is configured
+    if api_key_configured and api_key_header_value and api_key_header_value == api_key:
+        return  # API key validation successful
+
+    ### Authentication failed ####
+
+    # if password authentication is configured but not provided, ensure 401 error if auth_configured
+    if auth_configured and not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No credentials provided. Please login.",
+        )
+
+    # if api key is provided but validation failed
+    if api_key_header_value:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail="Invalid API Key",
+        )
+
+    # if api_key_configured but not provided
+    if api_key_configured and not api_key_header_value:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN,
+            detail="API Key required",
+        )
+
+    # Otherwise: refuse access and return 403 error
+    raise HTTPException(
+        status_code=HTTP_403_FORBIDDEN,
+        detail="API Key required or login authentication required.",
+    )
+
+
 def get_combined_auth_dependency(api_key: Optional[str] = None):
     """
     Create a combined authentication dependency that implements authentication logic
@@ -92,76 +180,7 @@ def get_combined_auth_dependency(api_key: Optional[str] = None):
         if api_key_header is None
         else Security(api_key_header),
     ):
-        # 1. Check if path is in whitelist
-        path = request.url.path
-        for pattern, is_prefix in whitelist_patterns:
-            if (is_prefix and path.startswith(pattern)) or (
-                not is_prefix and path == pattern
-            ):
-                return  # Whitelist path, allow access
-
-        # 2. Validate token first if provided in the request (Ensure 401 error if token is invalid)
-        if token:
-            try:
-                token_info = auth_handler.validate_token(token)
-                # Accept guest token if no auth is configured
-                if not auth_configured and token_info.get("role") == "guest":
-                    return
-                # Accept non-guest token if auth is configured
-                if auth_configured and token_info.get("role") != "guest":
-                    return
-
-                # Token validation failed, immediately return 401 error
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token. Please login again.",
-                )
-            except HTTPException as e:
-                # If already a 401 error, re-raise it
-                if e.status_code == status.HTTP_401_UNAUTHORIZED:
-                    raise
-                # For other exceptions, continue processing
-
-        # 3. Acept all request if no API protection needed
-        if not auth_configured and not api_key_configured:
-            return
-
-        # 4. Validate API key if provided and API-Key authentication is configured
-        if (
-            api_key_configured
-            and api_key_header_value
-            and api_key_header_value == api_key
-        ):
-            return  # API key validation successful
-
-        ### Authentication failed ####
-
-        # if password authentication is configured but not provided, ensure 401 error if auth_configured
-        if auth_configured and not token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="No credentials provided. Please login.",
-            )
-
-        # if api key is provided but validation failed
-        if api_key_header_value:
-            raise HTTPException(
-                status_code=HTTP_403_FORBIDDEN,
-                detail="Invalid API Key",
-            )
-
-        # if api_key_configured but not provided
-        if api_key_configured and not api_key_header_value:
-            raise HTTPException(
-                status_code=HTTP_403_FORBIDDEN,
-                detail="API Key required",
-            )
-
-        # Otherwise: refuse access and return 403 error
-        raise HTTPException(
-            status_code=HTTP_403_FORBIDDEN,
-            detail="API Key required or login authentication required.",
-        )
+        check_credentials(request.url.path, token, api_key_header_value, api_key)
 
     return combined_dependency
 
@@ -283,6 +302,8 @@ def display_splash_screen(args: argparse.Namespace) -> None:
     ASCIIColors.magenta("\n💾 Storage Configuration:")
     ASCIIColors.white("    ├─ KV Storage: ", end="")
     ASCIIColors.yellow(f"{args.kv_storage}")
+    ASCIIColors.white("    ├─ LLM Cache Storage: ", end="")
+    ASCIIColors.yellow(f"{args.llm_cache_storage or args.kv_storage}")
     ASCIIColors.white("    ├─ Vector Storage: ", end="")
     ASCIIColors.yellow(f"{args.vector_storage}")
     ASCIIColors.white("    ├─ Graph Storage: ", end="")
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from enum import Enum
+import asyncio
+import functools
+import inspect
 import os
 from dotenv import load_dotenv
 from dataclasses import dataclass, field
@@ -17,6 +20,7 @@ from typing import (
     AsyncIterator,
 )
 from .utils import EmbeddingFunc
+from .tracing import is_tracing_active, span
 from .types import KnowledgeGraph
 from .constants import (
     GRAPH_FIELD_SEP,
@@ -169,6 +173,26 @@ class QueryParam:
     containing citation information for the retrieved content.
     """
 
+    include_timings: bool = False
+    """If True, query_data returns the timing breakdown of the query (keyword extraction,
+    searches, storage calls, LLM queue) in metadata["timings"]. Works without enabling tracing.
+    """
+
+
+def _trace_storage_method(method):
+    @functools.wraps(method)
+    async def traced_method(self, *args, **kwargs):
+        if not is_tracing_active():
+            return await method(self, *args, **kwargs)
+        with span(
+            f"{type(self).__name__}.{method.__name__}",
+            {"namespace": getattr(self, "namespace", "")},
+        ):
+            return await method(self, *args, **kwargs)
+
+    traced_method._storage_traced = True
+    return traced_method
+
 
 @dataclass
 class StorageNameSpace(ABC):
@@ -176,6 +200,18 @@ class StorageNameSpace(ABC):
     workspace: str
     global_config: dict[str, Any]
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Record the public async methods of every storage implementation as spans
+        for name, value in list(vars(cls).items()):
+            if (
+                not name.startswith("_")
+                and inspect.iscoroutinefunction(value)
+                and not getattr(value, "__isabstractmethod__", False)
+                and not getattr(value, "_storage_traced", False)
+            ):
+                setattr(cls, name, _trace_storage_method(value))
+
     async def initialize(self):
         """Initialize the storage"""
         pass
@@ -184,10 +220,27 @@ class StorageNameSpace(ABC):
         """Finalize the storage"""
         pass
 
+    async def ensure_loaded(self) -> None:
+        """Finish loading data that initialize deferred
+
+        File-backed storages of namespaces listed in lazy_load_namespaces skip
+        loading their files in initialize and load them on first access or when
+        this is awaited. Other storages are fully loaded by initialize.
+        """
+        pass
+
     @abstractmethod
     async def index_done_callback(self) -> None:
         """Commit the storage operations after indexing"""
 
+    def get_last_flush_bytes(self) -> int | None:
+        """Bytes written to local files by the last index_done_callback
+
+        File-backed storages report 0 when the flush was skipped because nothing
+        changed. Storages persisting to a remote service return None.
+        """
+        return None
+
     @abstractmethod
     async def drop(self) -> dict[str, str]:
         """Drop all data from storage and clean up resources
@@ -234,6 +287,28 @@ class BaseVectorStorage(StorageNameSpace, ABC):
                            If provided, skips embedding computation for better performance.
         """
 
+    async def query_batch(
+        self, query_embeddings: list[list[float]], top_k: int
+    ) -> list[list[dict[str, Any]]]:
+        """Run one top_k search per pre-computed query embedding.
+
+        Results are returned in the order of query_embeddings, each list shaped like
+        the result of query(). The default runs query() once per embedding; storages
+        with native multi-vector search override it to search all vectors in one call.
+
+        Args:
+            query_embeddings: Pre-computed query embeddings
+            top_k: Number of top results to return per embedding
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.query("", top_k=top_k, query_embedding=embedding)
+                    for embedding in query_embeddings
+                )
+            )
+        )
+
     @abstractmethod
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """Insert or update vectors in the storage.
@@ -327,6 +402,30 @@ class BaseKVStorage(StorageNameSpace, ABC):
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
         """Get values by ids"""
 
+    async def get_fields_by_ids(
+        self, ids: list[str], fields: list[str]
+    ) -> list[dict[str, Any] | None]:
+        """Get some fields of the values by ids
+
+        Remote backends override this to fetch only the requested fields, e.g.
+        chunk token counts without the chunk text.
+
+        Args:
+            ids: Ids to look up
+            fields: Names of the fields to return
+
+        Returns:
+            list: One dict of the requested fields present in each value, in the
+            order of ids, None for missing ids
+        """
+        values = await self.get_by_ids(ids)
+        return [
+            None
+            if value is None
+            else {field: value[field] for field in fields if field in value}
+            for value in values
+        ]
+
     @abstractmethod
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Return un-exist keys"""
@@ -714,6 +813,26 @@ class BaseGraphStorage(StorageNameSpace, ABC):
             List of matching labels sorted by relevance
         """
 
+    async def get_graph_version(self) -> int | None:
+        """Get the version of the graph data, bumped by index_done_callback after changes
+
+        Results derived from the graph, such as cached subgraphs, stay valid while
+        the version is unchanged.
+
+        Returns:
+            The current version, or None if the storage does not track versions
+        """
+        return None
+
+    def is_shared_graph(self) -> bool:
+        """Whether other LightRAG servers may write to the same graph
+
+        The graph version only counts the changes made by the workers of this
+        server, results cached by version must expire when other servers can
+        write to the graph.
+        """
+        return True
+
 
 class DocStatus(str, Enum):
     """Document processing status"""
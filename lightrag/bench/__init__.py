@@ -0,0 +1,42 @@
+"""
+Throughput and latency benchmarks of LightRAG's own code paths.
+
+The LLM, embedding model and tokenizer are replaced by deterministic fakes, so
+results measure chunking, extraction parsing, merging, storage and query
+context building rather than model providers. Run ``python -m lightrag.bench``
+or ``lightrag-bench``, see ``--help`` for options; ``python -m
+lightrag.bench.parser`` benchmarks parsing of extraction output alone.
+"""
+
+from lightrag.bench.corpus import (
+    generate_corpus,
+    generate_custom_kg,
+    generate_entity_names,
+    generate_extraction_output,
+    generate_queries,
+)
+from lightrag.bench.fakes import FakeEmbedding, FakeLLM, FakeLLMError, FakeTokenizer
+from lightrag.bench.runner import (
+    QUERY_MODES,
+    STORAGE_PRESETS,
+    BenchConfig,
+    run_backend,
+    run_benchmark,
+)
+
+__all__ = [
+    "BenchConfig",
+    "FakeEmbedding",
+    "FakeLLM",
+    "FakeLLMError",
+    "FakeTokenizer",
+    "QUERY_MODES",
+    "STORAGE_PRESETS",
+    "generate_corpus",
+    "generate_custom_kg",
+    "generate_entity_names",
+    "generate_extraction_output",
+    "generate_queries",
+    "run_backend",
+    "run_benchmark",
+]
@@ -0,0 +1,168 @@
+"""
+Command line entry point: python -m lightrag.bench
+
+Examples:
+    python -m lightrag.bench --docs 100 --output bench.json
+    python -m lightrag.bench --backends json --llm-latency 0.05 --modes mix naive
+    REDIS_URI=redis://localhost:6379 python -m lightrag.bench --backends \\
+        --kv-storage RedisKVStorage --doc-status-storage RedisDocStatusStorage
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from lightrag.bench.runner import (
+    QUERY_MODES,
+    STORAGE_PRESETS,
+    BenchConfig,
+    run_benchmark,
+)
+from lightrag.utils import logger
+
+_DEFAULT_STORAGES = STORAGE_PRESETS["json"]["storages"]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    defaults = BenchConfig()
+    parser = argparse.ArgumentParser(
+        prog="lightrag-bench",
+        description="Benchmark LightRAG ingestion, queries and deletion with a fake LLM and embedding",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="*",
+        default=None,
+        help=f"Storage presets to run (default: all of {', '.join(STORAGE_PRESETS)}), "
+        "pass no value to run only the custom storages",
+    )
+    parser.add_argument(
+        "--kv-storage", help="Run a custom backend with this KV storage"
+    )
+    parser.add_argument("--vector-storage", help="Vector storage of the custom backend")
+    parser.add_argument("--graph-storage", help="Graph storage of the custom backend")
+    parser.add_argument(
+        "--doc-status-storage", help="Doc status storage of the custom backend"
+    )
+    parser.add_argument("--docs", type=int, default=defaults.num_docs)
+    parser.add_argument(
+        "--sentences-per-doc", type=int, default=defaults.sentences_per_doc
+    )
+    parser.add_argument("--entities", type=int, default=defaults.num_entities)
+    parser.add_argument("--queries", type=int, default=defaults.num_queries)
+    parser.add_argument(
+        "--modes", nargs="+", choices=QUERY_MODES, default=defaults.query_modes
+    )
+    parser.add_argument(
+        "--query-concurrency", type=int, default=defaults.query_concurrency
+    )
+    parser.add_argument(
+        "--delete-fraction",
+        type=float,
+        default=defaults.delete_fraction,
+        help="Share of the documents deleted in the delete scenario",
+    )
+    parser.add_argument("--kg-entities", type=int, default=defaults.kg_entities)
+    parser.add_argument("--kg-relations", type=int, default=defaults.kg_relations)
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=defaults.llm_latency,
+        help="Mean seconds per fake LLM call",
+    )
+    parser.add_argument(
+        "--embedding-latency",
+        type=float,
+        default=defaults.embedding_latency,
+        help="Mean seconds per fake embedding call",
+    )
+    parser.add_argument(
+        "--llm-failure-rate", type=float, default=defaults.llm_failure_rate
+    )
+    parser.add_argument(
+        "--embedding-failure-rate",
+        type=float,
+        default=defaults.embedding_failure_rate,
+    )
+    parser.add_argument("--embedding-dim", type=int, default=defaults.embedding_dim)
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_token_size)
+    parser.add_argument("--max-async", type=int, default=defaults.max_async)
+    parser.add_argument(
+        "--max-parallel-insert", type=int, default=defaults.max_parallel_insert
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--working-dir", help="Parent directory of the temporary working directories"
+    )
+    parser.add_argument(
+        "--keep-data",
+        action="store_true",
+        help="Keep the working directories after the run",
+    )
+    parser.add_argument(
+        "--output", "-o", help="Write the JSON results to this file instead of stdout"
+    )
+    parser.add_argument("--verbose", "-v", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logger.setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    config = BenchConfig(
+        num_docs=args.docs,
+        sentences_per_doc=args.sentences_per_doc,
+        num_entities=args.entities,
+        num_queries=args.queries,
+        query_modes=args.modes,
+        query_concurrency=args.query_concurrency,
+        delete_fraction=args.delete_fraction,
+        kg_entities=args.kg_entities,
+        kg_relations=args.kg_relations,
+        llm_latency=args.llm_latency,
+        embedding_latency=args.embedding_latency,
+        llm_failure_rate=args.llm_failure_rate,
+        embedding_failure_rate=args.embedding_failure_rate,
+        embedding_dim=args.embedding_dim,
+        chunk_token_size=args.chunk_size,
+        max_async=args.max_async,
+        max_parallel_insert=args.max_parallel_insert,
+        seed=args.seed,
+        working_dir=args.working_dir,
+        keep_data=args.keep_data,
+    )
+
+    custom_storages = None
+    overrides = {
+        "kv_storage": args.kv_storage,
+        "vector_storage": args.vector_storage,
+        "graph_storage": args.graph_storage,
+        "doc_status_storage": args.doc_status_storage,
+    }
+    if any(overrides.values()):
+        custom_storages = {
+            key: value or _DEFAULT_STORAGES[key] for key, value in overrides.items()
+        }
+
+    backends = args.backends
+    if backends is not None and not backends and custom_storages is None:
+        print("Error: no backend selected", file=sys.stderr)
+        sys.exit(2)
+
+    results = asyncio.run(
+        run_benchmark(config, backends=backends, custom_storages=custom_storages)
+    )
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"Benchmark results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
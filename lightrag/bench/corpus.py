@@ -0,0 +1,248 @@
+"""
+Synthetic corpora, queries and knowledge graphs for benchmarks.
+
+Entity names are invented capitalized words and are picked with a Zipf-like
+skew, so a few hub entities appear in many documents (exercising description
+merging and rebuild on deletion) while most appear only a few times.
+"""
+
+from __future__ import annotations
+
+import random
+
+from lightrag.prompt import PROMPTS
+
+_SYLLABLES = [
+    "ka",
+    "lo",
+    "mir",
+    "ven",
+    "tor",
+    "sa",
+    "rel",
+    "dun",
+    "bri",
+    "for",
+    "nal",
+    "es",
+    "qua",
+    "thor",
+    "vi",
+    "zen",
+    "mo",
+    "ral",
+    "tis",
+    "gar",
+]
+_VERBS = [
+    "works with",
+    "competes against",
+    "acquired",
+    "supplies",
+    "advises",
+    "invested in",
+    "partners with",
+    "reports to",
+    "founded",
+    "audits",
+]
+_TOPICS = [
+    "renewable energy",
+    "supply chains",
+    "quarterly revenue",
+    "data privacy",
+    "river transport",
+    "medical research",
+    "urban planning",
+    "satellite links",
+]
+_FILLER = [
+    "the report notes that progress on {topic} remained steady during the year.",
+    "several observers linked the change to new rules on {topic}.",
+    "the agreement covers {topic} and runs for three years.",
+    "critics questioned the cost of the work on {topic}.",
+]
+
+
+def generate_entity_names(count: int, seed: int = 0) -> list[str]:
+    """Unique capitalized names built from random syllables"""
+    rng = random.Random(seed)
+    names: dict[str, None] = {}
+    while len(names) < count:
+        length = rng.randint(2, 4)
+        names.setdefault("".join(rng.choices(_SYLLABLES, k=length)).capitalize())
+    return list(names)
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> list[float]:
+    return [1.0 / (rank**exponent) for rank in range(1, count + 1)]
+
+
+def generate_corpus(
+    num_docs: int,
+    sentences_per_doc: int = 40,
+    num_entities: int = 200,
+    filler_ratio: float = 0.3,
+    seed: int = 0,
+) -> tuple[list[str], list[str]]:
+    """Generate documents made of relation sentences between named entities
+
+    Args:
+        num_docs: Number of documents
+        sentences_per_doc: Sentences per document
+        num_entities: Size of the entity vocabulary
+        filler_ratio: Share of sentences naming no entity
+        seed: Random seed
+
+    Returns:
+        (documents, entity_names)
+    """
+    rng = random.Random(seed)
+    names = generate_entity_names(num_entities, seed)
+    weights = _zipf_weights(num_entities)
+
+    documents = []
+    for doc_index in range(num_docs):
+        sentences = []
+        for _ in range(sentences_per_doc):
+            topic = rng.choice(_TOPICS)
+            if rng.random() < filler_ratio:
+                sentences.append(rng.choice(_FILLER).format(topic=topic).capitalize())
+                continue
+            source, target = rng.choices(names, weights=weights, k=2)
+            if source == target:
+                target = rng.choice(names)
+            sentences.append(
+                f"{source} {rng.choice(_VERBS)} {target} on {topic} in year {rng.randint(1990, 2025)}."
+            )
+        documents.append(f"Synthetic document {doc_index}. " + " ".join(sentences))
+    return documents, names
+
+
+def generate_queries(entity_names: list[str], count: int, seed: int = 0) -> list[str]:
+    """Questions about one or two entities, biased towards popular entities"""
+    rng = random.Random(seed + 1)
+    weights = _zipf_weights(len(entity_names))
+    queries = []
+    for i in range(count):
+        first, second = rng.choices(entity_names, weights=weights, k=2)
+        if i % 2:
+            queries.append(f"How is {first} related to {second}?")
+        else:
+            queries.append(f"What do the documents say about {first}?")
+    return queries
+
+
+# Tuple delimiter corruptions seen in LLM extraction output
+_DELIMITER_CORRUPTIONS = ["<|##|>", "<|>", "<#>", "<|#|", "|#|>", "<||#>", "||#||"]
+
+
+def generate_extraction_output(
+    num_records: int,
+    corruption_rate: float = 0.05,
+    inline_rate: float = 0.02,
+    seed: int = 0,
+) -> str:
+    """Generate an extraction (or gleaning) result in the tuple-delimited format
+
+    Args:
+        num_records: Number of entity and relation records
+        corruption_rate: Share of tuple delimiters replaced by a corrupted form
+        inline_rate: Share of records separated from the previous one by the
+            tuple delimiter instead of a new-line
+        seed: Random seed
+    """
+    tuple_delimiter = PROMPTS["DEFAULT_TUPLE_DELIMITER"]
+    rng = random.Random(seed)
+    names = generate_entity_names(max(num_records // 2, 2), seed)
+
+    def join(fields: list[str]) -> str:
+        out = fields[0]
+        for value in fields[1:]:
+            if rng.random() < corruption_rate:
+                out += rng.choice(_DELIMITER_CORRUPTIONS)
+            else:
+                out += tuple_delimiter
+            out += value
+        return out
+
+    parts = []
+    for i in range(num_records):
+        if i % 2 == 0:
+            name = names[(i // 2) % len(names)]
+            record = join(
+                ["entity", name, "concept", f"{name} works on {rng.choice(_TOPICS)}."]
+            )
+        else:
+            source, target = rng.sample(names, 2)
+            verb = rng.choice(_VERBS)
+            record = join(
+                ["relation", source, target, verb, f"{source} {verb} {target}."]
+            )
+        if parts:
+            parts.append(tuple_delimiter if rng.random() < inline_rate else "\n")
+        parts.append(record)
+    parts.append("\n" + PROMPTS["DEFAULT_COMPLETION_DELIMITER"])
+    return "".join(parts)
+
+
+def generate_custom_kg(
+    num_entities: int,
+    num_relations: int,
+    num_chunks: int = 10,
+    seed: int = 0,
+) -> dict:
+    """Generate a knowledge graph in the format of LightRAG.insert_custom_kg
+
+    Args:
+        num_entities: Number of entities
+        num_relations: Number of relations between random entity pairs
+        num_chunks: Number of source chunks the entities and relations cite
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    names = generate_entity_names(num_entities, seed)
+    chunks = [
+        {
+            "content": f"Synthetic source chunk {i} about {rng.choice(_TOPICS)}.",
+            "source_id": f"bench-source-{i}",
+            "file_path": "bench_custom_kg",
+        }
+        for i in range(max(num_chunks, 1))
+    ]
+    entities = [
+        {
+            "entity_name": name,
+            "entity_type": "concept",
+            "description": f"{name} is a synthetic entity about {rng.choice(_TOPICS)}.",
+            "source_id": rng.choice(chunks)["source_id"],
+            "file_path": "bench_custom_kg",
+        }
+        for name in names
+    ]
+    relationships = {}
+    attempts = 0
+    while (
+        len(names) > 1
+        and len(relationships) < num_relations
+        and attempts < num_relations * 10
+    ):
+        attempts += 1
+        source, target = rng.sample(names, 2)
+        key = tuple(sorted((source, target)))
+        if key in relationships:
+            continue
+        relationships[key] = {
+            "src_id": source,
+            "tgt_id": target,
+            "description": f"{source} {rng.choice(_VERBS)} {target}.",
+            "keywords": "synthetic",
+            "weight": 1.0,
+            "source_id": rng.choice(chunks)["source_id"],
+            "file_path": "bench_custom_kg",
+        }
+    return {
+        "chunks": chunks,
+        "entities": entities,
+        "relationships": list(relationships.values()),
+    }
@@ -0,0 +1,238 @@
+"""
+Deterministic stand-ins for the LLM, embedding model and tokenizer.
+
+The fakes answer every prompt LightRAG sends in the format it expects, so the
+whole pipeline (chunking, extraction parsing, merging, storage writes, query
+context building) runs without network access. Outputs depend only on the
+input text and the seed, latency and failures are drawn from a seeded random
+generator.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from lightrag.prompt import PROMPTS
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+_NAME_PATTERN = re.compile(r"\b[A-Z][a-z]{2,}\b")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD_PATTERN = re.compile(r"\w+")
+_TOKEN_PATTERN = re.compile(r"\s*\S+|\s+")
+_INPUT_TEXT = re.compile(r"Text:\s*```\s*(.*?)```", re.DOTALL)
+_STOPWORDS = {"The", "This", "That", "These", "Those", "What", "How", "Which", "Who"}
+_LOREM = (
+    "the knowledge graph links entities through relations described in the "
+    "retrieved context and the answer summarizes these facts for the user"
+).split()
+
+
+class FakeLLMError(Exception):
+    """Failure injected by FakeLLM or FakeEmbedding"""
+
+
+def _stable_hash(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def _names(text: str) -> list[str]:
+    """Capitalized words in order of first appearance"""
+    seen = {}
+    for name in _NAME_PATTERN.findall(text):
+        if name not in _STOPWORDS:
+            seen.setdefault(name, None)
+    return list(seen)
+
+
+class _FaultInjector:
+    def __init__(self, latency: float, jitter: float, failure_rate: float, seed: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    async def wait(self) -> None:
+        self.calls += 1
+        if self.latency > 0:
+            delay = self.latency * (1 + self.jitter * (2 * self._rng.random() - 1))
+            await asyncio.sleep(max(delay, 0))
+        if self.failure_rate > 0 and self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise FakeLLMError(f"Injected failure on call {self.calls}")
+
+
+class FakeLLM(_FaultInjector):
+    """Async LLM function answering LightRAG prompts deterministically
+
+    Extraction prompts get one entity per capitalized word of the input text and
+    one relation per sentence naming two entities. Gleaning prompts get an empty
+    result, keyword prompts get the capitalized words of the query, anything
+    else (summaries, answers) gets a fixed-length text.
+
+    Args:
+        latency: Mean seconds spent per call
+        jitter: Relative spread of the latency (0.5 means +-50%)
+        failure_rate: Probability of a call raising FakeLLMError
+        response_words: Number of words in summaries and answers
+        max_entities: Maximum number of entities extracted per chunk
+        seed: Seed of the latency and failure draws
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.5,
+        failure_rate: float = 0.0,
+        response_words: int = 120,
+        max_entities: int = 20,
+        seed: int = 0,
+    ):
+        super().__init__(latency, jitter, failure_rate, seed)
+        self.response_words = response_words
+        self.max_entities = max_entities
+        self.calls_by_kind: Counter[str] = Counter()
+
+    async def __call__(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        history_messages: list | None = None,
+        keyword_extraction: bool = False,
+        **kwargs,
+    ) -> str:
+        kind = self._kind(system_prompt, history_messages, keyword_extraction)
+        self.calls_by_kind[kind] += 1
+        await self.wait()
+        if kind == "extract":
+            match = _INPUT_TEXT.search(system_prompt or "")
+            return self._extract(match.group(1) if match else prompt)
+        if kind == "glean":
+            return PROMPTS["DEFAULT_COMPLETION_DELIMITER"]
+        if kind == "keywords":
+            query = prompt.rsplit("User Query:", 1)[-1]
+            return json.dumps(
+                {
+                    "high_level_keywords": ["relationship", "overview"],
+                    "low_level_keywords": _names(query)[:5],
+                }
+            )
+        return self._text(prompt)
+
+    @staticmethod
+    def _kind(system_prompt, history_messages, keyword_extraction) -> str:
+        if keyword_extraction:
+            return "keywords"
+        if system_prompt and PROMPTS["DEFAULT_TUPLE_DELIMITER"] in system_prompt:
+            return "glean" if history_messages else "extract"
+        return "generate"
+
+    def _extract(self, text: str) -> str:
+        delimiter = PROMPTS["DEFAULT_TUPLE_DELIMITER"]
+        entities = _names(text)[: self.max_entities]
+        known = set(entities)
+        lines = [
+            delimiter.join(
+                ["entity", name, "concept", f"{name} is mentioned in the text."]
+            )
+            for name in entities
+        ]
+        related = set()
+        for sentence in _SENTENCE_SPLIT.split(text):
+            names = [name for name in _names(sentence) if name in known]
+            if len(names) < 2 or (names[0], names[1]) in related:
+                continue
+            related.add((names[0], names[1]))
+            lines.append(
+                delimiter.join(
+                    ["relation", names[0], names[1], "related", sentence.strip()]
+                )
+            )
+        lines.append(PROMPTS["DEFAULT_COMPLETION_DELIMITER"])
+        return "\n".join(lines)
+
+    def _text(self, prompt: str) -> str:
+        offset = _stable_hash(prompt)
+        return " ".join(
+            _LOREM[(offset + i) % len(_LOREM)] for i in range(self.response_words)
+        )
+
+
+class FakeEmbedding(_FaultInjector):
+    """Async embedding function returning hashed bag-of-words vectors
+
+    Texts sharing words get similar vectors, so vector retrieval returns
+    meaningful neighbours instead of random ones.
+
+    Args:
+        dim: Embedding dimension
+        latency: Mean seconds spent per call
+        jitter: Relative spread of the latency
+        failure_rate: Probability of a call raising FakeLLMError
+        seed: Seed of the latency and failure draws
+    """
+
+    def __init__(
+        self,
+        dim: int = 256,
+        latency: float = 0.0,
+        jitter: float = 0.5,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(latency, jitter, failure_rate, seed)
+        self.dim = dim
+        self.texts = 0
+
+    async def __call__(self, texts: list[str], **kwargs) -> np.ndarray:
+        await self.wait()
+        self.texts += len(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_PATTERN.findall(text.lower())
+            if not words:
+                vectors[row, 0] = 1.0
+                continue
+            columns = [_stable_hash(word) % self.dim for word in words]
+            np.add.at(vectors[row], columns, 1.0)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+    def as_embedding_func(self, max_token_size: int = 8192) -> EmbeddingFunc:
+        return EmbeddingFunc(
+            embedding_dim=self.dim, max_token_size=max_token_size, func=self
+        )
+
+
+class FakeTokenizer(Tokenizer):
+    """Reversible word-level tokenizer, one token per word with its leading whitespace
+
+    Token counts come close to BPE tokenizers on English text without needing
+    the tiktoken model files.
+    """
+
+    def __init__(self):
+        super().__init__(model_name="fake-word-tokenizer", tokenizer=self)
+        self._ids: dict[str, int] = {}
+        self._tokens: list[str] = []
+
+    def encode(self, content: str) -> list[int]:
+        ids = []
+        for token in _TOKEN_PATTERN.findall(content):
+            token_id = self._ids.get(token)
+            if token_id is None:
+                token_id = self._ids[token] = len(self._tokens)
+                self._tokens.append(token)
+            ids.append(token_id)
+        return ids
+
+    def decode(self, tokens: list[int]) -> str:
+        return "".join(self._tokens[token_id] for token_id in tokens)
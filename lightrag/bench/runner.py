@@ -0,0 +1,352 @@
+"""
+Benchmark scenarios and result collection.
+
+For every storage backend the runner builds a fresh LightRAG instance in a
+temporary working directory and runs, in order:
+
+- insert: ainsert of the synthetic corpus through the document pipeline
+- custom_kg: ainsert_custom_kg of a synthetic graph
+- query: every query mode over the generated questions
+- delete: adelete_by_doc_id of a share of the documents, including the
+  rebuild of entities and relations they shared with other documents
+
+Peak RSS is the peak of the whole process so far, run one backend per process
+when comparing memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from lightrag import LightRAG, QueryParam, __version__
+from lightrag.base import DocStatus
+from lightrag.bench.corpus import generate_corpus, generate_custom_kg, generate_queries
+from lightrag.bench.fakes import FakeEmbedding, FakeLLM, FakeTokenizer
+from lightrag.kg.shared_storage import initialize_pipeline_status
+from lightrag.utils import logger
+
+QUERY_MODES = ["local", "global", "hybrid", "naive", "mix", "bypass"]
+
+# Storage combinations that run without external services, with the modules they need
+STORAGE_PRESETS: dict[str, dict[str, Any]] = {
+    "json": {
+        "storages": {
+            "kv_storage": "JsonKVStorage",
+            "vector_storage": "NanoVectorDBStorage",
+            "graph_storage": "NetworkXStorage",
+            "doc_status_storage": "JsonDocStatusStorage",
+        },
+        "requires": [],
+    },
+    "sqlite-cache": {
+        "storages": {
+            "kv_storage": "JsonKVStorage",
+            "vector_storage": "NanoVectorDBStorage",
+            "graph_storage": "NetworkXStorage",
+            "doc_status_storage": "JsonDocStatusStorage",
+            "llm_cache_storage": "SQLiteCacheKVStorage",
+        },
+        "requires": [],
+    },
+    "faiss": {
+        "storages": {
+            "kv_storage": "JsonKVStorage",
+            "vector_storage": "FaissVectorDBStorage",
+            "graph_storage": "NetworkXStorage",
+            "doc_status_storage": "JsonDocStatusStorage",
+        },
+        "requires": ["faiss"],
+    },
+}
+
+
+@dataclass
+class BenchConfig:
+    """Benchmark parameters, recorded in the results"""
+
+    num_docs: int = 50
+    sentences_per_doc: int = 40
+    num_entities: int = 200
+    num_queries: int = 20
+    query_modes: list[str] = field(default_factory=lambda: list(QUERY_MODES))
+    query_concurrency: int = 1
+    delete_fraction: float = 0.1
+    kg_entities: int = 500
+    kg_relations: int = 1000
+    llm_latency: float = 0.0
+    embedding_latency: float = 0.0
+    llm_failure_rate: float = 0.0
+    embedding_failure_rate: float = 0.0
+    embedding_dim: int = 256
+    chunk_token_size: int = 1200
+    max_async: int = 16
+    max_parallel_insert: int = 4
+    seed: int = 0
+    working_dir: str | None = None
+    keep_data: bool = False
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _latency_stats(latencies: list[float]) -> dict[str, Any]:
+    if not latencies:
+        return {"count": 0}
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(latencies),
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 3) if seconds > 0 else 0.0
+
+
+async def _run_insert(rag: LightRAG, documents: list[str]) -> dict[str, Any]:
+    doc_ids = [f"bench-doc-{i}" for i in range(len(documents))]
+    start = time.perf_counter()
+    await rag.ainsert(documents, ids=doc_ids)
+    elapsed = time.perf_counter() - start
+
+    processed = await rag.doc_status.get_docs_by_status(DocStatus.PROCESSED)
+    failed = await rag.doc_status.get_docs_by_status(DocStatus.FAILED)
+    chunks = sum(status.chunks_count or 0 for status in processed.values())
+    return {
+        "seconds": round(elapsed, 3),
+        "docs": len(documents),
+        "processed": len(processed),
+        "failed": len(failed),
+        "chunks": chunks,
+        "docs_per_s": _rate(len(processed), elapsed),
+        "chunks_per_s": _rate(chunks, elapsed),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def _run_custom_kg(rag: LightRAG, config: BenchConfig) -> dict[str, Any]:
+    custom_kg = generate_custom_kg(
+        config.kg_entities, config.kg_relations, seed=config.seed
+    )
+    start = time.perf_counter()
+    await rag.ainsert_custom_kg(custom_kg)
+    elapsed = time.perf_counter() - start
+    items = len(custom_kg["entities"]) + len(custom_kg["relationships"])
+    return {
+        "seconds": round(elapsed, 3),
+        "entities": len(custom_kg["entities"]),
+        "relationships": len(custom_kg["relationships"]),
+        "items_per_s": _rate(items, elapsed),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def _run_queries(
+    rag: LightRAG, queries: list[str], mode: str, concurrency: int
+) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    latencies: list[float] = []
+    errors = 0
+
+    async def run(query: str) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await rag.aquery(
+                    query, param=QueryParam(mode=mode, enable_rerank=False)
+                )
+            except Exception as e:
+                errors += 1
+                logger.debug(f"Benchmark query failed in {mode} mode: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    return {
+        **_latency_stats(latencies),
+        "errors": errors,
+        "queries_per_s": _rate(len(latencies), elapsed),
+    }
+
+
+async def _run_delete(rag: LightRAG, doc_ids: list[str]) -> dict[str, Any]:
+    start = time.perf_counter()
+    failed = 0
+    for doc_id in doc_ids:
+        result = await rag.adelete_by_doc_id(doc_id)
+        if result.status != "success":
+            failed += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "docs": len(doc_ids),
+        "failed": failed,
+        "docs_per_s": _rate(len(doc_ids) - failed, elapsed),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+async def run_backend(
+    name: str, storages: dict[str, str], config: BenchConfig
+) -> dict[str, Any]:
+    """Run all scenarios against one storage combination"""
+    documents, entity_names = generate_corpus(
+        config.num_docs,
+        sentences_per_doc=config.sentences_per_doc,
+        num_entities=config.num_entities,
+        seed=config.seed,
+    )
+    queries = generate_queries(entity_names, config.num_queries, seed=config.seed)
+    llm = FakeLLM(
+        latency=config.llm_latency,
+        failure_rate=config.llm_failure_rate,
+        seed=config.seed,
+    )
+    embedding = FakeEmbedding(
+        dim=config.embedding_dim,
+        latency=config.embedding_latency,
+        failure_rate=config.embedding_failure_rate,
+        seed=config.seed,
+    )
+
+    if config.working_dir:
+        os.makedirs(config.working_dir, exist_ok=True)
+    working_dir = tempfile.mkdtemp(
+        prefix=f"lightrag_bench_{name}_", dir=config.working_dir
+    )
+    rag = LightRAG(
+        working_dir=working_dir,
+        workspace=f"bench_{name}".replace("-", "_"),
+        llm_model_func=llm,
+        embedding_func=embedding.as_embedding_func(),
+        tokenizer=FakeTokenizer(),
+        chunk_token_size=config.chunk_token_size,
+        llm_model_max_async=config.max_async,
+        embedding_func_max_async=config.max_async,
+        max_parallel_insert=config.max_parallel_insert,
+        # Measure the query pipeline rather than the query response cache
+        enable_llm_cache=False,
+        **storages,
+    )
+    results: dict[str, Any] = {"storages": storages, "working_dir": working_dir}
+    try:
+        await rag.initialize_storages()
+        await initialize_pipeline_status(rag.pipeline_status_namespace)
+
+        logger.info(f"[bench:{name}] Inserting {len(documents)} documents")
+        results["insert"] = await _run_insert(rag, documents)
+
+        logger.info(f"[bench:{name}] Inserting a custom knowledge graph")
+        results["custom_kg"] = await _run_custom_kg(rag, config)
+
+        results["query"] = {}
+        for mode in config.query_modes:
+            logger.info(f"[bench:{name}] Running {len(queries)} {mode} queries")
+            results["query"][mode] = await _run_queries(
+                rag, queries, mode, config.query_concurrency
+            )
+
+        delete_count = min(
+            len(documents), max(1, round(len(documents) * config.delete_fraction))
+        )
+        logger.info(f"[bench:{name}] Deleting {delete_count} documents")
+        results["delete"] = await _run_delete(
+            rag, [f"bench-doc-{i}" for i in range(delete_count)]
+        )
+    finally:
+        await rag.finalize_storages()
+        if not config.keep_data:
+            shutil.rmtree(working_dir, ignore_errors=True)
+
+    results["llm"] = {
+        "calls": llm.calls,
+        "failures": llm.failures,
+        "calls_by_kind": dict(llm.calls_by_kind),
+    }
+    results["embedding"] = {
+        "calls": embedding.calls,
+        "failures": embedding.failures,
+        "texts": embedding.texts,
+    }
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+def _missing_requirements(requires: list[str]) -> list[str]:
+    return [module for module in requires if importlib.util.find_spec(module) is None]
+
+
+async def run_benchmark(
+    config: BenchConfig,
+    backends: list[str] | None = None,
+    custom_storages: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Run the benchmark and return the JSON-serializable results
+
+    Args:
+        config: Benchmark parameters
+        backends: Names of STORAGE_PRESETS to run, defaults to all presets
+        custom_storages: Additional "custom" backend, LightRAG storage fields
+            (kv_storage, vector_storage, ...) for services configured through env
+    """
+    results: dict[str, Any] = {
+        "lightrag_version": __version__,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": asdict(config),
+        "backends": {},
+    }
+
+    to_run: dict[str, dict[str, str]] = {}
+    for name in backends or list(STORAGE_PRESETS):
+        preset = STORAGE_PRESETS.get(name)
+        if preset is None:
+            results["backends"][name] = {"skipped": "unknown backend preset"}
+            continue
+        missing = _missing_requirements(preset["requires"])
+        if missing:
+            results["backends"][name] = {
+                "skipped": f"missing modules: {', '.join(missing)}"
+            }
+            continue
+        to_run[name] = dict(preset["storages"])
+    if custom_storages:
+        to_run["custom"] = custom_storages
+
+    for name, storages in to_run.items():
+        try:
+            results["backends"][name] = await run_backend(name, storages, config)
+        except Exception as e:
+            logger.error(f"[bench:{name}] Benchmark failed: {e}")
+            results["backends"][name] = {"storages": storages, "error": str(e)}
+    return results
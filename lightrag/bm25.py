@@ -0,0 +1,316 @@
+"""
+Local BM25 index over text chunks for hybrid retrieval.
+
+Dense retrieval misses exact tokens such as product codes, part numbers and
+rare proper names. ChunkBM25Index keeps an inverted index of the chunk
+contents in memory, updated incrementally when chunks are upserted or
+deleted, and persisted next to the workspace's local storage files as
+compressed postings lists. Query time lexical search then costs one NumPy pass
+over the postings of each query term instead of a call to a remote search
+service; results are fused with the dense ranking by reciprocal rank fusion.
+
+Like the chunk storages of file-based deployments, the index is loaded by
+every process and written by the process running the document pipeline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+from lightrag.utils import logger, write_file_atomic
+
+_TOKEN = re.compile(r"\w+(?:[-./]\w+)*")
+_WORD = re.compile(r"\w+")
+# Scripts written without spaces, indexed as character bigrams
+_CJK_RUN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase terms of a text for lexical matching
+
+    Compound tokens such as "AX-200/B" or "v2.1" are kept whole and also
+    indexed by their parts; runs of CJK characters become character bigrams.
+    Text is NFC-normalized so precomposed and combining Vietnamese diacritics
+    match.
+    """
+    tokens = []
+    for token in _TOKEN.findall(unicodedata.normalize("NFC", text).lower()):
+        if _CJK_RUN.search(token):
+            tokens.extend(_WORD.findall(_CJK_RUN.sub(" ", token)))
+            for run in _CJK_RUN.findall(token):
+                if len(run) == 1:
+                    tokens.append(run)
+                else:
+                    tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+            continue
+        tokens.append(token)
+        if not _WORD.fullmatch(token):
+            tokens.extend(_WORD.findall(token))
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[list[str]], k: int = 60) -> list[str]:
+    """Merge rankings of ids, scoring each id by the sum of 1 / (k + rank)"""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+class ChunkBM25Index:
+    """Incremental BM25 inverted index of chunk contents
+
+    Chunks are numbered by slot; postings map slots to term frequencies so a
+    query term is scored with a few NumPy operations over its postings.
+    Slots of deleted chunks are left empty until the index is reloaded.
+    The persisted file is reloaded when it changes on disk, unless the index
+    holds changes that were not persisted yet.
+
+    Args:
+        index_file: Path of the persisted index (.npz)
+        k1: Term frequency saturation
+        b: Document length normalization
+    """
+
+    def __init__(self, index_file: str, k1: float = 1.2, b: float = 0.75):
+        self.index_file = index_file
+        self.k1 = k1
+        self.b = b
+        self._set_state([], np.zeros(0, dtype=np.float64), {}, {})
+        self._loaded_mtime: float | None = None
+        self._dirty = False
+        self._lock = asyncio.Lock()
+
+    def _set_state(
+        self,
+        slot_ids: list[str | None],
+        lengths: np.ndarray,
+        postings: dict[str, dict[int, int]],
+        slot_terms: dict[int, tuple[str, ...]],
+    ) -> None:
+        self._slot_ids = slot_ids  # slot -> chunk id, None once deleted
+        self._slots = {
+            chunk_id: slot
+            for slot, chunk_id in enumerate(slot_ids)
+            if chunk_id is not None
+        }
+        self._lengths = lengths  # slot -> number of terms, with spare capacity
+        self._postings = postings  # term -> slot -> term frequency
+        self._slot_terms = slot_terms  # slot -> distinct terms, for removal
+        self._total_length = int(lengths[: len(slot_ids)].sum())
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def _count_terms(chunks: dict[str, dict]) -> dict[str, Counter]:
+        return {
+            chunk_id: Counter(tokenize(chunk.get("content") or ""))
+            for chunk_id, chunk in chunks.items()
+        }
+
+    def _add(self, chunk_id: str, term_counts: Counter) -> None:
+        self._remove((chunk_id,))
+        slot = len(self._slot_ids)
+        if slot >= len(self._lengths):
+            lengths = np.zeros(max(1024, 2 * len(self._lengths)), dtype=np.float64)
+            lengths[:slot] = self._lengths[:slot]
+            self._lengths = lengths
+        self._slot_ids.append(chunk_id)
+        self._slots[chunk_id] = slot
+
+        for term, tf in term_counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+            postings[slot] = tf
+        length = sum(term_counts.values())
+        self._lengths[slot] = length
+        self._slot_terms[slot] = tuple(term_counts)
+        self._total_length += length
+        self._dirty = True
+
+    def _remove(self, chunk_ids: Iterable[str]) -> None:
+        for chunk_id in chunk_ids:
+            slot = self._slots.pop(chunk_id, None)
+            if slot is None:
+                continue
+            for term in self._slot_terms.pop(slot, ()):
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(slot, None)
+                    if not postings:
+                        del self._postings[term]
+            self._slot_ids[slot] = None
+            self._total_length -= int(self._lengths[slot])
+            self._lengths[slot] = 0
+            self._dirty = True
+
+    async def upsert(self, chunks: dict[str, dict]) -> None:
+        """Index or re-index chunks by their "content" field"""
+        if not chunks:
+            return
+        # Tokenize off the event loop, mutate on it so searches never see a
+        # half-updated dictionary
+        term_counts = await asyncio.to_thread(self._count_terms, chunks)
+        async with self._lock:
+            await self._reload_if_changed()
+            for chunk_id, counts in term_counts.items():
+                self._add(chunk_id, counts)
+
+    async def delete(self, chunk_ids: Iterable[str]) -> None:
+        """Remove chunks from the index"""
+        async with self._lock:
+            await self._reload_if_changed()
+            self._remove(chunk_ids)
+
+    async def search(self, query: str, top_k: int) -> list[tuple[str, float]]:
+        """Best matching chunks of the query
+
+        Returns:
+            list: (chunk id, BM25 score) by decreasing score
+        """
+        if top_k <= 0:
+            return []
+        async with self._lock:
+            await self._reload_if_changed()
+        # Scoring doesn't yield to the event loop, upserts and deletes can't
+        # interleave with it
+        num_docs = len(self._slots)
+        if not num_docs:
+            return []
+
+        k1 = self.k1
+        num_slots = len(self._slot_ids)
+        avg_length = self._total_length / num_docs or 1.0
+        # Per-slot denominator term of the BM25 tf saturation
+        norms = k1 * (1 - self.b + self.b * self._lengths[:num_slots] / avg_length)
+        scores = np.zeros(num_slots, dtype=np.float64)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=df)
+            tfs = np.fromiter(postings.values(), dtype=np.float64, count=df)
+            scores[slots] += idf * tfs * (k1 + 1) / (tfs + norms[slots])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self._slot_ids[slot], float(scores[slot])) for slot in matched]
+
+    async def _reload_if_changed(self) -> None:
+        # Called with the lock held. Unflushed local changes win over the file,
+        # which is only written by the process that owns them
+        if self._dirty:
+            return
+        try:
+            mtime = os.path.getmtime(self.index_file)
+        except FileNotFoundError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            loaded = await asyncio.to_thread(self._load)
+        except Exception as e:
+            logger.warning(f"Failed to load BM25 index {self.index_file}: {e}")
+            self._loaded_mtime = mtime
+            return
+        self._set_state(*loaded)
+        self._loaded_mtime = mtime
+        self._dirty = False
+        logger.info(f"Loaded BM25 index with {len(self._slots)} chunks")
+
+    def _load(self):
+        with np.load(self.index_file, allow_pickle=False) as data:
+            doc_ids = data["doc_ids"].tolist()
+            lengths = data["doc_lengths"].astype(np.float64)
+            terms = data["terms"].tolist()
+            offsets = data["offsets"].tolist()
+            posting_docs = data["posting_docs"].tolist()
+            posting_tfs = data["posting_tfs"].tolist()
+
+        postings: dict[str, dict[int, int]] = {}
+        slot_terms: list[list[str]] = [[] for _ in doc_ids]
+        for term, start, end in zip(terms, offsets, offsets[1:]):
+            slots = posting_docs[start:end]
+            postings[term] = dict(zip(slots, posting_tfs[start:end]))
+            for slot in slots:
+                slot_terms[slot].append(term)
+        return (
+            doc_ids,
+            lengths,
+            postings,
+            {slot: tuple(t) for slot, t in enumerate(slot_terms)},
+        )
+
+    def _save(self) -> None:
+        # Live slots are renumbered densely
+        slot_ids, lengths, all_postings = self._slot_ids, self._lengths, self._postings
+        live = [slot for slot, chunk_id in enumerate(slot_ids) if chunk_id is not None]
+        renumber = {slot: i for i, slot in enumerate(live)}
+        terms = list(all_postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        posting_docs: list[int] = []
+        posting_tfs: list[int] = []
+        for i, term in enumerate(terms):
+            postings = all_postings[term]
+            posting_docs.extend(renumber[slot] for slot in postings)
+            posting_tfs.extend(postings.values())
+            offsets[i + 1] = len(posting_docs)
+
+        def write(tmp_file: str) -> None:
+            with open(tmp_file, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    doc_ids=np.array([slot_ids[slot] for slot in live], dtype=str),
+                    doc_lengths=lengths[live].astype(np.int32),
+                    terms=np.array(terms, dtype=str),
+                    offsets=offsets,
+                    posting_docs=np.array(posting_docs, dtype=np.int32),
+                    posting_tfs=np.array(posting_tfs, dtype=np.int32),
+                )
+
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        write_file_atomic(self.index_file, write)
+        self._loaded_mtime = os.path.getmtime(self.index_file)
+        self._dirty = False
+
+    async def persist(self) -> None:
+        """Write the index to disk if it changed"""
+        async with self._lock:
+            if not self._dirty:
+                return
+            try:
+                # Upserts and deletes wait for the lock, the postings don't change
+                # while they are written
+                await asyncio.to_thread(self._save)
+            except Exception as e:
+                logger.error(f"Failed to save BM25 index {self.index_file}: {e}")
+
+    async def drop(self) -> None:
+        """Empty the index and delete its file"""
+        async with self._lock:
+            self._set_state([], np.zeros(0, dtype=np.float64), {}, {})
+            self._dirty = False
+            self._loaded_mtime = None
+            try:
+                os.remove(self.index_file)
+            except FileNotFoundError:
+                pass
+
+    def index_exists(self) -> bool:
+        """Whether the index was ever persisted"""
+        return os.path.exists(self.index_file)
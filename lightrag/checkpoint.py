@@ -0,0 +1,108 @@
+"""
+Checkpoints of documents in the document pipeline.
+
+A document's progress is kept in metadata["checkpoint"] of its doc_status
+entry while it is PROCESSING, and survives the reset to FAILED or PENDING
+when processing is interrupted:
+
+- stage "chunks_upserted": the chunks listed in chunks_list are stored in the
+  chunk storages, a restart reads them back instead of chunking and embedding
+  the document again
+- extracted_chunks: chunks whose extraction results are recorded in the LLM
+  cache, a restart rebuilds their results from the cache in one batch instead
+  of extracting them again
+- stage "merging": every chunk was extracted and the merge into the knowledge
+  graph started, a restart only runs the merge again
+
+A checkpoint is written after the data it refers to is persisted, so it never
+points at chunks or cache entries a crash lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable
+
+
+class CheckpointStage(str, Enum):
+    """Last pipeline stage reached by a document"""
+
+    CHUNKS_UPSERTED = "chunks_upserted"
+    MERGING = "merging"
+
+
+_STAGE_ORDER = [CheckpointStage.CHUNKS_UPSERTED, CheckpointStage.MERGING]
+
+
+class DocumentCheckpoint:
+    """Progress of one document through the pipeline
+
+    Args:
+        stage: Last stage reached, None for a document processed from scratch
+        extracted_chunks: Chunk ids whose extraction results are cached
+    """
+
+    def __init__(
+        self,
+        stage: CheckpointStage | None = None,
+        extracted_chunks: list[str] | None = None,
+    ):
+        self.stage = stage
+        # Ordered set of chunk ids
+        self.extracted_chunks: dict[str, None] = dict.fromkeys(extracted_chunks or [])
+        self._lock = asyncio.Lock()
+        self._saved_at = time.monotonic()
+
+    @classmethod
+    def from_metadata(cls, metadata: dict[str, Any] | None) -> DocumentCheckpoint:
+        """Checkpoint stored in doc_status metadata, empty if there is none"""
+        data = (metadata or {}).get("checkpoint") or {}
+        try:
+            stage = CheckpointStage(data["stage"]) if data.get("stage") else None
+        except ValueError:
+            stage = None
+        if stage is None:
+            return cls()
+        return cls(stage, data.get("extracted_chunks"))
+
+    def reached(self, stage: CheckpointStage) -> bool:
+        return self.stage is not None and _STAGE_ORDER.index(
+            self.stage
+        ) >= _STAGE_ORDER.index(stage)
+
+    def to_metadata(self) -> dict[str, Any]:
+        """Entry of the checkpoint in doc_status metadata, empty before any stage"""
+        if self.stage is None:
+            return {}
+        return {
+            "checkpoint": {
+                "stage": self.stage.value,
+                "extracted_chunks": list(self.extracted_chunks),
+            }
+        }
+
+    def extraction_recorder(
+        self,
+        save: Callable[[dict[str, Any]], Awaitable[None]],
+        interval: float,
+    ) -> Callable[[str], Awaitable[None]]:
+        """Callback recording extracted chunks, saving the checkpoint every interval seconds
+
+        save receives the metadata entry of the checkpoint, taken before it
+        persists the extraction results, so chunks extracted in the meantime are
+        only recorded by the next save.
+        """
+
+        async def on_chunk_extracted(chunk_id: str) -> None:
+            self.extracted_chunks[chunk_id] = None
+            if time.monotonic() - self._saved_at < interval:
+                return
+            async with self._lock:
+                if time.monotonic() - self._saved_at < interval:
+                    return
+                self._saved_at = time.monotonic()
+                await save(self.to_metadata())
+
+        return on_chunk_extracted
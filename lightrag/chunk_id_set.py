@@ -0,0 +1,303 @@
+"""
+Compact ordered sets of chunk ids for source-id bookkeeping.
+
+Entities and relations record the chunks they were extracted from, as
+GRAPH_FIELD_SEP-joined strings in the graph and as chunk id lists in the
+entity_chunks/relation_chunks stores. Hub entities cite tens of thousands of
+chunks, so merging, limiting and subtracting these lists as Python strings
+costs a set of strings and several list copies on every merge, delete and
+rebuild.
+
+ChunkIdSet interns chunk ids to integers (once per workspace) and keeps a set
+as a NumPy array of codes in insertion order, which the source id limit methods
+depend on. Unions, differences and limits are array operations, and the legacy
+list and string formats are only produced when writing to storage.
+
+Storages such as JsonKVStorage hand out the very list objects they were given,
+so the sets of the largest lists are remembered by list identity: reading back
+the list a set was written as returns that set without encoding it again, and
+writing a set that gained a few ids costs a list concatenation instead of
+decoding every id. Chunk id lists read from storage must not be modified in
+place.
+
+A workspace's codes and cached sets are freed by release_chunk_ids when its
+storages are finalized or dropped. Sets built before still work, they keep
+their table alive and are re-encoded when combined with sets of a newer one.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import compress
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from lightrag.constants import GRAPH_FIELD_SEP, SOURCE_IDS_LIMIT_METHOD_FIFO
+from lightrag.utils import logger, normalize_source_ids_limit_method
+
+
+class _ChunkIdTable:
+    """Interning of a workspace's chunk ids to consecutive integer codes
+
+    Codes are not released individually, the table grows with the number of
+    distinct chunk ids of the workspace until the workspace is released.
+    """
+
+    def __init__(self):
+        self._codes: dict[str, int] = {}
+        self._ids: list[str] = []
+
+    def encode(self, chunk_ids: list[str]) -> list[int]:
+        codes = list(map(self._codes.get, chunk_ids))
+        if None in codes:
+            for i, code in enumerate(codes):
+                if code is None:
+                    chunk_id = chunk_ids[i]
+                    code = self._codes.get(chunk_id)
+                    if code is None:
+                        code = self._codes[chunk_id] = len(self._ids)
+                        self._ids.append(chunk_id)
+                    codes[i] = code
+        return codes
+
+    def code(self, chunk_id: str) -> int | None:
+        return self._codes.get(chunk_id)
+
+    def decode(self, codes: np.ndarray) -> list[str]:
+        return list(map(self._ids.__getitem__, codes.tolist()))
+
+
+_tables: dict[str, _ChunkIdTable] = {}
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+# Sets of recently read or written chunk id lists, by id() of the list; the
+# entry keeps the list alive so its id() is not reused while it is cached.
+# The cache is bounded by the total number of chunk ids of its lists.
+_CACHED_MIN_SIZE = 256
+_CACHE_MAX_IDS = 1_000_000
+_list_cache: OrderedDict[int, tuple[list, ChunkIdSet]] = OrderedDict()
+_cached_ids = 0
+
+
+def _table_for(workspace: str) -> _ChunkIdTable:
+    table = _tables.get(workspace)
+    if table is None:
+        table = _tables[workspace] = _ChunkIdTable()
+    return table
+
+
+def _uncache_list(key: int) -> None:
+    global _cached_ids
+    chunk_ids, _ = _list_cache.pop(key)
+    _cached_ids -= len(chunk_ids)
+
+
+def _cache_list(chunk_ids: list, chunk_id_set: ChunkIdSet) -> None:
+    global _cached_ids
+    key = id(chunk_ids)
+    if key in _list_cache:
+        _uncache_list(key)
+    _list_cache[key] = (chunk_ids, chunk_id_set)
+    _cached_ids += len(chunk_ids)
+    while _cached_ids > _CACHE_MAX_IDS:
+        _uncache_list(next(iter(_list_cache)))
+
+
+def release_chunk_ids(workspace: str = "") -> None:
+    """Free the chunk id codes and cached sets of a workspace"""
+    table = _tables.pop(workspace, None)
+    if table is None:
+        return
+    for key, (_, chunk_id_set) in list(_list_cache.items()):
+        if chunk_id_set._table is table:
+            _uncache_list(key)
+
+
+class ChunkIdSet:
+    """Immutable ordered set of chunk ids
+
+    Build one with from_ids (chunk id lists of the entity_chunks and
+    relation_chunks stores) or from_joined (source_id fields of the graph), and
+    write it back with to_list or join. Empty ids are dropped and repeated ids
+    keep their first position. Sets are built for a workspace, ChunkIdSet(workspace)
+    is an empty one.
+    """
+
+    __slots__ = ("_codes", "_ids", "_table")
+
+    def __init__(self, workspace: str = ""):
+        self._codes = _EMPTY
+        self._ids: (
+            list[str] | None
+        ) = []  # Decoded ids in the same order, built on demand
+        self._table = _table_for(workspace)
+
+    @classmethod
+    def _of(
+        cls, table: _ChunkIdTable, codes: np.ndarray, ids: list[str] | None = None
+    ) -> ChunkIdSet:
+        chunk_id_set = cls.__new__(cls)
+        chunk_id_set._codes = codes
+        chunk_id_set._ids = ids
+        chunk_id_set._table = table
+        return chunk_id_set
+
+    @classmethod
+    def from_ids(
+        cls, chunk_ids: Iterable[str] | None, workspace: str = ""
+    ) -> ChunkIdSet:
+        if isinstance(chunk_ids, ChunkIdSet):
+            return chunk_ids
+        return cls._encode(chunk_ids, _table_for(workspace))
+
+    @classmethod
+    def from_joined(cls, value: str | None, workspace: str = "") -> ChunkIdSet:
+        """Set of a GRAPH_FIELD_SEP-joined source_id field"""
+        if not value:
+            return cls(workspace)
+        return cls.from_ids(value.split(GRAPH_FIELD_SEP), workspace)
+
+    @classmethod
+    def _encode(
+        cls, chunk_ids: Iterable[str] | None, table: _ChunkIdTable
+    ) -> ChunkIdSet:
+        if not chunk_ids:
+            return cls._of(table, _EMPTY, [])
+        cacheable = isinstance(chunk_ids, list) and len(chunk_ids) >= _CACHED_MIN_SIZE
+        if cacheable:
+            cached = _list_cache.get(id(chunk_ids))
+            if (
+                cached is not None
+                and cached[0] is chunk_ids
+                and cached[1]._table is table
+                and len(cached[1]) == len(chunk_ids)
+            ):
+                _list_cache.move_to_end(id(chunk_ids))
+                return cached[1]
+
+        ids = list(filter(None, chunk_ids))
+        codes = table.encode(ids)
+        if len(set(codes)) == len(codes):
+            chunk_id_set = cls._of(table, np.array(codes, dtype=np.int64), ids)
+        else:
+            # Repeated ids keep their first position
+            chunk_id_set = cls._of(
+                table, np.array(list(dict.fromkeys(codes)), dtype=np.int64)
+            )
+        if cacheable and len(chunk_id_set) == len(chunk_ids):
+            _cache_list(chunk_ids, chunk_id_set)
+        return chunk_id_set
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __bool__(self) -> bool:
+        return len(self._codes) > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._decoded())
+
+    def __contains__(self, chunk_id: object) -> bool:
+        if not isinstance(chunk_id, str):
+            return False
+        code = self._table.code(chunk_id)
+        return code is not None and bool((self._codes == code).any())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ChunkIdSet):
+            return NotImplemented
+        return np.array_equal(self._codes, self._as_codes(other))
+
+    def __repr__(self) -> str:
+        return f"ChunkIdSet({len(self)} chunk ids)"
+
+    def _decoded(self) -> list[str]:
+        if self._ids is None:
+            self._ids = self._table.decode(self._codes)
+        return self._ids
+
+    def _same_table(self, chunk_ids: Iterable[str]) -> ChunkIdSet:
+        """The ids as a set encoded by this set's table"""
+        if isinstance(chunk_ids, ChunkIdSet):
+            if chunk_ids._table is self._table or not chunk_ids:
+                return chunk_ids
+            # Built before the workspace was released
+            chunk_ids = chunk_ids._decoded()
+        return self._encode(chunk_ids, self._table)
+
+    def _as_codes(self, chunk_ids: Iterable[str]) -> np.ndarray:
+        return self._same_table(chunk_ids)._codes
+
+    def union(self, chunk_ids: Iterable[str]) -> ChunkIdSet:
+        """This set followed by the ids it does not contain yet, in their order"""
+        other = self._same_table(chunk_ids)
+        if not other:
+            return self
+        if not self:
+            return other
+        new = ~np.isin(other._codes, self._codes)
+        if not new.any():
+            return self
+        ids = None
+        if self._ids is not None:
+            ids = self._ids + self._table.decode(other._codes[new])
+        return self._of(
+            self._table, np.concatenate([self._codes, other._codes[new]]), ids
+        )
+
+    def difference(self, chunk_ids: Iterable[str]) -> ChunkIdSet:
+        """This set without the given ids, in its order"""
+        removed = self._as_codes(chunk_ids)
+        if not self or not len(removed):
+            return self
+        keep = ~np.isin(self._codes, removed)
+        if keep.all():
+            return self
+        ids = None
+        if self._ids is not None:
+            ids = list(compress(self._ids, keep.tolist()))
+        return self._of(self._table, self._codes[keep], ids)
+
+    def limit(
+        self, limit: int, method: str | None, *, identifier: str | None = None
+    ) -> ChunkIdSet:
+        """At most limit ids, like apply_source_ids_limit
+
+        The FIFO method keeps the newest ids, KEEP keeps the oldest.
+        """
+        if limit <= 0:
+            return self._of(self._table, _EMPTY, [])
+        if len(self) <= limit:
+            return self
+        method = normalize_source_ids_limit_method(method)
+        window = (
+            slice(len(self) - limit, None)
+            if method == SOURCE_IDS_LIMIT_METHOD_FIFO
+            else slice(0, limit)
+        )
+        if identifier:
+            logger.debug(
+                "Source_id truncated: %s | %s keeping %s of %s entries",
+                identifier,
+                method,
+                limit,
+                len(self),
+            )
+        ids = self._ids[window] if self._ids is not None else None
+        return self._of(self._table, self._codes[window], ids)
+
+    def to_list(self) -> list[str]:
+        """Chunk ids in storage format (entity_chunks/relation_chunks chunk_ids)
+
+        The returned list is a new object, the caller hands it to storage
+        unmodified.
+        """
+        chunk_ids = list(self._decoded())
+        if len(chunk_ids) >= _CACHED_MIN_SIZE:
+            _cache_list(chunk_ids, self)
+        return chunk_ids
+
+    def join(self) -> str:
+        """Chunk ids in storage format (graph source_id)"""
+        return GRAPH_FIELD_SEP.join(self._decoded())
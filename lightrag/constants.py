@@ -23,6 +23,11 @@ DEFAULT_SUMMARY_MAX_TOKENS = 1200
 DEFAULT_SUMMARY_LENGTH_RECOMMENDED = 600
 # Maximum token size sent to LLM for summary
 DEFAULT_SUMMARY_CONTEXT_SIZE = 12000
+# Incremental summary: fold only uncovered fragments into the existing summary
+DEFAULT_SUMMARY_INCREMENTAL = True
+# Cut map-reduce summary groups at content-defined boundaries so unchanged groups hit the
+# LLM cache on rebuilds, at the cost of smaller groups and more calls for new summaries
+DEFAULT_SUMMARY_CONTENT_DEFINED_GROUPS = False
 # Default entities to extract if ENTITY_TYPES is not specified in .env
 DEFAULT_ENTITY_TYPES = [
     "Person",
@@ -38,6 +43,18 @@ DEFAULT_ENTITY_TYPES = [
     "NaturalObject",
 ]
 
+# Chunk dedup before extraction: near-duplicate chunks (estimated Jaccard similarity of
+# their character shingles at or above the threshold) reuse an existing chunk's extraction
+DEFAULT_ENABLE_CHUNK_DEDUP = False
+DEFAULT_CHUNK_DEDUP_THRESHOLD = 0.9
+
+# Seconds between checkpoints of a document's extraction progress in doc_status
+DEFAULT_CHECKPOINT_INTERVAL = 30
+
+# Storage namespaces whose file-backed storages load on first access or in the
+# background after initialize_storages, instead of during it
+DEFAULT_LAZY_LOAD_NAMESPACES = ["llm_response_cache", "full_docs", "text_chunks"]
+
 # Separator for graph fields
 GRAPH_FIELD_SEP = "<SEP>"
 
@@ -50,6 +67,9 @@ DEFAULT_MAX_TOTAL_TOKENS = 30000
 DEFAULT_COSINE_THRESHOLD = 0.2
 DEFAULT_RELATED_CHUNK_NUMBER = 5
 DEFAULT_KG_CHUNK_PICK_METHOD = "VECTOR"
+# Local BM25 index over chunks, fused with vector search by reciprocal rank fusion
+DEFAULT_ENABLE_CHUNK_BM25 = False
+DEFAULT_RRF_K = 60
 
 # TODO: Deprated. All conversation_history messages is send to LLM.
 DEFAULT_HISTORY_TURNS = 0
@@ -57,6 +77,11 @@ DEFAULT_HISTORY_TURNS = 0
 # Rerank configuration defaults
 DEFAULT_MIN_RERANK_SCORE = 0.0
 DEFAULT_RERANK_BINDING = "null"
+# Relevance scores cached per (rerank model, query, chunk), 0 disables the cache
+DEFAULT_RERANK_CACHE_TTL = 3600  # seconds
+DEFAULT_RERANK_CACHE_MAX_ENTRIES = 100000
+# Concurrent rerank requests when a candidate set is split into sub-batches
+DEFAULT_RERANK_MAX_CONCURRENCY = 4
 
 # Default source ids limit in meta data for entity and relation
 DEFAULT_MAX_SOURCE_IDS_PER_ENTITY = 300
@@ -86,10 +111,28 @@ DEFAULT_TEMPERATURE = 1.0
 # Async configuration defaults
 DEFAULT_MAX_ASYNC = 4  # Default maximum async operations
 DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
+DEFAULT_MAX_PARALLEL_REBUILD = 0  # Entity/relation rebuild workers, 0 = MAX_ASYNC * 2
+# LLM and embedding workers kept for query calls, at most MAX_ASYNC - 1
+DEFAULT_QUERY_RESERVED_SLOTS = 1
 
 # Embedding configuration defaults
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
 DEFAULT_EMBEDDING_BATCH_NUM = 10  # Default batch size for embedding computations
+# Seconds a merged entity/relation waits for more vector upserts to fill an embedding batch, 0 = disabled
+DEFAULT_VDB_UPSERT_MAX_DELAY = 0.05
+
+# Maximum records kept in the cross-process change log of a file-backed namespace
+# Readers lagging behind the retained log fall back to a full reload from file
+DEFAULT_CHANGE_LOG_MAX_RECORDS = 20000
+
+# SQLiteCacheKVStorage (LLM response cache) settings
+# Prompt retention: "hash" keeps only the prompt hash, "compressed" keeps the full prompt compressed
+DEFAULT_LLM_CACHE_PROMPT_MODE = "hash"
+# Size bounds for the cache (0 = unbounded); extraction entries needed for rebuild are never evicted
+DEFAULT_LLM_CACHE_MAX_ENTRIES = 0
+DEFAULT_LLM_CACHE_MAX_BYTES = 0
+# Eviction order: "last_hit" (least recently hit first) or "age" (oldest first)
+DEFAULT_LLM_CACHE_EVICTION_POLICY = "last_hit"
 
 # Gunicorn worker timeout
 DEFAULT_TIMEOUT = 300
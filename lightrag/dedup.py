@@ -0,0 +1,326 @@
+"""
+Chunk-level deduplication before entity extraction.
+
+Every chunk sent to extraction is registered in a ChunkDedupIndex. A new chunk
+whose normalized text hashes to a registered chunk is an exact duplicate; one
+whose MinHash signature over character shingles collides with a registered
+chunk in an LSH band, and whose estimated Jaccard similarity reaches the
+threshold, is a near duplicate. Duplicates reuse the registered chunk's cached
+extraction instead of calling the LLM again.
+
+The index is kept in memory and persisted next to the workspace's local
+storage files. It may reference chunks that were deleted or did not finish
+extraction yet; callers verify a match against the chunk storage and fall back
+to a normal extraction. A matched chunk is only forgotten once
+find_stale_sources confirms it will never have an extraction to reuse.
+When the persisted file changes on disk it is reloaded, and registrations
+and removals not persisted yet are applied on top of it. persist() does the
+same under a file lock before writing, so workers sharing a workspace never
+overwrite each other's registrations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from hashlib import md5
+
+import numpy as np
+
+from lightrag.base import BaseKVStorage, DocStatus, DocStatusStorage
+from lightrag.utils import logger, write_file_atomic
+
+# Mersenne prime 2^61 - 1 keeps (a * h + b) exact in uint64 for 32-bit a and h
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@contextmanager
+def _file_lock(lock_file: str):
+    """Exclusive lock across processes, a no-op where fcntl is unavailable"""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(lock_file, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Lowercase and collapse whitespace so formatting-only changes hash alike"""
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+async def find_stale_sources(
+    source_ids, text_chunks: BaseKVStorage, doc_status: DocStatusStorage
+) -> set[str]:
+    """Matched chunks without a cached extraction that will never get one
+
+    A source is stale when its document was deleted, or was processed without
+    leaving an extraction (e.g. the LLM cache was cleared). Sources that are not
+    stored yet or whose document is still pending, processing or failed (and may
+    be retried) belong to extractions that can still finish, they are kept.
+    """
+    source_ids = list(source_ids)
+    if not source_ids:
+        return set()
+    chunks = await text_chunks.get_by_ids(source_ids)
+    doc_ids = {
+        source_id: chunk.get("full_doc_id")
+        for source_id, chunk in zip(source_ids, chunks)
+        if chunk and chunk.get("full_doc_id")
+    }
+    if not doc_ids:
+        return set()
+    unique_doc_ids = list(set(doc_ids.values()))
+    statuses = await doc_status.get_by_ids(unique_doc_ids)
+    finished = set()
+    for doc_id, status_doc in zip(unique_doc_ids, statuses):
+        status = status_doc.get("status") if status_doc else None
+        if status is None or status == DocStatus.PROCESSED:
+            finished.add(doc_id)
+    return {source_id for source_id, doc_id in doc_ids.items() if doc_id in finished}
+
+
+class ChunkDedupIndex:
+    """Exact-hash and MinHash/LSH index of the chunks sent to extraction
+
+    Args:
+        index_file: Path of the persisted index (.npz)
+        threshold: Minimum estimated Jaccard similarity of a near duplicate
+        num_perm: Number of MinHash permutations, must be divisible by bands
+        bands: Number of LSH bands, more bands find less similar candidates
+        shingle_size: Length of the character shingles
+    """
+
+    def __init__(
+        self,
+        index_file: str,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 8,
+        shingle_size: int = 5,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.index_file = index_file
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(1)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._hashes: dict[str, str] = {}  # normalized text hash -> chunk id
+        self._signatures: dict[str, np.ndarray] = {}  # chunk id -> signature
+        self._chunk_hashes: dict[str, str] = {}  # chunk id -> normalized text hash
+        self._buckets: list[dict[bytes, set[str]]] = [
+            defaultdict(set) for _ in range(bands)
+        ]
+        self._loaded_mtime: float | None = None
+        # Local changes not persisted yet, applied on top of the file when reloading
+        self._added: set[str] = set()
+        self._removed: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, normalized_text: str) -> np.ndarray:
+        """MinHash signature of the text's character shingles"""
+        k = self.shingle_size
+        if len(normalized_text) <= k:
+            shingles = {normalized_text}
+        else:
+            shingles = {
+                normalized_text[i : i + k] for i in range(len(normalized_text) - k + 1)
+            }
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [
+            signature[i * self.rows : (i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def _add(self, chunk_id: str, text_hash: str, signature: np.ndarray) -> None:
+        self._hashes.setdefault(text_hash, chunk_id)
+        self._chunk_hashes[chunk_id] = text_hash
+        self._signatures[chunk_id] = signature
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band[key].add(chunk_id)
+
+    def _remove(self, chunk_ids) -> None:
+        for chunk_id in chunk_ids:
+            self._added.discard(chunk_id)
+            self._removed.add(chunk_id)
+            signature = self._signatures.pop(chunk_id, None)
+            if signature is None:
+                continue
+            text_hash = self._chunk_hashes.pop(chunk_id)
+            if self._hashes.get(text_hash) == chunk_id:
+                del self._hashes[text_hash]
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                members = band.get(key)
+                if members:
+                    members.discard(chunk_id)
+                    if not members:
+                        del band[key]
+
+    def _match(
+        self, chunk_id: str, text_hash: str, signature: np.ndarray
+    ) -> tuple[str, str] | None:
+        source = self._hashes.get(text_hash)
+        if source is not None:
+            return source, "exact"
+
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        candidates.discard(chunk_id)
+
+        best, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity > best_similarity:
+                best, best_similarity = candidate, similarity
+        if best is not None and best_similarity >= self.threshold:
+            return best, "near"
+        return None
+
+    def _find_and_register(self, chunks: dict[str, dict]) -> dict[str, tuple[str, str]]:
+        duplicates = {}
+        for chunk_id, chunk in chunks.items():
+            normalized = normalize_chunk_text(chunk["content"])
+            text_hash = md5(normalized.encode("utf-8")).hexdigest()
+            signature = self.signature(normalized)
+            match = self._match(chunk_id, text_hash, signature)
+            if match is not None:
+                duplicates[chunk_id] = match
+            # Register duplicates too, they become sources once their extraction is linked
+            self._add(chunk_id, text_hash, signature)
+            self._added.add(chunk_id)
+            self._removed.discard(chunk_id)
+        return duplicates
+
+    async def find_duplicates(
+        self, chunks: dict[str, dict]
+    ) -> dict[str, tuple[str, str]]:
+        """Find registered chunks duplicated by new chunks, and register the new chunks
+
+        Chunks earlier in the same call are matched too, so boilerplate repeated
+        within one document is detected.
+
+        Returns:
+            dict: chunk id -> (source chunk id, "exact" or "near")
+        """
+        async with self._lock:
+            await asyncio.to_thread(self._reload_if_changed)
+            return await asyncio.to_thread(self._find_and_register, chunks)
+
+    async def remove(self, chunk_ids) -> None:
+        """Forget chunks, e.g. deleted chunks or a matched chunk without extraction"""
+        async with self._lock:
+            # Start from the registrations other workers persisted
+            await asyncio.to_thread(self._reload_if_changed)
+            self._remove(chunk_ids)
+
+    def _reload_if_changed(self) -> None:
+        # Called with the lock held. Local changes not persisted yet are applied on
+        # top of the file, which holds the registrations of every worker
+        try:
+            mtime = os.path.getmtime(self.index_file)
+        except FileNotFoundError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with np.load(self.index_file, allow_pickle=False) as data:
+                if data["signatures"].shape[1:] != (self.num_perm,):
+                    logger.warning(
+                        f"Chunk dedup index {self.index_file} uses other MinHash settings, rebuilding"
+                    )
+                    self._loaded_mtime = mtime
+                    return
+                chunk_ids = data["chunk_ids"].tolist()
+                text_hashes = data["text_hashes"].tolist()
+                signatures = data["signatures"]
+        except Exception as e:
+            logger.warning(f"Failed to load chunk dedup index {self.index_file}: {e}")
+            return
+
+        local = {
+            chunk_id: (self._chunk_hashes[chunk_id], self._signatures[chunk_id])
+            for chunk_id in self._added
+        }
+        self._hashes.clear()
+        self._signatures.clear()
+        self._chunk_hashes.clear()
+        for band in self._buckets:
+            band.clear()
+        for chunk_id, text_hash, signature in zip(chunk_ids, text_hashes, signatures):
+            if chunk_id not in self._removed:
+                self._add(chunk_id, text_hash, signature)
+        for chunk_id, (text_hash, signature) in local.items():
+            self._add(chunk_id, text_hash, signature)
+        self._loaded_mtime = mtime
+        logger.info(f"Loaded chunk dedup index with {len(chunk_ids)} chunks")
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.index_file) or ".", exist_ok=True)
+        with _file_lock(f"{self.index_file}.lock"):
+            # Merge what other workers persisted since the last load before writing
+            self._reload_if_changed()
+            self._write()
+        self._added.clear()
+        self._removed.clear()
+
+    def _write(self) -> None:
+        chunk_ids = list(self._signatures)
+        signatures = (
+            np.stack([self._signatures[c] for c in chunk_ids])
+            if chunk_ids
+            else np.empty((0, self.num_perm), dtype=np.uint32)
+        )
+
+        def write(tmp_file: str) -> None:
+            with open(tmp_file, "wb") as f:
+                np.savez_compressed(
+                    f,
+                    chunk_ids=np.array(chunk_ids, dtype=str),
+                    text_hashes=np.array(
+                        [self._chunk_hashes[c] for c in chunk_ids], dtype=str
+                    ),
+                    signatures=signatures,
+                )
+
+        write_file_atomic(self.index_file, write)
+        self._loaded_mtime = os.path.getmtime(self.index_file)
+
+    async def persist(self) -> None:
+        """Write the index to disk if it changed"""
+        async with self._lock:
+            if not self._added and not self._removed:
+                return
+            try:
+                await asyncio.to_thread(self._save)
+            except Exception as e:
+                logger.error(f"Failed to save chunk dedup index {self.index_file}: {e}")
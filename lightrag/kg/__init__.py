@@ -8,6 +8,17 @@ STORAGE_IMPLEMENTATIONS = {
         ],
         "required_methods": ["get_by_id", "upsert"],
     },
+    # Storage of the LLM response cache only (llm_cache_storage)
+    "LLM_CACHE_STORAGE": {
+        "implementations": [
+            "JsonKVStorage",
+            "RedisKVStorage",
+            "PGKVStorage",
+            "MongoKVStorage",
+            "SQLiteCacheKVStorage",
+        ],
+        "required_methods": ["get_by_id", "upsert"],
+    },
     "GRAPH_STORAGE": {
         "implementations": [
             "NetworkXStorage",
@@ -48,6 +59,7 @@ STORAGE_ENV_REQUIREMENTS: dict[str, list[str]] = {
     "MongoKVStorage": [],
     "RedisKVStorage": ["REDIS_URI"],
     "PGKVStorage": ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DATABASE"],
+    "SQLiteCacheKVStorage": [],
     # Graph Storage Implementations
     "NetworkXStorage": [],
     "Neo4JStorage": ["NEO4J_URI", "NEO4J_USERNAME", "NEO4J_PASSWORD"],
@@ -101,6 +113,19 @@ STORAGES = {
     "FaissVectorDBStorage": ".kg.faiss_impl",
     "QdrantVectorDBStorage": ".kg.qdrant_impl",
     "MemgraphStorage": ".kg.memgraph_impl",
+    "SQLiteCacheKVStorage": ".kg.sqlite_cache_impl",
+}
+
+# Packages needed by storage implementation modules, installed when a storage of
+# the module is selected rather than when the module is imported
+STORAGE_PACKAGES: dict[str, list[str]] = {
+    ".kg.neo4j_impl": ["neo4j"],
+    ".kg.memgraph_impl": ["neo4j"],
+    ".kg.milvus_impl": ["pymilvus>=2.6.2"],
+    ".kg.mongo_impl": ["pymongo"],
+    ".kg.redis_impl": ["redis"],
+    ".kg.postgres_impl": ["asyncpg"],
+    ".kg.qdrant_impl": ["qdrant-client"],
 }
 
 
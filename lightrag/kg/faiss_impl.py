@@ -6,13 +6,17 @@ import json
 import numpy as np
 from dataclasses import dataclass
 
-from lightrag.utils import logger, compute_mdhash_id
+from lightrag.utils import logger, compute_mdhash_id, write_file_atomic
 from lightrag.base import BaseVectorStorage
 
 from .shared_storage import (
     get_storage_lock,
+    get_namespace_flush_lock,
     get_update_flag,
     set_all_update_flags,
+    get_namespace_version,
+    get_namespace_changes,
+    publish_namespace_changes,
 )
 
 # You must manually install faiss-cpu or faiss-gpu before using FAISS vector db
@@ -67,8 +71,11 @@ class FaissVectorDBStorage(BaseVectorStorage):
         # Keep a local store for metadata, IDs, etc.
         # Maps <int faiss_id> → metadata (including your original ID).
         self._id_to_meta = {}
-
-        self._load_faiss_index()
+        # Change log version applied to the in-memory index
+        self._loaded_version = 0
+        # Custom ids modified locally since the last flush
+        self._changed_ids: set[str] = set()
+        self._last_flush_bytes = 0
 
     async def initialize(self):
         """Initialize storage data"""
@@ -76,6 +83,67 @@ class FaissVectorDBStorage(BaseVectorStorage):
         self.storage_updated = await get_update_flag(self.final_namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock()
+        # Read version before the files so that newer entries are re-applied idempotently
+        self._loaded_version = await get_namespace_version(self.final_namespace)
+        # Load the index off the event loop, other storages initialize meanwhile
+        await asyncio.to_thread(self._load_faiss_index)
+
+    async def _reload_index(self):
+        """Bring the in-memory index up to date with changes made by other processes
+
+        Applies the published change log entries since the loaded version by rebuilding
+        the flat index from in-memory vectors, and falls back to reloading the index and
+        metadata files when the log has been compacted away.
+        Must be called with the storage lock held.
+        """
+        changes = await get_namespace_changes(
+            self.final_namespace, self._loaded_version
+        )
+        if changes is not None:
+            version, entries = changes
+            if entries:
+                metas = {meta.get("__id__"): meta for meta in self._id_to_meta.values()}
+                for entry in entries:
+                    for cid in entry["deletes"]:
+                        metas.pop(cid, None)
+                    for cid, meta in entry["upserts"].items():
+                        metas[cid] = dict(meta)
+
+                self._index = faiss.IndexFlatIP(self._dim)
+                if metas:
+                    self._index.add(
+                        np.array(
+                            [meta["__vector__"] for meta in metas.values()],
+                            dtype=np.float32,
+                        )
+                    )
+                self._id_to_meta = dict(enumerate(metas.values()))
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} FAISS applied {len(entries)} change sets to {self.namespace} "
+                f"(v{self._loaded_version}->v{version})"
+            )
+            self._loaded_version = version
+            return
+
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
+        )
+        # Read version before the files so that newer entries are re-applied idempotently
+        self._loaded_version = await get_namespace_version(self.final_namespace)
+        self._index = faiss.IndexFlatIP(self._dim)
+        self._id_to_meta = {}
+        self._load_faiss_index()
+
+    def _collect_changes(self) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """Build the change set (final record state) for ids modified since last flush"""
+        upserts = {}
+        for meta in self._id_to_meta.values():
+            cid = meta.get("__id__")
+            if cid in self._changed_ids:
+                # Copy, the live meta dicts are mutated by later upserts
+                upserts[cid] = {**meta, "__vector__": list(meta["__vector__"])}
+        deletes = [cid for cid in self._changed_ids if cid not in upserts]
+        return upserts, deletes
 
     async def _get_index(self):
         """Check if the shtorage should be reloaded"""
@@ -83,13 +151,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
         async with self._storage_lock:
             # Check if storage was updated by another process
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} FAISS reloading {self.namespace} due to update by another process"
-                )
-                # Reload data
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
-                self._load_faiss_index()
+                await self._reload_index()
                 self.storage_updated.value = False
             return self._index
 
@@ -173,6 +235,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
             # Store the raw vector so we can rebuild if something is removed
             meta["__vector__"] = embeddings[i].tolist()
             self._id_to_meta.update({fid: meta})
+        self._changed_ids.update(m["__id__"] for m in list_data)
 
         logger.debug(
             f"[{self.workspace}] Upserted {len(list_data)} vectors into Faiss index."
@@ -194,15 +257,33 @@ class FaissVectorDBStorage(BaseVectorStorage):
             # embedding is shape (1, dim)
             embedding = np.array(embedding, dtype=np.float32)
 
+        return (await self._search(embedding, top_k))[0]
+
+    async def query_batch(
+        self, query_embeddings: list[list[float]], top_k: int
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Search all query embeddings with a single Faiss call.
+        """
+        if len(query_embeddings) == 0:
+            return []
+        return await self._search(np.array(query_embeddings, dtype=np.float32), top_k)
+
+    async def _search(
+        self, embedding: np.ndarray, top_k: int
+    ) -> list[list[dict[str, Any]]]:
         faiss.normalize_L2(embedding)  # we do in-place normalization
 
-        # Perform the similarity search
+        # Perform the similarity search, one row of results per query vector
         index = await self._get_index()
         distances, indices = index.search(embedding, top_k)
 
-        distances = distances[0]
-        indices = indices[0]
+        return [
+            self._format_results(row_distances, row_indices)
+            for row_distances, row_indices in zip(distances, indices)
+        ]
 
+    def _format_results(self, distances, indices) -> list[dict[str, Any]]:
         results = []
         for dist, idx in zip(distances, indices):
             if idx == -1:
@@ -249,6 +330,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
             fid = self._find_faiss_id_by_custom_id(cid)
             if fid is not None:
                 to_remove.append(fid)
+                self._changed_ids.add(cid)
 
         if to_remove:
             await self._remove_faiss_ids(to_remove)
@@ -281,6 +363,7 @@ class FaissVectorDBStorage(BaseVectorStorage):
         for fid, meta in self._id_to_meta.items():
             if meta.get("src_id") == entity_name or meta.get("tgt_id") == entity_name:
                 relations.append(fid)
+                self._changed_ids.add(meta.get("__id__"))
 
         logger.debug(
             f"[{self.workspace}] Found {len(relations)} relations for {entity_name}"
@@ -329,21 +412,28 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
             self._id_to_meta = new_id_to_meta
 
-    def _save_faiss_index(self):
+    def _save_faiss_snapshot(
+        self, index_bytes: np.ndarray, serializable_dict: dict[str, dict]
+    ) -> int:
         """
-        Save the current Faiss index + metadata to disk so it can persist across runs.
+        Save a serialized Faiss index + metadata snapshot to disk so it can persist across runs.
+        Both files are replaced atomically. Returns the number of bytes written.
+
+        _id_to_meta is { int: { '__id__': doc_id, '__vector__': [float,...], ... } }
+        serializable_dict holds the same entries with string keys, as JSON requires.
         """
-        faiss.write_index(self._index, self._faiss_index_file)
 
-        # Save metadata dict to JSON. Convert all keys to strings for JSON storage.
-        # _id_to_meta is { int: { '__id__': doc_id, '__vector__': [float,...], ... } }
-        # We'll keep the int -> dict, but JSON requires string keys.
-        serializable_dict = {}
-        for fid, meta in self._id_to_meta.items():
-            serializable_dict[str(fid)] = meta
+        def _write_index(path: str) -> None:
+            with open(path, "wb") as f:
+                f.write(index_bytes.tobytes())
+
+        def _write_meta(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(serializable_dict, f)
 
-        with open(self._meta_file, "w", encoding="utf-8") as f:
-            json.dump(serializable_dict, f)
+        return write_file_atomic(self._faiss_index_file, _write_index) + (
+            write_file_atomic(self._meta_file, _write_meta)
+        )
 
     def _load_faiss_index(self):
         """
@@ -381,36 +471,68 @@ class FaissVectorDBStorage(BaseVectorStorage):
             self._id_to_meta = {}
 
     async def index_done_callback(self) -> None:
-        async with self._storage_lock:
-            # Check if storage was updated by another process
-            if self.storage_updated.value:
-                # Storage was updated by another process, reload data instead of saving
-                logger.warning(
-                    f"[{self.workspace}] Storage for FAISS {self.namespace} was updated by another process, reloading..."
-                )
-                self._index = faiss.IndexFlatIP(self._dim)
-                self._id_to_meta = {}
-                self._load_faiss_index()
-                self.storage_updated.value = False
-                return False  # Return error
+        # Serialize snapshot, write and publication of this namespace across processes,
+        # so the file on disk always holds the latest published change set
+        async with get_namespace_flush_lock(self.final_namespace):
+            async with self._storage_lock:
+                # Check if storage was updated by another process
+                if self.storage_updated.value:
+                    # Storage was updated by another process, reload data instead of saving
+                    logger.warning(
+                        f"[{self.workspace}] Storage for FAISS {self.namespace} was updated by another process, reloading..."
+                    )
+                    await self._reload_index()
+                    self.storage_updated.value = False
+                    return False  # Return error
+                if not self._changed_ids:
+                    # Nothing changed since the last flush
+                    self._last_flush_bytes = 0
+                    return True
+                # Snapshot under the lock, serialize it off the event loop
+                index_bytes = faiss.serialize_index(self._index)
+                meta_snapshot = {
+                    str(fid): meta for fid, meta in self._id_to_meta.items()
+                }
+                upserts, deletes = self._collect_changes()
+                self._changed_ids.clear()
 
-        # Acquire lock and perform persistence
-        async with self._storage_lock:
             try:
-                # Save data to disk
-                self._save_faiss_index()
-                # Notify other processes that data has been updated
-                await set_all_update_flags(self.final_namespace)
-                # Reset own update flag to avoid self-reloading
-                self.storage_updated.value = False
+                self._last_flush_bytes = await asyncio.to_thread(
+                    self._save_faiss_snapshot, index_bytes, meta_snapshot
+                )
             except Exception as e:
                 logger.error(
                     f"[{self.workspace}] Error saving FAISS index for {self.namespace}: {e}"
                 )
+                # Keep the changes pending so the next flush retries the write
+                self._changed_ids.update(upserts.keys(), deletes)
                 return False  # Return error
 
+            async with self._storage_lock:
+                # Publish the change set so other processes can apply deltas
+                previous_version = self._loaded_version
+                version = await publish_namespace_changes(
+                    self.final_namespace, upserts, deletes
+                )
+                # Versions published by another process since the snapshot was taken
+                missed_updates = (
+                    self.storage_updated.value or version > previous_version + 1
+                )
+                # Notify other processes that data has been updated
+                await set_all_update_flags(self.final_namespace)
+                if missed_updates:
+                    # Catch up on them, re-applying the own change set is idempotent
+                    await self._reload_index()
+                else:
+                    self._loaded_version = version
+                # Reset own update flag to avoid self-reloading
+                self.storage_updated.value = False
+
         return True  # Return success
 
+    def get_last_flush_bytes(self) -> int | None:
+        return self._last_flush_bytes
+
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
         """Get vector data by its ID
 
@@ -512,7 +634,11 @@ class FaissVectorDBStorage(BaseVectorStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
+            # Hold the flush lock so no concurrent flush rewrites the removed file
+            async with (
+                get_namespace_flush_lock(self.final_namespace),
+                self._storage_lock,
+            ):
                 # Reset the index
                 self._index = faiss.IndexFlatIP(self._dim)
                 self._id_to_meta = {}
@@ -525,7 +651,12 @@ class FaissVectorDBStorage(BaseVectorStorage):
 
                 self._id_to_meta = {}
                 self._load_faiss_index()
+                self._changed_ids.clear()
 
+                # Force other processes to reload the (now empty) index
+                self._loaded_version = await publish_namespace_changes(
+                    self.final_namespace
+                )
                 # Notify other processes
                 await set_all_update_flags(self.final_namespace)
                 self.storage_updated.value = False
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 import os
 from typing import Any, Union, final
@@ -17,7 +18,8 @@ from lightrag.exceptions import StorageNotInitializedError
 from .shared_storage import (
     get_namespace_data,
     get_storage_lock,
-    get_data_init_lock,
+    get_namespace_flush_lock,
+    get_namespace_init_lock,
     get_update_flag,
     set_all_update_flags,
     clear_all_update_flags,
@@ -47,17 +49,19 @@ class JsonDocStatusStorage(DocStatusStorage):
         self._data = None
         self._storage_lock = None
         self.storage_updated = None
+        self._last_flush_bytes = 0
 
     async def initialize(self):
         """Initialize storage data"""
         self._storage_lock = get_storage_lock()
         self.storage_updated = await get_update_flag(self.final_namespace)
-        async with get_data_init_lock():
+        async with get_namespace_init_lock(self.final_namespace):
             # check need_init must before get_namespace_data
             need_init = await try_initialize_namespace(self.final_namespace)
             self._data = await get_namespace_data(self.final_namespace)
             if need_init:
-                loaded_data = load_json(self._file_name) or {}
+                loaded_data = await asyncio.to_thread(load_json, self._file_name)
+                loaded_data = loaded_data or {}
                 async with self._storage_lock:
                     self._data.update(loaded_data)
                     logger.info(
@@ -153,17 +157,32 @@ class JsonDocStatusStorage(DocStatusStorage):
         return result
 
     async def index_done_callback(self) -> None:
-        async with self._storage_lock:
-            if self.storage_updated.value:
-                data_dict = (
-                    dict(self._data) if hasattr(self._data, "_getvalue") else self._data
-                )
-                logger.debug(
-                    f"[{self.workspace}] Process {os.getpid()} doc status writting {len(data_dict)} records to {self.namespace}"
-                )
-                write_json(data_dict, self._file_name)
+        # Serialize flushes of this namespace across processes so an older snapshot
+        # never replaces a newer file
+        async with get_namespace_flush_lock(self.final_namespace):
+            async with self._storage_lock:
+                if not self.storage_updated.value:
+                    self._last_flush_bytes = 0
+                    return
+                # Take a shallow snapshot under the lock, serialize it off the event loop
+                data_dict = dict(self._data)
                 await clear_all_update_flags(self.final_namespace)
 
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} doc status writting {len(data_dict)} records to {self.namespace}"
+            )
+            try:
+                self._last_flush_bytes = await asyncio.to_thread(
+                    write_json, data_dict, self._file_name
+                )
+            except Exception:
+                # Keep the namespace dirty so the next flush retries the write
+                await set_all_update_flags(self.final_namespace)
+                raise
+
+    def get_last_flush_bytes(self) -> int | None:
+        return self._last_flush_bytes
+
     async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
         """
         Importance notes for in-memory storage:
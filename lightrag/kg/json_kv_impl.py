@@ -1,3 +1,4 @@
+import asyncio
 import os
 from dataclasses import dataclass
 from typing import Any, final
@@ -14,11 +15,13 @@ from lightrag.exceptions import StorageNotInitializedError
 from .shared_storage import (
     get_namespace_data,
     get_storage_lock,
-    get_data_init_lock,
+    get_namespace_flush_lock,
+    get_namespace_init_lock,
     get_update_flag,
     set_all_update_flags,
     clear_all_update_flags,
     try_initialize_namespace,
+    reset_initialize_namespace,
 )
 
 
@@ -43,48 +46,94 @@ class JsonKVStorage(BaseKVStorage):
         self._data = None
         self._storage_lock = None
         self.storage_updated = None
+        self._load_lock = asyncio.Lock()
+        self._last_flush_bytes = 0
 
     async def initialize(self):
-        """Initialize storage data"""
+        """Initialize storage data
+
+        Namespaces listed in lazy_load_namespaces are loaded on first access or
+        by ensure_loaded instead.
+        """
         self._storage_lock = get_storage_lock()
         self.storage_updated = await get_update_flag(self.final_namespace)
-        async with get_data_init_lock():
-            # check need_init must before get_namespace_data
-            need_init = await try_initialize_namespace(self.final_namespace)
-            self._data = await get_namespace_data(self.final_namespace)
-            if need_init:
-                loaded_data = load_json(self._file_name) or {}
-                async with self._storage_lock:
-                    # Migrate legacy cache structure if needed
-                    if self.namespace.endswith("_cache"):
-                        loaded_data = await self._migrate_legacy_cache_structure(
-                            loaded_data
-                        )
+        if self.namespace in (self.global_config.get("lazy_load_namespaces") or ()):
+            return
+        await self._ensure_loaded()
 
-                    self._data.update(loaded_data)
-                    data_count = len(loaded_data)
+    async def ensure_loaded(self) -> None:
+        await self._ensure_loaded()
 
-                    logger.info(
-                        f"[{self.workspace}] Process {os.getpid()} KV load {self.namespace} with {data_count} records"
-                    )
+    async def _ensure_loaded(self) -> None:
+        if self._data is not None:
+            return
+        if self._storage_lock is None:
+            raise StorageNotInitializedError("JsonKVStorage")
+        async with self._load_lock:
+            if self._data is not None:
+                return
+            async with get_namespace_init_lock(self.final_namespace):
+                # check need_init must before get_namespace_data
+                need_init = await try_initialize_namespace(self.final_namespace)
+                data = await get_namespace_data(self.final_namespace)
+                if need_init:
+                    try:
+                        loaded_data = await asyncio.to_thread(
+                            load_json, self._file_name
+                        )
+                    except BaseException:
+                        # Also when cancelled, e.g. the background load at shutdown
+                        await reset_initialize_namespace(self.final_namespace)
+                        raise
+                    loaded_data = loaded_data or {}
+                    async with self._storage_lock:
+                        # Migrate legacy cache structure if needed
+                        if self.namespace.endswith("_cache"):
+                            loaded_data = await self._migrate_legacy_cache_structure(
+                                loaded_data
+                            )
+
+                        data.update(loaded_data)
+                        data_count = len(loaded_data)
+
+                        logger.info(
+                            f"[{self.workspace}] Process {os.getpid()} KV load {self.namespace} with {data_count} records"
+                        )
+            # Published last, accessors only skip loading once the data is complete
+            self._data = data
 
     async def index_done_callback(self) -> None:
-        async with self._storage_lock:
-            if self.storage_updated.value:
-                data_dict = (
-                    dict(self._data) if hasattr(self._data, "_getvalue") else self._data
-                )
-
-                # Calculate data count - all data is now flattened
-                data_count = len(data_dict)
+        if self._data is None:
+            # Never loaded, nothing to write
+            return
+        # Serialize flushes of this namespace across processes so an older snapshot
+        # never replaces a newer file
+        async with get_namespace_flush_lock(self.final_namespace):
+            async with self._storage_lock:
+                if not self.storage_updated.value:
+                    self._last_flush_bytes = 0
+                    return
+                # Take a shallow snapshot under the lock, serialize it off the event loop
+                data_dict = dict(self._data)
+                await clear_all_update_flags(self.final_namespace)
 
-                logger.debug(
-                    f"[{self.workspace}] Process {os.getpid()} KV writting {data_count} records to {self.namespace}"
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} KV writting {len(data_dict)} records to {self.namespace}"
+            )
+            try:
+                self._last_flush_bytes = await asyncio.to_thread(
+                    write_json, data_dict, self._file_name
                 )
-                write_json(data_dict, self._file_name)
-                await clear_all_update_flags(self.final_namespace)
+            except Exception:
+                # Keep the namespace dirty so the next flush retries the write
+                await set_all_update_flags(self.final_namespace)
+                raise
+
+    def get_last_flush_bytes(self) -> int | None:
+        return self._last_flush_bytes
 
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        await self._ensure_loaded()
         async with self._storage_lock:
             result = self._data.get(id)
             if result:
@@ -98,6 +147,7 @@ class JsonKVStorage(BaseKVStorage):
             return result
 
     async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        await self._ensure_loaded()
         async with self._storage_lock:
             results = []
             for id in ids:
@@ -116,6 +166,7 @@ class JsonKVStorage(BaseKVStorage):
             return results
 
     async def filter_keys(self, keys: set[str]) -> set[str]:
+        await self._ensure_loaded()
         async with self._storage_lock:
             return set(keys) - set(self._data.keys())
 
@@ -135,8 +186,7 @@ class JsonKVStorage(BaseKVStorage):
         logger.debug(
             f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
         )
-        if self._storage_lock is None:
-            raise StorageNotInitializedError("JsonKVStorage")
+        await self._ensure_loaded()
         async with self._storage_lock:
             # Add timestamps to data based on whether key exists
             for k, v in data.items():
@@ -170,6 +220,7 @@ class JsonKVStorage(BaseKVStorage):
         Returns:
             None
         """
+        await self._ensure_loaded()
         async with self._storage_lock:
             any_deleted = False
             for doc_id in ids:
@@ -186,6 +237,7 @@ class JsonKVStorage(BaseKVStorage):
         Returns:
             bool: True if storage contains no data, False otherwise
         """
+        await self._ensure_loaded()
         async with self._storage_lock:
             return len(self._data) == 0
 
@@ -204,6 +256,7 @@ class JsonKVStorage(BaseKVStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
+            await self._ensure_loaded()
             async with self._storage_lock:
                 self._data.clear()
                 await set_all_update_flags(self.final_namespace)
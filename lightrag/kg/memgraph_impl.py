@@ -10,10 +10,6 @@ from ..base import BaseGraphStorage
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from ..constants import GRAPH_FIELD_SEP
 from ..kg.shared_storage import get_data_init_lock, get_graph_db_lock
-import pipmaster as pm
-
-if not pm.is_installed("neo4j"):
-    pm.install("neo4j")
 from neo4j import (
     AsyncGraphDatabase,
     AsyncManagedTransaction,
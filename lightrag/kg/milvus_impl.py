@@ -7,11 +7,6 @@ from lightrag.utils import logger, compute_mdhash_id
 from ..base import BaseVectorStorage
 from ..constants import DEFAULT_MAX_FILE_PATH_LENGTH
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock
-import pipmaster as pm
-
-if not pm.is_installed("pymilvus"):
-    pm.install("pymilvus>=2.6.2")
-
 import configparser
 from pymilvus import MilvusClient, DataType, CollectionSchema, FieldSchema  # type: ignore
 
@@ -1083,12 +1078,26 @@ class MilvusVectorDBStorage(BaseVectorStorage):
                 [query], _priority=5
             )  # higher priority for query
 
+        return self._search(embedding, top_k)[0]
+
+    async def query_batch(
+        self, query_embeddings: list[list[float]], top_k: int
+    ) -> list[list[dict[str, Any]]]:
+        """Search all query embeddings in a single Milvus search request"""
+        if len(query_embeddings) == 0:
+            return []
+        self._ensure_collection_loaded()
+        return self._search([list(e) for e in query_embeddings], top_k)
+
+    def _search(
+        self, embeddings: list[list[float]], top_k: int
+    ) -> list[list[dict[str, Any]]]:
         # Include all meta_fields (created_at is now always included)
         output_fields = list(self.meta_fields)
 
         results = self._client.search(
             collection_name=self.final_namespace,
-            data=embedding,
+            data=embeddings,
             limit=top_k,
             output_fields=output_fields,
             search_params={
@@ -1097,13 +1106,16 @@ class MilvusVectorDBStorage(BaseVectorStorage):
             },
         )
         return [
-            {
-                **dp["entity"],
-                "id": dp["id"],
-                "distance": dp["distance"],
-                "created_at": dp.get("created_at"),
-            }
-            for dp in results[0]
+            [
+                {
+                    **dp["entity"],
+                    "id": dp["id"],
+                    "distance": dp["distance"],
+                    "created_at": dp.get("created_at"),
+                }
+                for dp in hits
+            ]
+            for hits in results
         ]
 
     async def index_done_callback(self) -> None:
@@ -21,11 +21,6 @@ from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from ..constants import GRAPH_FIELD_SEP
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock, get_graph_db_lock
 
-import pipmaster as pm
-
-if not pm.is_installed("pymongo"):
-    pm.install("pymongo")
-
 from pymongo import AsyncMongoClient  # type: ignore
 from pymongo import UpdateOne  # type: ignore
 from pymongo.asynchronous.database import AsyncDatabase  # type: ignore
@@ -170,6 +165,19 @@ class MongoKVStorage(BaseKVStorage):
             ordered_results.append(doc_map.get(str(id_value)))
         return ordered_results
 
+    async def get_fields_by_ids(
+        self, ids: list[str], fields: list[str]
+    ) -> list[dict[str, Any] | None]:
+        # Projection keeps the other fields on the server
+        cursor = self._data.find(
+            {"_id": {"$in": ids}}, {"_id": 1, **{field: 1 for field in fields}}
+        )
+        doc_map = {
+            str(doc["_id"]): {field: doc[field] for field in fields if field in doc}
+            async for doc in cursor
+        }
+        return [doc_map.get(str(id_value)) for id_value in ids]
+
     async def filter_keys(self, keys: set[str]) -> set[str]:
         cursor = self._data.find({"_id": {"$in": list(keys)}}, {"_id": 1})
         existing_ids = {str(x["_id"]) async for x in cursor}
@@ -4,23 +4,37 @@ import os
 import zlib
 from typing import Any, final
 from dataclasses import dataclass
+import json
 import numpy as np
 import time
+from functools import partial
 
 from lightrag.utils import (
     logger,
     compute_mdhash_id,
+    write_file_atomic,
 )
 
 from lightrag.base import BaseVectorStorage
 from nano_vectordb import NanoVectorDB
+from nano_vectordb.dbs import array_to_buffer_string
 from .shared_storage import (
     get_storage_lock,
+    get_namespace_flush_lock,
     get_update_flag,
     set_all_update_flags,
+    get_namespace_version,
+    get_namespace_changes,
+    publish_namespace_changes,
 )
 
 
+def _dump_storage(storage: dict[str, Any], file_name: str) -> None:
+    """Write a NanoVectorDB storage snapshot in the same layout as NanoVectorDB.save"""
+    with open(file_name, "w", encoding="utf-8") as f:
+        json.dump(storage, f, ensure_ascii=False)
+
+
 @final
 @dataclass
 class NanoVectorDBStorage(BaseVectorStorage):
@@ -29,6 +43,11 @@ class NanoVectorDBStorage(BaseVectorStorage):
         self._client = None
         self._storage_lock = None
         self.storage_updated = None
+        # Change log version applied to the in-memory client
+        self._loaded_version = 0
+        # Vector ids modified locally since the last flush
+        self._changed_ids: set[str] = set()
+        self._last_flush_bytes = 0
 
         # Use global config value if specified, otherwise use default
         kwargs = self.global_config.get("vector_db_storage_cls_kwargs", {})
@@ -57,17 +76,73 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
         self._max_batch_size = self.global_config["embedding_batch_num"]
 
-        self._client = NanoVectorDB(
-            self.embedding_func.embedding_dim,
-            storage_file=self._client_file_name,
-        )
-
     async def initialize(self):
         """Initialize storage data"""
         # Get the update flag for cross-process update notification
         self.storage_updated = await get_update_flag(self.final_namespace)
         # Get the storage lock for use in other methods
         self._storage_lock = get_storage_lock(enable_logging=False)
+        # Read version before the file so that newer entries are re-applied idempotently
+        self._loaded_version = await get_namespace_version(self.final_namespace)
+        # Load the vector file off the event loop, other storages initialize meanwhile
+        self._client = await asyncio.to_thread(
+            NanoVectorDB,
+            self.embedding_func.embedding_dim,
+            storage_file=self._client_file_name,
+        )
+
+    async def _reload_client(self):
+        """Bring the in-memory client up to date with changes made by other processes
+
+        Applies the published change log entries since the loaded version, and falls
+        back to reloading the whole file when the log has been compacted away.
+        Must be called with the storage lock held.
+        """
+        changes = await get_namespace_changes(
+            self.final_namespace, self._loaded_version
+        )
+        if changes is not None:
+            version, entries = changes
+            upserted = deleted = 0
+            for entry in entries:
+                if entry["deletes"]:
+                    self._client.delete(entry["deletes"])
+                    deleted += len(entry["deletes"])
+                if entry["upserts"]:
+                    # NanoVectorDB consumes __vector__ from the dicts, upsert copies
+                    self._client.upsert(
+                        datas=[dict(dp) for dp in entry["upserts"].values()]
+                    )
+                    upserted += len(entry["upserts"])
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} applied {len(entries)} change sets to {self.namespace} "
+                f"(v{self._loaded_version}->v{version}, upserted: {upserted}, deleted: {deleted})"
+            )
+            self._loaded_version = version
+            return
+
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
+        )
+        # Read version before the file so that newer entries are re-applied idempotently
+        self._loaded_version = await get_namespace_version(self.final_namespace)
+        self._client = NanoVectorDB(
+            self.embedding_func.embedding_dim,
+            storage_file=self._client_file_name,
+        )
+
+    def _collect_changes(self) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """Build the change set (final record state) for ids modified since last flush"""
+        storage = getattr(self._client, "_NanoVectorDB__storage")
+        upserts = {}
+        for i, dp in enumerate(storage["data"]):
+            if dp["__id__"] in self._changed_ids:
+                upserts[dp["__id__"]] = {
+                    **dp,
+                    "__vector__": storage["matrix"][i].copy(),
+                }
+        deletes = [id for id in self._changed_ids if id not in upserts]
+        return upserts, deletes
 
     async def _get_client(self):
         """Check if the storage should be reloaded"""
@@ -75,14 +150,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
         async with self._storage_lock:
             # Check if data needs to be reloaded
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} reloading {self.namespace} due to update by another process"
-                )
-                # Reload data
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
-                )
+                await self._reload_client()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -129,6 +197,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
                 d["__vector__"] = embeddings[i]
             client = await self._get_client()
             results = client.upsert(datas=list_data)
+            self._changed_ids.update(data.keys())
             return results
         else:
             # sometimes the embedding is not returned correctly. just log it.
@@ -185,6 +254,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
         try:
             client = await self._get_client()
             client.delete(ids)
+            self._changed_ids.update(ids)
             logger.debug(
                 f"[{self.workspace}] Successfully deleted {len(ids)} vectors from {self.namespace}"
             )
@@ -211,6 +281,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             client = await self._get_client()
             if client.get([entity_id]):
                 client.delete([entity_id])
+                self._changed_ids.add(entity_id)
                 logger.debug(
                     f"[{self.workspace}] Successfully deleted entity {entity_name}"
                 )
@@ -245,6 +316,7 @@ class NanoVectorDBStorage(BaseVectorStorage):
             if ids_to_delete:
                 client = await self._get_client()
                 client.delete(ids_to_delete)
+                self._changed_ids.update(ids_to_delete)
                 logger.debug(
                     f"[{self.workspace}] Deleted {len(ids_to_delete)} relations for {entity_name}"
                 )
@@ -259,39 +331,73 @@ class NanoVectorDBStorage(BaseVectorStorage):
 
     async def index_done_callback(self) -> bool:
         """Save data to disk"""
-        async with self._storage_lock:
-            # Check if storage was updated by another process
-            if self.storage_updated.value:
-                # Storage was updated by another process, reload data instead of saving
-                logger.warning(
-                    f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
+        # Serialize snapshot, write and publication of this namespace across processes,
+        # so the file on disk always holds the latest published change set
+        async with get_namespace_flush_lock(self.final_namespace):
+            async with self._storage_lock:
+                # Check if storage was updated by another process
+                if self.storage_updated.value:
+                    # Storage was updated by another process, reload data instead of saving
+                    logger.warning(
+                        f"[{self.workspace}] Storage for {self.namespace} was updated by another process, reloading..."
+                    )
+                    await self._reload_client()
+                    # Reset update flag
+                    self.storage_updated.value = False
+                    return False  # Return error
+                if not self._changed_ids:
+                    # Nothing changed since the last flush
+                    self._last_flush_bytes = 0
+                    return True
+                # Snapshot under the lock, serialize it off the event loop
+                storage = getattr(self._client, "_NanoVectorDB__storage")
+                snapshot = {
+                    **storage,
+                    "data": list(storage["data"]),
+                    "matrix": array_to_buffer_string(storage["matrix"]),
+                }
+                upserts, deletes = self._collect_changes()
+                self._changed_ids.clear()
+
+            try:
+                self._last_flush_bytes = await asyncio.to_thread(
+                    write_file_atomic,
+                    self._client_file_name,
+                    partial(_dump_storage, snapshot),
                 )
-                self._client = NanoVectorDB(
-                    self.embedding_func.embedding_dim,
-                    storage_file=self._client_file_name,
+            except Exception as e:
+                logger.error(
+                    f"[{self.workspace}] Error saving data for {self.namespace}: {e}"
                 )
-                # Reset update flag
-                self.storage_updated.value = False
+                # Keep the changes pending so the next flush retries the write
+                self._changed_ids.update(upserts.keys(), deletes)
                 return False  # Return error
 
-        # Acquire lock and perform persistence
-        async with self._storage_lock:
-            try:
-                # Save data to disk
-                self._client.save()
+            async with self._storage_lock:
+                # Publish the change set so other processes can apply deltas
+                previous_version = self._loaded_version
+                version = await publish_namespace_changes(
+                    self.final_namespace, upserts, deletes
+                )
+                # Versions published by another process since the snapshot was taken
+                missed_updates = (
+                    self.storage_updated.value or version > previous_version + 1
+                )
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
+                if missed_updates:
+                    # Catch up on them, re-applying the own change set is idempotent
+                    await self._reload_client()
+                else:
+                    self._loaded_version = version
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
-                return True  # Return success
-            except Exception as e:
-                logger.error(
-                    f"[{self.workspace}] Error saving data for {self.namespace}: {e}"
-                )
-                return False  # Return error
 
         return True  # Return success
 
+    def get_last_flush_bytes(self) -> int | None:
+        return self._last_flush_bytes
+
     async def get_by_id(self, id: str) -> dict[str, Any] | None:
         """Get vector data by its ID
 
@@ -391,7 +497,11 @@ class NanoVectorDBStorage(BaseVectorStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
+            # Hold the flush lock so no concurrent flush rewrites the removed file
+            async with (
+                get_namespace_flush_lock(self.final_namespace),
+                self._storage_lock,
+            ):
                 # delete _client_file_name
                 if os.path.exists(self._client_file_name):
                     os.remove(self._client_file_name)
@@ -400,7 +510,12 @@ class NanoVectorDBStorage(BaseVectorStorage):
                     self.embedding_func.embedding_dim,
                     storage_file=self._client_file_name,
                 )
+                self._changed_ids.clear()
 
+                # Force other processes to reload the (now empty) storage
+                self._loaded_version = await publish_namespace_changes(
+                    self.final_namespace
+                )
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
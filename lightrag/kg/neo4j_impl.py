@@ -17,12 +17,12 @@ from ..utils import logger
 from ..base import BaseGraphStorage
 from ..types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
 from ..constants import GRAPH_FIELD_SEP
-from ..kg.shared_storage import get_data_init_lock, get_graph_db_lock
-import pipmaster as pm
-
-if not pm.is_installed("neo4j"):
-    pm.install("neo4j")
-
+from ..kg.shared_storage import (
+    get_data_init_lock,
+    get_graph_db_lock,
+    get_namespace_version,
+    publish_namespace_changes,
+)
 from neo4j import (  # type: ignore
     AsyncGraphDatabase,
     exceptions as neo4jExceptions,
@@ -351,8 +351,14 @@ class Neo4JStorage(BaseGraphStorage):
         await self.finalize()
 
     async def index_done_callback(self) -> None:
-        # Neo4J handles persistence automatically
-        pass
+        # Neo4J handles persistence automatically, only the graph version is bumped
+        await publish_namespace_changes(self._graph_version_namespace())
+
+    def _graph_version_namespace(self) -> str:
+        return f"{self._get_workspace_label()}_{self.namespace}_graph_version"
+
+    async def get_graph_version(self) -> int | None:
+        return await get_namespace_version(self._graph_version_namespace())
 
     async def has_node(self, node_id: str) -> bool:
         """
@@ -1815,6 +1821,7 @@ class Neo4JStorage(BaseGraphStorage):
                     query = f"MATCH (n:`{workspace_label}`) DETACH DELETE n"
                     result = await session.run(query)
                     await result.consume()  # Ensure result is fully consumed
+                    await publish_namespace_changes(self._graph_version_namespace())
 
                     # logger.debug(
                     #     f"[{self.workspace}] Process {os.getpid()} drop Neo4j workspace '{workspace_label}' in database {self._DATABASE}"
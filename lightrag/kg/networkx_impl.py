@@ -1,16 +1,22 @@
+import asyncio
 import os
 from dataclasses import dataclass
+from functools import partial
 from typing import final
 
 from lightrag.types import KnowledgeGraph, KnowledgeGraphNode, KnowledgeGraphEdge
-from lightrag.utils import logger
+from lightrag.utils import logger, write_file_atomic
 from lightrag.base import BaseGraphStorage
 from lightrag.constants import GRAPH_FIELD_SEP
 import networkx as nx
 from .shared_storage import (
     get_storage_lock,
+    get_namespace_flush_lock,
     get_update_flag,
     set_all_update_flags,
+    get_namespace_version,
+    get_namespace_changes,
+    publish_namespace_changes,
 )
 
 from dotenv import load_dotenv
@@ -31,11 +37,11 @@ class NetworkXStorage(BaseGraphStorage):
         return None
 
     @staticmethod
-    def write_nx_graph(graph: nx.Graph, file_name, workspace="_"):
+    def write_nx_graph(graph: nx.Graph, file_name, workspace="_") -> int:
         logger.info(
             f"[{workspace}] Writing graph with {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges"
         )
-        nx.write_graphml(graph, file_name)
+        return write_file_atomic(file_name, partial(nx.write_graphml, graph))
 
     def __post_init__(self):
         working_dir = self.global_config["working_dir"]
@@ -56,9 +62,26 @@ class NetworkXStorage(BaseGraphStorage):
         self._storage_lock = None
         self.storage_updated = None
         self._graph = None
+        # Change log version applied to the in-memory graph
+        self._loaded_version = 0
+        # Nodes and edges modified locally since the last flush
+        self._changed_nodes: set[str] = set()
+        self._changed_edges: set[tuple[str, str]] = set()
+        self._last_flush_bytes = 0
 
-        # Load initial graph
-        preloaded_graph = NetworkXStorage.load_nx_graph(self._graphml_xml_file)
+    async def initialize(self):
+        """Initialize storage data"""
+        # Get the update flag for cross-process update notification
+        self.storage_updated = await get_update_flag(self.final_namespace)
+        # Get the storage lock for use in other methods
+        self._storage_lock = get_storage_lock()
+        # Read version before the file so that newer entries are re-applied idempotently
+        self._loaded_version = await get_namespace_version(self.final_namespace)
+
+        # Load initial graph off the event loop, other storages initialize meanwhile
+        preloaded_graph = await asyncio.to_thread(
+            NetworkXStorage.load_nx_graph, self._graphml_xml_file
+        )
         if preloaded_graph is not None:
             logger.info(
                 f"[{self.workspace}] Loaded graph from {self._graphml_xml_file} with {preloaded_graph.number_of_nodes()} nodes, {preloaded_graph.number_of_edges()} edges"
@@ -69,12 +92,77 @@ class NetworkXStorage(BaseGraphStorage):
             )
         self._graph = preloaded_graph or nx.Graph()
 
-    async def initialize(self):
-        """Initialize storage data"""
-        # Get the update flag for cross-process update notification
-        self.storage_updated = await get_update_flag(self.final_namespace)
-        # Get the storage lock for use in other methods
-        self._storage_lock = get_storage_lock()
+    async def _reload_graph(self):
+        """Bring the in-memory graph up to date with changes made by other processes
+
+        Applies the published change log entries since the loaded version, and falls
+        back to reloading the GraphML file when the log has been compacted away.
+        Must be called with the storage lock held.
+        """
+        changes = await get_namespace_changes(
+            self.final_namespace, self._loaded_version
+        )
+        if changes is not None:
+            version, entries = changes
+            for entry in entries:
+                upserts = entry["upserts"]
+                # Entries hold the final state: removals first, then full attribute sets
+                for kind, key in entry["deletes"]:
+                    if kind == "node":
+                        if self._graph.has_node(key):
+                            self._graph.remove_node(key)
+                    elif self._graph.has_edge(*key):
+                        self._graph.remove_edge(*key)
+                for (kind, key), attrs in upserts.items():
+                    if kind != "node":
+                        continue
+                    if self._graph.has_node(key):
+                        self._graph.nodes[key].clear()
+                    self._graph.add_node(key, **attrs)
+                for (kind, key), attrs in upserts.items():
+                    if kind != "edge":
+                        continue
+                    if self._graph.has_edge(*key):
+                        self._graph.edges[key].clear()
+                    self._graph.add_edge(*key, **attrs)
+            logger.debug(
+                f"[{self.workspace}] Process {os.getpid()} applied {len(entries)} graph change sets "
+                f"(v{self._loaded_version}->v{version})"
+            )
+            self._loaded_version = version
+            return
+
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
+        )
+        # Read version before the file so that newer entries are re-applied idempotently
+        self._loaded_version = await get_namespace_version(self.final_namespace)
+        self._graph = (
+            NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
+        )
+
+    def _collect_changes(self) -> tuple[dict[tuple, dict], list[tuple]]:
+        """Build the change set (final state) for nodes and edges modified since last flush
+
+        Keys are ("node", node_id) or ("edge", (src, tgt)) tuples.
+        """
+        upserts, deletes = {}, []
+        for node_id in self._changed_nodes:
+            if self._graph.has_node(node_id):
+                upserts[("node", node_id)] = dict(self._graph.nodes[node_id])
+            else:
+                deletes.append(("node", node_id))
+        for edge in self._changed_edges:
+            if self._graph.has_edge(*edge):
+                upserts[("edge", edge)] = dict(self._graph.edges[edge])
+            else:
+                deletes.append(("edge", edge))
+        return upserts, deletes
+
+    def _mark_node_removed(self, graph: nx.Graph, node_id: str) -> None:
+        """Record a node and its incident edges as changed before the node is removed"""
+        self._changed_nodes.add(node_id)
+        self._changed_edges.update(graph.edges(node_id))
 
     async def _get_graph(self):
         """Check if the storage should be reloaded"""
@@ -82,13 +170,7 @@ class NetworkXStorage(BaseGraphStorage):
         async with self._storage_lock:
             # Check if data needs to be reloaded
             if self.storage_updated.value:
-                logger.info(
-                    f"[{self.workspace}] Process {os.getpid()} reloading graph {self._graphml_xml_file} due to modifications by another process"
-                )
-                # Reload data
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
-                )
+                await self._reload_graph()
                 # Reset update flag
                 self.storage_updated.value = False
 
@@ -137,6 +219,7 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_node(node_id, **node_data)
+        self._changed_nodes.add(node_id)
 
     async def upsert_edge(
         self, source_node_id: str, target_node_id: str, edge_data: dict[str, str]
@@ -149,6 +232,8 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         graph.add_edge(source_node_id, target_node_id, **edge_data)
+        self._changed_nodes.update((source_node_id, target_node_id))
+        self._changed_edges.add((source_node_id, target_node_id))
 
     async def delete_node(self, node_id: str) -> None:
         """
@@ -159,6 +244,7 @@ class NetworkXStorage(BaseGraphStorage):
         """
         graph = await self._get_graph()
         if graph.has_node(node_id):
+            self._mark_node_removed(graph, node_id)
             graph.remove_node(node_id)
             logger.debug(f"[{self.workspace}] Node {node_id} deleted from the graph")
         else:
@@ -180,6 +266,7 @@ class NetworkXStorage(BaseGraphStorage):
         graph = await self._get_graph()
         for node in nodes:
             if graph.has_node(node):
+                self._mark_node_removed(graph, node)
                 graph.remove_node(node)
 
     async def remove_edges(self, edges: list[tuple[str, str]]):
@@ -197,6 +284,7 @@ class NetworkXStorage(BaseGraphStorage):
         for source, target in edges:
             if graph.has_edge(source, target):
                 graph.remove_edge(source, target)
+                self._changed_edges.add((source, target))
 
     async def get_all_labels(self) -> list[str]:
         """
@@ -528,38 +616,76 @@ class NetworkXStorage(BaseGraphStorage):
 
     async def index_done_callback(self) -> bool:
         """Save data to disk"""
-        async with self._storage_lock:
-            # Check if storage was updated by another process
-            if self.storage_updated.value:
-                # Storage was updated by another process, reload data instead of saving
-                logger.info(
-                    f"[{self.workspace}] Graph was updated by another process, reloading..."
-                )
-                self._graph = (
-                    NetworkXStorage.load_nx_graph(self._graphml_xml_file) or nx.Graph()
+        # Serialize snapshot, write and publication of this namespace across processes,
+        # so the file on disk always holds the latest published change set
+        async with get_namespace_flush_lock(self.final_namespace):
+            async with self._storage_lock:
+                # Check if storage was updated by another process
+                if self.storage_updated.value:
+                    # Storage was updated by another process, reload data instead of saving
+                    logger.info(
+                        f"[{self.workspace}] Graph was updated by another process, reloading..."
+                    )
+                    await self._reload_graph()
+                    # Reset update flag
+                    self.storage_updated.value = False
+                    return False  # Return error
+                if not self._changed_nodes and not self._changed_edges:
+                    # Nothing changed since the last flush
+                    self._last_flush_bytes = 0
+                    return True
+                # Snapshot under the lock, serialize it off the event loop
+                graph_snapshot = self._graph.copy()
+                upserts, deletes = self._collect_changes()
+                changed_nodes, changed_edges = self._changed_nodes, self._changed_edges
+                self._changed_nodes, self._changed_edges = set(), set()
+
+            try:
+                self._last_flush_bytes = await asyncio.to_thread(
+                    NetworkXStorage.write_nx_graph,
+                    graph_snapshot,
+                    self._graphml_xml_file,
+                    self.workspace,
                 )
-                # Reset update flag
-                self.storage_updated.value = False
+            except Exception as e:
+                logger.error(f"[{self.workspace}] Error saving graph: {e}")
+                # Keep the changes pending so the next flush retries the write
+                self._changed_nodes.update(changed_nodes)
+                self._changed_edges.update(changed_edges)
                 return False  # Return error
 
-        # Acquire lock and perform persistence
-        async with self._storage_lock:
-            try:
-                # Save data to disk
-                NetworkXStorage.write_nx_graph(
-                    self._graph, self._graphml_xml_file, self.workspace
+            async with self._storage_lock:
+                # Publish the change set so other processes can apply deltas
+                previous_version = self._loaded_version
+                version = await publish_namespace_changes(
+                    self.final_namespace, upserts, deletes
+                )
+                # Versions published by another process since the snapshot was taken
+                missed_updates = (
+                    self.storage_updated.value or version > previous_version + 1
                 )
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
+                if missed_updates:
+                    # Catch up on them, re-applying the own change set is idempotent
+                    await self._reload_graph()
+                else:
+                    self._loaded_version = version
                 # Reset own update flag to avoid self-reloading
                 self.storage_updated.value = False
-                return True  # Return success
-            except Exception as e:
-                logger.error(f"[{self.workspace}] Error saving graph: {e}")
-                return False  # Return error
 
         return True
 
+    def get_last_flush_bytes(self) -> int | None:
+        return self._last_flush_bytes
+
+    async def get_graph_version(self) -> int | None:
+        return await get_namespace_version(self.final_namespace)
+
+    def is_shared_graph(self) -> bool:
+        # The graph file is owned by one server
+        return False
+
     async def drop(self) -> dict[str, str]:
         """Drop all graph data from storage and clean up resources
 
@@ -575,11 +701,21 @@ class NetworkXStorage(BaseGraphStorage):
             - On failure: {"status": "error", "message": "<error details>"}
         """
         try:
-            async with self._storage_lock:
+            # Hold the flush lock so no concurrent flush rewrites the removed file
+            async with (
+                get_namespace_flush_lock(self.final_namespace),
+                self._storage_lock,
+            ):
                 # delete _client_file_name
                 if os.path.exists(self._graphml_xml_file):
                     os.remove(self._graphml_xml_file)
                 self._graph = nx.Graph()
+                self._changed_nodes.clear()
+                self._changed_edges.clear()
+                # Force other processes to reload the (now empty) graph
+                self._loaded_version = await publish_namespace_changes(
+                    self.final_namespace
+                )
                 # Notify other processes that data has been updated
                 await set_all_update_flags(self.final_namespace)
                 # Reset own update flag to avoid self-reloading
@@ -34,12 +34,13 @@ from ..base import (
 from ..namespace import NameSpace, is_namespace
 from ..utils import logger
 from ..constants import GRAPH_FIELD_SEP
-from ..kg.shared_storage import get_data_init_lock, get_graph_db_lock, get_storage_lock
-
-import pipmaster as pm
-
-if not pm.is_installed("asyncpg"):
-    pm.install("asyncpg")
+from ..kg.shared_storage import (
+    get_data_init_lock,
+    get_graph_db_lock,
+    get_namespace_version,
+    get_storage_lock,
+    publish_namespace_changes,
+)
 
 import asyncpg  # type: ignore
 from asyncpg import Pool  # type: ignore
@@ -1958,6 +1959,30 @@ class PGKVStorage(BaseKVStorage):
 
         return _order_results(results)
 
+    async def get_fields_by_ids(
+        self, ids: list[str], fields: list[str]
+    ) -> list[dict[str, Any] | None]:
+        """Get some columns of text chunks without transferring the others"""
+        is_text_chunks = is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS)
+        if not is_text_chunks or not _TEXT_CHUNK_COLUMNS.issuperset(fields):
+            return await super().get_fields_by_ids(ids, fields)
+        if not ids:
+            return []
+
+        columns = ", ".join(
+            "COALESCE(content, '') as content" if field == "content" else field
+            for field in fields
+            if field != "id"
+        )
+        sql = f"""SELECT id, {columns} FROM LIGHTRAG_DOC_CHUNKS
+                  WHERE workspace=$1 AND id = ANY($2)"""
+        rows = await self.db.query(sql, [self.workspace, ids], multirows=True)
+        row_map = {
+            str(row["id"]): {field: row[field] for field in fields}
+            for row in rows or []
+        }
+        return [row_map.get(str(chunk_id)) for chunk_id in ids]
+
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Filter out duplicated content"""
         if not keys:
@@ -2336,6 +2361,43 @@ class PGVectorStorage(BaseVectorStorage):
         results = await self.db.query(sql, params=list(params.values()), multirows=True)
         return results
 
+    async def query_batch(
+        self, query_embeddings: list[list[float]], top_k: int
+    ) -> list[list[dict[str, Any]]]:
+        """Search all query embeddings with a single SQL round trip
+
+        The per-embedding nearest-neighbour queries are combined with UNION ALL, so each
+        branch keeps its own ORDER BY/LIMIT and can use the vector index.
+        """
+        if len(query_embeddings) == 0:
+            return []
+
+        branches = []
+        for query_index, embedding in enumerate(query_embeddings):
+            embedding_string = ",".join(map(str, embedding))
+            branch_sql = (
+                SQL_TEMPLATES[self.namespace]
+                .format(embedding_string=embedding_string)
+                .strip()
+                .rstrip(";")
+            )
+            branches.append(
+                f"(SELECT {query_index} AS query_index, q.* FROM ({branch_sql}) q)"
+            )
+        sql = " UNION ALL ".join(branches)
+        params = {
+            "workspace": self.workspace,
+            "closer_than_threshold": 1 - self.cosine_better_than_threshold,
+            "top_k": top_k,
+        }
+        rows = await self.db.query(sql, params=list(params.values()), multirows=True)
+
+        # Rows of different branches may interleave, each branch keeps its own order
+        results: list[list[dict[str, Any]]] = [[] for _ in query_embeddings]
+        for row in rows or []:
+            results[row.pop("query_index")].append(row)
+        return results
+
     async def index_done_callback(self) -> None:
         # PG handles persistence automatically
         pass
@@ -3318,8 +3380,14 @@ class PGGraphStorage(BaseGraphStorage):
                 self.db = None
 
     async def index_done_callback(self) -> None:
-        # PG handles persistence automatically
-        pass
+        # PG handles persistence automatically, only the graph version is bumped
+        await publish_namespace_changes(self._graph_version_namespace())
+
+    def _graph_version_namespace(self) -> str:
+        return f"{self.graph_name}_graph_version"
+
+    async def get_graph_version(self) -> int | None:
+        return await get_namespace_version(self._graph_version_namespace())
 
     @staticmethod
     def _record_to_dict(record: asyncpg.Record) -> dict[str, Any]:
@@ -4800,6 +4868,7 @@ class PGGraphStorage(BaseGraphStorage):
                                 $$) AS (result agtype)"""
 
                 await self._query(drop_query, readonly=False)
+                await publish_namespace_changes(self._graph_version_namespace())
                 return {
                     "status": "success",
                     "message": f"workspace '{self.workspace}' graph data dropped",
@@ -4826,6 +4895,12 @@ NAMESPACE_TABLE_MAP = {
 }
 
 
+# Columns of LIGHTRAG_DOC_CHUNKS that PGKVStorage.get_fields_by_ids can select
+_TEXT_CHUNK_COLUMNS = frozenset(
+    {"id", "tokens", "content", "chunk_order_index", "full_doc_id", "file_path"}
+)
+
+
 def namespace_to_table_name(namespace: str) -> str:
     for k, v in NAMESPACE_TABLE_MAP.items():
         if is_namespace(namespace, k):
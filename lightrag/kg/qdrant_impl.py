@@ -9,11 +9,6 @@ from ..utils import logger
 from ..base import BaseVectorStorage
 from ..kg.shared_storage import get_data_init_lock, get_storage_lock
 import configparser
-import pipmaster as pm
-
-if not pm.is_installed("qdrant-client"):
-    pm.install("qdrant-client")
-
 from qdrant_client import QdrantClient, models  # type: ignore
 
 config = configparser.ConfigParser()
@@ -232,6 +227,30 @@ class QdrantVectorDBStorage(BaseVectorStorage):
 
         # logger.debug(f"[{self.workspace}] query result: {results}")
 
+        return self._format_results(results)
+
+    async def query_batch(
+        self, query_embeddings: list[list[float]], top_k: int
+    ) -> list[list[dict[str, Any]]]:
+        """Search all query embeddings in a single Qdrant batch request"""
+        if len(query_embeddings) == 0:
+            return []
+        batch_results = self._client.search_batch(
+            collection_name=self.final_namespace,
+            requests=[
+                models.SearchRequest(
+                    vector=list(embedding),
+                    limit=top_k,
+                    with_payload=True,
+                    score_threshold=self.cosine_better_than_threshold,
+                )
+                for embedding in query_embeddings
+            ],
+        )
+        return [self._format_results(results) for results in batch_results]
+
+    @staticmethod
+    def _format_results(results) -> list[dict[str, Any]]:
         return [
             {
                 **dp.payload,
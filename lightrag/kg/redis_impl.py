@@ -2,14 +2,10 @@ import os
 import logging
 from typing import Any, final, Union
 from dataclasses import dataclass
-import pipmaster as pm
 import configparser
 from contextlib import asynccontextmanager
 import threading
 
-if not pm.is_installed("redis"):
-    pm.install("redis")
-
 # aioredis is a depricated library, replaced with redis
 from redis.asyncio import Redis, ConnectionPool  # type: ignore
 from redis.exceptions import RedisError, ConnectionError, TimeoutError  # type: ignore
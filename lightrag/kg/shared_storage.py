@@ -9,6 +9,7 @@ import logging
 from typing import Any, Dict, List, Optional, Union, TypeVar, Generic
 
 from lightrag.exceptions import PipelineNotInitializedError
+from lightrag.constants import DEFAULT_CHANGE_LOG_MAX_RECORDS
 
 
 # Define a direct print function for critical logs that must be visible in all processes
@@ -77,6 +78,10 @@ _initialized = None
 _shared_dicts: Optional[Dict[str, Any]] = None
 _init_flags: Optional[Dict[str, bool]] = None  # namespace -> initialized
 _update_flags: Optional[Dict[str, bool]] = None  # namespace -> updated
+# namespace -> {"version": int, "base_version": int, "records": int}
+_change_logs: Optional[Dict[str, Dict[str, int]]] = None
+# "namespace@version" -> {"upserts": dict, "deletes": list}
+_change_log_entries: Optional[Dict[str, Dict[str, Any]]] = None
 
 # locks for mutex access
 _storage_lock: Optional[LockType] = None
@@ -1100,6 +1105,32 @@ def get_storage_keyed_lock(
     return _storage_keyed_lock(namespace, keys, enable_logging=enable_logging)
 
 
+def get_namespace_init_lock(
+    namespace: str, enable_logging: bool = False
+) -> _KeyedLockContext:
+    """Return the data initialization lock of one namespace
+
+    Unlike get_data_init_lock, storages loading different namespaces from their
+    files don't wait for each other.
+    """
+    return get_storage_keyed_lock(
+        namespace, namespace="data_init", enable_logging=enable_logging
+    )
+
+
+def get_namespace_flush_lock(
+    namespace: str, enable_logging: bool = False
+) -> _KeyedLockContext:
+    """Return the flush lock of one namespace
+
+    Serializes snapshot, file write and change publication of a namespace across
+    processes, while different namespaces still flush in parallel.
+    """
+    return get_storage_keyed_lock(
+        namespace, namespace="flush", enable_logging=enable_logging
+    )
+
+
 def get_data_init_lock(enable_logging: bool = False) -> UnifiedLock:
     """return unified data initialization lock for ensuring atomic data initialization"""
     async_lock = _async_locks.get("data_init_lock") if _is_multiprocess else None
@@ -1202,6 +1233,8 @@ def initialize_share_data(workers: int = 1):
         _init_flags, \
         _initialized, \
         _update_flags, \
+        _change_logs, \
+        _change_log_entries, \
         _async_locks, \
         _storage_keyed_lock, \
         _earliest_mp_cleanup_time, \
@@ -1231,6 +1264,8 @@ def initialize_share_data(workers: int = 1):
         _shared_dicts = _manager.dict()
         _init_flags = _manager.dict()
         _update_flags = _manager.dict()
+        _change_logs = _manager.dict()
+        _change_log_entries = _manager.dict()
 
         _storage_keyed_lock = KeyedUnifiedLock()
 
@@ -1256,6 +1291,8 @@ def initialize_share_data(workers: int = 1):
         _shared_dicts = {}
         _init_flags = {}
         _update_flags = {}
+        _change_logs = {}
+        _change_log_entries = {}
         _async_locks = None  # No need for async locks in single process mode
 
         _storage_keyed_lock = KeyedUnifiedLock()
@@ -1269,12 +1306,16 @@ def initialize_share_data(workers: int = 1):
     _initialized = True
 
 
-async def initialize_pipeline_status():
+async def initialize_pipeline_status(namespace: str = "pipeline_status"):
     """
     Initialize pipeline namespace with default values.
     This function is called during FASTAPI lifespan for each worker.
+
+    Args:
+        namespace: Pipeline status namespace, LightRAG instances that process
+                   documents independently in one process use distinct namespaces
     """
-    pipeline_namespace = await get_namespace_data("pipeline_status", first_init=True)
+    pipeline_namespace = await get_namespace_data(namespace, first_init=True)
 
     async with get_internal_lock():
         # Check if already initialized by checking for required fields
@@ -1297,7 +1338,9 @@ async def initialize_pipeline_status():
                 "history_messages": history_messages,  # 使用共享列表对象
             }
         )
-        direct_log(f"Process {os.getpid()} Pipeline namespace initialized")
+        direct_log(
+            f"Process {os.getpid()} Pipeline namespace initialized: [{namespace}]"
+        )
 
 
 async def get_update_flag(namespace: str):
@@ -1361,6 +1404,129 @@ async def clear_all_update_flags(namespace: str):
             _update_flags[namespace][i].value = False
 
 
+def _change_log_entry_key(namespace: str, version: int) -> str:
+    return f"{namespace}@{version}"
+
+
+async def get_namespace_version(namespace: str) -> int:
+    """Return the latest published data version of a namespace (0 if never published)"""
+    if _change_logs is None:
+        raise ValueError("Try to get version before Shared-Data is initialized")
+
+    async with get_internal_lock():
+        log_meta = _change_logs.get(namespace)
+        return log_meta["version"] if log_meta else 0
+
+
+async def publish_namespace_changes(
+    namespace: str,
+    upserts: Optional[Dict[str, Any]] = None,
+    deletes: Optional[List[Any]] = None,
+    max_records: int = DEFAULT_CHANGE_LOG_MAX_RECORDS,
+) -> int:
+    """Publish a change log entry for a file-backed namespace and bump its version.
+
+    Readers in other processes call get_namespace_changes() with the version they
+    have loaded and apply only the deltas published after it. Oldest entries are
+    compacted away once the retained record count exceeds max_records; readers
+    behind the compacted version must fall back to a full reload from file.
+
+    Passing neither upserts nor deletes publishes a compaction marker, forcing every
+    reader to reload the full file (used by drop or unknown bulk changes).
+    In single-process mode no other process reads the entries, only the version
+    is bumped.
+
+    Args:
+        namespace: The final namespace of the storage
+        upserts: Mapping of record key to the full record payload after the change
+        deletes: Keys of records removed by the change
+        max_records: Maximum number of records retained across all log entries
+
+    Returns:
+        int: The new version of the namespace
+    """
+    if _change_logs is None:
+        raise ValueError("Try to publish changes before Shared-Data is initialized")
+
+    upserts = upserts or {}
+    deletes = list(deletes or [])
+    entry_records = len(upserts) + len(deletes)
+    full_reload = (
+        not _is_multiprocess or entry_records == 0 or entry_records > max_records
+    )
+
+    async with get_internal_lock():
+        log_meta = dict(
+            _change_logs.get(namespace)
+            or {"version": 0, "base_version": 0, "records": 0}
+        )
+        version = log_meta["version"] + 1
+
+        if full_reload:
+            # Drop the whole log: readers behind this version must reload from file
+            for v in range(log_meta["base_version"] + 1, version):
+                _change_log_entries.pop(_change_log_entry_key(namespace, v), None)
+            log_meta.update({"version": version, "base_version": version, "records": 0})
+            _change_logs[namespace] = log_meta
+            return version
+
+        _change_log_entries[_change_log_entry_key(namespace, version)] = {
+            "upserts": upserts,
+            "deletes": deletes,
+            "records": entry_records,
+        }
+        log_meta["version"] = version
+        log_meta["records"] += entry_records
+
+        # Compact oldest entries until the retained records fit the budget
+        while log_meta["records"] > max_records and log_meta["base_version"] < version:
+            log_meta["base_version"] += 1
+            dropped = _change_log_entries.pop(
+                _change_log_entry_key(namespace, log_meta["base_version"]), None
+            )
+            if dropped:
+                log_meta["records"] -= dropped["records"]
+
+        _change_logs[namespace] = log_meta
+        return version
+
+
+async def get_namespace_changes(
+    namespace: str, since_version: int
+) -> Optional[tuple[int, List[Dict[str, Any]]]]:
+    """Get change log entries published after since_version
+
+    Args:
+        namespace: The final namespace of the storage
+        since_version: The version the caller has already applied
+
+    Returns:
+        (latest_version, entries) with entries ordered by version, each entry holding
+        "upserts" and "deletes"; or None if the required entries have been compacted
+        away and the caller must reload the full file.
+    """
+    if _change_logs is None:
+        raise ValueError("Try to get changes before Shared-Data is initialized")
+
+    async with get_internal_lock():
+        log_meta = _change_logs.get(namespace)
+        if not log_meta:
+            return (0, []) if since_version == 0 else None
+        if (
+            since_version < log_meta["base_version"]
+            or since_version > log_meta["version"]
+        ):
+            return None
+
+        entries = []
+        for v in range(since_version + 1, log_meta["version"] + 1):
+            entry = _change_log_entries.get(_change_log_entry_key(namespace, v))
+            if entry is None:
+                return None
+            entries.append(entry)
+        return log_meta["version"], entries
+
+
 async def get_all_update_flags_status() -> Dict[str, list]:
     """
     Get update flags status for all namespaces.
@@ -1409,6 +1575,18 @@ async def try_initialize_namespace(namespace: str) -> bool:
     return False
 
 
+async def reset_initialize_namespace(namespace: str) -> None:
+    """Give back the initialization permission of a namespace whose data failed to load
+
+    The next storage initializing the namespace gets the permission and loads
+    its data from file again, instead of finding the namespace empty.
+    """
+    if _init_flags is None:
+        return
+    async with get_internal_lock():
+        _init_flags.pop(namespace, None)
+
+
 async def get_namespace_data(
     namespace: str, first_init: bool = False
 ) -> Dict[str, Any]:
@@ -1429,7 +1607,7 @@ async def get_namespace_data(
     async with get_internal_lock():
         if namespace not in _shared_dicts:
             # Special handling for pipeline_status namespace
-            if namespace == "pipeline_status" and not first_init:
+            if namespace.endswith("pipeline_status") and not first_init:
                 # Check if pipeline_status should have been initialized but wasn't
                 # This helps users understand they need to call initialize_pipeline_status()
                 raise PipelineNotInitializedError(namespace)
@@ -1443,6 +1621,37 @@ async def get_namespace_data(
     return _shared_dicts[namespace]
 
 
+async def release_namespaces(namespaces: List[str]) -> int:
+    """Drop the shared data of namespaces whose storages have been finalized
+
+    Used when a LightRAG instance is unloaded while the process keeps running, so
+    the memory held by its file-backed storages is returned. The next storage
+    created for a released namespace loads it from file again. Shared data is
+    only released in single-process mode, where no other worker can still be
+    using it.
+
+    Returns:
+        int: Number of namespaces released
+    """
+    if _shared_dicts is None or _is_multiprocess:
+        return 0
+
+    released = 0
+    async with get_internal_lock():
+        for namespace in namespaces:
+            found = _shared_dicts.pop(namespace, None) is not None
+            found = _init_flags.pop(namespace, None) is not None or found
+            _update_flags.pop(namespace, None)
+            log_meta = _change_logs.pop(namespace, None)
+            if log_meta:
+                for v in range(log_meta["base_version"] + 1, log_meta["version"] + 1):
+                    _change_log_entries.pop(_change_log_entry_key(namespace, v), None)
+            if found:
+                released += 1
+    direct_log(f"Process {os.getpid()} released {released} shared namespaces")
+    return released
+
+
 def finalize_share_data():
     """
     Release shared resources and clean up.
@@ -1465,6 +1674,8 @@ def finalize_share_data():
         _init_flags, \
         _initialized, \
         _update_flags, \
+        _change_logs, \
+        _change_log_entries, \
         _async_locks
 
     # Check if already initialized
@@ -1509,6 +1720,10 @@ def finalize_share_data():
                 except Exception:
                     pass  # Ignore any errors during update flags cleanup
                 _update_flags.clear()
+            if _change_logs is not None:
+                _change_logs.clear()
+            if _change_log_entries is not None:
+                _change_log_entries.clear()
 
             # Shut down the Manager - this will automatically clean up all shared resources
             _manager.shutdown()
@@ -1530,6 +1745,8 @@ def finalize_share_data():
     _graph_db_lock = None
     _data_init_lock = None
     _update_flags = None
+    _change_logs = None
+    _change_log_entries = None
     _async_locks = None
 
     direct_log(f"Process {os.getpid()} storage data finalization complete")
@@ -0,0 +1,518 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, final
+
+from lightrag.base import (
+    BaseKVStorage,
+)
+from lightrag.constants import (
+    DEFAULT_LLM_CACHE_EVICTION_POLICY,
+    DEFAULT_LLM_CACHE_MAX_BYTES,
+    DEFAULT_LLM_CACHE_MAX_ENTRIES,
+    DEFAULT_LLM_CACHE_PROMPT_MODE,
+)
+from lightrag.exceptions import StorageNotInitializedError
+from lightrag.namespace import NameSpace, is_namespace
+from lightrag.utils import (
+    compute_args_hash,
+    get_env_value,
+    load_json,
+    logger,
+    parse_cache_key,
+)
+
+try:
+    import zstandard
+except ImportError:  # zlib is used when zstandard is not available
+    zstandard = None
+
+# Codec tag stored as the first byte of every compressed column
+_CODEC_RAW = 0
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+
+# Values shorter than this are stored uncompressed
+_COMPRESS_MIN_BYTES = 256
+
+# Max host parameters per statement for IN (...) lookups
+_SQL_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    mode TEXT,
+    cache_type TEXT,
+    chunk_id TEXT,
+    prompt_hash TEXT,
+    prompt BLOB,
+    response BLOB,
+    queryparam TEXT,
+    size INTEGER NOT NULL DEFAULT 0,
+    create_time INTEGER NOT NULL DEFAULT 0,
+    update_time INTEGER NOT NULL DEFAULT 0,
+    last_hit_time INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_llm_cache_create_time ON llm_cache(create_time);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_hit_time ON llm_cache(last_hit_time);
+"""
+
+_SELECT_COLUMNS = (
+    "key, cache_type, chunk_id, prompt_hash, prompt, response, queryparam, "
+    "create_time, update_time"
+)
+
+# Extraction results referenced by text_chunks.llm_cache_list, needed by rebuild
+_PROTECTED_CONDITION = (
+    "mode = 'default' AND cache_type = 'extract' AND chunk_id IS NOT NULL"
+)
+
+
+def _compress(text: str | None) -> bytes | None:
+    if text is None:
+        return None
+    raw = text.encode("utf-8")
+    if len(raw) < _COMPRESS_MIN_BYTES:
+        return bytes([_CODEC_RAW]) + raw
+    if zstandard is not None:
+        return bytes([_CODEC_ZSTD]) + zstandard.ZstdCompressor(level=3).compress(raw)
+    return bytes([_CODEC_ZLIB]) + zlib.compress(raw, 6)
+
+
+def _decompress(blob: bytes | None) -> str | None:
+    if blob is None:
+        return None
+    codec, payload = blob[0], blob[1:]
+    if codec == _CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError(
+                "LLM cache entry is zstd compressed but zstandard is not installed"
+            )
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == _CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    return payload.decode("utf-8")
+
+
+@final
+@dataclass
+class SQLiteCacheKVStorage(BaseKVStorage):
+    """Compact KV storage for the LLM response cache.
+
+    Entries are kept in a single SQLite table (WAL mode, shared safely by all
+    worker processes) keyed by the flattened ``{mode}:{cache_type}:{hash}``
+    cache key. Responses are stored compressed and prompts are kept as a hash
+    only unless LLM_CACHE_PROMPT_MODE=compressed. The cache can be bounded with
+    LLM_CACHE_MAX_ENTRIES / LLM_CACHE_MAX_BYTES; eviction never removes
+    extraction results referenced by text chunks, so rebuild keeps working.
+
+    Only the llm_response_cache namespace can be stored, the table has no room
+    for the fields of other KV namespaces. In hash mode original_prompt of the
+    entries read back is empty, cache lookups only use the key.
+    """
+
+    def __post_init__(self):
+        if not is_namespace(self.namespace, NameSpace.KV_STORE_LLM_RESPONSE_CACHE):
+            raise ValueError(
+                f"SQLiteCacheKVStorage only stores the LLM response cache, not namespace "
+                f"'{self.namespace}'; select it with llm_cache_storage (LIGHTRAG_LLM_CACHE_STORAGE)"
+            )
+        working_dir = self.global_config["working_dir"]
+        if self.workspace:
+            # Include workspace in the file path for data isolation
+            workspace_dir = os.path.join(working_dir, self.workspace)
+        else:
+            # Default behavior when workspace is empty
+            workspace_dir = working_dir
+            self.workspace = "_"
+
+        os.makedirs(workspace_dir, exist_ok=True)
+        self._file_name = os.path.join(
+            workspace_dir, f"kv_store_{self.namespace}.sqlite"
+        )
+        self._legacy_file_name = os.path.join(
+            workspace_dir, f"kv_store_{self.namespace}.json"
+        )
+
+        self._prompt_mode = get_env_value(
+            "LLM_CACHE_PROMPT_MODE", DEFAULT_LLM_CACHE_PROMPT_MODE
+        ).lower()
+        if self._prompt_mode not in ("hash", "compressed"):
+            logger.warning(
+                f"[{self.workspace}] Invalid LLM_CACHE_PROMPT_MODE '{self._prompt_mode}', using 'hash'"
+            )
+            self._prompt_mode = "hash"
+        self._max_entries = get_env_value(
+            "LLM_CACHE_MAX_ENTRIES", DEFAULT_LLM_CACHE_MAX_ENTRIES, int
+        )
+        self._max_bytes = get_env_value(
+            "LLM_CACHE_MAX_BYTES", DEFAULT_LLM_CACHE_MAX_BYTES, int
+        )
+        self._eviction_policy = get_env_value(
+            "LLM_CACHE_EVICTION_POLICY", DEFAULT_LLM_CACHE_EVICTION_POLICY
+        ).lower()
+        if self._eviction_policy not in ("last_hit", "age"):
+            logger.warning(
+                f"[{self.workspace}] Invalid LLM_CACHE_EVICTION_POLICY '{self._eviction_policy}', using 'last_hit'"
+            )
+            self._eviction_policy = "last_hit"
+
+        self._conn: sqlite3.Connection | None = None
+        # sqlite3 connections are not safe for concurrent use across threads
+        self._conn_lock = threading.Lock()
+        # Cache hits are recorded in memory and written out in batches
+        self._pending_hits: dict[str, int] = {}
+        self._overflow_warned = False
+
+    async def initialize(self):
+        """Open the database and import the legacy JSON cache on first use"""
+        if self._conn is not None:
+            return
+        self._conn = await asyncio.to_thread(self._open)
+        await asyncio.to_thread(self._run, self._migrate_legacy_json)
+        count = await asyncio.to_thread(
+            self._run,
+            lambda conn: conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0],
+        )
+        logger.info(
+            f"[{self.workspace}] Process {os.getpid()} SQLite cache load {self.namespace} with {count} records"
+        )
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._file_name,
+            timeout=30,
+            isolation_level=None,  # explicit transactions only
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _run(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._conn is None:
+            raise StorageNotInitializedError("SQLiteCacheKVStorage")
+        with self._conn_lock:
+            return func(self._conn)
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection) -> None:
+        if not os.path.exists(self._legacy_file_name):
+            return
+        if conn.execute("SELECT 1 FROM llm_cache LIMIT 1").fetchone():
+            return
+        legacy_data = load_json(self._legacy_file_name) or {}
+        rows = [
+            self._to_row(k, v, int(time.time()))
+            for k, v in legacy_data.items()
+            if isinstance(v, dict) and "return" in v
+        ]
+        if not rows:
+            return
+        self._write_rows(conn, rows)
+        logger.info(
+            f"[{self.workspace}] Imported {len(rows)} entries from {self._legacy_file_name} into SQLite cache"
+        )
+
+    def _to_row(self, key: str, value: dict[str, Any], now: int) -> tuple:
+        parsed = parse_cache_key(key)
+        mode = parsed[0] if parsed else None
+        prompt = value.get("original_prompt")
+        prompt_hash = compute_args_hash(prompt) if prompt else None
+        prompt_blob = _compress(prompt) if self._prompt_mode == "compressed" else None
+        response_blob = _compress(value.get("return"))
+        queryparam = value.get("queryparam")
+        queryparam_json = (
+            json.dumps(queryparam, ensure_ascii=False) if queryparam else None
+        )
+        size = (
+            len(key)
+            + len(response_blob or b"")
+            + len(prompt_blob or b"")
+            + len(queryparam_json or "")
+        )
+        return (
+            key,
+            mode,
+            value.get("cache_type"),
+            value.get("chunk_id"),
+            prompt_hash,
+            prompt_blob,
+            response_blob,
+            queryparam_json,
+            size,
+            value.get("create_time") or now,
+            now,
+            now,
+        )
+
+    @staticmethod
+    def _write_rows(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Keep create_time of existing keys, refresh everything else
+            conn.executemany(
+                """INSERT INTO llm_cache (key, mode, cache_type, chunk_id, prompt_hash,
+                       prompt, response, queryparam, size, create_time, update_time, last_hit_time)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET
+                       mode = excluded.mode,
+                       cache_type = excluded.cache_type,
+                       chunk_id = excluded.chunk_id,
+                       prompt_hash = excluded.prompt_hash,
+                       prompt = excluded.prompt,
+                       response = excluded.response,
+                       queryparam = excluded.queryparam,
+                       size = excluded.size,
+                       update_time = excluded.update_time,
+                       last_hit_time = excluded.last_hit_time""",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _to_record(row: tuple) -> dict[str, Any]:
+        (
+            key,
+            cache_type,
+            chunk_id,
+            prompt_hash,
+            prompt,
+            response,
+            queryparam,
+            create_time,
+            update_time,
+        ) = row
+        prompt_text = _decompress(prompt)
+        return {
+            "return": _decompress(response),
+            "cache_type": cache_type,
+            "chunk_id": chunk_id,
+            # Prompts are retained as a hash only unless compressed mode is enabled,
+            # hash mode entries come back with an empty original_prompt
+            "original_prompt": prompt_text if prompt_text is not None else "",
+            "prompt_hash": prompt_hash,
+            "queryparam": json.loads(queryparam) if queryparam else None,
+            "create_time": create_time,
+            "update_time": update_time,
+            "_id": key,
+        }
+
+    def _fetch(self, conn: sqlite3.Connection, ids: list[str]) -> dict[str, tuple]:
+        rows: dict[str, tuple] = {}
+        for i in range(0, len(ids), _SQL_BATCH_SIZE):
+            batch = ids[i : i + _SQL_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            for row in conn.execute(
+                f"SELECT {_SELECT_COLUMNS} FROM llm_cache WHERE key IN ({placeholders})",
+                batch,
+            ):
+                rows[row[0]] = row
+        return rows
+
+    def _record_hits(self, keys) -> None:
+        now = int(time.time())
+        for key in keys:
+            self._pending_hits[key] = now
+
+    def _flush_hits(self, conn: sqlite3.Connection) -> None:
+        if not self._pending_hits:
+            return
+        hits, self._pending_hits = self._pending_hits, {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE llm_cache SET last_hit_time = ? WHERE key = ? AND last_hit_time < ?",
+                [(ts, key, ts) for key, ts in hits.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        rows = await asyncio.to_thread(self._run, lambda conn: self._fetch(conn, [id]))
+        row = rows.get(id)
+        if row is None:
+            return None
+        self._record_hits([id])
+        return self._to_record(row)
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        if not ids:
+            return []
+        rows = await asyncio.to_thread(
+            self._run, lambda conn: self._fetch(conn, list(ids))
+        )
+        self._record_hits(rows.keys())
+        return [self._to_record(rows[id]) if id in rows else None for id in ids]
+
+    async def filter_keys(self, keys: set[str]) -> set[str]:
+        if not keys:
+            return set()
+
+        def _existing(conn: sqlite3.Connection) -> set[str]:
+            key_list = list(keys)
+            found = set()
+            for i in range(0, len(key_list), _SQL_BATCH_SIZE):
+                batch = key_list[i : i + _SQL_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT key FROM llm_cache WHERE key IN ({placeholders})",
+                        batch,
+                    )
+                )
+            return found
+
+        existing = await asyncio.to_thread(self._run, _existing)
+        return set(keys) - existing
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        """Write entries immediately; SQLite makes them visible to all processes"""
+        if not data:
+            return
+
+        logger.debug(
+            f"[{self.workspace}] Inserting {len(data)} records to {self.namespace}"
+        )
+        now = int(time.time())
+        rows = [self._to_row(k, v, now) for k, v in data.items()]
+        await asyncio.to_thread(self._run, lambda conn: self._write_rows(conn, rows))
+
+    async def delete(self, ids: list[str]) -> None:
+        """Delete specific records from storage by their IDs
+
+        Args:
+            ids (list[str]): List of cache keys to be deleted from storage
+
+        Returns:
+            None
+        """
+        if not ids:
+            return
+
+        def _delete(conn: sqlite3.Connection) -> None:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "DELETE FROM llm_cache WHERE key = ?", [(id,) for id in ids]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        await asyncio.to_thread(self._run, _delete)
+
+    async def is_empty(self) -> bool:
+        """Check if the storage is empty
+
+        Returns:
+            bool: True if storage contains no data, False otherwise
+        """
+        row = await asyncio.to_thread(
+            self._run,
+            lambda conn: conn.execute("SELECT 1 FROM llm_cache LIMIT 1").fetchone(),
+        )
+        return row is None
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Evict unprotected entries until the cache fits its size bounds"""
+        if self._max_entries <= 0 and self._max_bytes <= 0:
+            return 0
+        total_entries, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        excess_entries = (
+            total_entries - self._max_entries if self._max_entries > 0 else 0
+        )
+        excess_bytes = total_bytes - self._max_bytes if self._max_bytes > 0 else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return 0
+
+        order_column = (
+            "last_hit_time" if self._eviction_policy == "last_hit" else "create_time"
+        )
+        victims = []
+        for key, size in conn.execute(
+            f"SELECT key, size FROM llm_cache WHERE NOT ({_PROTECTED_CONDITION}) "
+            f"ORDER BY {order_column} ASC"
+        ):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+
+        if victims:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if (excess_entries > 0 or excess_bytes > 0) and not self._overflow_warned:
+            self._overflow_warned = True
+            logger.warning(
+                f"[{self.workspace}] LLM cache still exceeds its size bounds after eviction: "
+                "the remaining entries are extraction results needed for rebuild"
+            )
+        return len(victims)
+
+    async def index_done_callback(self) -> None:
+        def _maintain(conn: sqlite3.Connection) -> int:
+            self._flush_hits(conn)
+            return self._evict(conn)
+
+        evicted = await asyncio.to_thread(self._run, _maintain)
+        if evicted:
+            logger.info(
+                f"[{self.workspace}] Evicted {evicted} entries from {self.namespace} ({self._eviction_policy} policy)"
+            )
+
+    async def drop(self) -> dict[str, str]:
+        """Drop all data from storage and clean up resources
+
+        Returns:
+            dict[str, str]: Operation status and message
+            - On success: {"status": "success", "message": "data dropped"}
+            - On failure: {"status": "error", "message": "<error details>"}
+        """
+        try:
+
+            def _drop(conn: sqlite3.Connection) -> None:
+                self._pending_hits.clear()
+                conn.execute("DELETE FROM llm_cache")
+                conn.execute("VACUUM")
+
+            await asyncio.to_thread(self._run, _drop)
+            logger.info(
+                f"[{self.workspace}] Process {os.getpid()} drop {self.namespace}"
+            )
+            return {"status": "success", "message": "data dropped"}
+        except Exception as e:
+            logger.error(f"[{self.workspace}] Error dropping {self.namespace}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def finalize(self):
+        """Record pending cache hits and close the database"""
+        if self._conn is None:
+            return
+        await self.index_done_callback()
+
+        def _close(conn: sqlite3.Connection) -> None:
+            conn.close()
+
+        await asyncio.to_thread(self._run, _close)
+        self._conn = None
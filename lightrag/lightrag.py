@@ -12,6 +12,7 @@ from functools import partial
 from typing import (
     Any,
     AsyncIterator,
+    Awaitable,
     Callable,
     Iterator,
     cast,
@@ -35,12 +36,19 @@ from lightrag.constants import (
     DEFAULT_COSINE_THRESHOLD,
     DEFAULT_RELATED_CHUNK_NUMBER,
     DEFAULT_KG_CHUNK_PICK_METHOD,
+    DEFAULT_ENABLE_CHUNK_BM25,
+    DEFAULT_RRF_K,
     DEFAULT_MIN_RERANK_SCORE,
     DEFAULT_SUMMARY_MAX_TOKENS,
     DEFAULT_SUMMARY_CONTEXT_SIZE,
+    DEFAULT_SUMMARY_INCREMENTAL,
+    DEFAULT_SUMMARY_CONTENT_DEFINED_GROUPS,
     DEFAULT_SUMMARY_LENGTH_RECOMMENDED,
     DEFAULT_MAX_ASYNC,
+    DEFAULT_QUERY_RESERVED_SLOTS,
     DEFAULT_MAX_PARALLEL_INSERT,
+    DEFAULT_MAX_PARALLEL_REBUILD,
+    DEFAULT_VDB_UPSERT_MAX_DELAY,
     DEFAULT_MAX_GRAPH_NODES,
     DEFAULT_MAX_SOURCE_IDS_PER_ENTITY,
     DEFAULT_MAX_SOURCE_IDS_PER_RELATION,
@@ -51,11 +59,16 @@ from lightrag.constants import (
     DEFAULT_SOURCE_IDS_LIMIT_METHOD,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
+    DEFAULT_ENABLE_CHUNK_DEDUP,
+    DEFAULT_CHUNK_DEDUP_THRESHOLD,
+    DEFAULT_CHECKPOINT_INTERVAL,
+    DEFAULT_LAZY_LOAD_NAMESPACES,
 )
 from lightrag.utils import get_env_value
 
 from lightrag.kg import (
     STORAGES,
+    STORAGE_PACKAGES,
     verify_storage_implementation,
 )
 
@@ -89,7 +102,13 @@ from lightrag.operate import (
     kg_query,
     naive_query,
     rebuild_knowledge_from_chunks,
+    link_duplicate_extractions,
 )
+from lightrag.bm25 import ChunkBM25Index
+from lightrag.chunk_id_set import ChunkIdSet, release_chunk_ids
+from lightrag.checkpoint import CheckpointStage, DocumentCheckpoint
+from lightrag.dedup import ChunkDedupIndex, find_stale_sources
+from lightrag.tracing import collect_spans, span, timing_breakdown
 from lightrag.constants import GRAPH_FIELD_SEP
 from lightrag.utils import (
     Tokenizer,
@@ -98,16 +117,18 @@ from lightrag.utils import (
     always_get_an_event_loop,
     compute_mdhash_id,
     lazy_external_import,
+    ensure_packages,
     priority_limit_async_func_call,
+    scheduling_flow,
     get_content_summary,
     sanitize_text_for_encoding,
     check_storage_env_vars,
     generate_track_id,
     convert_to_user_format,
     logger,
-    subtract_source_ids,
     make_relation_chunk_key,
     normalize_source_ids_limit_method,
+    VectorUpsertCoalescer,
 )
 from lightrag.types import KnowledgeGraph
 from dotenv import load_dotenv
@@ -139,6 +160,9 @@ class LightRAG:
     kv_storage: str = field(default="JsonKVStorage")
     """Storage backend for key-value data."""
 
+    llm_cache_storage: str | None = field(default=None)
+    """Storage backend for the LLM response cache. Uses kv_storage when not set."""
+
     vector_storage: str = field(default="NanoVectorDBStorage")
     """Storage backend for vector embeddings."""
 
@@ -148,12 +172,22 @@ class LightRAG:
     doc_status_storage: str = field(default="JsonDocStatusStorage")
     """Storage type for tracking document processing statuses."""
 
+    lazy_load_namespaces: list[str] = field(
+        default_factory=lambda: get_env_value(
+            "LAZY_LOAD_NAMESPACES", DEFAULT_LAZY_LOAD_NAMESPACES, list
+        )
+    )
+    """Namespaces whose file-backed storages (JsonKVStorage) skip loading their files in initialize_storages. They are loaded in a background task started by initialize_storages, or on first access if that comes first."""
+
     # Workspace
     # ---
 
     workspace: str = field(default_factory=lambda: os.getenv("WORKSPACE", ""))
     """Workspace for data isolation. Defaults to empty string if WORKSPACE environment variable is not set."""
 
+    pipeline_status_namespace: str = field(default="pipeline_status")
+    """Shared-data namespace of the document pipeline status. Instances that run their pipelines independently in one process (e.g. the API server's workspace pool) need distinct namespaces, each initialized with initialize_pipeline_status()."""
+
     # Logging (Deprecated, use setup_logger in utils.py instead)
     # ---
     log_level: int | None = field(default=None)
@@ -200,6 +234,14 @@ class LightRAG:
     )
     """Method for selecting text chunks: 'WEIGHT' for weight-based selection, 'VECTOR' for embedding similarity-based selection."""
 
+    enable_chunk_bm25: bool = field(
+        default=get_env_value("ENABLE_CHUNK_BM25", DEFAULT_ENABLE_CHUNK_BM25, bool)
+    )
+    """Maintain a local BM25 index of the chunks and fuse its results with chunk vector search (naive and mix modes)."""
+
+    rrf_k: int = field(default=get_env_value("RRF_K", DEFAULT_RRF_K, int))
+    """Rank offset of reciprocal rank fusion, larger values flatten the weight of top ranks."""
+
     # Entity extraction
     # ---
 
@@ -214,6 +256,40 @@ class LightRAG:
         )
     )
 
+    summary_incremental: bool = field(
+        default=get_env_value("SUMMARY_INCREMENTAL", DEFAULT_SUMMARY_INCREMENTAL, bool)
+    )
+    """Fold only description fragments not yet covered by the stored summary into it."""
+
+    summary_content_defined_groups: bool = field(
+        default=get_env_value(
+            "SUMMARY_CONTENT_DEFINED_GROUPS",
+            DEFAULT_SUMMARY_CONTENT_DEFINED_GROUPS,
+            bool,
+        )
+    )
+    """Group map-reduce summaries at content-defined boundaries so unchanged groups reuse
+    the LLM cache after deletions, at the cost of more LLM calls for first-time summaries."""
+
+    enable_chunk_dedup: bool = field(
+        default=get_env_value("ENABLE_CHUNK_DEDUP", DEFAULT_ENABLE_CHUNK_DEDUP, bool)
+    )
+    """Skip the extraction LLM call for chunks duplicating an already extracted chunk, reusing its cached extraction.
+    Requires enable_llm_cache_for_entity_extract."""
+
+    chunk_dedup_threshold: float = field(
+        default=get_env_value(
+            "CHUNK_DEDUP_THRESHOLD", DEFAULT_CHUNK_DEDUP_THRESHOLD, float
+        )
+    )
+    """Minimum estimated Jaccard similarity of character shingles for a chunk to count as a near duplicate."""
+
+    checkpoint_interval: float = field(
+        default=get_env_value("CHECKPOINT_INTERVAL", DEFAULT_CHECKPOINT_INTERVAL, float)
+    )
+    """Seconds between checkpoints of the chunks extracted from a document, recorded in doc_status so
+    an interrupted document resumes without extracting them again. Requires enable_llm_cache_for_entity_extract."""
+
     # Text chunking
     # ---
 
@@ -279,6 +355,13 @@ class LightRAG:
     )
     """Maximum number of concurrent embedding function calls."""
 
+    vdb_upsert_max_delay: float = field(
+        default=get_env_value(
+            "VDB_UPSERT_MAX_DELAY", DEFAULT_VDB_UPSERT_MAX_DELAY, float
+        )
+    )
+    """Seconds entity and relation vector upserts produced during merge are buffered to be embedded in full `embedding_batch_num` batches. 0 writes each upsert immediately."""
+
     embedding_cache_config: dict[str, Any] = field(
         default_factory=lambda: {
             "enabled": False,
@@ -327,6 +410,11 @@ class LightRAG:
     )
     """Maximum number of concurrent LLM calls."""
 
+    query_reserved_slots: int = field(
+        default=get_env_value("QUERY_RESERVED_SLOTS", DEFAULT_QUERY_RESERVED_SLOTS, int)
+    )
+    """LLM and embedding workers that only run query calls, so queries never wait for in-flight ingestion calls. At least one worker is always left to ingestion."""
+
     llm_model_kwargs: dict[str, Any] = field(default_factory=dict)
     """Additional keyword arguments passed to the LLM model function."""
 
@@ -365,6 +453,11 @@ class LightRAG:
     )
     """Maximum number of parallel insert operations."""
 
+    max_parallel_rebuild: int = field(
+        default=get_env_value("MAX_PARALLEL_REBUILD", DEFAULT_MAX_PARALLEL_REBUILD, int)
+    )
+    """Maximum number of entities/relations rebuilt concurrently after a document deletion. 0 uses llm_model_max_async * 2."""
+
     max_graph_nodes: int = field(
         default=get_env_value("MAX_GRAPH_NODES", DEFAULT_MAX_GRAPH_NODES, int)
     )
@@ -468,6 +561,8 @@ class LightRAG:
             ("GRAPH_STORAGE", self.graph_storage),
             ("DOC_STATUS_STORAGE", self.doc_status_storage),
         ]
+        if self.llm_cache_storage:
+            storage_configs.append(("LLM_CACHE_STORAGE", self.llm_cache_storage))
 
         for storage_type, storage_name in storage_configs:
             # Verify storage implementation compatibility
@@ -514,11 +609,14 @@ class LightRAG:
         logger.debug(f"LightRAG init with param:\n  {_print_config}\n")
 
         # Init Embedding
-        self.embedding_func = priority_limit_async_func_call(
-            self.embedding_func_max_async,
-            llm_timeout=self.default_embedding_timeout,
-            queue_name="Embedding func",
-        )(self.embedding_func)
+        # A function already limited by a queue shared between instances keeps that queue
+        if not getattr(self.embedding_func, "shared_queue", False):
+            self.embedding_func = priority_limit_async_func_call(
+                self.embedding_func_max_async,
+                llm_timeout=self.default_embedding_timeout,
+                queue_name="Embedding func",
+                reserved_slots=self.query_reserved_slots,
+            )(self.embedding_func)
 
         # Initialize all storages
         self.key_string_value_json_storage_cls: type[BaseKVStorage] = (
@@ -543,7 +641,16 @@ class LightRAG:
         # Initialize document status storage
         self.doc_status_storage_cls = self._get_storage_class(self.doc_status_storage)
 
-        self.llm_response_cache: BaseKVStorage = self.key_string_value_json_storage_cls(  # type: ignore
+        # The LLM response cache may use a dedicated storage backend
+        llm_cache_storage_cls = (
+            partial(
+                self._get_storage_class(self.llm_cache_storage),
+                global_config=global_config,
+            )
+            if self.llm_cache_storage
+            else self.key_string_value_json_storage_cls
+        )
+        self.llm_response_cache: BaseKVStorage = llm_cache_storage_cls(  # type: ignore
             namespace=NameSpace.KV_STORE_LLM_RESPONSE_CACHE,
             workspace=self.workspace,
             global_config=global_config,
@@ -611,6 +718,52 @@ class LightRAG:
             meta_fields={"full_doc_id", "content", "file_path"},
         )
 
+        # Write-behind buffers coalescing per-entity/relation upserts of concurrent merge tasks
+        self._entities_vdb_coalescer: VectorUpsertCoalescer | None = None
+        self._relationships_vdb_coalescer: VectorUpsertCoalescer | None = None
+        if self.vdb_upsert_max_delay > 0:
+            self._entities_vdb_coalescer = VectorUpsertCoalescer(
+                self.entities_vdb,
+                batch_size=self.embedding_batch_num,
+                max_delay=self.vdb_upsert_max_delay,
+                operation_name="entity_batched_upsert",
+            )
+            self._relationships_vdb_coalescer = VectorUpsertCoalescer(
+                self.relationships_vdb,
+                batch_size=self.embedding_batch_num,
+                max_delay=self.vdb_upsert_max_delay,
+                operation_name="relationship_batched_upsert",
+            )
+
+        # Chunk indexes kept next to the workspace's local storage files
+        index_dir = (
+            os.path.join(self.working_dir, self.workspace)
+            if self.workspace
+            else self.working_dir
+        )
+
+        # Background loading of lazy_load_namespaces, see initialize_storages
+        self._storage_warmup_task: asyncio.Task | None = None
+
+        # Index of the chunks sent to extraction, used to find duplicate chunks
+        self._chunk_dedup_index: ChunkDedupIndex | None = None
+        if self.enable_chunk_dedup:
+            if not self.enable_llm_cache_for_entity_extract:
+                logger.warning(
+                    "Chunk dedup needs enable_llm_cache_for_entity_extract, duplicate chunks will be extracted again"
+                )
+            self._chunk_dedup_index = ChunkDedupIndex(
+                os.path.join(index_dir, "chunk_dedup_index.npz"),
+                threshold=self.chunk_dedup_threshold,
+            )
+
+        # Lexical index of the chunks, fused with chunk vector search
+        self.chunks_bm25: ChunkBM25Index | None = None
+        if self.enable_chunk_bm25:
+            self.chunks_bm25 = ChunkBM25Index(
+                os.path.join(index_dir, "chunks_bm25_index.npz")
+            )
+
         # Initialize document status storage
         self.doc_status: DocStatusStorage = self.doc_status_storage_cls(
             namespace=NameSpace.DOC_STATUS,
@@ -623,61 +776,142 @@ class LightRAG:
         hashing_kv = self.llm_response_cache
 
         # Get timeout from LLM model kwargs for dynamic timeout calculation
-        self.llm_model_func = priority_limit_async_func_call(
-            self.llm_model_max_async,
-            llm_timeout=self.default_llm_timeout,
-            queue_name="LLM func",
-        )(
-            partial(
-                self.llm_model_func,  # type: ignore
-                hashing_kv=hashing_kv,
-                **self.llm_model_kwargs,
-            )
+        llm_model_func = partial(
+            self.llm_model_func,  # type: ignore
+            hashing_kv=hashing_kv,
+            **self.llm_model_kwargs,
         )
+        if getattr(self.llm_model_func, "shared_queue", False):
+            self.llm_model_func = llm_model_func
+        else:
+            self.llm_model_func = priority_limit_async_func_call(
+                self.llm_model_max_async,
+                llm_timeout=self.default_llm_timeout,
+                queue_name="LLM func",
+                reserved_slots=self.query_reserved_slots,
+            )(llm_model_func)
 
         self._storages_status = StoragesStatus.CREATED
 
+    def _named_storages(self) -> list[tuple[str, StorageNameSpace]]:
+        return [
+            ("full_docs", self.full_docs),
+            ("text_chunks", self.text_chunks),
+            ("full_entities", self.full_entities),
+            ("full_relations", self.full_relations),
+            ("entity_chunks", self.entity_chunks),
+            ("relation_chunks", self.relation_chunks),
+            ("entities_vdb", self.entities_vdb),
+            ("relationships_vdb", self.relationships_vdb),
+            ("chunks_vdb", self.chunks_vdb),
+            ("chunk_entity_relation_graph", self.chunk_entity_relation_graph),
+            ("llm_response_cache", self.llm_response_cache),
+            ("doc_status", self.doc_status),
+        ]
+
     async def initialize_storages(self):
-        """Storage initialization must be called one by one to prevent deadlock"""
+        """Initialize the storages concurrently
+
+        Startup takes as long as the slowest storage. Storages of
+        lazy_load_namespaces finish loading in a background task, see
+        storages_warming.
+        """
         if self._storages_status == StoragesStatus.CREATED:
-            for storage in (
-                self.full_docs,
-                self.text_chunks,
-                self.full_entities,
-                self.full_relations,
-                self.entity_chunks,
-                self.relation_chunks,
-                self.entities_vdb,
-                self.relationships_vdb,
-                self.chunks_vdb,
-                self.chunk_entity_relation_graph,
-                self.llm_response_cache,
-                self.doc_status,
-            ):
-                if storage:
-                    # logger.debug(f"Initializing storage: {storage}")
-                    await storage.initialize()
+            start = time.perf_counter()
+            storages = [
+                (storage_name, storage)
+                for storage_name, storage in self._named_storages()
+                if storage
+            ]
+            results = await asyncio.gather(
+                *(
+                    self._timed_storage_call(
+                        storage_name, storage.initialize, "Initialized"
+                    )
+                    for storage_name, storage in storages
+                ),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            logger.info(
+                f"Initialized {len(storages)} storages in {time.perf_counter() - start:.2f}s"
+            )
+
+            if self.chunks_bm25 is not None and not self.chunks_bm25.index_exists():
+                await self._build_chunks_bm25_index()
 
             self._storages_status = StoragesStatus.INITIALIZED
-            logger.debug("All storage types initialized")
+            deferred = [
+                (storage_name, storage)
+                for storage_name, storage in storages
+                if storage.namespace in self.lazy_load_namespaces
+            ]
+            if deferred:
+                self._storage_warmup_task = asyncio.create_task(
+                    self._warm_up_storages(deferred)
+                )
+
+    async def _timed_storage_call(
+        self, storage_name: str, call: Callable[[], Awaitable[None]], action: str
+    ) -> None:
+        start = time.perf_counter()
+        await call()
+        logger.info(f"{action} {storage_name} in {time.perf_counter() - start:.2f}s")
+
+    async def _warm_up_storages(
+        self, storages: list[tuple[str, StorageNameSpace]]
+    ) -> None:
+        """Load the storages deferred by initialize, one at a time to leave room for queries"""
+        for storage_name, storage in storages:
+            try:
+                await self._timed_storage_call(
+                    storage_name, storage.ensure_loaded, "Loaded"
+                )
+            except Exception as e:
+                # Retried on first access
+                logger.error(f"Failed to load {storage_name}: {e}")
+
+    @property
+    def storages_warming(self) -> bool:
+        """Whether storages of lazy_load_namespaces are still loading in the background"""
+        return (
+            self._storage_warmup_task is not None
+            and not self._storage_warmup_task.done()
+        )
+
+    async def _build_chunks_bm25_index(self, batch_size: int = 1000) -> None:
+        """Index the chunks of already processed documents, e.g. when enable_chunk_bm25 is turned on for an existing workspace"""
+        processed = await self.doc_status.get_docs_by_status(DocStatus.PROCESSED)
+        chunk_ids = [
+            chunk_id
+            for status in processed.values()
+            for chunk_id in (status.chunks_list or [])
+        ]
+        if not chunk_ids:
+            return
+
+        logger.info(f"Building BM25 index of {len(chunk_ids)} chunks")
+        start = time.perf_counter()
+        for i in range(0, len(chunk_ids), batch_size):
+            batch = chunk_ids[i : i + batch_size]
+            chunks = await self.text_chunks.get_by_ids(batch)
+            await self.chunks_bm25.upsert(
+                {chunk_id: chunk for chunk_id, chunk in zip(batch, chunks) if chunk}
+            )
+        await self.chunks_bm25.persist()
+        logger.info(
+            f"Built BM25 index of {len(self.chunks_bm25)} chunks in {time.perf_counter() - start:.2f}s"
+        )
 
     async def finalize_storages(self):
         """Asynchronously finalize the storages with improved error handling"""
         if self._storages_status == StoragesStatus.INITIALIZED:
-            storages = [
-                ("full_docs", self.full_docs),
-                ("text_chunks", self.text_chunks),
-                ("full_entities", self.full_entities),
-                ("full_relations", self.full_relations),
-                ("entity_chunks", self.entity_chunks),
-                ("relation_chunks", self.relation_chunks),
-                ("entities_vdb", self.entities_vdb),
-                ("relationships_vdb", self.relationships_vdb),
-                ("chunks_vdb", self.chunks_vdb),
-                ("chunk_entity_relation_graph", self.chunk_entity_relation_graph),
-                ("llm_response_cache", self.llm_response_cache),
-                ("doc_status", self.doc_status),
-            ]
+            if self.storages_warming:
+                # Let the background load finish rather than leave a namespace half loaded
+                await self._storage_warmup_task
+            storages = self._named_storages()
 
             # Finalize each storage individually to ensure one failure doesn't prevent others from closing
             successful_finalizations = []
@@ -707,6 +941,7 @@ class LightRAG:
             else:
                 logger.debug("All storages finalized successfully")
 
+            release_chunk_ids(self.workspace)
             self._storages_status = StoragesStatus.FINALIZED
 
     async def check_and_migrate_data(self):
@@ -1062,6 +1297,7 @@ class LightRAG:
         else:
             # Fallback to dynamic import for other storage implementations
             import_path = STORAGES[storage_name]
+            ensure_packages(STORAGE_PACKAGES.get(import_path, []))
             storage_class = lazy_external_import(import_path, storage_name)
             return storage_class
 
@@ -1202,6 +1438,8 @@ class LightRAG:
                 self.full_docs.upsert(new_docs),
                 self.text_chunks.upsert(inserting_chunks),
             ]
+            if self.chunks_bm25 is not None:
+                tasks.append(self.chunks_bm25.upsert(inserting_chunks))
             await asyncio.gather(*tasks)
 
         finally:
@@ -1527,6 +1765,7 @@ class LightRAG:
                     DocStatus.FAILED,
                 ]:
                     # Prepare document for status reset to PENDING
+                    checkpoint = DocumentCheckpoint.from_metadata(status_doc.metadata)
                     docs_to_reset[doc_id] = {
                         "status": DocStatus.PENDING,
                         "content_summary": status_doc.content_summary,
@@ -1535,9 +1774,13 @@ class LightRAG:
                         "updated_at": datetime.now(timezone.utc).isoformat(),
                         "file_path": getattr(status_doc, "file_path", "unknown_source"),
                         "track_id": getattr(status_doc, "track_id", ""),
-                        # Clear any error messages and processing metadata
+                        # Clear any error messages and processing metadata, but keep the
+                        # checkpoint the document resumes from
                         "error_msg": "",
-                        "metadata": {},
+                        **self._checkpointed_chunks_fields(
+                            checkpoint, dict.fromkeys(status_doc.chunks_list or [])
+                        ),
+                        "metadata": checkpoint.to_metadata(),
                     }
 
                     # Update the status in to_process_docs as well
@@ -1574,7 +1817,7 @@ class LightRAG:
         """
 
         # Get pipeline status shared data and lock
-        pipeline_status = await get_namespace_data("pipeline_status")
+        pipeline_status = await get_namespace_data(self.pipeline_status_namespace)
         pipeline_status_lock = get_pipeline_status_lock()
 
         # Check if another process is already processing the queue
@@ -1707,6 +1950,8 @@ class LightRAG:
                     processing_start_time = int(time.time())
                     first_stage_tasks = []
                     entity_relation_task = None
+                    chunks: dict[str, Any] = {}
+                    checkpoint = DocumentCheckpoint()
 
                     async with semaphore:
                         nonlocal processed_count
@@ -1757,27 +2002,73 @@ class LightRAG:
                                 )
                             content = content_data["content"]
 
-                            # Generate chunks from document
-                            chunks: dict[str, Any] = {
-                                compute_mdhash_id(dp["content"], prefix="chunk-"): {
-                                    **dp,
-                                    "full_doc_id": doc_id,
-                                    "file_path": file_path,  # Add file path to each chunk
-                                    "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
-                                }
-                                for dp in self.chunking_func(
-                                    self.tokenizer,
-                                    content,
-                                    split_by_character,
-                                    split_by_character_only,
-                                    self.chunk_overlap_token_size,
-                                    self.chunk_token_size,
+                            # Resume an interrupted run from its checkpoint
+                            checkpoint = DocumentCheckpoint.from_metadata(
+                                status_doc.metadata
+                            )
+                            if checkpoint.stage is not None:
+                                chunks = await self._load_checkpointed_chunks(
+                                    status_doc
                                 )
-                            }
+                                if chunks:
+                                    log_message = f"Resuming d-id {doc_id} from checkpoint: {checkpoint.stage.value}, {len(checkpoint.extracted_chunks)}/{len(chunks)} chunks extracted"
+                                    logger.info(log_message)
+                                    async with pipeline_status_lock:
+                                        pipeline_status["latest_message"] = log_message
+                                        pipeline_status["history_messages"].append(
+                                            log_message
+                                        )
+                                else:
+                                    checkpoint = DocumentCheckpoint()
+
+                            if not checkpoint.reached(CheckpointStage.CHUNKS_UPSERTED):
+                                # Generate chunks from document
+                                chunks = {
+                                    compute_mdhash_id(dp["content"], prefix="chunk-"): {
+                                        **dp,
+                                        "full_doc_id": doc_id,
+                                        "file_path": file_path,  # Add file path to each chunk
+                                        "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
+                                    }
+                                    for dp in self.chunking_func(
+                                        self.tokenizer,
+                                        content,
+                                        split_by_character,
+                                        split_by_character_only,
+                                        self.chunk_overlap_token_size,
+                                        self.chunk_token_size,
+                                    )
+                                }
 
                             if not chunks:
                                 logger.warning("No document chunks to process")
 
+                            # Find chunks duplicating already extracted chunks
+                            duplicates: dict[str, tuple[str, str]] = {}
+                            if self._chunk_dedup_index is not None and chunks:
+                                duplicates = (
+                                    await self._chunk_dedup_index.find_duplicates(
+                                        chunks
+                                    )
+                                )
+                                # A chunk reprocessed under the same id keeps its cached extraction
+                                same_id_chunks = [
+                                    chunk_id
+                                    for chunk_id, (source_id, _) in duplicates.items()
+                                    if chunk_id == source_id
+                                ]
+                                if same_id_chunks:
+                                    existing_chunks = await self.text_chunks.get_by_ids(
+                                        same_id_chunks
+                                    )
+                                    for chunk_id, existing in zip(
+                                        same_id_chunks, existing_chunks
+                                    ):
+                                        if existing and existing.get("llm_cache_list"):
+                                            chunks[chunk_id]["llm_cache_list"] = (
+                                                existing["llm_cache_list"]
+                                            )
+
                             # Record processing start time
                             processing_start_time = int(time.time())
 
@@ -1806,34 +2097,74 @@ class LightRAG:
                                             "file_path": file_path,
                                             "track_id": status_doc.track_id,  # Preserve existing track_id
                                             "metadata": {
-                                                "processing_start_time": processing_start_time
+                                                "processing_start_time": processing_start_time,
+                                                **checkpoint.to_metadata(),
                                             },
                                         }
                                     }
                                 )
                             )
-                            chunks_vdb_task = asyncio.create_task(
-                                self.chunks_vdb.upsert(chunks)
-                            )
-                            text_chunks_task = asyncio.create_task(
-                                self.text_chunks.upsert(chunks)
-                            )
 
                             # First stage tasks (parallel execution)
-                            first_stage_tasks = [
-                                doc_status_task,
-                                chunks_vdb_task,
-                                text_chunks_task,
-                            ]
+                            first_stage_tasks = [doc_status_task]
+                            chunks_upserted = checkpoint.reached(
+                                CheckpointStage.CHUNKS_UPSERTED
+                            )
+                            if not chunks_upserted:
+                                first_stage_tasks.append(
+                                    asyncio.create_task(self.chunks_vdb.upsert(chunks))
+                                )
+                                first_stage_tasks.append(
+                                    asyncio.create_task(self.text_chunks.upsert(chunks))
+                                )
+                            if self.chunks_bm25 is not None:
+                                # The local index may not have been saved before the interruption
+                                first_stage_tasks.append(
+                                    asyncio.create_task(self.chunks_bm25.upsert(chunks))
+                                )
                             entity_relation_task = None
 
                             # Execute first stage tasks
                             await asyncio.gather(*first_stage_tasks)
 
+                            save_checkpoint = partial(
+                                self._save_checkpoint,
+                                doc_id=doc_id,
+                                status_doc=status_doc,
+                                chunks=chunks,
+                                file_path=file_path,
+                                processing_start_time=processing_start_time,
+                            )
+                            if not chunks_upserted:
+                                checkpoint.stage = CheckpointStage.CHUNKS_UPSERTED
+                                await save_checkpoint(
+                                    checkpoint.to_metadata(),
+                                    flush_storages=[self.text_chunks, self.chunks_vdb],
+                                )
+
+                            # Extracted chunks are only recorded with their results in the LLM cache
+                            on_chunk_extracted = None
+                            if self._checkpoint_extraction:
+                                on_chunk_extracted = checkpoint.extraction_recorder(
+                                    partial(
+                                        save_checkpoint,
+                                        flush_storages=[
+                                            self.llm_response_cache,
+                                            self.text_chunks,
+                                        ],
+                                    ),
+                                    self.checkpoint_interval,
+                                )
+
                             # Stage 2: Process entity relation graph (after text_chunks are saved)
                             entity_relation_task = asyncio.create_task(
                                 self._process_extract_entities(
-                                    chunks, pipeline_status, pipeline_status_lock
+                                    chunks,
+                                    pipeline_status,
+                                    pipeline_status_lock,
+                                    duplicates=duplicates,
+                                    extracted=list(checkpoint.extracted_chunks),
+                                    on_chunk_extracted=on_chunk_extracted,
                                 )
                             )
                             await entity_relation_task
@@ -1884,7 +2215,7 @@ class LightRAG:
                             # Record processing end time for failed case
                             processing_end_time = int(time.time())
 
-                            # Update document status to failed
+                            # Update document status to failed, keeping the checkpoint to resume from
                             await self.doc_status.upsert(
                                 {
                                     doc_id: {
@@ -1898,9 +2229,13 @@ class LightRAG:
                                         ).isoformat(),
                                         "file_path": file_path,
                                         "track_id": status_doc.track_id,  # Preserve existing track_id
+                                        **self._checkpointed_chunks_fields(
+                                            checkpoint, chunks
+                                        ),
                                         "metadata": {
                                             "processing_start_time": processing_start_time,
                                             "processing_end_time": processing_end_time,
+                                            **checkpoint.to_metadata(),
                                         },
                                     }
                                 }
@@ -1920,11 +2255,25 @@ class LightRAG:
 
                                 # Get chunk_results from entity_relation_task
                                 chunk_results = await entity_relation_task
+
+                                checkpoint.stage = CheckpointStage.MERGING
+                                if self._checkpoint_extraction:
+                                    checkpoint.extracted_chunks = dict.fromkeys(chunks)
+                                await save_checkpoint(
+                                    checkpoint.to_metadata(),
+                                    flush_storages=[
+                                        self.llm_response_cache,
+                                        self.text_chunks,
+                                    ],
+                                )
+
                                 await merge_nodes_and_edges(
                                     chunk_results=chunk_results,  # result collected from entity_relation_task
                                     knowledge_graph_inst=self.chunk_entity_relation_graph,
-                                    entity_vdb=self.entities_vdb,
-                                    relationships_vdb=self.relationships_vdb,
+                                    entity_vdb=self._entities_vdb_coalescer
+                                    or self.entities_vdb,
+                                    relationships_vdb=self._relationships_vdb_coalescer
+                                    or self.relationships_vdb,
                                     global_config=asdict(self),
                                     full_entities_storage=self.full_entities,
                                     full_relations_storage=self.full_relations,
@@ -1959,13 +2308,24 @@ class LightRAG:
                                             "metadata": {
                                                 "processing_start_time": processing_start_time,
                                                 "processing_end_time": processing_end_time,
+                                                **(
+                                                    {
+                                                        "chunk_dedup": self._chunk_dedup_stats(
+                                                            chunks, duplicates
+                                                        )
+                                                    }
+                                                    if self._chunk_dedup_index
+                                                    else {}
+                                                ),
                                             },
                                         }
                                     }
                                 )
 
                                 # Call _insert_done after processing each file
-                                await self._insert_done()
+                                await self._insert_done(
+                                    pipeline_status, pipeline_status_lock
+                                )
 
                                 async with pipeline_status_lock:
                                     log_message = f"Completed processing file {current_file_number}/{total_files}: {file_path}"
@@ -2012,7 +2372,7 @@ class LightRAG:
                                 # Record processing end time for failed case
                                 processing_end_time = int(time.time())
 
-                                # Update document status to failed
+                                # Update document status to failed, keeping the checkpoint to resume from
                                 await self.doc_status.upsert(
                                     {
                                         doc_id: {
@@ -2024,9 +2384,13 @@ class LightRAG:
                                             "updated_at": datetime.now().isoformat(),
                                             "file_path": file_path,
                                             "track_id": status_doc.track_id,  # Preserve existing track_id
+                                            **self._checkpointed_chunks_fields(
+                                                checkpoint, chunks
+                                            ),
                                             "metadata": {
                                                 "processing_start_time": processing_start_time,
                                                 "processing_end_time": processing_end_time,
+                                                **checkpoint.to_metadata(),
                                             },
                                         }
                                     }
@@ -2035,17 +2399,21 @@ class LightRAG:
                 # Create processing tasks for all documents
                 doc_tasks = []
                 for doc_id, status_doc in to_process_docs.items():
-                    doc_tasks.append(
-                        process_document(
-                            doc_id,
-                            status_doc,
-                            split_by_character,
-                            split_by_character_only,
-                            pipeline_status,
-                            pipeline_status_lock,
-                            semaphore,
+                    # LLM calls of each track are queued fairly against other tracks
+                    with scheduling_flow(f"{self.workspace}/{status_doc.track_id}"):
+                        doc_tasks.append(
+                            asyncio.create_task(
+                                process_document(
+                                    doc_id,
+                                    status_doc,
+                                    split_by_character,
+                                    split_by_character_only,
+                                    pipeline_status,
+                                    pipeline_status_lock,
+                                    semaphore,
+                                )
+                            )
                         )
-                    )
 
                 # Wait for all document processing to complete
                 try:
@@ -2103,17 +2471,113 @@ class LightRAG:
                 pipeline_status["history_messages"].append(log_message)
 
     async def _process_extract_entities(
-        self, chunk: dict[str, Any], pipeline_status=None, pipeline_status_lock=None
+        self,
+        chunk: dict[str, Any],
+        pipeline_status=None,
+        pipeline_status_lock=None,
+        duplicates: dict[str, tuple[str, str]] | None = None,
+        extracted: list[str] | None = None,
+        on_chunk_extracted: Callable[[str], Awaitable[None]] | None = None,
     ) -> list:
+        """Extract entities and relations of a document's chunks
+
+        Args:
+            duplicates: Chunk id -> (source chunk id, kind) of duplicate chunks,
+                whose extraction is copied from the source chunk's cache entries
+            extracted: Chunk ids extracted before an interruption, rebuilt from
+                their own cache entries
+            on_chunk_extracted: Called with the id of each newly extracted chunk
+        """
+        duplicates = duplicates or {}
+        # Chunk id -> chunk whose cached extraction is reused
+        links = {
+            chunk_id: chunk_id for chunk_id in extracted or [] if chunk_id in chunk
+        }
+        links.update(
+            (chunk_id, source_id) for chunk_id, (source_id, _) in duplicates.items()
+        )
         try:
-            chunk_results = await extract_entities(
+            if not links:
+                return await extract_entities(
+                    chunk,
+                    global_config=asdict(self),
+                    pipeline_status=pipeline_status,
+                    pipeline_status_lock=pipeline_status_lock,
+                    llm_response_cache=self.llm_response_cache,
+                    text_chunks_storage=self.text_chunks,
+                    on_chunk_extracted=on_chunk_extracted,
+                )
+
+            # Extract unique chunks first, duplicates may link to chunks of this document
+            unique_chunks = {
+                chunk_id: data
+                for chunk_id, data in chunk.items()
+                if chunk_id not in links
+            }
+            chunk_results = []
+            if unique_chunks:
+                chunk_results = await extract_entities(
+                    unique_chunks,
+                    global_config=asdict(self),
+                    pipeline_status=pipeline_status,
+                    pipeline_status_lock=pipeline_status_lock,
+                    llm_response_cache=self.llm_response_cache,
+                    text_chunks_storage=self.text_chunks,
+                    on_chunk_extracted=on_chunk_extracted,
+                )
+
+            linked_results, unresolved = await link_duplicate_extractions(
+                links,
                 chunk,
-                global_config=asdict(self),
-                pipeline_status=pipeline_status,
-                pipeline_status_lock=pipeline_status_lock,
-                llm_response_cache=self.llm_response_cache,
-                text_chunks_storage=self.text_chunks,
+                self.llm_response_cache,
+                self.text_chunks,
             )
+            chunk_results.extend(linked_results)
+
+            if unresolved:
+                # The matched chunk has no cached extraction yet. Forget it only if it
+                # will never get one, a concurrent document may still be extracting it
+                unresolved_sources = set()
+                for chunk_id in unresolved:
+                    if chunk_id not in duplicates:
+                        continue
+                    source_id, _ = duplicates.pop(chunk_id)
+                    if source_id != chunk_id and source_id not in chunk:
+                        unresolved_sources.add(source_id)
+                if self._chunk_dedup_index is not None and unresolved_sources:
+                    await self._chunk_dedup_index.remove(
+                        await find_stale_sources(
+                            unresolved_sources, self.text_chunks, self.doc_status
+                        )
+                    )
+                chunk_results.extend(
+                    await extract_entities(
+                        {chunk_id: chunk[chunk_id] for chunk_id in unresolved},
+                        global_config=asdict(self),
+                        pipeline_status=pipeline_status,
+                        pipeline_status_lock=pipeline_status_lock,
+                        llm_response_cache=self.llm_response_cache,
+                        text_chunks_storage=self.text_chunks,
+                        on_chunk_extracted=on_chunk_extracted,
+                    )
+                )
+
+            resumed = len(links) - len(duplicates) - len(unresolved)
+            if resumed and pipeline_status is not None:
+                log_message = (
+                    f"Checkpoint: reused extraction of {resumed}/{len(chunk)} chunks"
+                )
+                logger.info(log_message)
+                async with pipeline_status_lock:
+                    pipeline_status["latest_message"] = log_message
+                    pipeline_status["history_messages"].append(log_message)
+            linked_duplicates = len(linked_results) - resumed
+            if linked_duplicates and pipeline_status is not None:
+                log_message = f"Chunk dedup: reused extraction of {linked_duplicates}/{len(chunk)} chunks"
+                logger.info(log_message)
+                async with pipeline_status_lock:
+                    pipeline_status["latest_message"] = log_message
+                    pipeline_status["history_messages"].append(log_message)
             return chunk_results
         except Exception as e:
             error_msg = f"Failed to extract entities and relationships: {str(e)}"
@@ -2123,11 +2587,96 @@ class LightRAG:
                 pipeline_status["history_messages"].append(error_msg)
             raise e
 
+    @property
+    def _checkpoint_extraction(self) -> bool:
+        """Whether extracted chunks can be recorded, their results live in the LLM cache"""
+        return (
+            self.llm_response_cache is not None
+            and self.enable_llm_cache_for_entity_extract
+        )
+
+    async def _load_checkpointed_chunks(
+        self, status_doc: DocProcessingStatus
+    ) -> dict[str, Any] | None:
+        """Chunks of a checkpointed document, None if any of them is missing"""
+        chunk_ids = status_doc.chunks_list or []
+        if not chunk_ids:
+            return None
+        stored = await self.text_chunks.get_by_ids(chunk_ids)
+        chunks = {}
+        for chunk_id, chunk_data in zip(chunk_ids, stored):
+            if not chunk_data:
+                logger.warning(
+                    f"Checkpoint of {status_doc.file_path} is missing chunk {chunk_id}, processing the document from scratch"
+                )
+                return None
+            chunks[chunk_id] = {
+                key: value
+                for key, value in chunk_data.items()
+                if key not in ("_id", "create_time", "update_time")
+            }
+        return chunks
+
+    async def _save_checkpoint(
+        self,
+        checkpoint_metadata: dict[str, Any],
+        doc_id: str,
+        status_doc: DocProcessingStatus,
+        chunks: dict[str, Any],
+        file_path: str,
+        processing_start_time: int,
+        flush_storages: list[StorageNameSpace | None] | None = None,
+    ) -> None:
+        """Persist the storages a checkpoint refers to, then the checkpoint"""
+        for storage in flush_storages or []:
+            if storage is not None:
+                await storage.index_done_callback()
+        await self.doc_status.upsert(
+            {
+                doc_id: {
+                    "status": DocStatus.PROCESSING,
+                    "chunks_count": len(chunks),
+                    "chunks_list": list(chunks.keys()),
+                    "content_summary": status_doc.content_summary,
+                    "content_length": status_doc.content_length,
+                    "created_at": status_doc.created_at,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                    "file_path": file_path,
+                    "track_id": status_doc.track_id,
+                    "metadata": {
+                        "processing_start_time": processing_start_time,
+                        **checkpoint_metadata,
+                    },
+                }
+            }
+        )
+        await self.doc_status.index_done_callback()
+
+    @staticmethod
+    def _checkpointed_chunks_fields(
+        checkpoint: DocumentCheckpoint, chunks: dict[str, Any]
+    ) -> dict[str, Any]:
+        """chunks_list and chunks_count to keep with a checkpoint in doc_status"""
+        if checkpoint.stage is None:
+            return {}
+        return {"chunks_count": len(chunks), "chunks_list": list(chunks.keys())}
+
+    @staticmethod
+    def _chunk_dedup_stats(
+        chunks: dict[str, Any], duplicates: dict[str, tuple[str, str]]
+    ) -> dict[str, int]:
+        exact = sum(1 for _, kind in duplicates.values() if kind == "exact")
+        return {
+            "exact": exact,
+            "near": len(duplicates) - exact,
+            "extracted": len(chunks) - len(duplicates),
+        }
+
     async def _insert_done(
         self, pipeline_status=None, pipeline_status_lock=None
     ) -> None:
-        tasks = [
-            cast(StorageNameSpace, storage_inst).index_done_callback()
+        storages = [
+            cast(StorageNameSpace, storage_inst)
             for storage_inst in [  # type: ignore
                 self.full_docs,
                 self.doc_status,
@@ -2144,13 +2693,36 @@ class LightRAG:
             ]
             if storage_inst is not None
         ]
-        await asyncio.gather(*tasks)
 
+        async def _timed_flush(storage: StorageNameSpace) -> tuple[str, dict]:
+            # File-backed storages snapshot under their lock and serialize in a worker
+            # thread, so independent namespaces are written in parallel
+            start = time.perf_counter()
+            await storage.index_done_callback()
+            return storage.namespace, {
+                "duration": round(time.perf_counter() - start, 3),
+                "bytes": storage.get_last_flush_bytes(),
+            }
+
+        flush_stats = dict(
+            await asyncio.gather(*[_timed_flush(storage) for storage in storages])
+        )
+        if self._chunk_dedup_index is not None:
+            await self._chunk_dedup_index.persist()
+        if self.chunks_bm25 is not None:
+            await self.chunks_bm25.persist()
+
+        slowest = max(flush_stats.items(), key=lambda x: x[1]["duration"], default=None)
+        total_bytes = sum(stat["bytes"] or 0 for stat in flush_stats.values())
         log_message = "In memory DB persist to disk"
+        if slowest is not None:
+            log_message += f" ({total_bytes} bytes, slowest: {slowest[0]} {slowest[1]['duration']}s)"
         logger.info(log_message)
+        logger.debug(f"Flush stats per namespace: {flush_stats}")
 
         if pipeline_status is not None and pipeline_status_lock is not None:
             async with pipeline_status_lock:
+                pipeline_status["flush_stats"] = flush_stats
                 pipeline_status["latest_message"] = log_message
                 pipeline_status["history_messages"].append(log_message)
 
@@ -2202,6 +2774,8 @@ class LightRAG:
                     self.chunks_vdb.upsert(all_chunks_data),
                     self.text_chunks.upsert(all_chunks_data),
                 )
+                if self.chunks_bm25 is not None:
+                    await self.chunks_bm25.upsert(all_chunks_data)
 
             # Insert entities into knowledge graph
             all_entities_data: list[dict[str, str]] = []
@@ -2487,6 +3061,10 @@ class LightRAG:
                         "relations_after_truncation": int,  # Relations after token truncation
                         "merged_chunks_count": int,          # Chunks before final processing
                         "final_chunks_count": int            # Final chunks in result
+                    },
+                    "timings": {                 # Only with param.include_timings
+                        "totals": Dict[str, dict],  # Seconds and call count per span name
+                        "spans": List[dict]         # Span tree with start offsets and durations
                     }
                 }
             }
@@ -2522,6 +3100,17 @@ class LightRAG:
             actual data is nested under the 'data' field, with 'status' and 'message'
             fields at the top level.
         """
+        with scheduling_flow(self.workspace):
+            if not param.include_timings:
+                return await self._aquery_data(query, param)
+
+            with collect_spans() as spans:
+                with span("aquery_data", {"mode": param.mode}):
+                    final_data = await self._aquery_data(query, param)
+        final_data.setdefault("metadata", {})["timings"] = timing_breakdown(spans)
+        return final_data
+
+    async def _aquery_data(self, query: str, param: QueryParam) -> dict[str, Any]:
         global_config = asdict(self)
 
         # Create a copy of param to avoid modifying the original
@@ -2560,6 +3149,7 @@ class LightRAG:
                 hashing_kv=self.llm_response_cache,
                 system_prompt=None,
                 chunks_vdb=self.chunks_vdb,
+                chunks_bm25=self.chunks_bm25,
             )
         elif data_param.mode == "naive":
             logger.debug(f"[aquery_data] Using naive_query for mode: {data_param.mode}")
@@ -2570,6 +3160,7 @@ class LightRAG:
                 global_config,
                 hashing_kv=self.llm_response_cache,
                 system_prompt=None,
+                chunks_bm25=self.chunks_bm25,
             )
         elif data_param.mode == "bypass":
             logger.debug("[aquery_data] Using bypass mode")
@@ -2638,6 +3229,13 @@ class LightRAG:
         Returns:
             dict[str, Any]: Complete response with structured data and LLM response.
         """
+        # LLM calls of each workspace are queued fairly against other workspaces
+        with scheduling_flow(self.workspace):
+            return await self._aquery_llm(query, param, system_prompt)
+
+    async def _aquery_llm(
+        self, query: str, param: QueryParam, system_prompt: str | None
+    ) -> dict[str, Any]:
         logger.debug(f"[aquery_llm] Query param: {param}")
 
         global_config = asdict(self)
@@ -2657,6 +3255,7 @@ class LightRAG:
                     hashing_kv=self.llm_response_cache,
                     system_prompt=system_prompt,
                     chunks_vdb=self.chunks_vdb,
+                    chunks_bm25=self.chunks_bm25,
                 )
             elif param.mode == "naive":
                 query_result = await naive_query(
@@ -2666,12 +3265,13 @@ class LightRAG:
                     global_config,
                     hashing_kv=self.llm_response_cache,
                     system_prompt=system_prompt,
+                    chunks_bm25=self.chunks_bm25,
                 )
             elif param.mode == "bypass":
                 # Bypass mode: directly use LLM without knowledge retrieval
                 use_llm_func = param.model_func or global_config["llm_model_func"]
-                # Apply higher priority (8) to entity/relation summary tasks
-                use_llm_func = partial(use_llm_func, _priority=8)
+                # Query priority (5), bypass answers run in the query lane
+                use_llm_func = partial(use_llm_func, _priority=5)
 
                 param.stream = True if param.stream is None else param.stream
                 response = await use_llm_func(
@@ -2915,7 +3515,7 @@ class LightRAG:
         doc_llm_cache_ids: list[str] = []
 
         # Get pipeline status shared data and lock for status updates
-        pipeline_status = await get_namespace_data("pipeline_status")
+        pipeline_status = await get_namespace_data(self.pipeline_status_namespace)
         pipeline_status_lock = get_pipeline_status_lock()
 
         async with pipeline_status_lock:
@@ -3066,11 +3666,12 @@ class LightRAG:
 
             # 4. Analyze entities and relationships that will be affected
             entities_to_delete = set()
-            entities_to_rebuild = {}  # entity_name -> remaining chunk id list
+            entities_to_rebuild = {}  # entity_name -> remaining chunk id set
             relationships_to_delete = set()
-            relationships_to_rebuild = {}  # (src, tgt) -> remaining chunk id list
-            entity_chunk_updates: dict[str, list[str]] = {}
-            relation_chunk_updates: dict[tuple[str, str], list[str]] = {}
+            relationships_to_rebuild = {}  # (src, tgt) -> remaining chunk id set
+            entity_chunk_updates: dict[str, ChunkIdSet] = {}
+            relation_chunk_updates: dict[tuple[str, str], ChunkIdSet] = {}
+            deleted_chunk_ids = ChunkIdSet.from_ids(chunk_ids, self.workspace)
 
             try:
                 # Get affected entities and relations from full_entities and full_relations storage
@@ -3123,40 +3724,47 @@ class LightRAG:
                 raise Exception(f"Failed to analyze graph dependencies: {e}") from e
 
             try:
-                # Process entities
+                # Process entities, reading their chunk id lists in one batch
+                node_labels = [
+                    node_data.get("entity_id")
+                    for node_data in affected_nodes
+                    if node_data.get("entity_id")
+                ]
+                stored_entity_chunks = {}
+                if self.entity_chunks and node_labels:
+                    stored_entity_chunks = dict(
+                        zip(
+                            node_labels,
+                            await self.entity_chunks.get_by_ids(node_labels),
+                        )
+                    )
+
                 for node_data in affected_nodes:
                     node_label = node_data.get("entity_id")
                     if not node_label:
                         continue
 
-                    existing_sources: list[str] = []
-                    if self.entity_chunks:
-                        stored_chunks = await self.entity_chunks.get_by_id(node_label)
-                        if stored_chunks and isinstance(stored_chunks, dict):
-                            existing_sources = [
-                                chunk_id
-                                for chunk_id in stored_chunks.get("chunk_ids", [])
-                                if chunk_id
-                            ]
+                    existing_sources = ChunkIdSet(self.workspace)
+                    stored_chunks = stored_entity_chunks.get(node_label)
+                    if stored_chunks and isinstance(stored_chunks, dict):
+                        existing_sources = ChunkIdSet.from_ids(
+                            stored_chunks.get("chunk_ids"), self.workspace
+                        )
 
                     if not existing_sources and node_data.get("source_id"):
-                        existing_sources = [
-                            chunk_id
-                            for chunk_id in node_data["source_id"].split(
-                                GRAPH_FIELD_SEP
-                            )
-                            if chunk_id
-                        ]
+                        existing_sources = ChunkIdSet.from_joined(
+                            node_data["source_id"], self.workspace
+                        )
 
                     if not existing_sources:
                         continue
 
-                    remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+                    remaining_sources = existing_sources.difference(deleted_chunk_ids)
 
                     if not remaining_sources:
                         entities_to_delete.add(node_label)
-                        entity_chunk_updates[node_label] = []
-                    elif remaining_sources != existing_sources:
+                        entity_chunk_updates[node_label] = ChunkIdSet(self.workspace)
+                    elif remaining_sources is not existing_sources:
                         entities_to_rebuild[node_label] = remaining_sources
                         entity_chunk_updates[node_label] = remaining_sources
                     else:
@@ -3168,7 +3776,25 @@ class LightRAG:
                     pipeline_status["latest_message"] = log_message
                     pipeline_status["history_messages"].append(log_message)
 
-                # Process relationships
+                # Process relationships, reading their chunk id lists in one batch
+                relation_keys = list(
+                    dict.fromkeys(
+                        make_relation_chunk_key(
+                            edge_data.get("source"), edge_data.get("target")
+                        )
+                        for edge_data in affected_edges
+                        if edge_data.get("source") and edge_data.get("target")
+                    )
+                )
+                stored_relation_chunks = {}
+                if self.relation_chunks and relation_keys:
+                    stored_relation_chunks = dict(
+                        zip(
+                            relation_keys,
+                            await self.relation_chunks.get_by_ids(relation_keys),
+                        )
+                    )
+
                 for edge_data in affected_edges:
                     src = edge_data.get("source")
                     tgt = edge_data.get("target")
@@ -3183,37 +3809,29 @@ class LightRAG:
                     ):
                         continue
 
-                    existing_sources: list[str] = []
-                    if self.relation_chunks:
-                        storage_key = make_relation_chunk_key(src, tgt)
-                        stored_chunks = await self.relation_chunks.get_by_id(
-                            storage_key
+                    existing_sources = ChunkIdSet(self.workspace)
+                    stored_chunks = stored_relation_chunks.get(
+                        make_relation_chunk_key(src, tgt)
+                    )
+                    if stored_chunks and isinstance(stored_chunks, dict):
+                        existing_sources = ChunkIdSet.from_ids(
+                            stored_chunks.get("chunk_ids"), self.workspace
                         )
-                        if stored_chunks and isinstance(stored_chunks, dict):
-                            existing_sources = [
-                                chunk_id
-                                for chunk_id in stored_chunks.get("chunk_ids", [])
-                                if chunk_id
-                            ]
 
                     if not existing_sources:
-                        existing_sources = [
-                            chunk_id
-                            for chunk_id in edge_data["source_id"].split(
-                                GRAPH_FIELD_SEP
-                            )
-                            if chunk_id
-                        ]
+                        existing_sources = ChunkIdSet.from_joined(
+                            edge_data["source_id"], self.workspace
+                        )
 
                     if not existing_sources:
                         continue
 
-                    remaining_sources = subtract_source_ids(existing_sources, chunk_ids)
+                    remaining_sources = existing_sources.difference(deleted_chunk_ids)
 
                     if not remaining_sources:
                         relationships_to_delete.add(edge_tuple)
-                        relation_chunk_updates[edge_tuple] = []
-                    elif remaining_sources != existing_sources:
+                        relation_chunk_updates[edge_tuple] = ChunkIdSet(self.workspace)
+                    elif remaining_sources is not existing_sources:
                         relationships_to_rebuild[edge_tuple] = remaining_sources
                         relation_chunk_updates[edge_tuple] = remaining_sources
                     else:
@@ -3237,7 +3855,7 @@ class LightRAG:
                             entity_delete_ids.add(entity_name)
                         else:
                             entity_upsert_payload[entity_name] = {
-                                "chunk_ids": remaining,
+                                "chunk_ids": remaining.to_list(),
                                 "count": len(remaining),
                                 "updated_at": current_time,
                             }
@@ -3256,7 +3874,7 @@ class LightRAG:
                             relation_delete_ids.add(storage_key)
                         else:
                             relation_upsert_payload[storage_key] = {
-                                "chunk_ids": remaining,
+                                "chunk_ids": remaining.to_list(),
                                 "count": len(remaining),
                                 "updated_at": current_time,
                             }
@@ -3278,6 +3896,10 @@ class LightRAG:
                     try:
                         await self.chunks_vdb.delete(chunk_ids)
                         await self.text_chunks.delete(chunk_ids)
+                        if self._chunk_dedup_index is not None:
+                            await self._chunk_dedup_index.remove(chunk_ids)
+                        if self.chunks_bm25 is not None:
+                            await self.chunks_bm25.delete(chunk_ids)
 
                         async with pipeline_status_lock:
                             log_message = f"Successfully deleted {len(chunk_ids)} chunks from storage"
@@ -3766,20 +4388,26 @@ class LightRAG:
     async def aexport_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "jsonl", "parquet", "excel", "md", "txt"] = "csv",
         include_vector_data: bool = False,
+        batch_size: int = 1000,
+        progress_callback: Callable[[str, int, int], None] | None = None,
     ) -> None:
         """
         Asynchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "jsonl", "parquet", "excel", "md", "txt".
                 - csv: Comma-separated values file
+                - jsonl: JSON Lines, one record per line tagged with its type
+                - parquet: Parquet file (requires pyarrow)
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
+                csv, jsonl, parquet and md are streamed in batches with bounded memory.
             include_vector_data: Whether to include data from the vector database.
+            batch_size: Number of graph nodes read (and rows written) per batch.
+            progress_callback: Optional callable(section, processed, total) called after each batch.
         """
         from lightrag.utils import aexport_data as utils_aexport_data
 
@@ -3790,25 +4418,33 @@ class LightRAG:
             output_path,
             file_format,
             include_vector_data,
+            batch_size,
+            progress_callback,
         )
 
     def export_data(
         self,
         output_path: str,
-        file_format: Literal["csv", "excel", "md", "txt"] = "csv",
+        file_format: Literal["csv", "jsonl", "parquet", "excel", "md", "txt"] = "csv",
         include_vector_data: bool = False,
+        batch_size: int = 1000,
+        progress_callback: Callable[[str, int, int], None] | None = None,
     ) -> None:
         """
         Synchronously exports all entities, relations, and relationships to various formats.
         Args:
             output_path: The path to the output file (including extension).
-            file_format: Output format - "csv", "excel", "md", "txt".
+            file_format: Output format - "csv", "jsonl", "parquet", "excel", "md", "txt".
                 - csv: Comma-separated values file
+                - jsonl: JSON Lines, one record per line tagged with its type
+                - parquet: Parquet file (requires pyarrow)
                 - excel: Microsoft Excel file with multiple sheets
                 - md: Markdown tables
                 - txt: Plain text formatted output
-                - table: Print formatted tables to console
+                csv, jsonl, parquet and md are streamed in batches with bounded memory.
             include_vector_data: Whether to include data from the vector database.
+            batch_size: Number of graph nodes read (and rows written) per batch.
+            progress_callback: Optional callable(section, processed, total) called after each batch.
         """
         try:
             loop = asyncio.get_event_loop()
@@ -3817,5 +4453,11 @@ class LightRAG:
             asyncio.set_event_loop(loop)
 
         loop.run_until_complete(
-            self.aexport_data(output_path, file_format, include_vector_data)
+            self.aexport_data(
+                output_path,
+                file_format,
+                include_vector_data,
+                batch_size,
+                progress_callback,
+            )
         )
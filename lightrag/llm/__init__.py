@@ -0,0 +1,48 @@
+"""
+LLM and embedding bindings.
+
+Binding modules import their client libraries at module level and are only
+imported when a binding is used. Missing client libraries are installed by
+ensure_binding_packages when a binding is selected, not when its module is
+imported, so importing lightrag never runs package installation checks.
+"""
+
+from lightrag.utils import ensure_packages
+
+# Binding names of the API server (LLM_BINDING, EMBEDDING_BINDING) -> module of lightrag.llm
+BINDING_MODULES: dict[str, str] = {
+    "openai": "openai",
+    "azure_openai": "azure_openai",
+    "ollama": "ollama",
+    "lollms": "lollms",
+    "aws_bedrock": "bedrock",
+    "jina": "jina",
+    "vietnamese": "vietnamese_embed",
+}
+
+# Module of lightrag.llm -> packages its client libraries come from
+BINDING_PACKAGES: dict[str, list[str]] = {
+    "openai": ["openai"],
+    "azure_openai": ["openai"],
+    "nvidia_openai": ["openai"],
+    "siliconcloud": ["openai"],
+    "zhipu": ["openai", "zhipuai"],
+    "ollama": ["ollama"],
+    "bedrock": ["aioboto3"],
+    "anthropic": ["anthropic", "voyageai"],
+    "hf": ["transformers", "torch"],
+    "lmdeploy": ["lmdeploy[all]"],
+    "llama_index_impl": ["llama-index"],
+    "vietnamese_embed": ["huggingface_hub"],
+}
+
+
+def ensure_binding_packages(binding: str) -> None:
+    """Install the missing client libraries of a binding
+
+    Args:
+        binding: API server binding name (e.g. "aws_bedrock") or module name
+            of lightrag.llm (e.g. "bedrock")
+    """
+    module = BINDING_MODULES.get(binding, binding)
+    ensure_packages(BINDING_PACKAGES.get(module, []))
@@ -4,20 +4,12 @@ import os
 import logging
 import numpy as np
 from typing import Any, Union, AsyncIterator
-import pipmaster as pm  # Pipmaster for dynamic library install
 
 if sys.version_info < (3, 9):
     from typing import AsyncIterator
 else:
     from collections.abc import AsyncIterator
 
-# Install Anthropic SDK if not present
-if not pm.is_installed("anthropic"):
-    pm.install("anthropic")
-
-# Add Voyage AI import
-if not pm.is_installed("voyageai"):
-    pm.install("voyageai")
 import voyageai
 
 from anthropic import (
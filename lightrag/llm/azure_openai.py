@@ -1,11 +1,5 @@
 from collections.abc import Iterable
 import os
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-# install specific modules
-if not pm.is_installed("openai"):
-    pm.install("openai")
-
 from openai import (
     AsyncAzureOpenAI,
     APIConnectionError,
@@ -2,10 +2,6 @@ import copy
 import os
 import json
 
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-if not pm.is_installed("aioboto3"):
-    pm.install("aioboto3")
 import aioboto3
 import numpy as np
 from tenacity import (
@@ -2,17 +2,6 @@ import copy
 import os
 from functools import lru_cache
 
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-# install specific modules
-if not pm.is_installed("transformers"):
-    pm.install("transformers")
-if not pm.is_installed("torch"):
-    pm.install("torch")
-if not pm.is_installed("numpy"):
-    pm.install("numpy")
-
-from transformers import AutoTokenizer, AutoModelForCausalLM
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -24,7 +13,6 @@ from lightrag.exceptions import (
     RateLimitError,
     APITimeoutError,
 )
-import torch
 import numpy as np
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -32,6 +20,9 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
 @lru_cache(maxsize=1)
 def initialize_hf_model(model_name):
+    # torch and transformers take seconds to import, only pay for them when used
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
     hf_tokenizer = AutoTokenizer.from_pretrained(
         model_name, device_map="auto", trust_remote_code=True
     )
@@ -142,6 +133,8 @@ async def hf_model_complete(
 
 
 async def hf_embed(texts: list[str], tokenizer, embed_model) -> np.ndarray:
+    import torch
+
     # Detect the appropriate device
     if torch.cuda.is_available():
         device = next(embed_model.parameters()).device  # Use CUDA if available
@@ -1,4 +1,3 @@
-import pipmaster as pm
 from llama_index.core.llms import (
     ChatMessage,
     MessageRole,
@@ -7,10 +6,6 @@ from llama_index.core.llms import (
 from typing import List, Optional
 from lightrag.utils import logger
 
-# Install required dependencies
-if not pm.is_installed("llama-index"):
-    pm.install("llama-index")
-
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.settings import Settings as LlamaIndexSettings
 from tenacity import (
@@ -1,9 +1,3 @@
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-# install specific modules
-if not pm.is_installed("lmdeploy"):
-    pm.install("lmdeploy[all]")
-
 from lightrag.exceptions import (
     APIConnectionError,
     RateLimitError,
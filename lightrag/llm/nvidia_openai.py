@@ -6,12 +6,6 @@ if sys.version_info < (3, 9):
 else:
     pass
 
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-# install specific modules
-if not pm.is_installed("openai"):
-    pm.install("openai")
-
 from openai import (
     AsyncOpenAI,
     APIConnectionError,
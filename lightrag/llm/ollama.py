@@ -1,11 +1,5 @@
 from collections.abc import AsyncIterator
 
-import pipmaster as pm
-
-# install specific modules
-if not pm.is_installed("ollama"):
-    pm.install("ollama")
-
 import ollama
 
 from tenacity import (
@@ -4,12 +4,6 @@ import logging
 
 from collections.abc import AsyncIterator
 
-import pipmaster as pm
-
-# install specific modules
-if not pm.is_installed("openai"):
-    pm.install("openai")
-
 from openai import (
     AsyncOpenAI,
     APIConnectionError,
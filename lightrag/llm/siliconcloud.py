@@ -4,12 +4,6 @@ if sys.version_info < (3, 9):
     pass
 else:
     pass
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-# install specific modules
-if not pm.is_installed("lmdeploy"):
-    pm.install("lmdeploy")
-
 from openai import (
     APIConnectionError,
     RateLimitError,
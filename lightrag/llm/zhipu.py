@@ -7,12 +7,6 @@ if sys.version_info < (3, 9):
     pass
 else:
     pass
-import pipmaster as pm  # Pipmaster for dynamic library install
-
-# install specific modules
-if not pm.is_installed("zhipuai"):
-    pm.install("zhipuai")
-
 from openai import (
     APIConnectionError,
     RateLimitError,
@@ -5,7 +5,8 @@ from pathlib import Path
 import asyncio
 import json
 import json_repair
-from typing import Any, AsyncIterator, overload, Literal
+import numpy as np
+from typing import Any, AsyncIterator, Awaitable, Callable, overload, Literal
 from collections import Counter, defaultdict
 
 from lightrag.exceptions import PipelineCancelledException
@@ -13,6 +14,7 @@ from lightrag.utils import (
     logger,
     compute_mdhash_id,
     Tokenizer,
+    EmbeddingFunc,
     is_float_regex,
     sanitize_and_normalize_extracted_text,
     pack_user_ass_to_openai_messages,
@@ -24,18 +26,19 @@ from lightrag.utils import (
     CacheData,
     use_llm_func_with_cache,
     update_chunk_cache_list,
+    generate_cache_key,
     remove_think_tags,
     pick_by_weighted_polling,
     pick_by_vector_similarity,
     process_chunks_unified,
     safe_vdb_operation_with_exception,
     create_prefixed_exception,
-    fix_tuple_delimiter_corruption,
+    get_extraction_record_parser,
     convert_to_user_format,
     generate_reference_list_from_chunks,
-    apply_source_ids_limit,
-    merge_source_ids,
     make_relation_chunk_key,
+    defer_vdb_writes,
+    wait_vdb_writes,
 )
 from lightrag.base import (
     BaseGraphStorage,
@@ -62,8 +65,12 @@ from lightrag.constants import (
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_ENTITY_NAME_MAX_LENGTH,
+    DEFAULT_RRF_K,
 )
+from lightrag.chunk_id_set import ChunkIdSet
+from lightrag.bm25 import ChunkBM25Index, reciprocal_rank_fusion
 from lightrag.kg.shared_storage import get_storage_keyed_lock
+from lightrag.tracing import span, traced
 import time
 from dotenv import load_dotenv
 
@@ -72,6 +79,9 @@ from dotenv import load_dotenv
 # the OS environment variables take precedence over the .env file
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / ".env", override=False)
 
+# Description fingerprints sum 64-bit fragment hashes
+_FINGERPRINT_MODULUS = 1 << 64
+
 
 def _truncate_entity_identifier(
     identifier: str, limit: int, chunk_key: str, identifier_role: str
@@ -94,6 +104,56 @@ def _truncate_entity_identifier(
     return display_value
 
 
+def _description_fingerprint(
+    description_list: list[str], base_fingerprint: str | None = None
+) -> str:
+    """Bounded, order-independent fingerprint of the description fragments behind a summary
+
+    Stored as `description_hashes` on nodes and edges in the form "<count>:<digest>",
+    where digest is the sum of the fragment hashes modulo 2^64. A rebuild compares it
+    with the fingerprint of the remaining fragments to tell whether the current
+    summary still covers exactly them. base_fingerprint is a stored fingerprint to
+    extend with fragments it does not cover yet.
+    """
+    count, digest = _parse_description_fingerprint(base_fingerprint) or (0, 0)
+    for fragment_hash in {_description_hash(desc) for desc in description_list}:
+        count += 1
+        digest = (digest + int(fragment_hash, 16)) % _FINGERPRINT_MODULUS
+    return f"{count}:{digest:016x}"
+
+
+def _parse_description_fingerprint(fingerprint: str | None) -> tuple[int, int] | None:
+    """(count, digest) of a stored fingerprint, None when missing or malformed"""
+    count, sep, digest = (fingerprint or "").partition(":")
+    if not sep or not count.isdigit():
+        return None
+    try:
+        return int(count), int(digest, 16)
+    except ValueError:
+        return None
+
+
+def _description_hash(description: str) -> str:
+    return compute_mdhash_id(description)[:16]
+
+
+def _filter_covered_fragments(
+    fragments: list[dict], already_description: list[str], merged_chunk_ids
+) -> list[dict]:
+    """Drop description fragments the stored summary already covers
+
+    A fragment is covered when its text is still part of the stored description,
+    or when its source chunk was merged into the entity or relation before.
+    """
+    stored = set(already_description)
+    return [
+        dp
+        for dp in fragments
+        if dp["description"] not in stored
+        and not (dp.get("source_id") and dp["source_id"] in merged_chunk_ids)
+    ]
+
+
 def chunking_by_token_size(
     tokenizer: Tokenizer,
     content: str,
@@ -166,6 +226,11 @@ async def _handle_entity_relation_summary(
     4. Summarize each chunk, then recursively process the summaries
     5. Continue until we get a final summary within token limits or num of descriptions is less than force_llm_summary_on_merge
 
+    With summary_content_defined_groups enabled, groups in the map phase are also cut after descriptions
+    whose hash marks a boundary, giving groups of up to half of summary_context_size. Group
+    boundaries then depend only on nearby descriptions, so adding or removing a few descriptions
+    leaves most groups unchanged and their summaries are served from the LLM cache.
+
     Args:
         entity_or_relation_name: Name of the entity or relation being summarized
         description_list: List of description strings to summarize
@@ -188,6 +253,7 @@ async def _handle_entity_relation_summary(
     summary_context_size = global_config["summary_context_size"]
     summary_max_tokens = global_config["summary_max_tokens"]
     force_llm_summary_on_merge = global_config["force_llm_summary_on_merge"]
+    content_defined_groups = global_config.get("summary_content_defined_groups", False)
 
     current_list = description_list[:]  # Copy the list to avoid modifying original
     llm_was_used = False  # Track whether LLM was used during the entire process
@@ -227,6 +293,13 @@ async def _handle_entity_relation_summary(
         current_chunk = []
         current_tokens = 0
 
+        if content_defined_groups:
+            # Aim for groups of a quarter to half of the context size. Rounding the modulus down to
+            # a power of two keeps it, and therefore the boundaries, stable as the list changes.
+            avg_tokens = max(1, total_tokens // len(current_list))
+            group_span = max(2, summary_context_size // (2 * avg_tokens))
+            boundary_modulus = 1 << (group_span.bit_length() - 1)
+
         # Currently least 3 descriptions in current_list
         for i, desc in enumerate(current_list):
             desc_tokens = len(tokenizer.encode(desc))
@@ -250,6 +323,15 @@ async def _handle_entity_relation_summary(
             else:
                 current_chunk.append(desc)
                 current_tokens += desc_tokens
+                # Content-defined boundary keeps groups stable across small list changes
+                if (
+                    content_defined_groups
+                    and len(current_chunk) >= 2
+                    and int(_description_hash(desc), 16) % boundary_modulus == 0
+                ):
+                    chunks.append(current_chunk)
+                    current_chunk = []
+                    current_tokens = 0
 
         # Add the last chunk if it exists
         if current_chunk:
@@ -349,7 +431,7 @@ async def _summarize_descriptions(
     return summary
 
 
-async def _handle_single_entity_extraction(
+def _handle_single_entity_extraction(
     record_attributes: list[str],
     chunk_key: str,
     timestamp: int,
@@ -421,7 +503,7 @@ async def _handle_single_entity_extraction(
         return None
 
 
-async def _handle_single_relationship_extraction(
+def _handle_single_relationship_extraction(
     record_attributes: list[str],
     chunk_key: str,
     timestamp: int,
@@ -520,18 +602,22 @@ async def rebuild_knowledge_from_chunks(
     """Rebuild entity and relationship descriptions from cached extraction results with parallel processing
 
     This method uses cached LLM extraction results instead of calling LLM again,
-    following the same approach as the insert process. Now with parallel processing
-    controlled by llm_model_max_async and using get_storage_keyed_lock for data consistency.
+    following the same approach as the insert process. All cached extractions are
+    fetched and parsed once into an index keyed by entity and relation, then a fixed
+    pool of workers (max_parallel_rebuild, defaulting to llm_model_max_async * 2)
+    rebuilds each entity and relation under get_storage_keyed_lock. Entities and
+    relations whose remaining description set is unchanged keep their summary.
+    Progress and ETA are reported in pipeline_status["rebuild_progress"].
 
     Args:
-        entities_to_rebuild: Dict mapping entity_name -> list of remaining chunk_ids
-        relationships_to_rebuild: Dict mapping (src, tgt) -> list of remaining chunk_ids
+        entities_to_rebuild: Dict mapping entity_name -> remaining chunk_ids (list or ChunkIdSet)
+        relationships_to_rebuild: Dict mapping (src, tgt) -> remaining chunk_ids (list or ChunkIdSet)
         knowledge_graph_inst: Knowledge graph storage
         entities_vdb: Entity vector database
         relationships_vdb: Relationship vector database
         text_chunks_storage: Text chunks storage
         llm_response_cache: LLM response cache
-        global_config: Global configuration containing llm_model_max_async
+        global_config: Global configuration containing max_parallel_rebuild and llm_model_max_async
         pipeline_status: Pipeline status dictionary
         pipeline_status_lock: Lock for pipeline status
         entity_chunks_storage: KV storage maintaining full chunk IDs per entity
@@ -556,10 +642,12 @@ async def rebuild_knowledge_from_chunks(
 
     # Get cached extraction results for these chunks using storage
     # cached_results： chunk_id -> [list of (extraction_result, create_time) from LLM cache sorted by create_time of the first extraction_result]
+    chunk_file_paths: dict[str, str] = {}
     cached_results = await _get_cached_extraction_results(
         llm_response_cache,
         all_referenced_chunk_ids,
         text_chunks_storage=text_chunks_storage,
+        chunk_file_paths=chunk_file_paths,
     )
 
     if not cached_results:
@@ -571,15 +659,17 @@ async def rebuild_knowledge_from_chunks(
                 pipeline_status["history_messages"].append(status_message)
         return
 
-    # Process cached results to get entities and relationships for each chunk
-    chunk_entities = {}  # chunk_id -> {entity_name: [entity_data]}
-    chunk_relationships = {}  # chunk_id -> {(src, tgt): [relationship_data]}
+    # Parse every cached result once, indexed by entity and by relation:
+    # entity_index: entity_name -> {chunk_id: [entity_data]}
+    # relation_index: sorted (src, tgt) -> {chunk_id: [relationship_data]}
+    entity_index: dict[str, dict[str, list[dict]]] = defaultdict(dict)
+    relation_index: dict[tuple[str, str], dict[str, list[dict]]] = defaultdict(dict)
 
     for chunk_id, results in cached_results.items():
         try:
             # Handle multiple extraction results per chunk
-            chunk_entities[chunk_id] = defaultdict(list)
-            chunk_relationships[chunk_id] = defaultdict(list)
+            chunk_entities = {}  # entity_name -> [entity_data]
+            chunk_relationships = {}  # (src, tgt) -> [relationship_data]
 
             # process multiple LLM extraction results for a single chunk_id
             for result in results:
@@ -588,53 +678,44 @@ async def rebuild_knowledge_from_chunks(
                     chunk_id=chunk_id,
                     extraction_result=result[0],
                     timestamp=result[1],
+                    file_path=chunk_file_paths.get(chunk_id),
                 )
 
                 # Merge entities and relationships from this extraction result
                 # Compare description lengths and keep the better version for the same chunk_id
                 for entity_name, entity_list in entities.items():
-                    if entity_name not in chunk_entities[chunk_id]:
-                        # New entity for this chunk_id
-                        chunk_entities[chunk_id][entity_name].extend(entity_list)
-                    elif len(chunk_entities[chunk_id][entity_name]) == 0:
-                        # Empty list, add the new entities
-                        chunk_entities[chunk_id][entity_name].extend(entity_list)
+                    existing_list = chunk_entities.get(entity_name)
+                    if not existing_list:
+                        # New (or empty) entity for this chunk_id
+                        chunk_entities[entity_name] = list(entity_list)
                     else:
                         # Compare description lengths and keep the better one
                         existing_desc_len = len(
-                            chunk_entities[chunk_id][entity_name][0].get(
-                                "description", ""
-                            )
-                            or ""
+                            existing_list[0].get("description", "") or ""
                         )
                         new_desc_len = len(entity_list[0].get("description", "") or "")
 
                         if new_desc_len > existing_desc_len:
                             # Replace with the new entity that has longer description
-                            chunk_entities[chunk_id][entity_name] = list(entity_list)
+                            chunk_entities[entity_name] = list(entity_list)
                         # Otherwise keep existing version
 
                 # Compare description lengths and keep the better version for the same chunk_id
                 for rel_key, rel_list in relationships.items():
-                    if rel_key not in chunk_relationships[chunk_id]:
-                        # New relationship for this chunk_id
-                        chunk_relationships[chunk_id][rel_key].extend(rel_list)
-                    elif len(chunk_relationships[chunk_id][rel_key]) == 0:
-                        # Empty list, add the new relationships
-                        chunk_relationships[chunk_id][rel_key].extend(rel_list)
+                    existing_list = chunk_relationships.get(rel_key)
+                    if not existing_list:
+                        # New (or empty) relationship for this chunk_id
+                        chunk_relationships[rel_key] = list(rel_list)
                     else:
                         # Compare description lengths and keep the better one
                         existing_desc_len = len(
-                            chunk_relationships[chunk_id][rel_key][0].get(
-                                "description", ""
-                            )
-                            or ""
+                            existing_list[0].get("description", "") or ""
                         )
                         new_desc_len = len(rel_list[0].get("description", "") or "")
 
                         if new_desc_len > existing_desc_len:
                             # Replace with the new relationship that has longer description
-                            chunk_relationships[chunk_id][rel_key] = list(rel_list)
+                            chunk_relationships[rel_key] = list(rel_list)
                         # Otherwise keep existing version
 
         except Exception as e:
@@ -648,103 +729,153 @@ async def rebuild_knowledge_from_chunks(
                     pipeline_status["history_messages"].append(status_message)
             continue
 
-    # Get max async tasks limit from global_config for semaphore control
-    graph_max_async = global_config.get("llm_model_max_async", 4) * 2
-    semaphore = asyncio.Semaphore(graph_max_async)
+        for entity_name, entity_list in chunk_entities.items():
+            entity_index[entity_name][chunk_id] = entity_list
+        # Relationships are undirected: (src, tgt) and (tgt, src) share one index entry
+        for (src, tgt), rel_list in chunk_relationships.items():
+            edge_key = (src, tgt) if src <= tgt else (tgt, src)
+            relation_index[edge_key].setdefault(chunk_id, []).extend(rel_list)
+
+    # Concurrency of the rebuild worker pool
+    graph_max_async = global_config.get("max_parallel_rebuild") or (
+        global_config.get("llm_model_max_async", 4) * 2
+    )
+    workspace = global_config.get("workspace", "")
+    lock_namespace = f"{workspace}:GraphDB" if workspace else "GraphDB"
 
     # Counters for tracking progress
     rebuilt_entities_count = 0
     rebuilt_relationships_count = 0
     failed_entities_count = 0
     failed_relationships_count = 0
+    unchanged_count = 0
+    total_jobs = len(entities_to_rebuild) + len(relationships_to_rebuild)
+    completed_jobs = 0
+    start_time = time.perf_counter()
+    last_report_time = start_time
+
+    async def _report_progress(force: bool = False):
+        nonlocal last_report_time
+        now = time.perf_counter()
+        elapsed = now - start_time
+        eta = (
+            elapsed / completed_jobs * (total_jobs - completed_jobs)
+            if completed_jobs
+            else None
+        )
+        progress = {
+            "total": total_jobs,
+            "completed": completed_jobs,
+            "unchanged": unchanged_count,
+            "failed": failed_entities_count + failed_relationships_count,
+            "elapsed": round(elapsed, 2),
+            "eta": round(eta, 2) if eta is not None else None,
+        }
+        # Throttle status messages; the progress dict itself is always current
+        report_message = force or now - last_report_time >= 2.0
+        if report_message:
+            last_report_time = now
+        if pipeline_status is not None and pipeline_status_lock is not None:
+            async with pipeline_status_lock:
+                pipeline_status["rebuild_progress"] = progress
+                if report_message and completed_jobs < total_jobs:
+                    eta_str = f"{eta:.0f}s" if eta is not None else "unknown"
+                    pipeline_status["latest_message"] = (
+                        f"Rebuild progress: {completed_jobs}/{total_jobs} (ETA {eta_str})"
+                    )
 
     async def _locked_rebuild_entity(entity_name, chunk_ids):
-        nonlocal rebuilt_entities_count, failed_entities_count
-        async with semaphore:
-            workspace = global_config.get("workspace", "")
-            namespace = f"{workspace}:GraphDB" if workspace else "GraphDB"
-            async with get_storage_keyed_lock(
-                [entity_name], namespace=namespace, enable_logging=False
-            ):
-                try:
-                    await _rebuild_single_entity(
-                        knowledge_graph_inst=knowledge_graph_inst,
-                        entities_vdb=entities_vdb,
-                        entity_name=entity_name,
-                        chunk_ids=chunk_ids,
-                        chunk_entities=chunk_entities,
-                        llm_response_cache=llm_response_cache,
-                        global_config=global_config,
-                        entity_chunks_storage=entity_chunks_storage,
-                    )
-                    rebuilt_entities_count += 1
+        nonlocal rebuilt_entities_count, failed_entities_count, unchanged_count
+        async with get_storage_keyed_lock(
+            [entity_name], namespace=lock_namespace, enable_logging=False
+        ):
+            try:
+                unchanged = await _rebuild_single_entity(
+                    knowledge_graph_inst=knowledge_graph_inst,
+                    entities_vdb=entities_vdb,
+                    entity_name=entity_name,
+                    chunk_ids=chunk_ids,
+                    entity_chunk_data=entity_index.get(entity_name, {}),
+                    llm_response_cache=llm_response_cache,
+                    global_config=global_config,
+                    entity_chunks_storage=entity_chunks_storage,
+                )
+                rebuilt_entities_count += 1
+                if unchanged:
+                    unchanged_count += 1
+                    status_message = f"Unchanged `{entity_name}`: kept summary from {len(chunk_ids)} chunks"
+                else:
                     status_message = (
                         f"Rebuild `{entity_name}` from {len(chunk_ids)} chunks"
                     )
-                    logger.info(status_message)
-                    if pipeline_status is not None and pipeline_status_lock is not None:
-                        async with pipeline_status_lock:
-                            pipeline_status["latest_message"] = status_message
-                            pipeline_status["history_messages"].append(status_message)
-                except Exception as e:
-                    failed_entities_count += 1
-                    status_message = f"Failed to rebuild `{entity_name}`: {e}"
-                    logger.info(status_message)  # Per requirement, change to info
-                    if pipeline_status is not None and pipeline_status_lock is not None:
-                        async with pipeline_status_lock:
-                            pipeline_status["latest_message"] = status_message
-                            pipeline_status["history_messages"].append(status_message)
+                logger.info(status_message)
+                if pipeline_status is not None and pipeline_status_lock is not None:
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = status_message
+                        pipeline_status["history_messages"].append(status_message)
+            except Exception as e:
+                failed_entities_count += 1
+                status_message = f"Failed to rebuild `{entity_name}`: {e}"
+                logger.info(status_message)  # Per requirement, change to info
+                if pipeline_status is not None and pipeline_status_lock is not None:
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = status_message
+                        pipeline_status["history_messages"].append(status_message)
 
     async def _locked_rebuild_relationship(src, tgt, chunk_ids):
         nonlocal rebuilt_relationships_count, failed_relationships_count
-        async with semaphore:
-            workspace = global_config.get("workspace", "")
-            namespace = f"{workspace}:GraphDB" if workspace else "GraphDB"
-            # Sort src and tgt to ensure order-independent lock key generation
-            sorted_key_parts = sorted([src, tgt])
-            async with get_storage_keyed_lock(
-                sorted_key_parts,
-                namespace=namespace,
-                enable_logging=False,
-            ):
-                try:
-                    await _rebuild_single_relationship(
-                        knowledge_graph_inst=knowledge_graph_inst,
-                        relationships_vdb=relationships_vdb,
-                        entities_vdb=entities_vdb,
-                        src=src,
-                        tgt=tgt,
-                        chunk_ids=chunk_ids,
-                        chunk_relationships=chunk_relationships,
-                        llm_response_cache=llm_response_cache,
-                        global_config=global_config,
-                        relation_chunks_storage=relation_chunks_storage,
-                        entity_chunks_storage=entity_chunks_storage,
-                        pipeline_status=pipeline_status,
-                        pipeline_status_lock=pipeline_status_lock,
-                    )
-                    rebuilt_relationships_count += 1
-                except Exception as e:
-                    failed_relationships_count += 1
-                    status_message = f"Failed to rebuild `{src}`~`{tgt}`: {e}"
-                    logger.info(status_message)  # Per requirement, change to info
-                    if pipeline_status is not None and pipeline_status_lock is not None:
-                        async with pipeline_status_lock:
-                            pipeline_status["latest_message"] = status_message
-                            pipeline_status["history_messages"].append(status_message)
-
-    # Create tasks for parallel processing
-    tasks = []
-
-    # Add entity rebuilding tasks
-    for entity_name, chunk_ids in entities_to_rebuild.items():
-        task = asyncio.create_task(_locked_rebuild_entity(entity_name, chunk_ids))
-        tasks.append(task)
+        nonlocal unchanged_count
+        # Sort src and tgt to ensure order-independent lock key generation
+        sorted_key_parts = sorted([src, tgt])
+        async with get_storage_keyed_lock(
+            sorted_key_parts,
+            namespace=lock_namespace,
+            enable_logging=False,
+        ):
+            try:
+                unchanged = await _rebuild_single_relationship(
+                    knowledge_graph_inst=knowledge_graph_inst,
+                    relationships_vdb=relationships_vdb,
+                    entities_vdb=entities_vdb,
+                    src=src,
+                    tgt=tgt,
+                    chunk_ids=chunk_ids,
+                    relation_chunk_data=relation_index.get(tuple(sorted_key_parts), {}),
+                    llm_response_cache=llm_response_cache,
+                    global_config=global_config,
+                    relation_chunks_storage=relation_chunks_storage,
+                    entity_chunks_storage=entity_chunks_storage,
+                    pipeline_status=pipeline_status,
+                    pipeline_status_lock=pipeline_status_lock,
+                )
+                rebuilt_relationships_count += 1
+                if unchanged:
+                    unchanged_count += 1
+            except Exception as e:
+                failed_relationships_count += 1
+                status_message = f"Failed to rebuild `{src}`~`{tgt}`: {e}"
+                logger.info(status_message)  # Per requirement, change to info
+                if pipeline_status is not None and pipeline_status_lock is not None:
+                    async with pipeline_status_lock:
+                        pipeline_status["latest_message"] = status_message
+                        pipeline_status["history_messages"].append(status_message)
+
+    # Schedule entities first, then relationships, on a fixed pool of workers
+    jobs = [
+        partial(_locked_rebuild_entity, entity_name, chunk_ids)
+        for entity_name, chunk_ids in entities_to_rebuild.items()
+    ] + [
+        partial(_locked_rebuild_relationship, src, tgt, chunk_ids)
+        for (src, tgt), chunk_ids in relationships_to_rebuild.items()
+    ]
+    job_iter = iter(jobs)
 
-    # Add relationship rebuilding tasks
-    for (src, tgt), chunk_ids in relationships_to_rebuild.items():
-        task = asyncio.create_task(_locked_rebuild_relationship(src, tgt, chunk_ids))
-        tasks.append(task)
+    async def _rebuild_worker():
+        nonlocal completed_jobs
+        for job in job_iter:
+            await job()
+            completed_jobs += 1
+            await _report_progress()
 
     # Log parallel processing start
     status_message = f"Starting parallel rebuild of {len(entities_to_rebuild)} entities and {len(relationships_to_rebuild)} relationships (async: {graph_max_async})"
@@ -753,8 +884,14 @@ async def rebuild_knowledge_from_chunks(
         async with pipeline_status_lock:
             pipeline_status["latest_message"] = status_message
             pipeline_status["history_messages"].append(status_message)
+    await _report_progress()
 
-    # Execute all tasks in parallel with semaphore control and early failure detection
+    tasks = [
+        asyncio.create_task(_rebuild_worker())
+        for _ in range(min(graph_max_async, len(jobs)))
+    ]
+
+    # Execute all workers in parallel with early failure detection
     done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
 
     # Check if any task raised an exception and ensure all exceptions are retrieved
@@ -786,8 +923,11 @@ async def rebuild_knowledge_from_chunks(
         # Re-raise the first exception to notify the caller
         raise first_exception
 
+    await _report_progress(force=True)
+
     # Final status report
-    status_message = f"KG rebuild completed: {rebuilt_entities_count} entities and {rebuilt_relationships_count} relationships rebuilt successfully."
+    elapsed = time.perf_counter() - start_time
+    status_message = f"KG rebuild completed in {elapsed:.1f}s: {rebuilt_entities_count} entities and {rebuilt_relationships_count} relationships rebuilt successfully ({unchanged_count} unchanged)."
     if failed_entities_count > 0 or failed_relationships_count > 0:
         status_message += f" Failed: {failed_entities_count} entities, {failed_relationships_count} relationships."
 
@@ -802,6 +942,7 @@ async def _get_cached_extraction_results(
     llm_response_cache: BaseKVStorage,
     chunk_ids: set[str],
     text_chunks_storage: BaseKVStorage,
+    chunk_file_paths: dict[str, str] | None = None,
 ) -> dict[str, list[str]]:
     """Get cached extraction results for specific chunk IDs
 
@@ -814,6 +955,7 @@ async def _get_cached_extraction_results(
         llm_response_cache: LLM response cache storage
         chunk_ids: Set of chunk IDs to get cached results for
         text_chunks_storage: Text chunks storage for retrieving chunk data and LLM cache references
+        chunk_file_paths: Optional dict filled with chunk_id -> file_path from the fetched chunks
 
     Returns:
         Dict mapping chunk_id -> list of extraction_result_text, where:
@@ -826,12 +968,17 @@ async def _get_cached_extraction_results(
     all_cache_ids = set()
 
     # Read from storage
-    chunk_data_list = await text_chunks_storage.get_by_ids(list(chunk_ids))
-    for chunk_data in chunk_data_list:
+    chunk_id_list = list(chunk_ids)
+    chunk_data_list = await text_chunks_storage.get_by_ids(chunk_id_list)
+    for chunk_id, chunk_data in zip(chunk_id_list, chunk_data_list):
         if chunk_data and isinstance(chunk_data, dict):
             llm_cache_list = chunk_data.get("llm_cache_list", [])
             if llm_cache_list:
                 all_cache_ids.update(llm_cache_list)
+            if chunk_file_paths is not None:
+                chunk_file_paths[chunk_id] = chunk_data.get(
+                    "file_path", "unknown_source"
+                )
         else:
             logger.warning(f"Chunk data is invalid or None: {chunk_data}")
 
@@ -915,67 +1062,18 @@ async def _process_extraction_result(
             f"{chunk_key}: Complete delimiter can not be found in extraction result"
         )
 
-    # Split LLL output result to records by "\n"
-    records = split_string_by_multi_markers(
-        result,
-        ["\n", completion_delimiter, completion_delimiter.lower()],
-    )
-
-    # Fix LLM output format error which use tuple_delimiter to seperate record instead of "\n"
-    fixed_records = []
-    for record in records:
-        record = record.strip()
-        if record is None:
-            continue
-        entity_records = split_string_by_multi_markers(
-            record, [f"{tuple_delimiter}entity{tuple_delimiter}"]
-        )
-        for entity_record in entity_records:
-            if not entity_record.startswith("entity") and not entity_record.startswith(
-                "relation"
-            ):
-                entity_record = f"entity<|{entity_record}"
-            entity_relation_records = split_string_by_multi_markers(
-                # treat "relationship" and "relation" interchangeable
-                entity_record,
-                [
-                    f"{tuple_delimiter}relationship{tuple_delimiter}",
-                    f"{tuple_delimiter}relation{tuple_delimiter}",
-                ],
-            )
-            for entity_relation_record in entity_relation_records:
-                if not entity_relation_record.startswith(
-                    "entity"
-                ) and not entity_relation_record.startswith("relation"):
-                    entity_relation_record = (
-                        f"relation{tuple_delimiter}{entity_relation_record}"
-                    )
-                fixed_records = fixed_records + [entity_relation_record]
-
-    if len(fixed_records) != len(records):
+    # Split LLM output into records and records into fields in a single pass,
+    # fixing records separated by tuple_delimiter instead of "\n"
+    parser = get_extraction_record_parser(tuple_delimiter, completion_delimiter)
+    records, delimiter_separated = parser.parse(result)
+    if delimiter_separated:
         logger.warning(
             f"{chunk_key}: LLM output format error; find LLM use {tuple_delimiter} as record seperators instead new-line"
         )
 
-    for record in fixed_records:
-        record = record.strip()
-        if record is None:
-            continue
-
-        # Fix various forms of tuple_delimiter corruption from the LLM output using the dedicated function
-        delimiter_core = tuple_delimiter[2:-2]  # Extract "#" from "<|#|>"
-        record = fix_tuple_delimiter_corruption(record, delimiter_core, tuple_delimiter)
-        if delimiter_core != delimiter_core.lower():
-            # change delimiter_core to lower case, and fix again
-            delimiter_core = delimiter_core.lower()
-            record = fix_tuple_delimiter_corruption(
-                record, delimiter_core, tuple_delimiter
-            )
-
-        record_attributes = split_string_by_multi_markers(record, [tuple_delimiter])
-
+    for record_attributes in records:
         # Try to parse as entity
-        entity_data = await _handle_single_entity_extraction(
+        entity_data = _handle_single_entity_extraction(
             record_attributes, chunk_key, timestamp, file_path
         )
         if entity_data is not None:
@@ -990,7 +1088,7 @@ async def _process_extraction_result(
             continue
 
         # Try to parse as relationship
-        relationship_data = await _handle_single_relationship_extraction(
+        relationship_data = _handle_single_relationship_extraction(
             record_attributes, chunk_key, timestamp, file_path
         )
         if relationship_data is not None:
@@ -1018,6 +1116,7 @@ async def _rebuild_from_extraction_result(
     extraction_result: str,
     chunk_id: str,
     timestamp: int,
+    file_path: str | None = None,
 ) -> tuple[dict, dict]:
     """Parse cached extraction result using the same logic as extract_entities
 
@@ -1025,18 +1124,20 @@ async def _rebuild_from_extraction_result(
         text_chunks_storage: Text chunks storage to get chunk data
         extraction_result: The cached LLM extraction result
         chunk_id: The chunk ID for source tracking
+        file_path: File path of the chunk, looked up from storage when not given
 
     Returns:
         Tuple of (entities_dict, relationships_dict)
     """
 
-    # Get chunk data for file_path from storage
-    chunk_data = await text_chunks_storage.get_by_id(chunk_id)
-    file_path = (
-        chunk_data.get("file_path", "unknown_source")
-        if chunk_data
-        else "unknown_source"
-    )
+    if file_path is None:
+        # Get chunk data for file_path from storage
+        chunk_data = await text_chunks_storage.get_by_id(chunk_id)
+        file_path = (
+            chunk_data.get("file_path", "unknown_source")
+            if chunk_data
+            else "unknown_source"
+        )
 
     # Call the shared processing function
     return await _process_extraction_result(
@@ -1054,27 +1155,36 @@ async def _rebuild_single_entity(
     entities_vdb: BaseVectorStorage,
     entity_name: str,
     chunk_ids: list[str],
-    chunk_entities: dict,
+    entity_chunk_data: dict[str, list[dict]],
     llm_response_cache: BaseKVStorage,
     global_config: dict[str, str],
     entity_chunks_storage: BaseKVStorage | None = None,
     pipeline_status: dict | None = None,
     pipeline_status_lock=None,
-) -> None:
-    """Rebuild a single entity from cached extraction results"""
+) -> bool:
+    """Rebuild a single entity from cached extraction results
+
+    Args:
+        entity_chunk_data: Parsed entity records of this entity, keyed by chunk_id
+
+    Returns:
+        bool: True if the remaining description set was unchanged and the summary was kept
+    """
 
     # Get current entity data
     current_entity = await knowledge_graph_inst.get_node(entity_name)
     if not current_entity:
-        return
+        return False
 
     # Helper function to update entity in both graph and vector storage
     async def _update_entity_storage(
         final_description: str,
         entity_type: str,
         file_paths: list[str],
-        source_chunk_ids: list[str],
+        source_chunk_ids: ChunkIdSet,
         truncation_info: str = "",
+        description_hashes: str = "",
+        update_vdb: bool = True,
     ):
         try:
             # Update entity in graph storage (critical path)
@@ -1082,15 +1192,20 @@ async def _rebuild_single_entity(
                 **current_entity,
                 "description": final_description,
                 "entity_type": entity_type,
-                "source_id": GRAPH_FIELD_SEP.join(source_chunk_ids),
+                "source_id": source_chunk_ids.join(),
                 "file_path": GRAPH_FIELD_SEP.join(file_paths)
                 if file_paths
                 else current_entity.get("file_path", "unknown_source"),
                 "created_at": int(time.time()),
                 "truncate": truncation_info,
+                "description_hashes": description_hashes,
             }
             await knowledge_graph_inst.upsert_node(entity_name, updated_entity_data)
 
+            # Same description and type: the stored embedding is still valid
+            if not update_vdb:
+                return
+
             # Update entity in vector database (equally critical)
             entity_vdb_id = compute_mdhash_id(entity_name, prefix="ent-")
             entity_content = f"{entity_name}\n{final_description}"
@@ -1120,14 +1235,15 @@ async def _rebuild_single_entity(
             logger.error(error_msg)
             raise  # Re-raise exception
 
-    # normalized_chunk_ids = merge_source_ids([], chunk_ids)
-    normalized_chunk_ids = chunk_ids
+    normalized_chunk_ids = ChunkIdSet.from_ids(
+        chunk_ids, global_config.get("workspace", "")
+    )
 
     if entity_chunks_storage is not None and normalized_chunk_ids:
         await entity_chunks_storage.upsert(
             {
                 entity_name: {
-                    "chunk_ids": normalized_chunk_ids,
+                    "chunk_ids": normalized_chunk_ids.to_list(),
                     "count": len(normalized_chunk_ids),
                 }
             }
@@ -1137,8 +1253,7 @@ async def _rebuild_single_entity(
         global_config.get("source_ids_limit_method") or SOURCE_IDS_LIMIT_METHOD_KEEP
     )
 
-    limited_chunk_ids = apply_source_ids_limit(
-        normalized_chunk_ids,
+    limited_chunk_ids = normalized_chunk_ids.limit(
         global_config["max_source_ids_per_entity"],
         limit_method,
         identifier=f"`{entity_name}`",
@@ -1147,8 +1262,8 @@ async def _rebuild_single_entity(
     # Collect all entity data from relevant (limited) chunks
     all_entity_data = []
     for chunk_id in limited_chunk_ids:
-        if chunk_id in chunk_entities and entity_name in chunk_entities[chunk_id]:
-            all_entity_data.extend(chunk_entities[chunk_id][entity_name])
+        if chunk_id in entity_chunk_data:
+            all_entity_data.extend(entity_chunk_data[chunk_id])
 
     if not all_entity_data:
         logger.warning(
@@ -1159,7 +1274,7 @@ async def _rebuild_single_entity(
         edges = await knowledge_graph_inst.get_node_edges(entity_name)
         if not edges:
             logger.warning(f"No relations attached to entity `{entity_name}`")
-            return
+            return False
 
         # Collect relationship data to extract entity information
         relationship_descriptions = []
@@ -1199,7 +1314,7 @@ async def _rebuild_single_entity(
             file_paths,
             limited_chunk_ids,
         )
-        return
+        return False
 
     # Process cached entity data
     descriptions = []
@@ -1252,8 +1367,18 @@ async def _rebuild_single_entity(
         else current_entity.get("entity_type", "UNKNOWN")
     )
 
+    # Keep the current summary if it already covers exactly the remaining descriptions
+    description_hashes = _description_fingerprint(description_list)
+    unchanged = bool(
+        description_list
+        and current_entity.get("description")
+        and description_hashes == current_entity.get("description_hashes")
+    )
+
     # Generate final description from entities or fallback to current
-    if description_list:
+    if unchanged:
+        final_description = current_entity["description"]
+    elif description_list:
         final_description, _ = await _handle_entity_relation_summary(
             "Entity",
             entity_name,
@@ -1278,6 +1403,8 @@ async def _rebuild_single_entity(
         file_paths_list,
         limited_chunk_ids,
         truncation_info,
+        description_hashes=description_hashes,
+        update_vdb=not (unchanged and entity_type == current_entity.get("entity_type")),
     )
 
     # Log rebuild completion with truncation info
@@ -1290,6 +1417,7 @@ async def _rebuild_single_entity(
         async with pipeline_status_lock:
             pipeline_status["latest_message"] = status_message
             pipeline_status["history_messages"].append(status_message)
+    return unchanged
 
 
 async def _rebuild_single_relationship(
@@ -1299,34 +1427,41 @@ async def _rebuild_single_relationship(
     src: str,
     tgt: str,
     chunk_ids: list[str],
-    chunk_relationships: dict,
+    relation_chunk_data: dict[str, list[dict]],
     llm_response_cache: BaseKVStorage,
     global_config: dict[str, str],
     relation_chunks_storage: BaseKVStorage | None = None,
     entity_chunks_storage: BaseKVStorage | None = None,
     pipeline_status: dict | None = None,
     pipeline_status_lock=None,
-) -> None:
+) -> bool:
     """Rebuild a single relationship from cached extraction results
 
     Note: This function assumes the caller has already acquired the appropriate
     keyed lock for the relationship pair to ensure thread safety.
+
+    Args:
+        relation_chunk_data: Parsed records of this relation (either direction), keyed by chunk_id
+
+    Returns:
+        bool: True if the remaining description set was unchanged and the summary was kept
     """
 
     # Get current relationship data
     current_relationship = await knowledge_graph_inst.get_edge(src, tgt)
     if not current_relationship:
-        return
+        return False
 
-    # normalized_chunk_ids = merge_source_ids([], chunk_ids)
-    normalized_chunk_ids = chunk_ids
+    normalized_chunk_ids = ChunkIdSet.from_ids(
+        chunk_ids, global_config.get("workspace", "")
+    )
 
     if relation_chunks_storage is not None and normalized_chunk_ids:
         storage_key = make_relation_chunk_key(src, tgt)
         await relation_chunks_storage.upsert(
             {
                 storage_key: {
-                    "chunk_ids": normalized_chunk_ids,
+                    "chunk_ids": normalized_chunk_ids.to_list(),
                     "count": len(normalized_chunk_ids),
                 }
             }
@@ -1335,8 +1470,7 @@ async def _rebuild_single_relationship(
     limit_method = (
         global_config.get("source_ids_limit_method") or SOURCE_IDS_LIMIT_METHOD_KEEP
     )
-    limited_chunk_ids = apply_source_ids_limit(
-        normalized_chunk_ids,
+    limited_chunk_ids = normalized_chunk_ids.limit(
         global_config["max_source_ids_per_relation"],
         limit_method,
         identifier=f"`{src}`~`{tgt}`",
@@ -1345,17 +1479,12 @@ async def _rebuild_single_relationship(
     # Collect all relationship data from relevant chunks
     all_relationship_data = []
     for chunk_id in limited_chunk_ids:
-        if chunk_id in chunk_relationships:
-            # Check both (src, tgt) and (tgt, src) since relationships can be bidirectional
-            for edge_key in [(src, tgt), (tgt, src)]:
-                if edge_key in chunk_relationships[chunk_id]:
-                    all_relationship_data.extend(
-                        chunk_relationships[chunk_id][edge_key]
-                    )
+        if chunk_id in relation_chunk_data:
+            all_relationship_data.extend(relation_chunk_data[chunk_id])
 
     if not all_relationship_data:
         logger.warning(f"No relation data found for `{src}-{tgt}`")
-        return
+        return False
 
     # Merge descriptions and keywords
     descriptions = []
@@ -1412,8 +1541,18 @@ async def _rebuild_single_relationship(
 
     weight = sum(weights) if weights else current_relationship.get("weight", 1.0)
 
+    # Keep the current summary if it already covers exactly the remaining descriptions
+    description_hashes = _description_fingerprint(description_list)
+    unchanged = bool(
+        description_list
+        and current_relationship.get("description")
+        and description_hashes == current_relationship.get("description_hashes")
+    )
+
     # Generate final description from relations or fallback to current
-    if description_list:
+    if unchanged:
+        final_description = current_relationship["description"]
+    elif description_list:
         final_description, _ = await _handle_entity_relation_summary(
             "Relation",
             f"{src}-{tgt}",
@@ -1445,11 +1584,12 @@ async def _rebuild_single_relationship(
         else current_relationship.get("description", ""),
         "keywords": combined_keywords,
         "weight": weight,
-        "source_id": GRAPH_FIELD_SEP.join(limited_chunk_ids),
+        "source_id": limited_chunk_ids.join(),
         "file_path": GRAPH_FIELD_SEP.join([fp for fp in file_paths_list if fp])
         if file_paths_list
         else current_relationship.get("file_path", "unknown_source"),
         "truncate": truncation_info,
+        "description_hashes": description_hashes,
     }
 
     # Ensure both endpoint nodes exist before writing the edge back
@@ -1481,7 +1621,7 @@ async def _rebuild_single_relationship(
                 await entity_chunks_storage.upsert(
                     {
                         node_id: {
-                            "chunk_ids": limited_chunk_ids,
+                            "chunk_ids": limited_chunk_ids.to_list(),
                             "count": len(limited_chunk_ids),
                         }
                     }
@@ -1510,47 +1650,58 @@ async def _rebuild_single_relationship(
 
     await knowledge_graph_inst.upsert_edge(src, tgt, updated_relationship_data)
 
-    # Update relationship in vector database
-    try:
-        rel_vdb_id = compute_mdhash_id(src + tgt, prefix="rel-")
-        rel_vdb_id_reverse = compute_mdhash_id(tgt + src, prefix="rel-")
+    # Same description and keywords: the stored embedding is still valid
+    def _keyword_set(value: str) -> set[str]:
+        return {k.strip() for k in value.split(",") if k.strip()}
 
-        # Delete old vector records first (both directions to be safe)
+    update_vdb = not (
+        unchanged
+        and _keyword_set(combined_keywords)
+        == _keyword_set(current_relationship.get("keywords", ""))
+    )
+
+    # Update relationship in vector database
+    if update_vdb:
         try:
-            await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
-        except Exception as e:
-            logger.debug(
-                f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
-            )
+            rel_vdb_id = compute_mdhash_id(src + tgt, prefix="rel-")
+            rel_vdb_id_reverse = compute_mdhash_id(tgt + src, prefix="rel-")
 
-        # Insert new vector record
-        rel_content = f"{combined_keywords}\t{src}\n{tgt}\n{final_description}"
-        vdb_data = {
-            rel_vdb_id: {
-                "src_id": src,
-                "tgt_id": tgt,
-                "source_id": updated_relationship_data["source_id"],
-                "content": rel_content,
-                "keywords": combined_keywords,
-                "description": final_description,
-                "weight": weight,
-                "file_path": updated_relationship_data["file_path"],
+            # Delete old vector records first (both directions to be safe)
+            try:
+                await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
+            except Exception as e:
+                logger.debug(
+                    f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
+                )
+
+            # Insert new vector record
+            rel_content = f"{combined_keywords}\t{src}\n{tgt}\n{final_description}"
+            vdb_data = {
+                rel_vdb_id: {
+                    "src_id": src,
+                    "tgt_id": tgt,
+                    "source_id": updated_relationship_data["source_id"],
+                    "content": rel_content,
+                    "keywords": combined_keywords,
+                    "description": final_description,
+                    "weight": weight,
+                    "file_path": updated_relationship_data["file_path"],
+                }
             }
-        }
 
-        # Use safe operation wrapper - VDB failure must throw exception
-        await safe_vdb_operation_with_exception(
-            operation=lambda: relationships_vdb.upsert(vdb_data),
-            operation_name="rebuild_relationship_upsert",
-            entity_name=f"{src}-{tgt}",
-            max_retries=3,
-            retry_delay=0.2,
-        )
+            # Use safe operation wrapper - VDB failure must throw exception
+            await safe_vdb_operation_with_exception(
+                operation=lambda: relationships_vdb.upsert(vdb_data),
+                operation_name="rebuild_relationship_upsert",
+                entity_name=f"{src}-{tgt}",
+                max_retries=3,
+                retry_delay=0.2,
+            )
 
-    except Exception as e:
-        error_msg = f"Failed to rebuild relationship storage for `{src}-{tgt}`: {e}"
-        logger.error(error_msg)
-        raise  # Re-raise exception
+        except Exception as e:
+            error_msg = f"Failed to rebuild relationship storage for `{src}-{tgt}`: {e}"
+            logger.error(error_msg)
+            raise  # Re-raise exception
 
     # Log rebuild completion with truncation info
     status_message = f"Rebuild `{src}`~`{tgt}` from {len(chunk_ids)} chunks"
@@ -1562,6 +1713,8 @@ async def _rebuild_single_relationship(
             f" ({limit_method}:{len(limited_chunk_ids)}/{len(normalized_chunk_ids)})"
         )
         status_message += truncation_info
+    if unchanged:
+        status_message += " (unchanged summary kept)"
 
     logger.info(status_message)
 
@@ -1570,6 +1723,7 @@ async def _rebuild_single_relationship(
         async with pipeline_status_lock:
             pipeline_status["latest_message"] = status_message
             pipeline_status["history_messages"].append(status_message)
+    return unchanged
 
 
 async def _merge_nodes_then_upsert(
@@ -1584,8 +1738,9 @@ async def _merge_nodes_then_upsert(
     entity_chunks_storage: BaseKVStorage | None = None,
 ):
     """Get existing nodes from knowledge graph use name,if exists, merge data, else create, then upsert."""
+    workspace = global_config.get("workspace", "")
     already_entity_types = []
-    already_source_ids = []
+    already_source_ids = ChunkIdSet(workspace)
     already_description = []
     already_file_paths = []
 
@@ -1593,33 +1748,38 @@ async def _merge_nodes_then_upsert(
     already_node = await knowledge_graph_inst.get_node(entity_name)
     if already_node:
         already_entity_types.append(already_node["entity_type"])
-        already_source_ids.extend(already_node["source_id"].split(GRAPH_FIELD_SEP))
+        already_source_ids = ChunkIdSet.from_joined(
+            already_node["source_id"], workspace
+        )
         already_file_paths.extend(already_node["file_path"].split(GRAPH_FIELD_SEP))
         already_description.extend(already_node["description"].split(GRAPH_FIELD_SEP))
 
     new_source_ids = [dp["source_id"] for dp in nodes_data if dp.get("source_id")]
 
-    existing_full_source_ids = []
+    existing_full_source_ids = ChunkIdSet(workspace)
     if entity_chunks_storage is not None:
         stored_chunks = await entity_chunks_storage.get_by_id(entity_name)
         if stored_chunks and isinstance(stored_chunks, dict):
-            existing_full_source_ids = [
-                chunk_id for chunk_id in stored_chunks.get("chunk_ids", []) if chunk_id
-            ]
+            existing_full_source_ids = ChunkIdSet.from_ids(
+                stored_chunks.get("chunk_ids"), workspace
+            )
+    stored_full_source_ids = bool(existing_full_source_ids)
 
     if not existing_full_source_ids:
-        existing_full_source_ids = [
-            chunk_id for chunk_id in already_source_ids if chunk_id
-        ]
+        existing_full_source_ids = already_source_ids
 
     # 2. Merging new source ids with existing ones
-    full_source_ids = merge_source_ids(existing_full_source_ids, new_source_ids)
+    full_source_ids = existing_full_source_ids.union(new_source_ids)
 
-    if entity_chunks_storage is not None and full_source_ids:
+    if (
+        entity_chunks_storage is not None
+        and full_source_ids
+        and not (stored_full_source_ids and full_source_ids is existing_full_source_ids)
+    ):
         await entity_chunks_storage.upsert(
             {
                 entity_name: {
-                    "chunk_ids": full_source_ids,
+                    "chunk_ids": full_source_ids.to_list(),
                     "count": len(full_source_ids),
                 }
             }
@@ -1628,8 +1788,7 @@ async def _merge_nodes_then_upsert(
     # 3. Finalize source_id by applying source ids limit
     limit_method = global_config.get("source_ids_limit_method")
     max_source_limit = global_config.get("max_source_ids_per_entity")
-    source_ids = apply_source_ids_limit(
-        full_source_ids,
+    source_ids = full_source_ids.limit(
         max_source_limit,
         limit_method,
         identifier=f"`{entity_name}`",
@@ -1661,7 +1820,7 @@ async def _merge_nodes_then_upsert(
     ):
         if already_node:
             logger.info(
-                f"Skipped `{entity_name}`: KEEP old chunks {already_source_ids}/{len(full_source_ids)}"
+                f"Skipped `{entity_name}`: KEEP old chunks {len(already_source_ids)}/{len(full_source_ids)}"
             )
             existing_node_data = dict(already_node)
             return existing_node_data
@@ -1672,7 +1831,7 @@ async def _merge_nodes_then_upsert(
             )
 
     # 6.1 Finalize source_id
-    source_id = GRAPH_FIELD_SEP.join(source_ids)
+    source_id = source_ids.join()
 
     # 6.2 Finalize entity type by highest count
     entity_type = sorted(
@@ -1699,6 +1858,28 @@ async def _merge_nodes_then_upsert(
     )
     sorted_descriptions = [dp["description"] for dp in sorted_nodes]
 
+    # Fragments the stored summary does not cover yet
+    stored_fingerprint = (
+        already_node.get("description_hashes") if already_node else None
+    )
+    if already_node and _parse_description_fingerprint(stored_fingerprint) is None:
+        # Stored before fingerprints existed: seed it from the stored description fragments
+        stored_fingerprint = _description_fingerprint(already_description)
+    if already_node:
+        uncovered_descriptions = [
+            dp["description"]
+            for dp in _filter_covered_fragments(
+                sorted_nodes, already_description, existing_full_source_ids
+            )
+        ]
+    else:
+        uncovered_descriptions = sorted_descriptions
+
+    # Incremental summary: only fold fragments the stored summary does not cover yet
+    incremental = global_config.get("summary_incremental", False) and bool(already_node)
+    if incremental:
+        sorted_descriptions = uncovered_descriptions
+
     # Combine already_description with sorted new sorted descriptions
     description_list = already_description + sorted_descriptions
     if not description_list:
@@ -1712,14 +1893,26 @@ async def _merge_nodes_then_upsert(
                 raise PipelineCancelledException("User cancelled during entity summary")
 
     # 8. Get summary description an LLM usage status
-    description, llm_was_used = await _handle_entity_relation_summary(
-        "Entity",
-        entity_name,
-        description_list,
-        GRAPH_FIELD_SEP,
-        global_config,
-        llm_response_cache,
-    )
+    if incremental and not sorted_descriptions:
+        # Every new fragment is already covered: keep the stored summary as is
+        description, llm_was_used = already_node["description"], False
+    else:
+        description, llm_was_used = await _handle_entity_relation_summary(
+            "Entity",
+            entity_name,
+            description_list,
+            GRAPH_FIELD_SEP,
+            global_config,
+            llm_response_cache,
+        )
+
+    # Fragments covered by the summary
+    if not already_node:
+        description_hashes = _description_fingerprint(sorted_descriptions)
+    else:
+        description_hashes = _description_fingerprint(
+            uncovered_descriptions, stored_fingerprint
+        )
 
     # 9. Build file_path within MAX_FILE_PATHS
     file_paths_list = []
@@ -1822,6 +2015,7 @@ async def _merge_nodes_then_upsert(
         file_path=file_path,
         created_at=int(time.time()),
         truncate=truncation_info,
+        description_hashes=description_hashes,
     )
     await knowledge_graph_inst.upsert_node(
         entity_name,
@@ -1868,9 +2062,10 @@ async def _merge_edges_then_upsert(
     if src_id == tgt_id:
         return None
 
+    workspace = global_config.get("workspace", "")
     already_edge = None
     already_weights = []
-    already_source_ids = []
+    already_source_ids = ChunkIdSet(workspace)
     already_description = []
     already_keywords = []
     already_file_paths = []
@@ -1885,8 +2080,8 @@ async def _merge_edges_then_upsert(
 
             # Get source_id with empty string default if missing or None
             if already_edge.get("source_id") is not None:
-                already_source_ids.extend(
-                    already_edge["source_id"].split(GRAPH_FIELD_SEP)
+                already_source_ids = ChunkIdSet.from_joined(
+                    already_edge["source_id"], workspace
                 )
 
             # Get file_path with empty string default if missing or None
@@ -1912,27 +2107,30 @@ async def _merge_edges_then_upsert(
     new_source_ids = [dp["source_id"] for dp in edges_data if dp.get("source_id")]
 
     storage_key = make_relation_chunk_key(src_id, tgt_id)
-    existing_full_source_ids = []
+    existing_full_source_ids = ChunkIdSet(workspace)
     if relation_chunks_storage is not None:
         stored_chunks = await relation_chunks_storage.get_by_id(storage_key)
         if stored_chunks and isinstance(stored_chunks, dict):
-            existing_full_source_ids = [
-                chunk_id for chunk_id in stored_chunks.get("chunk_ids", []) if chunk_id
-            ]
+            existing_full_source_ids = ChunkIdSet.from_ids(
+                stored_chunks.get("chunk_ids"), workspace
+            )
+    stored_full_source_ids = bool(existing_full_source_ids)
 
     if not existing_full_source_ids:
-        existing_full_source_ids = [
-            chunk_id for chunk_id in already_source_ids if chunk_id
-        ]
+        existing_full_source_ids = already_source_ids
 
     # 2. Merge new source ids with existing ones
-    full_source_ids = merge_source_ids(existing_full_source_ids, new_source_ids)
+    full_source_ids = existing_full_source_ids.union(new_source_ids)
 
-    if relation_chunks_storage is not None and full_source_ids:
+    if (
+        relation_chunks_storage is not None
+        and full_source_ids
+        and not (stored_full_source_ids and full_source_ids is existing_full_source_ids)
+    ):
         await relation_chunks_storage.upsert(
             {
                 storage_key: {
-                    "chunk_ids": full_source_ids,
+                    "chunk_ids": full_source_ids.to_list(),
                     "count": len(full_source_ids),
                 }
             }
@@ -1941,8 +2139,7 @@ async def _merge_edges_then_upsert(
     # 3. Finalize source_id by applying source ids limit
     limit_method = global_config.get("source_ids_limit_method")
     max_source_limit = global_config.get("max_source_ids_per_relation")
-    source_ids = apply_source_ids_limit(
-        full_source_ids,
+    source_ids = full_source_ids.limit(
         max_source_limit,
         limit_method,
         identifier=f"`{src_id}`~`{tgt_id}`",
@@ -1977,7 +2174,7 @@ async def _merge_edges_then_upsert(
     ):
         if already_edge:
             logger.info(
-                f"Skipped `{src_id}`~`{tgt_id}`: KEEP old chunks  {already_source_ids}/{len(full_source_ids)}"
+                f"Skipped `{src_id}`~`{tgt_id}`: KEEP old chunks  {len(already_source_ids)}/{len(full_source_ids)}"
             )
             existing_edge_data = dict(already_edge)
             return existing_edge_data
@@ -1990,7 +2187,7 @@ async def _merge_edges_then_upsert(
             )
 
     # 6.1 Finalize source_id
-    source_id = GRAPH_FIELD_SEP.join(source_ids)
+    source_id = source_ids.join()
 
     # 6.2 Finalize weight by summing new edges and existing weights
     weight = sum([dp["weight"] for dp in edges_data] + already_weights)
@@ -2026,6 +2223,28 @@ async def _merge_edges_then_upsert(
     )
     sorted_descriptions = [dp["description"] for dp in sorted_edges]
 
+    # Fragments the stored summary does not cover yet
+    stored_fingerprint = (
+        already_edge.get("description_hashes") if already_edge else None
+    )
+    if already_edge and _parse_description_fingerprint(stored_fingerprint) is None:
+        # Stored before fingerprints existed: seed it from the stored description fragments
+        stored_fingerprint = _description_fingerprint(already_description)
+    if already_edge:
+        uncovered_descriptions = [
+            dp["description"]
+            for dp in _filter_covered_fragments(
+                sorted_edges, already_description, existing_full_source_ids
+            )
+        ]
+    else:
+        uncovered_descriptions = sorted_descriptions
+
+    # Incremental summary: only fold fragments the stored summary does not cover yet
+    incremental = global_config.get("summary_incremental", False) and bool(already_edge)
+    if incremental:
+        sorted_descriptions = uncovered_descriptions
+
     # Combine already_description with sorted new descriptions
     description_list = already_description + sorted_descriptions
     if not description_list:
@@ -2041,14 +2260,26 @@ async def _merge_edges_then_upsert(
                 )
 
     # 8. Get summary description an LLM usage status
-    description, llm_was_used = await _handle_entity_relation_summary(
-        "Relation",
-        f"({src_id}, {tgt_id})",
-        description_list,
-        GRAPH_FIELD_SEP,
-        global_config,
-        llm_response_cache,
-    )
+    if incremental and not sorted_descriptions:
+        # Every new fragment is already covered: keep the stored summary as is
+        description, llm_was_used = already_edge["description"], False
+    else:
+        description, llm_was_used = await _handle_entity_relation_summary(
+            "Relation",
+            f"({src_id}, {tgt_id})",
+            description_list,
+            GRAPH_FIELD_SEP,
+            global_config,
+            llm_response_cache,
+        )
+
+    # Fragments covered by the summary
+    if not already_edge:
+        description_hashes = _description_fingerprint(sorted_descriptions)
+    else:
+        description_hashes = _description_fingerprint(
+            uncovered_descriptions, stored_fingerprint
+        )
 
     # 9. Build file_path within MAX_FILE_PATHS limit
     file_paths_list = []
@@ -2166,17 +2397,15 @@ async def _merge_edges_then_upsert(
             await knowledge_graph_inst.upsert_node(need_insert_id, node_data=node_data)
 
             # Update entity_chunks_storage for the newly created entity
-            if entity_chunks_storage is not None:
-                chunk_ids = [chunk_id for chunk_id in full_source_ids if chunk_id]
-                if chunk_ids:
-                    await entity_chunks_storage.upsert(
-                        {
-                            need_insert_id: {
-                                "chunk_ids": chunk_ids,
-                                "count": len(chunk_ids),
-                            }
+            if entity_chunks_storage is not None and full_source_ids:
+                await entity_chunks_storage.upsert(
+                    {
+                        need_insert_id: {
+                            "chunk_ids": full_source_ids.to_list(),
+                            "count": len(full_source_ids),
                         }
-                    )
+                    }
+                )
 
             if entity_vdb is not None:
                 entity_vdb_id = compute_mdhash_id(need_insert_id, prefix="ent-")
@@ -2222,6 +2451,7 @@ async def _merge_edges_then_upsert(
             file_path=file_path,
             created_at=edge_created_at,
             truncate=truncation_info,
+            description_hashes=description_hashes,
         ),
     )
 
@@ -2270,6 +2500,7 @@ async def _merge_edges_then_upsert(
     return edge_data
 
 
+@traced("merge_nodes_and_edges")
 async def merge_nodes_and_edges(
     chunk_results: list,
     knowledge_graph_inst: BaseGraphStorage,
@@ -2347,6 +2578,15 @@ async def merge_nodes_and_edges(
     graph_max_async = global_config.get("llm_model_max_async", 4) * 2
     semaphore = asyncio.Semaphore(graph_max_async)
 
+    async def _with_deferred_vdb_writes(process, *args):
+        # Vector upserts through a VectorUpsertCoalescer are awaited only after the
+        # semaphore and keyed lock are released, letting other merge tasks fill the batch
+        writes = []
+        with defer_vdb_writes(writes):
+            result = await process(*args)
+        await wait_vdb_writes(writes)
+        return result
+
     # ===== Phase 1: Process all entities concurrently =====
     log_message = f"Phase 1: Processing {total_entities_count} entities from {doc_id} (async: {graph_max_async})"
     logger.info(log_message)
@@ -2412,7 +2652,11 @@ async def merge_nodes_and_edges(
     # Create entity processing tasks
     entity_tasks = []
     for entity_name, entities in all_nodes.items():
-        task = asyncio.create_task(_locked_process_entity_name(entity_name, entities))
+        task = asyncio.create_task(
+            _with_deferred_vdb_writes(
+                _locked_process_entity_name, entity_name, entities
+            )
+        )
         entity_tasks.append(task)
 
     # Execute entity tasks with error handling
@@ -2526,7 +2770,9 @@ async def merge_nodes_and_edges(
     # Create relationship processing tasks
     edge_tasks = []
     for edge_key, edges in all_edges.items():
-        task = asyncio.create_task(_locked_process_edges(edge_key, edges))
+        task = asyncio.create_task(
+            _with_deferred_vdb_writes(_locked_process_edges, edge_key, edges)
+        )
         edge_tasks.append(task)
 
     # Execute relationship tasks with error handling
@@ -2640,6 +2886,129 @@ async def merge_nodes_and_edges(
         pipeline_status["history_messages"].append(log_message)
 
 
+def _merge_extraction_results(
+    maybe_nodes: dict, maybe_edges: dict, new_nodes: dict, new_edges: dict
+) -> None:
+    """Merge another extraction of the same chunk, keeping the longer description"""
+    for entity_name, new_entities in new_nodes.items():
+        if entity_name in maybe_nodes:
+            # Compare description lengths and keep the better one
+            original_desc_len = len(
+                maybe_nodes[entity_name][0].get("description", "") or ""
+            )
+            new_desc_len = len(new_entities[0].get("description", "") or "")
+
+            if new_desc_len > original_desc_len:
+                maybe_nodes[entity_name] = list(new_entities)
+            # Otherwise keep original version
+        else:
+            # New entity from this extraction
+            maybe_nodes[entity_name] = list(new_entities)
+
+    for edge_key, new_edge_list in new_edges.items():
+        if edge_key in maybe_edges:
+            # Compare description lengths and keep the better one
+            original_desc_len = len(
+                maybe_edges[edge_key][0].get("description", "") or ""
+            )
+            new_desc_len = len(new_edge_list[0].get("description", "") or "")
+
+            if new_desc_len > original_desc_len:
+                maybe_edges[edge_key] = list(new_edge_list)
+            # Otherwise keep original version
+        else:
+            # New edge from this extraction
+            maybe_edges[edge_key] = list(new_edge_list)
+
+
+async def link_duplicate_extractions(
+    duplicates: dict[str, str],
+    chunks: dict[str, TextChunkSchema],
+    llm_response_cache: BaseKVStorage | None,
+    text_chunks_storage: BaseKVStorage,
+) -> tuple[list, list[str]]:
+    """Reuse the cached extraction of source chunks for their duplicate chunks
+
+    The source chunk's cached extraction results are parsed again with the
+    duplicate as source, and copied into cache entries owned by the duplicate so
+    that rebuilding or deleting either document keeps working.
+
+    Args:
+        duplicates: Duplicate chunk id -> source chunk id
+        chunks: The duplicate chunks' data
+        llm_response_cache: LLM response cache storage
+        text_chunks_storage: Text chunks storage (holding each chunk's llm_cache_list)
+
+    Returns:
+        (chunk_results, unresolved): results in the format of extract_entities, and
+        the duplicate chunk ids whose source has no cached extraction
+    """
+    if not duplicates or llm_response_cache is None:
+        return [], list(duplicates)
+
+    cached_results = await _get_cached_extraction_results(
+        llm_response_cache, set(duplicates.values()), text_chunks_storage
+    )
+
+    chunk_results = []
+    unresolved = []
+    cache_entries = {}
+    chunk_cache_keys = {}
+    timestamp = int(time.time())
+    for chunk_id, source_id in duplicates.items():
+        results = cached_results.get(source_id)
+        if not results:
+            unresolved.append(chunk_id)
+            continue
+
+        file_path = chunks[chunk_id].get("file_path", "unknown_source")
+        maybe_nodes, maybe_edges = {}, {}
+        try:
+            for extraction_result, _ in results:
+                nodes, edges = await _rebuild_from_extraction_result(
+                    text_chunks_storage,
+                    extraction_result,
+                    chunk_id,
+                    timestamp,
+                    file_path=file_path,
+                )
+                _merge_extraction_results(maybe_nodes, maybe_edges, nodes, edges)
+        except Exception as e:
+            logger.warning(
+                f"Failed to parse cached extraction of {source_id} for duplicate chunk {chunk_id}: {e}"
+            )
+            unresolved.append(chunk_id)
+            continue
+        chunk_results.append((maybe_nodes, maybe_edges))
+
+        if chunk_id != source_id:
+            keys = []
+            for i, (extraction_result, _) in enumerate(results):
+                cache_key = generate_cache_key(
+                    "default", "extract", compute_args_hash(source_id, chunk_id, i)
+                )
+                cache_entries[cache_key] = {
+                    "return": extraction_result,
+                    "cache_type": "extract",
+                    "chunk_id": chunk_id,
+                    "original_prompt": None,
+                    "queryparam": None,
+                    "linked_chunk_id": source_id,
+                }
+                keys.append(cache_key)
+            chunk_cache_keys[chunk_id] = keys
+
+    if cache_entries:
+        await llm_response_cache.upsert(cache_entries)
+        for chunk_id, keys in chunk_cache_keys.items():
+            await update_chunk_cache_list(
+                chunk_id, text_chunks_storage, keys, "chunk_dedup"
+            )
+
+    return chunk_results, unresolved
+
+
+@traced("extract_entities")
 async def extract_entities(
     chunks: dict[str, TextChunkSchema],
     global_config: dict[str, str],
@@ -2647,7 +3016,13 @@ async def extract_entities(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     text_chunks_storage: BaseKVStorage | None = None,
+    on_chunk_extracted: Callable[[str], Awaitable[None]] | None = None,
 ) -> list:
+    """Extract entities and relations of chunks with the LLM
+
+    on_chunk_extracted is awaited with the id of each chunk once its extraction
+    results are saved to the LLM cache.
+    """
     # Check for cancellation at the start of entity extraction
     if pipeline_status is not None and pipeline_status_lock is not None:
         async with pipeline_status_lock:
@@ -2690,6 +3065,7 @@ async def extract_entities(
     processed_chunks = 0
     total_chunks = len(ordered_chunks)
 
+    @traced("extract_entities.chunk")
     async def _process_single_content(chunk_key_dp: tuple[str, TextChunkSchema]):
         """Process a single chunk
         Args:
@@ -2767,35 +3143,9 @@ async def extract_entities(
             )
 
             # Merge results - compare description lengths to choose better version
-            for entity_name, glean_entities in glean_nodes.items():
-                if entity_name in maybe_nodes:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_nodes[entity_name][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_entities[0].get("description", "") or "")
-
-                    if glean_desc_len > original_desc_len:
-                        maybe_nodes[entity_name] = list(glean_entities)
-                    # Otherwise keep original version
-                else:
-                    # New entity from gleaning stage
-                    maybe_nodes[entity_name] = list(glean_entities)
-
-            for edge_key, glean_edges in glean_edges.items():
-                if edge_key in maybe_edges:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_edges[edge_key][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_edges[0].get("description", "") or "")
-
-                    if glean_desc_len > original_desc_len:
-                        maybe_edges[edge_key] = list(glean_edges)
-                    # Otherwise keep original version
-                else:
-                    # New edge from gleaning stage
-                    maybe_edges[edge_key] = list(glean_edges)
+            _merge_extraction_results(
+                maybe_nodes, maybe_edges, glean_nodes, glean_edges
+            )
 
         # Batch update chunk's llm_cache_list with all collected cache keys
         if cache_keys_collector and text_chunks_storage:
@@ -2805,6 +3155,8 @@ async def extract_entities(
                 cache_keys_collector,
                 "entity_extraction",
             )
+        if on_chunk_extracted is not None:
+            await on_chunk_extracted(chunk_key)
 
         processed_chunks += 1
         entities_count = len(maybe_nodes)
@@ -2887,6 +3239,7 @@ async def extract_entities(
     return chunk_results
 
 
+@traced("kg_query")
 async def kg_query(
     query: str,
     knowledge_graph_inst: BaseGraphStorage,
@@ -2898,6 +3251,7 @@ async def kg_query(
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
     chunks_vdb: BaseVectorStorage = None,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> QueryResult | None:
     """
     Execute knowledge graph query and return unified QueryResult object.
@@ -2913,6 +3267,7 @@ async def kg_query(
         hashing_kv: Cache storage
         system_prompt: System prompt
         chunks_vdb: Document chunks vector database
+        chunks_bm25: BM25 index of the chunks, fused with vector search in mix mode
 
     Returns:
         QueryResult | None: Unified query result object containing:
@@ -2940,46 +3295,88 @@ async def kg_query(
         # Apply higher priority (5) to query relation LLM function
         use_model_func = partial(use_model_func, _priority=5)
 
-    hl_keywords, ll_keywords = await get_keywords_from_query(
-        query, query_param, global_config, hashing_kv
+    # Stages that only need the raw query (query embedding and, in mix mode, the chunk
+    # vector search) start right away and run while the keywords are being extracted.
+    # Entity and relation searches start as soon as the keywords arrive.
+    stage_timings: dict[str, float] = {}
+    query_start = time.perf_counter()
+    query_embedding_task = asyncio.create_task(
+        _timed_stage(
+            stage_timings,
+            "query_embedding",
+            _compute_query_embedding(query, text_chunks_db, chunks_vdb),
+        )
     )
+    vector_chunks_task = None
+    if query_param.mode == "mix" and chunks_vdb:
+
+        async def _speculative_vector_search():
+            query_embedding = await query_embedding_task
+            return await _timed_stage(
+                stage_timings,
+                "vector_search",
+                _get_vector_context(
+                    query, chunks_vdb, query_param, query_embedding, chunks_bm25
+                ),
+            )
 
-    logger.debug(f"High-level keywords: {hl_keywords}")
-    logger.debug(f"Low-level  keywords: {ll_keywords}")
-
-    # Handle empty keywords
-    if ll_keywords == [] and query_param.mode in ["local", "hybrid", "mix"]:
-        logger.warning("low_level_keywords is empty")
-    if hl_keywords == [] and query_param.mode in ["global", "hybrid", "mix"]:
-        logger.warning("high_level_keywords is empty")
-    if hl_keywords == [] and ll_keywords == []:
-        if len(query) < 50:
-            logger.warning(f"Forced low_level_keywords to origin query: {query}")
-            ll_keywords = [query]
-        else:
-            language = get_language_from_config(global_config, query)
-            return QueryResult(content=get_prompt("fail_response", language=language))
+        vector_chunks_task = asyncio.create_task(_speculative_vector_search())
 
-    ll_keywords_str = ", ".join(ll_keywords) if ll_keywords else ""
-    hl_keywords_str = ", ".join(hl_keywords) if hl_keywords else ""
+    try:
+        hl_keywords, ll_keywords = await _timed_stage(
+            stage_timings,
+            "keyword_extraction",
+            get_keywords_from_query(query, query_param, global_config, hashing_kv),
+        )
 
-    # Build query context (unified interface)
-    context_result = await _build_query_context(
-        query,
-        ll_keywords_str,
-        hl_keywords_str,
-        knowledge_graph_inst,
-        entities_vdb,
-        relationships_vdb,
-        text_chunks_db,
-        query_param,
-        chunks_vdb,
-    )
+        logger.debug(f"High-level keywords: {hl_keywords}")
+        logger.debug(f"Low-level  keywords: {ll_keywords}")
+
+        # Handle empty keywords
+        if ll_keywords == [] and query_param.mode in ["local", "hybrid", "mix"]:
+            logger.warning("low_level_keywords is empty")
+        if hl_keywords == [] and query_param.mode in ["global", "hybrid", "mix"]:
+            logger.warning("high_level_keywords is empty")
+        if hl_keywords == [] and ll_keywords == []:
+            if len(query) < 50:
+                logger.warning(f"Forced low_level_keywords to origin query: {query}")
+                ll_keywords = [query]
+            else:
+                language = get_language_from_config(global_config, query)
+                return QueryResult(
+                    content=get_prompt("fail_response", language=language)
+                )
+
+        ll_keywords_str = ", ".join(ll_keywords) if ll_keywords else ""
+        hl_keywords_str = ", ".join(hl_keywords) if hl_keywords else ""
+
+        # Build query context (unified interface)
+        context_result = await _build_query_context(
+            query,
+            ll_keywords_str,
+            hl_keywords_str,
+            knowledge_graph_inst,
+            entities_vdb,
+            relationships_vdb,
+            text_chunks_db,
+            query_param,
+            chunks_vdb,
+            query_embedding_task=query_embedding_task,
+            vector_chunks_task=vector_chunks_task,
+            stage_timings=stage_timings,
+            chunks_bm25=chunks_bm25,
+        )
+    finally:
+        # Speculative stages that were not consumed, because the keywords were empty
+        # or a later stage failed, must not keep running or leak their exceptions
+        await _discard_tasks(query_embedding_task, vector_chunks_task)
 
     if context_result is None:
         logger.info("[kg_query] No query context could be built; returning no-result.")
         return None
 
+    stage_timings["retrieval_total"] = round(time.perf_counter() - query_start, 4)
+
     # Return different content based on query parameters
     if query_param.only_need_context and not query_param.only_need_prompt:
         return QueryResult(
@@ -3102,6 +3499,80 @@ async def kg_query(
         )
 
 
+async def _discard_tasks(*tasks: asyncio.Future | None) -> None:
+    """Cancel unfinished tasks and wait for them, retrieving the exceptions of all tasks"""
+    tasks = [task for task in tasks if task is not None]
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _timed_stage(stage_timings: dict[str, float], stage: str, awaitable):
+    """Await `awaitable` and record its duration in seconds under `stage`"""
+    stage_start = time.perf_counter()
+    try:
+        with span(f"query.{stage}"):
+            return await awaitable
+    finally:
+        stage_timings[stage] = round(time.perf_counter() - stage_start, 4)
+
+
+def _query_embedding_needed(
+    query: str,
+    text_chunks_db: BaseKVStorage,
+    chunks_vdb: BaseVectorStorage | None,
+) -> bool:
+    """Whether a vector operation (chunk search or VECTOR chunk picking) uses the raw query embedding"""
+    kg_chunk_pick_method = text_chunks_db.global_config.get(
+        "kg_chunk_pick_method", DEFAULT_KG_CHUNK_PICK_METHOD
+    )
+    return bool(query) and (kg_chunk_pick_method == "VECTOR" or bool(chunks_vdb))
+
+
+async def _compute_query_embedding(
+    query: str,
+    text_chunks_db: BaseKVStorage,
+    chunks_vdb: BaseVectorStorage | None,
+) -> list[float] | None:
+    """Embed the raw query once for every vector operation that needs it
+
+    Returns None when no vector operation uses the query embedding or embedding fails.
+    """
+    if not _query_embedding_needed(query, text_chunks_db, chunks_vdb):
+        return None
+    embedding_func_config = text_chunks_db.embedding_func
+    if not embedding_func_config or not embedding_func_config.func:
+        return None
+    try:
+        query_embedding = await embedding_func_config.func([query])
+        logger.debug("Pre-computed query embedding for all vector operations")
+        return query_embedding[0]  # Extract first embedding from batch result
+    except Exception as e:
+        logger.warning(f"Failed to pre-compute query embedding: {e}")
+        return None
+
+
+async def _embed_search_texts(
+    texts: list[str], embedding_func: EmbeddingFunc | None
+) -> dict[str, Any]:
+    """Embed all search strings in one embedding call, mapping each text to its vector
+
+    Returns an empty dict when embedding fails; the vector storages then embed their
+    search strings themselves.
+    """
+    texts = list(dict.fromkeys(text for text in texts if text))
+    if not texts or embedding_func is None:
+        return {}
+    try:
+        # higher priority for query
+        embeddings = await embedding_func(texts, _priority=5)
+    except Exception as e:
+        logger.warning(f"Failed to embed search strings in one batch: {e}")
+        return {}
+    return dict(zip(texts, embeddings))
+
+
 async def get_keywords_from_query(
     query: str,
     query_param: QueryParam,
@@ -3244,11 +3715,48 @@ async def extract_keywords_only(
     return hl_keywords, ll_keywords
 
 
+async def _fuse_bm25_results(
+    query: str,
+    dense_results: list[dict],
+    chunks_vdb: BaseVectorStorage,
+    chunks_bm25: ChunkBM25Index,
+    top_k: int,
+) -> tuple[list[dict], int]:
+    """Fuse vector search results with BM25 results by reciprocal rank fusion
+
+    Returns:
+        tuple: (fused results in the format of chunks_vdb.query, number of BM25 hits)
+    """
+    with span("query.bm25_search"):
+        bm25_results = await chunks_bm25.search(query, top_k)
+    if not bm25_results:
+        return dense_results, 0
+
+    results_by_id = {result["id"]: result for result in dense_results}
+    fused_ids = reciprocal_rank_fusion(
+        [list(results_by_id), [chunk_id for chunk_id, _ in bm25_results]],
+        k=chunks_vdb.global_config.get("rrf_k", DEFAULT_RRF_K),
+    )[:top_k]
+
+    # Lexical-only hits are fetched from the vector storage, which keeps the content
+    missing_ids = [chunk_id for chunk_id in fused_ids if chunk_id not in results_by_id]
+    if missing_ids:
+        for record in await chunks_vdb.get_by_ids(missing_ids):
+            if record and record.get("id") is not None:
+                results_by_id[record["id"]] = record
+
+    fused = [
+        results_by_id[chunk_id] for chunk_id in fused_ids if chunk_id in results_by_id
+    ]
+    return fused, len(bm25_results)
+
+
 async def _get_vector_context(
     query: str,
     chunks_vdb: BaseVectorStorage,
     query_param: QueryParam,
     query_embedding: list[float] = None,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> list[dict]:
     """
     Retrieve text chunks from the vector database without reranking or truncation.
@@ -3261,6 +3769,7 @@ async def _get_vector_context(
         chunks_vdb: Vector database containing document chunks
         query_param: Query parameters including chunk_top_k and ids
         query_embedding: Optional pre-computed query embedding to avoid redundant embedding calls
+        chunks_bm25: Optional BM25 index of the chunks, its results are fused with the vector results
 
     Returns:
         List of text chunks with metadata
@@ -3273,6 +3782,11 @@ async def _get_vector_context(
         results = await chunks_vdb.query(
             query, top_k=search_top_k, query_embedding=query_embedding
         )
+        bm25_hits = None
+        if chunks_bm25 is not None:
+            results, bm25_hits = await _fuse_bm25_results(
+                query, results or [], chunks_vdb, chunks_bm25, search_top_k
+            )
         if not results:
             logger.info(
                 f"Naive query: 0 chunks (chunk_top_k:{search_top_k} cosine:{cosine_threshold})"
@@ -3292,7 +3806,8 @@ async def _get_vector_context(
                 valid_chunks.append(chunk_with_metadata)
 
         logger.info(
-            f"Naive query: {len(valid_chunks)} chunks (chunk_top_k:{search_top_k} cosine:{cosine_threshold})"
+            f"Naive query: {len(valid_chunks)} chunks (chunk_top_k:{search_top_k} cosine:{cosine_threshold}"
+            + (f" bm25:{bm25_hits})" if bm25_hits is not None else ")")
         )
         return valid_chunks
 
@@ -3311,11 +3826,21 @@ async def _perform_kg_search(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    query_embedding_task: asyncio.Future | None = None,
+    vector_chunks_task: asyncio.Future | None = None,
+    stage_timings: dict[str, float] | None = None,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> dict[str, Any]:
     """
     Pure search logic that retrieves raw entities, relations, and vector chunks.
     No token truncation or formatting - just raw search results.
+
+    `query_embedding_task` and `vector_chunks_task` are stages kg_query started before
+    the keywords were known; they are computed here when not provided. Stage durations
+    are recorded in `stage_timings` when given.
     """
+    if stage_timings is None:
+        stage_timings = {}
 
     # Initialize result containers
     local_entities = []
@@ -3330,76 +3855,106 @@ async def _perform_kg_search(
     # Track chunk sources and metadata for final logging
     chunk_tracking = {}  # chunk_id -> {source, frequency, order}
 
-    # Pre-compute query embedding once for all vector operations
-    kg_chunk_pick_method = text_chunks_db.global_config.get(
-        "kg_chunk_pick_method", DEFAULT_KG_CHUNK_PICK_METHOD
-    )
-    query_embedding = None
-    if query and (kg_chunk_pick_method == "VECTOR" or chunks_vdb):
-        embedding_func_config = text_chunks_db.embedding_func
-        if embedding_func_config and embedding_func_config.func:
-            try:
-                query_embedding = await embedding_func_config.func([query])
-                query_embedding = query_embedding[
-                    0
-                ]  # Extract first embedding from batch result
-                logger.debug("Pre-computed query embedding for all vector operations")
-            except Exception as e:
-                logger.warning(f"Failed to pre-compute query embedding: {e}")
-                query_embedding = None
-
-    # Handle local and global modes
     if query_param.mode == "local" and len(ll_keywords) > 0:
-        local_entities, local_relations = await _get_node_data(
-            ll_keywords,
-            knowledge_graph_inst,
-            entities_vdb,
-            query_param,
-        )
-
+        search_local, search_global = True, False
     elif query_param.mode == "global" and len(hl_keywords) > 0:
-        global_relations, global_entities = await _get_edge_data(
-            hl_keywords,
-            knowledge_graph_inst,
-            relationships_vdb,
-            query_param,
+        search_local, search_global = False, True
+    else:  # hybrid or mix mode
+        search_local, search_global = len(ll_keywords) > 0, len(hl_keywords) > 0
+
+    # Embed the strings of all vector searches in a single embedding call. The raw
+    # query (pre-computed once for all vector operations) joins the batch unless
+    # kg_query already started embedding it.
+    embed_query = query_embedding_task is None and _query_embedding_needed(
+        query, text_chunks_db, chunks_vdb
+    )
+    search_texts = [
+        text
+        for text, needed in (
+            (ll_keywords, search_local),
+            (hl_keywords, search_global),
+            (query, embed_query),
         )
+        if needed
+    ]
+    search_embeddings = await _timed_stage(
+        stage_timings,
+        "search_embedding",
+        _embed_search_texts(search_texts, entities_vdb.embedding_func),
+    )
 
-    else:  # hybrid or mix mode
-        if len(ll_keywords) > 0:
-            local_entities, local_relations = await _get_node_data(
-                ll_keywords,
-                knowledge_graph_inst,
-                entities_vdb,
-                query_param,
+    # Entity and relation searches only depend on the keywords and run concurrently
+    node_data_task = edge_data_task = None
+    if search_local:
+        node_data_task = asyncio.ensure_future(
+            _timed_stage(
+                stage_timings,
+                "entity_search",
+                _get_node_data(
+                    ll_keywords,
+                    knowledge_graph_inst,
+                    entities_vdb,
+                    query_param,
+                    query_embedding=search_embeddings.get(ll_keywords),
+                ),
             )
-        if len(hl_keywords) > 0:
-            global_relations, global_entities = await _get_edge_data(
-                hl_keywords,
-                knowledge_graph_inst,
-                relationships_vdb,
-                query_param,
+        )
+    if search_global:
+        edge_data_task = asyncio.ensure_future(
+            _timed_stage(
+                stage_timings,
+                "relation_search",
+                _get_edge_data(
+                    hl_keywords,
+                    knowledge_graph_inst,
+                    relationships_vdb,
+                    query_param,
+                    query_embedding=search_embeddings.get(hl_keywords),
+                ),
             )
+        )
+    try:
+        if node_data_task is not None:
+            local_entities, local_relations = await node_data_task
+        if edge_data_task is not None:
+            global_relations, global_entities = await edge_data_task
+        if query_embedding_task is not None:
+            query_embedding = await query_embedding_task
+        else:
+            query_embedding = search_embeddings.get(query)
+    except BaseException:
+        for task in (node_data_task, edge_data_task):
+            if task is not None and not task.done():
+                task.cancel()
+        raise
 
-        # Get vector chunks for mix mode
-        if query_param.mode == "mix" and chunks_vdb:
-            vector_chunks = await _get_vector_context(
-                query,
-                chunks_vdb,
-                query_param,
-                query_embedding,
+    # Get vector chunks for mix mode
+    if query_param.mode == "mix" and chunks_vdb:
+        if vector_chunks_task is not None:
+            vector_chunks = await vector_chunks_task
+        else:
+            vector_chunks = await _timed_stage(
+                stage_timings,
+                "vector_search",
+                _get_vector_context(
+                    query,
+                    chunks_vdb,
+                    query_param,
+                    query_embedding,
+                    chunks_bm25,
+                ),
             )
-            # Track vector chunks with source metadata
-            for i, chunk in enumerate(vector_chunks):
-                chunk_id = chunk.get("chunk_id") or chunk.get("id")
-                if chunk_id:
-                    chunk_tracking[chunk_id] = {
-                        "source": "C",
-                        "frequency": 1,  # Vector chunks always have frequency 1
-                        "order": i + 1,  # 1-based order in vector search results
-                    }
-                else:
-                    logger.warning(f"Vector chunk missing chunk_id: {chunk}")
+        # Track vector chunks with source metadata
+        for i, chunk in enumerate(vector_chunks):
+            chunk_id = chunk.get("chunk_id") or chunk.get("id")
+            if chunk_id:
+                chunk_tracking[chunk_id] = {
+                    "source": "C",
+                    "frequency": 1,  # Vector chunks always have frequency 1
+                    "order": i + 1,  # 1-based order in vector search results
+                }
+            else:
+                logger.warning(f"Vector chunk missing chunk_id: {chunk}")
 
     # Round-robin merge entities
     final_entities = []
@@ -3641,6 +4196,26 @@ async def _apply_token_truncation(
     }
 
 
+# Fields of the chunk handles used to rank and truncate KG related chunks
+CHUNK_HANDLE_FIELDS = ["tokens", "file_path"]
+
+
+def _merged_chunk(chunk: dict, chunk_id: str) -> dict:
+    file_path = chunk.get("file_path", "unknown_source")
+    if "content" in chunk:
+        return {
+            "content": chunk["content"],
+            "file_path": file_path,
+            "chunk_id": chunk_id,
+        }
+    # Chunk handle, hydrated if it survives truncation
+    return {
+        "file_path": file_path,
+        "chunk_id": chunk_id,
+        "tokens": chunk.get("tokens", 0),
+    }
+
+
 async def _merge_all_chunks(
     filtered_entities: list[dict],
     filtered_relations: list[dict],
@@ -3700,13 +4275,7 @@ async def _merge_all_chunks(
             chunk_id = chunk.get("chunk_id") or chunk.get("id")
             if chunk_id and chunk_id not in seen_chunk_ids:
                 seen_chunk_ids.add(chunk_id)
-                merged_chunks.append(
-                    {
-                        "content": chunk["content"],
-                        "file_path": chunk.get("file_path", "unknown_source"),
-                        "chunk_id": chunk_id,
-                    }
-                )
+                merged_chunks.append(_merged_chunk(chunk, chunk_id))
 
         # Add from entity chunks (Local mode)
         if i < len(entity_chunks):
@@ -3714,13 +4283,7 @@ async def _merge_all_chunks(
             chunk_id = chunk.get("chunk_id") or chunk.get("id")
             if chunk_id and chunk_id not in seen_chunk_ids:
                 seen_chunk_ids.add(chunk_id)
-                merged_chunks.append(
-                    {
-                        "content": chunk["content"],
-                        "file_path": chunk.get("file_path", "unknown_source"),
-                        "chunk_id": chunk_id,
-                    }
-                )
+                merged_chunks.append(_merged_chunk(chunk, chunk_id))
 
         # Add from relation chunks (Global mode)
         if i < len(relation_chunks):
@@ -3728,13 +4291,7 @@ async def _merge_all_chunks(
             chunk_id = chunk.get("chunk_id") or chunk.get("id")
             if chunk_id and chunk_id not in seen_chunk_ids:
                 seen_chunk_ids.add(chunk_id)
-                merged_chunks.append(
-                    {
-                        "content": chunk["content"],
-                        "file_path": chunk.get("file_path", "unknown_source"),
-                        "chunk_id": chunk_id,
-                    }
-                )
+                merged_chunks.append(_merged_chunk(chunk, chunk_id))
 
     logger.info(
         f"Round-robin merged chunks: {origin_len} -> {len(merged_chunks)} (deduplicated {origin_len - len(merged_chunks)})"
@@ -3753,6 +4310,7 @@ async def _build_llm_context(
     chunk_tracking: dict = None,
     entity_id_to_original: dict = None,
     relation_id_to_original: dict = None,
+    text_chunks_db: BaseKVStorage = None,
 ) -> tuple[str, dict[str, Any]]:
     """
     Build the final LLM context string with token processing.
@@ -3837,6 +4395,7 @@ async def _build_llm_context(
         global_config=global_config,
         source_type=query_param.mode,
         chunk_token_limit=available_chunk_tokens,  # Pass dynamic limit
+        text_chunks_db=text_chunks_db,
     )
 
     # Generate reference list from truncated chunks using the new common function
@@ -3927,6 +4486,7 @@ async def _build_llm_context(
 
 
 # Now let's update the old _build_query_context to use the new architecture
+@traced("query.build_context")
 async def _build_query_context(
     query: str,
     ll_keywords: str,
@@ -3937,13 +4497,20 @@ async def _build_query_context(
     text_chunks_db: BaseKVStorage,
     query_param: QueryParam,
     chunks_vdb: BaseVectorStorage = None,
+    query_embedding_task: asyncio.Future | None = None,
+    vector_chunks_task: asyncio.Future | None = None,
+    stage_timings: dict[str, float] | None = None,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> QueryContextResult | None:
     """
     Main query context building function using the new 4-stage architecture:
     1. Search -> 2. Truncate -> 3. Merge chunks -> 4. Build LLM context
 
     Returns unified QueryContextResult containing both context and raw_data.
+    Stage durations are reported in raw_data["metadata"]["stage_timings"].
     """
+    if stage_timings is None:
+        stage_timings = {}
 
     if not query:
         logger.warning("Query is empty, skipping context building")
@@ -3960,7 +4527,12 @@ async def _build_query_context(
         text_chunks_db,
         query_param,
         chunks_vdb,
+        query_embedding_task=query_embedding_task,
+        vector_chunks_task=vector_chunks_task,
+        stage_timings=stage_timings,
+        chunks_bm25=chunks_bm25,
     )
+    context_start = time.perf_counter()
 
     if not search_result["final_entities"] and not search_result["final_relations"]:
         if query_param.mode != "mix":
@@ -4009,6 +4581,7 @@ async def _build_query_context(
         chunk_tracking=search_result["chunk_tracking"],
         entity_id_to_original=truncation_result["entity_id_to_original"],
         relation_id_to_original=truncation_result["relation_id_to_original"],
+        text_chunks_db=text_chunks_db,
     )
 
     # Convert keywords strings to lists and add complete metadata to raw_data
@@ -4036,6 +4609,8 @@ async def _build_query_context(
         "merged_chunks_count": len(merged_chunks),
         "final_chunks_count": len(raw_data.get("data", {}).get("chunks", [])),
     }
+    stage_timings["context_build"] = round(time.perf_counter() - context_start, 4)
+    raw_data["metadata"]["stage_timings"] = stage_timings
 
     logger.debug(
         f"[_build_query_context] Context length: {len(context) if context else 0}"
@@ -4052,13 +4627,16 @@ async def _get_node_data(
     knowledge_graph_inst: BaseGraphStorage,
     entities_vdb: BaseVectorStorage,
     query_param: QueryParam,
+    query_embedding=None,
 ):
     # get similar entities
     logger.info(
         f"Query nodes: {query} (top_k:{query_param.top_k}, cosine:{entities_vdb.cosine_better_than_threshold})"
     )
 
-    results = await entities_vdb.query(query, top_k=query_param.top_k)
+    results = await entities_vdb.query(
+        query, top_k=query_param.top_k, query_embedding=query_embedding
+    )
 
     if not len(results):
         return [], []
@@ -4105,6 +4683,21 @@ async def _get_node_data(
     return node_datas, use_relations
 
 
+def _context_row_limit(
+    knowledge_graph_inst: BaseGraphStorage, max_tokens: int
+) -> int | None:
+    """Most rows of a ranked entity or relation list that can reach the context
+
+    Every row costs at least one token, so _apply_token_truncation keeps at
+    most max_tokens rows of the merged list, and the round-robin merge never
+    moves a row of the local or global list forward. Returns None when there
+    is no tokenizer and truncation is skipped.
+    """
+    if not knowledge_graph_inst.global_config.get("tokenizer"):
+        return None
+    return max(max_tokens, 0)
+
+
 async def _find_most_related_edges_from_entities(
     node_datas: list[dict],
     query_param: QueryParam,
@@ -4113,16 +4706,14 @@ async def _find_most_related_edges_from_entities(
     node_names = [dp["entity_name"] for dp in node_datas]
     batch_edges_dict = await knowledge_graph_inst.get_nodes_edges_batch(node_names)
 
-    all_edges = []
-    seen = set()
-
-    for node_name in node_names:
-        this_edges = batch_edges_dict.get(node_name, [])
-        for e in this_edges:
-            sorted_edge = tuple(sorted(e))
-            if sorted_edge not in seen:
-                seen.add(sorted_edge)
-                all_edges.append(sorted_edge)
+    # Deduplicated edges in the order they are first seen
+    all_edges = list(
+        dict.fromkeys(
+            (src, tgt) if src <= tgt else (tgt, src)
+            for node_name in node_names
+            for src, tgt in batch_edges_dict.get(node_name, [])
+        )
+    )
 
     # Prepare edge pairs in two forms:
     # For the batch edge properties function, use dicts.
@@ -4136,27 +4727,54 @@ async def _find_most_related_edges_from_entities(
         knowledge_graph_inst.edge_degrees_batch(edge_pairs_tuples),
     )
 
-    # Reconstruct edge_datas list in the same order as the deduplicated results.
-    all_edges_data = []
+    # Columns of the found edges, properties are referenced and only copied into
+    # result dicts for the rows that are returned
+    pairs = []
+    props = []
+    ranks = []
+    weights = []
     for pair in all_edges:
         edge_props = edge_data_dict.get(pair)
-        if edge_props is not None:
-            if "weight" not in edge_props:
-                logger.warning(
-                    f"Edge {pair} missing 'weight' attribute, using default value 1.0"
-                )
-                edge_props["weight"] = 1.0
+        if edge_props is None:
+            continue
+        if "weight" in edge_props:
+            weights.append(edge_props["weight"])
+        else:
+            logger.warning(
+                f"Edge {pair} missing 'weight' attribute, using default value 1.0"
+            )
+            weights.append(1.0)
+        pairs.append(pair)
+        props.append(edge_props)
+        ranks.append(edge_degrees_dict.get(pair, 0))
+    if not pairs:
+        return []
 
-            combined = {
-                "src_tgt": pair,
-                "rank": edge_degrees_dict.get(pair, 0),
-                **edge_props,
-            }
-            all_edges_data.append(combined)
+    # Sort by (rank, weight) descending, ties keep the order edges were found in
+    try:
+        order = np.lexsort(
+            (
+                -np.asarray(weights, dtype=np.float64),
+                -np.asarray(ranks, dtype=np.float64),
+            )
+        ).tolist()
+    except (TypeError, ValueError):
+        order = sorted(
+            range(len(pairs)), key=lambda i: (ranks[i], weights[i]), reverse=True
+        )
 
-    all_edges_data = sorted(
-        all_edges_data, key=lambda x: (x["rank"], x["weight"]), reverse=True
-    )
+    limit = _context_row_limit(knowledge_graph_inst, query_param.max_relation_tokens)
+    if limit is not None and limit < len(order):
+        logger.debug(
+            f"Local query: ranked {len(order)} relations, keeping {limit} that fit the relation token budget"
+        )
+        order = order[:limit]
+
+    all_edges_data = []
+    for i in order:
+        combined = {"src_tgt": pairs[i], "rank": ranks[i], **props[i]}
+        combined["weight"] = weights[i]
+        all_edges_data.append(combined)
 
     return all_edges_data
 
@@ -4302,12 +4920,16 @@ async def _find_related_text_unit_from_entities(
     unique_chunk_ids = list(
         dict.fromkeys(selected_chunk_ids)
     )  # Remove duplicates while preserving order
-    chunk_data_list = await text_chunks_db.get_by_ids(unique_chunk_ids)
+    # Chunk handles without content, only chunks kept in the final context are
+    # fetched in full by process_chunks_unified
+    chunk_data_list = await text_chunks_db.get_fields_by_ids(
+        unique_chunk_ids, CHUNK_HANDLE_FIELDS
+    )
 
     # Step 6: Build result chunks with valid data and update chunk tracking
     result_chunks = []
     for i, (chunk_id, chunk_data) in enumerate(zip(unique_chunk_ids, chunk_data_list)):
-        if chunk_data is not None and "content" in chunk_data:
+        if chunk_data is not None:
             chunk_data_copy = chunk_data.copy()
             chunk_data_copy["source_type"] = "entity"
             chunk_data_copy["chunk_id"] = chunk_id  # Add chunk_id for deduplication
@@ -4329,12 +4951,15 @@ async def _get_edge_data(
     knowledge_graph_inst: BaseGraphStorage,
     relationships_vdb: BaseVectorStorage,
     query_param: QueryParam,
+    query_embedding=None,
 ):
     logger.info(
         f"Query edges: {keywords} (top_k:{query_param.top_k}, cosine:{relationships_vdb.cosine_better_than_threshold})"
     )
 
-    results = await relationships_vdb.query(keywords, top_k=query_param.top_k)
+    results = await relationships_vdb.query(
+        keywords, top_k=query_param.top_k, query_embedding=query_embedding
+    )
 
     if not len(results):
         return [], []
@@ -4350,12 +4975,6 @@ async def _get_edge_data(
         pair = (k["src_id"], k["tgt_id"])
         edge_props = edge_data_dict.get(pair)
         if edge_props is not None:
-            if "weight" not in edge_props:
-                logger.warning(
-                    f"Edge {pair} missing 'weight' attribute, using default value 1.0"
-                )
-                edge_props["weight"] = 1.0
-
             # Keep edge data without rank, maintain vector search order
             combined = {
                 "src_id": k["src_id"],
@@ -4363,6 +4982,11 @@ async def _get_edge_data(
                 "created_at": k.get("created_at", None),
                 **edge_props,
             }
+            if "weight" not in edge_props:
+                logger.warning(
+                    f"Edge {pair} missing 'weight' attribute, using default value 1.0"
+                )
+                combined["weight"] = 1.0
             edge_datas.append(combined)
 
     # Relations maintain vector search order (sorted by similarity)
@@ -4385,16 +5009,10 @@ async def _find_most_related_entities_from_relationships(
     query_param: QueryParam,
     knowledge_graph_inst: BaseGraphStorage,
 ):
-    entity_names = []
-    seen = set()
-
-    for e in edge_datas:
-        if e["src_id"] not in seen:
-            entity_names.append(e["src_id"])
-            seen.add(e["src_id"])
-        if e["tgt_id"] not in seen:
-            entity_names.append(e["tgt_id"])
-            seen.add(e["tgt_id"])
+    # Deduplicated entity names in the order they are first seen
+    entity_names = list(
+        dict.fromkeys(name for e in edge_datas for name in (e["src_id"], e["tgt_id"]))
+    )
 
     # Only get nodes data, no need for node degrees
     nodes_dict = await knowledge_graph_inst.get_nodes_batch(entity_names)
@@ -4597,12 +5215,16 @@ async def _find_related_text_unit_from_relations(
     unique_chunk_ids = list(
         dict.fromkeys(selected_chunk_ids)
     )  # Remove duplicates while preserving order
-    chunk_data_list = await text_chunks_db.get_by_ids(unique_chunk_ids)
+    # Chunk handles without content, only chunks kept in the final context are
+    # fetched in full by process_chunks_unified
+    chunk_data_list = await text_chunks_db.get_fields_by_ids(
+        unique_chunk_ids, CHUNK_HANDLE_FIELDS
+    )
 
     # Step 6: Build result chunks with valid data and update chunk tracking
     result_chunks = []
     for i, (chunk_id, chunk_data) in enumerate(zip(unique_chunk_ids, chunk_data_list)):
-        if chunk_data is not None and "content" in chunk_data:
+        if chunk_data is not None:
             chunk_data_copy = chunk_data.copy()
             chunk_data_copy["source_type"] = "relationship"
             chunk_data_copy["chunk_id"] = chunk_id  # Add chunk_id for deduplication
@@ -4628,6 +5250,7 @@ async def naive_query(
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
     return_raw_data: Literal[True] = True,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> dict[str, Any]: ...
 
 
@@ -4640,9 +5263,11 @@ async def naive_query(
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
     return_raw_data: Literal[False] = False,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> str | AsyncIterator[str]: ...
 
 
+@traced("naive_query")
 async def naive_query(
     query: str,
     chunks_vdb: BaseVectorStorage,
@@ -4650,6 +5275,7 @@ async def naive_query(
     global_config: dict[str, str],
     hashing_kv: BaseKVStorage | None = None,
     system_prompt: str | None = None,
+    chunks_bm25: ChunkBM25Index | None = None,
 ) -> QueryResult | None:
     """
     Execute naive query and return unified QueryResult object.
@@ -4661,6 +5287,7 @@ async def naive_query(
         global_config: Global configuration
         hashing_kv: Cache storage
         system_prompt: System prompt
+        chunks_bm25: BM25 index of the chunks, fused with vector search when given
 
     Returns:
         QueryResult | None: Unified query result object containing:
@@ -4689,7 +5316,9 @@ async def naive_query(
         language = get_language_from_config(global_config, query)
         return QueryResult(content=get_prompt("fail_response", language=language))
 
-    chunks = await _get_vector_context(query, chunks_vdb, query_param, None)
+    chunks = await _get_vector_context(
+        query, chunks_vdb, query_param, None, chunks_bm25
+    )
 
     if chunks is None or len(chunks) == 0:
         logger.info(
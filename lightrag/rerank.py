@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import time
+from collections import OrderedDict
+from functools import partial
 import aiohttp
-from typing import Any, List, Dict, Optional
+from typing import Any, Awaitable, Callable, List, Dict, Optional
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
     retry_if_exception_type,
 )
-from .utils import logger
+from .constants import (
+    DEFAULT_RERANK_CACHE_MAX_ENTRIES,
+    DEFAULT_RERANK_CACHE_TTL,
+    DEFAULT_RERANK_MAX_CONCURRENCY,
+)
+from .utils import compute_mdhash_id, get_env_value, logger
 
 from dotenv import load_dotenv
 
@@ -18,6 +28,170 @@ from dotenv import load_dotenv
 # the OS environment variables take precedence over the .env file
 load_dotenv(dotenv_path=".env", override=False)
 
+# Documents accepted in one request by each provider
+COHERE_MAX_BATCH_SIZE = 1000
+JINA_MAX_BATCH_SIZE = 1000
+ALI_MAX_BATCH_SIZE = 500
+
+
+class RerankScoreCache:
+    """LRU cache of relevance scores with a time to live
+
+    Keys are (model, query hash, document key) tuples; a relevance score only
+    depends on the query and the document, so scores computed for one query
+    are reused when the same chunks come back as candidates again.
+
+    Args:
+        max_entries: Maximum number of cached scores, 0 disables the cache
+        ttl: Seconds a score stays valid, 0 disables the cache
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple) -> float | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, score = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return score
+
+    def set(self, key: tuple, score: float) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, score)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+rerank_score_cache = RerankScoreCache(
+    max_entries=get_env_value(
+        "RERANK_CACHE_MAX_ENTRIES", DEFAULT_RERANK_CACHE_MAX_ENTRIES, int
+    ),
+    ttl=get_env_value("RERANK_CACHE_TTL", DEFAULT_RERANK_CACHE_TTL, float),
+)
+
+
+def _cache_model_key(model: str, extra_body: Optional[Dict[str, Any]]) -> str:
+    # Extra parameters such as instructions can change the scores
+    if not extra_body:
+        return model
+    return f"{model}:{json.dumps(extra_body, sort_keys=True, default=str)}"
+
+
+async def cached_rerank(
+    query: str,
+    documents: List[str],
+    rerank_batch: Callable[..., Awaitable[List[Dict[str, Any]]]],
+    model: str,
+    top_n: Optional[int] = None,
+    document_ids: Optional[List[str]] = None,
+    max_batch_size: int = COHERE_MAX_BATCH_SIZE,
+    max_concurrency: Optional[int] = None,
+    cache: Optional[RerankScoreCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rerank documents, scoring only those without a cached score.
+
+    Documents missing from the cache are deduplicated and sent in concurrent
+    sub-batches of at most max_batch_size documents (RERANK_BATCH_SIZE env
+    lowers it); top_n is applied after merging the scores, so every batch is
+    requested without it.
+
+    Args:
+        query: The search query
+        documents: List of strings to rerank
+        rerank_batch: Provider call scoring documents=[...] for the query
+        model: Cache key of the model (model name and scoring parameters)
+        top_n: Number of top results to return
+        document_ids: Stable ids of the documents (chunk ids), defaults to
+            content hashes
+        max_batch_size: Maximum documents per request accepted by the provider
+        max_concurrency: Maximum concurrent requests (RERANK_MAX_CONCURRENCY env)
+        cache: Score cache, defaults to the process-wide rerank_score_cache
+
+    Returns:
+        List of dictionary of ["index": int, "relevance_score": float]
+    """
+    if document_ids is not None and len(document_ids) != len(documents):
+        raise ValueError("document_ids must have one id per document")
+    if cache is None:
+        cache = rerank_score_cache
+    batch_size = max(
+        1,
+        min(
+            max_batch_size,
+            get_env_value("RERANK_BATCH_SIZE", max_batch_size, int),
+        ),
+    )
+    if max_concurrency is None:
+        max_concurrency = get_env_value(
+            "RERANK_MAX_CONCURRENCY", DEFAULT_RERANK_MAX_CONCURRENCY, int
+        )
+
+    query_hash = compute_mdhash_id(query)
+    scores: Dict[int, float] = {}
+    # Documents to score, by cache key, with their positions in documents
+    pending: Dict[tuple, List[int]] = {}
+    for index, text in enumerate(documents):
+        doc_key = document_ids[index] if document_ids else compute_mdhash_id(text)
+        key = (model, query_hash, doc_key)
+        score = cache.get(key)
+        if score is None:
+            pending.setdefault(key, []).append(index)
+        else:
+            scores[index] = score
+    cached = len(scores)
+
+    if pending:
+        keys = list(pending)
+        texts = [documents[pending[key][0]] for key in keys]
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def score_batch(start: int) -> None:
+            batch = texts[start : start + batch_size]
+            async with semaphore:
+                results = await rerank_batch(documents=batch)
+            for result in results:
+                position = result["index"]
+                if not 0 <= position < len(batch):
+                    continue
+                key = keys[start + position]
+                score = result["relevance_score"]
+                cache.set(key, score)
+                for index in pending[key]:
+                    scores[index] = score
+
+        await asyncio.gather(
+            *(score_batch(start) for start in range(0, len(texts), batch_size))
+        )
+
+    logger.debug(
+        f"Rerank: {cached}/{len(documents)} scores cached, {len(pending)} documents "
+        f"scored in {-(-len(pending) // batch_size)} requests"
+    )
+    ranked = sorted(scores, key=lambda index: (-scores[index], index))
+    if top_n is not None:
+        ranked = ranked[:top_n]
+    return [{"index": index, "relevance_score": scores[index]} for index in ranked]
+
 
 @retry(
     stop=stop_after_attempt(3),
@@ -177,6 +351,8 @@ async def cohere_rerank(
     model: str = "rerank-v3.5",
     base_url: str = "https://api.cohere.com/v2/rerank",
     extra_body: Optional[Dict[str, Any]] = None,
+    document_ids: Optional[List[str]] = None,
+    max_batch_size: int = COHERE_MAX_BATCH_SIZE,
 ) -> List[Dict[str, Any]]:
     """
     Rerank documents using Cohere API.
@@ -189,6 +365,8 @@ async def cohere_rerank(
         model: rerank model name
         base_url: API endpoint
         extra_body: Additional body for http request(reserved for extra params)
+        document_ids: Chunk ids of the documents, used as score cache keys
+        max_batch_size: Maximum documents per request
 
     Returns:
         List of dictionary of ["index": int, "relevance_score": float]
@@ -196,17 +374,25 @@ async def cohere_rerank(
     if api_key is None:
         api_key = os.getenv("COHERE_API_KEY") or os.getenv("RERANK_BINDING_API_KEY")
 
-    return await generic_rerank_api(
+    rerank_batch = partial(
+        generic_rerank_api,
         query=query,
-        documents=documents,
         model=model,
         base_url=base_url,
         api_key=api_key,
-        top_n=top_n,
         return_documents=None,  # Cohere doesn't support this parameter
         extra_body=extra_body,
         response_format="standard",
     )
+    return await cached_rerank(
+        query=query,
+        documents=documents,
+        rerank_batch=rerank_batch,
+        model=_cache_model_key(model, extra_body),
+        top_n=top_n,
+        document_ids=document_ids,
+        max_batch_size=max_batch_size,
+    )
 
 
 async def jina_rerank(
@@ -217,6 +403,8 @@ async def jina_rerank(
     model: str = "jina-reranker-v2-base-multilingual",
     base_url: str = "https://api.jina.ai/v1/rerank",
     extra_body: Optional[Dict[str, Any]] = None,
+    document_ids: Optional[List[str]] = None,
+    max_batch_size: int = JINA_MAX_BATCH_SIZE,
 ) -> List[Dict[str, Any]]:
     """
     Rerank documents using Jina AI API.
@@ -229,6 +417,8 @@ async def jina_rerank(
         model: rerank model name
         base_url: API endpoint
         extra_body: Additional body for http request(reserved for extra params)
+        document_ids: Chunk ids of the documents, used as score cache keys
+        max_batch_size: Maximum documents per request
 
     Returns:
         List of dictionary of ["index": int, "relevance_score": float]
@@ -236,17 +426,25 @@ async def jina_rerank(
     if api_key is None:
         api_key = os.getenv("JINA_API_KEY") or os.getenv("RERANK_BINDING_API_KEY")
 
-    return await generic_rerank_api(
+    rerank_batch = partial(
+        generic_rerank_api,
         query=query,
-        documents=documents,
         model=model,
         base_url=base_url,
         api_key=api_key,
-        top_n=top_n,
         return_documents=False,
         extra_body=extra_body,
         response_format="standard",
     )
+    return await cached_rerank(
+        query=query,
+        documents=documents,
+        rerank_batch=rerank_batch,
+        model=_cache_model_key(model, extra_body),
+        top_n=top_n,
+        document_ids=document_ids,
+        max_batch_size=max_batch_size,
+    )
 
 
 async def ali_rerank(
@@ -257,6 +455,8 @@ async def ali_rerank(
     model: str = "gte-rerank-v2",
     base_url: str = "https://dashscope.aliyuncs.com/api/v1/services/rerank/text-rerank/text-rerank",
     extra_body: Optional[Dict[str, Any]] = None,
+    document_ids: Optional[List[str]] = None,
+    max_batch_size: int = ALI_MAX_BATCH_SIZE,
 ) -> List[Dict[str, Any]]:
     """
     Rerank documents using Aliyun DashScope API.
@@ -269,6 +469,8 @@ async def ali_rerank(
         model: rerank model name
         base_url: API endpoint
         extra_body: Additional body for http request(reserved for extra params)
+        document_ids: Chunk ids of the documents, used as score cache keys
+        max_batch_size: Maximum documents per request
 
     Returns:
         List of dictionary of ["index": int, "relevance_score": float]
@@ -276,18 +478,26 @@ async def ali_rerank(
     if api_key is None:
         api_key = os.getenv("DASHSCOPE_API_KEY") or os.getenv("RERANK_BINDING_API_KEY")
 
-    return await generic_rerank_api(
+    rerank_batch = partial(
+        generic_rerank_api,
         query=query,
-        documents=documents,
         model=model,
         base_url=base_url,
         api_key=api_key,
-        top_n=top_n,
         return_documents=False,  # Aliyun doesn't need this parameter
         extra_body=extra_body,
         response_format="aliyun",
         request_format="aliyun",
     )
+    return await cached_rerank(
+        query=query,
+        documents=documents,
+        rerank_batch=rerank_batch,
+        model=_cache_model_key(model, extra_body),
+        top_n=top_n,
+        document_ids=document_ids,
+        max_batch_size=max_batch_size,
+    )
 
 
 """Please run this test as a module:
@@ -0,0 +1,533 @@
+"""
+Lightweight spans and timers for LightRAG's hot paths.
+
+Tracing is off by default. While it is off, ``span()`` returns a shared no-op
+object after a flag check and a context variable lookup, and ``traced``
+functions call straight through, so the instrumentation can stay in the query,
+ingestion, LLM queue and storage code paths.
+
+When enabled (``enable_tracing()`` or ENABLE_TRACING=true), every finished
+span is:
+
+- aggregated into per-span duration histograms, exposed in the Prometheus
+  text format by ``render_prometheus()`` (served on /metrics by the API server)
+- passed to the registered span exporters; ``JsonLinesSpanExporter`` writes
+  spans in the OpenTelemetry (OTLP JSON) span layout, and with otel=True
+  spans are mirrored into the installed OpenTelemetry SDK
+
+Independently of the global switch, ``collect_spans()`` records the spans of
+one operation, which aquery_data uses to return a per-query timing breakdown.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from dotenv import load_dotenv
+
+# use the .env that is inside the current folder
+# allows to use different .env file for each lightrag instance
+# the OS environment variables take precedence over the .env file
+load_dotenv(dotenv_path=".env", override=False)
+
+logger = logging.getLogger("lightrag")
+
+# Histogram buckets in seconds, from storage lookups to slow LLM calls
+DURATION_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+_enabled = False
+_otel_tracer = None
+_exporters: list[Callable[["Span"], None]] = []
+_current_span: ContextVar["Span | None"] = ContextVar("_current_span", default=None)
+_collector: ContextVar[list | None] = ContextVar("_collector", default=None)
+
+
+class _NoopSpan:
+    """Returned by span() while nothing records spans"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation, nested under the span active when it was entered"""
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "trace_id",
+        "span_id",
+        "parent",
+        "start_time_ns",
+        "end_time_ns",
+        "error",
+        "_start",
+        "_collector",
+        "_tokens",
+        "_otel_span",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        parent: "Span | None" = None,
+        collector: list | None = None,
+    ):
+        self.name = name
+        self.attributes = dict(attributes) if attributes else {}
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.start_time_ns = 0
+        self.end_time_ns = 0
+        self.error: str | None = None
+        self._start = 0.0
+        self._collector = collector
+        self._tokens: tuple = ()
+        self._otel_span = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (0 while the span is running)"""
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+        if self._otel_span is not None:
+            self._otel_span.set_attribute(key, _otel_value(value))
+
+    def __enter__(self) -> "Span":
+        self._tokens = (
+            _current_span.set(self),
+            _collector.set(self._collector) if self._collector is not None else None,
+        )
+        if _otel_tracer is not None:
+            self._otel_span = _start_otel_span(self)
+        self.start_time_ns = time.time_ns()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._start
+        self.end_time_ns = self.start_time_ns + int(elapsed * 1e9)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        span_token, collector_token = self._tokens
+        _current_span.reset(span_token)
+        if collector_token is not None:
+            _collector.reset(collector_token)
+        _finish(self)
+        return False
+
+    def to_dict(self) -> dict[str, Any]:
+        """The span in the OpenTelemetry OTLP JSON span layout"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": self.error} if self.error else {"code": 1}
+            ),
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otel_value(value: Any) -> Any:
+    return value if isinstance(value, (bool, int, float, str)) else str(value)
+
+
+def _start_otel_span(span: Span):
+    from opentelemetry import trace as otel_trace
+
+    context = None
+    if span.parent is not None and span.parent._otel_span is not None:
+        context = otel_trace.set_span_in_context(span.parent._otel_span)
+    return _otel_tracer.start_span(
+        span.name,
+        context=context,
+        attributes={k: _otel_value(v) for k, v in span.attributes.items()},
+    )
+
+
+def _finish(span: Span) -> None:
+    if span._otel_span is not None:
+        if span.error:
+            from opentelemetry.trace import Status, StatusCode
+
+            span._otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        span._otel_span.end()
+    collector = _collector.get() if span._collector is None else span._collector
+    if collector is not None:
+        collector.append(span)
+    if _enabled:
+        _metrics.observe(span.name, span.duration, span.error is not None)
+        for exporter in _exporters:
+            try:
+                exporter(span)
+            except Exception as e:
+                logger.debug(f"Span exporter failed: {e}")
+
+
+def is_tracing_active() -> bool:
+    """True if spans are recorded, globally or for the running operation"""
+    return _enabled or _collector.get() is not None
+
+
+def span(name: str, attributes: dict[str, Any] | None = None) -> Span | _NoopSpan:
+    """Time a block: ``with span("kg_query", {"mode": mode}):``"""
+    if not _enabled and _collector.get() is None:
+        return NOOP_SPAN
+    return Span(name, attributes, parent=_current_span.get())
+
+
+def traced(name: str | None = None) -> Callable:
+    """Decorator recording each call of an async function as a span"""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not _enabled and _collector.get() is None:
+                return await func(*args, **kwargs)
+            with Span(span_name, parent=_current_span.get()):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def capture_context() -> tuple | None:
+    """The active span and collector, to continue a trace in another task
+
+    Returns None while nothing records spans, so callers pay one check.
+    """
+    collector = _collector.get()
+    if not _enabled and collector is None:
+        return None
+    return _current_span.get(), collector
+
+
+def span_in_context(
+    context: tuple | None, name: str, attributes: dict[str, Any] | None = None
+) -> Span | _NoopSpan:
+    """A span parented to a context from capture_context()
+
+    Used where work is handed to long-lived tasks (the LLM and embedding queue
+    workers) that do not inherit the caller's context variables.
+    """
+    if context is None:
+        return NOOP_SPAN
+    parent, collector = context
+    return Span(name, attributes, parent=parent, collector=collector)
+
+
+@contextmanager
+def collect_spans() -> Iterator[list[Span]]:
+    """Record the spans finished inside the block, even when tracing is disabled"""
+    spans: list[Span] = []
+    token = _collector.set(spans)
+    try:
+        yield spans
+    finally:
+        _collector.reset(token)
+
+
+def timing_breakdown(spans: list[Span]) -> dict[str, Any]:
+    """Summarize collected spans: total seconds and call count per span name,
+    and the span tree with start offsets relative to the first span"""
+    if not spans:
+        return {"totals": {}, "spans": []}
+    origin = min(s.start_time_ns for s in spans)
+    totals: dict[str, dict[str, float]] = {}
+    for s in spans:
+        total = totals.setdefault(s.name, {"seconds": 0.0, "count": 0})
+        total["seconds"] += s.duration
+        total["count"] += 1
+    for total in totals.values():
+        total["seconds"] = round(total["seconds"], 4)
+
+    ordered = sorted(spans, key=lambda s: s.start_time_ns)
+    return {
+        "totals": totals,
+        "spans": [
+            {
+                "name": s.name,
+                "id": s.span_id,
+                "parent_id": s.parent.span_id if s.parent else None,
+                "start_ms": round((s.start_time_ns - origin) / 1e6, 2),
+                "duration_ms": round(s.duration * 1000, 2),
+                **({"attributes": s.attributes} if s.attributes else {}),
+                **({"error": s.error} if s.error else {}),
+            }
+            for s in ordered
+        ],
+    }
+
+
+class _SpanMetrics:
+    """Per-span-name duration histograms and error counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[str, list] = {}  # name -> [bucket counts, sum, count]
+        self._errors: dict[str, int] = {}
+
+    def observe(self, name: str, duration: float, error: bool) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = [
+                    [0] * len(DURATION_BUCKETS),
+                    0.0,
+                    0,
+                ]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += duration
+            histogram[2] += 1
+            if error:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = {
+                name: (list(h[0]), h[1], h[2]) for name, h in self._histograms.items()
+            }
+            errors = dict(self._errors)
+
+        lines = [
+            "# HELP lightrag_span_duration_seconds Duration of instrumented LightRAG operations",
+            "# TYPE lightrag_span_duration_seconds histogram",
+        ]
+        for name in sorted(histograms):
+            buckets, total, count = histograms[name]
+            label = _label(name)
+            cumulative = 0
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(
+                    f'lightrag_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'lightrag_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {count}'
+            )
+            lines.append(
+                f'lightrag_span_duration_seconds_sum{{span="{label}"}} {total:.6f}'
+            )
+            lines.append(
+                f'lightrag_span_duration_seconds_count{{span="{label}"}} {count}'
+            )
+
+        lines += [
+            "# HELP lightrag_span_errors_total Instrumented LightRAG operations that raised",
+            "# TYPE lightrag_span_errors_total counter",
+        ]
+        for name in sorted(errors):
+            lines.append(
+                f'lightrag_span_errors_total{{span="{_label(name)}"}} {errors[name]}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _QueueWaitMetrics:
+    """Histograms of the time calls wait in the lanes of the LLM and embedding queues
+
+    Recorded whether or not tracing is enabled, one observation per queued call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (queue, lane) -> [bucket counts, sum, count]
+        self._histograms: dict[tuple[str, str], list] = {}
+
+    def observe(self, queue: str, lane: str, wait: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((queue, lane))
+            if histogram is None:
+                histogram = self._histograms[(queue, lane)] = [
+                    [0] * len(DURATION_BUCKETS),
+                    0.0,
+                    0,
+                ]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if wait <= bound:
+                    histogram[0][i] += 1
+                    break
+            histogram[1] += wait
+            histogram[2] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = {
+                key: (list(h[0]), h[1], h[2]) for key, h in self._histograms.items()
+            }
+
+        lines = [
+            "# HELP lightrag_queue_wait_seconds Time LLM and embedding calls waited for a worker, by lane",
+            "# TYPE lightrag_queue_wait_seconds histogram",
+        ]
+        for queue, lane in sorted(histograms):
+            buckets, total, count = histograms[(queue, lane)]
+            labels = f'queue="{_label(queue)}",lane="{_label(lane)}"'
+            cumulative = 0
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                cumulative += bucket_count
+                lines.append(
+                    f'lightrag_queue_wait_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'lightrag_queue_wait_seconds_bucket{{{labels},le="+Inf"}} {count}'
+            )
+            lines.append(f"lightrag_queue_wait_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"lightrag_queue_wait_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = _SpanMetrics()
+_queue_waits = _QueueWaitMetrics()
+
+
+def observe_queue_wait(queue: str, lane: str, wait: float) -> None:
+    """Record the seconds a call waited in a lane of a concurrency queue"""
+    _queue_waits.observe(queue, lane, wait)
+
+
+def render_prometheus() -> str:
+    """Span and queue wait metrics in the Prometheus text exposition format"""
+    return _metrics.render() + _queue_waits.render()
+
+
+class JsonLinesSpanExporter:
+    """Append finished spans to a file, one OTLP JSON span per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def add_span_exporter(exporter: Callable[[Span], None]) -> None:
+    """Register a callable receiving every finished span while tracing is enabled"""
+    _exporters.append(exporter)
+
+
+def enable_tracing(otel: bool = False, jsonl_file: str | None = None) -> None:
+    """Start recording spans into the metrics and exporters
+
+    Args:
+        otel: Mirror spans into the OpenTelemetry SDK configured in this process
+            (requires the opentelemetry-api package)
+        jsonl_file: Also write spans to this file as OTLP JSON lines
+    """
+    global _enabled, _otel_tracer
+    if otel and _otel_tracer is None:
+        try:
+            from opentelemetry import trace as otel_trace
+
+            _otel_tracer = otel_trace.get_tracer("lightrag")
+        except ImportError:
+            logger.warning(
+                "opentelemetry-api is not installed, OpenTelemetry export is disabled"
+            )
+    if jsonl_file:
+        add_span_exporter(JsonLinesSpanExporter(jsonl_file))
+    _enabled = True
+
+
+def disable_tracing() -> None:
+    """Stop recording spans, registered exporters are removed"""
+    global _enabled, _otel_tracer
+    _enabled = False
+    _otel_tracer = None
+    _exporters.clear()
+
+
+def is_tracing_enabled() -> bool:
+    return _enabled
+
+
+def reset_metrics() -> None:
+    _metrics.reset()
+    _queue_waits.reset()
+
+
+if os.getenv("ENABLE_TRACING", "false").lower() in ("true", "1", "yes", "t", "on"):
+    enable_tracing(
+        otel=os.getenv("TRACING_OTEL", "false").lower()
+        in ("true", "1", "yes", "t", "on"),
+        jsonl_file=os.getenv("TRACING_JSONL_FILE") or None,
+    )
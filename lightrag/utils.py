@@ -4,16 +4,21 @@ import weakref
 import asyncio
 import html
 import csv
+import heapq
+import inspect
 import json
 import logging
 import logging.handlers
 import os
 import re
+import tempfile
 import time
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 from hashlib import md5
 from typing import (
     Any,
@@ -39,6 +44,7 @@ from lightrag.constants import (
     VALID_SOURCE_IDS_LIMIT_METHODS,
     SOURCE_IDS_LIMIT_METHOD_FIFO,
 )
+from lightrag.tracing import capture_context, observe_queue_wait, span_in_context
 
 # Initialize logger with basic configuration
 logger = logging.getLogger("lightrag")
@@ -56,18 +62,18 @@ if not logger.handlers:
 # Set httpx logging level to WARNING
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
-# Global import for pypinyin with startup-time logging
-try:
-    import pypinyin
-
-    _PYPINYIN_AVAILABLE = True
-    # logger.info("pypinyin loaded successfully for Chinese pinyin sorting")
-except ImportError:
-    pypinyin = None
-    _PYPINYIN_AVAILABLE = False
-    logger.warning(
-        "pypinyin is not installed. Chinese pinyin sorting will use simple string sorting."
-    )
+
+@lru_cache(maxsize=1)
+def _load_pypinyin():
+    """Import pypinyin on first use, its dictionaries take longer to load than the rest of lightrag"""
+    try:
+        import pypinyin
+    except ImportError:
+        logger.warning(
+            "pypinyin is not installed. Chinese pinyin sorting will use simple string sorting."
+        )
+        return None
+    return pypinyin
 
 
 async def safe_vdb_operation_with_exception(
@@ -114,6 +120,151 @@ async def safe_vdb_operation_with_exception(
                     await asyncio.sleep(retry_delay)
 
 
+# Futures of vector writes deferred by the current task, see defer_vdb_writes()
+_deferred_vdb_writes: ContextVar[list | None] = ContextVar(
+    "deferred_vdb_writes", default=None
+)
+
+
+@contextmanager
+def defer_vdb_writes(writes: list):
+    """Collect VectorUpsertCoalescer writes of the current task instead of waiting for them
+
+    Inside this block VectorUpsertCoalescer.upsert() returns as soon as the payload is
+    buffered and appends the write's future to `writes`. The caller must await the
+    collected futures (see wait_vdb_writes) before relying on the data being stored.
+    """
+    token = _deferred_vdb_writes.set(writes)
+    try:
+        yield writes
+    except BaseException:
+        # Nobody will await the collected writes; keep their failures from going unobserved
+        for write in writes:
+            write.add_done_callback(lambda f: f.cancelled() or f.exception())
+        raise
+    finally:
+        _deferred_vdb_writes.reset(token)
+
+
+async def wait_vdb_writes(writes: list) -> None:
+    """Wait for deferred vector writes, raising the first failure"""
+    if writes:
+        await asyncio.gather(*writes)
+
+
+class VectorUpsertCoalescer:
+    """Write-behind buffer that merges small upserts into batched vector storage writes
+
+    Concurrent callers each upsert a few records; the coalescer buffers them and writes
+    one batch once `batch_size` records are pending or `max_delay` seconds have passed
+    since the first buffered record, so the storage embeds full batches instead of one
+    request per record. Batches are written one at a time in arrival order, and every
+    caller is resolved (or receives the batch error) when its batch has been written.
+
+    Only upsert and delete are supported; other reads go to the wrapped storage directly.
+    """
+
+    def __init__(
+        self,
+        storage: "BaseVectorStorage",
+        batch_size: int,
+        max_delay: float,
+        operation_name: str = "batched_upsert",
+    ):
+        self.storage = storage
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.operation_name = operation_name
+        self._buffer: dict[str, dict[str, Any]] = {}
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # Serializes batch writes so they reach the storage in arrival order
+        self._write_lock = asyncio.Lock()
+        # Scheduled but not yet finished batch writes with the ids they carry
+        self._flush_tasks: dict[asyncio.Task, set[str]] = {}
+        self.batches_written = 0
+        self.records_written = 0
+
+    @property
+    def namespace(self) -> str:
+        return self.storage.namespace
+
+    async def upsert(self, data: dict[str, dict[str, Any]]) -> None:
+        if not data:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._buffer.update(data)
+        self._waiters.append(future)
+
+        if len(self._buffer) >= self.batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._schedule_flush)
+
+        deferred = _deferred_vdb_writes.get()
+        if deferred is not None:
+            deferred.append(future)
+            return
+        await future
+
+    async def delete(self, ids: list[str]) -> None:
+        # A delete supersedes buffered upserts of the same ids
+        for id in ids:
+            self._buffer.pop(id, None)
+        # Batches already handed to a writer must land before the delete does
+        blocking = [
+            task
+            for task, task_ids in self._flush_tasks.items()
+            if task_ids.intersection(ids)
+        ]
+        if blocking:
+            await asyncio.wait(blocking)
+        await self.storage.delete(ids)
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._waiters:
+            return
+        batch, waiters = self._buffer, self._waiters
+        self._buffer, self._waiters = {}, []
+        task = asyncio.create_task(self._write_batch(batch, waiters))
+        self._flush_tasks[task] = set(batch)
+        task.add_done_callback(lambda t: self._flush_tasks.pop(t, None))
+
+    async def _write_batch(
+        self, batch: dict[str, dict[str, Any]], waiters: list[asyncio.Future]
+    ) -> None:
+        async with self._write_lock:
+            try:
+                if batch:
+                    await safe_vdb_operation_with_exception(
+                        operation=lambda: self.storage.upsert(batch),
+                        operation_name=self.operation_name,
+                        entity_name=f"{len(batch)} records of {self.namespace}",
+                        max_retries=3,
+                        retry_delay=0.2,
+                    )
+                    self.batches_written += 1
+                    self.records_written += len(batch)
+            except Exception as e:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+    async def flush(self) -> None:
+        """Write everything buffered so far and wait for all pending batches"""
+        self._schedule_flush()
+        if self._flush_tasks:
+            await asyncio.wait(list(self._flush_tasks))
+
+
 def get_env_value(
     env_key: str, default: any, value_type: type = str, special_none: bool = False
 ) -> any:
@@ -346,6 +497,154 @@ class TaskState:
     worker_started: bool = False
     cancellation_requested: bool = False
     cleanup_done: bool = False
+    trace_context: tuple | None = None  # Caller's tracing context, see capture_context
+
+
+QUERY_LANE = "query"
+INGEST_LANE = "ingest"
+# Calls queued with a priority at or below this value run in the query lane,
+# query paths use _priority=5 and ingestion uses 8 (summaries) or the default 10
+QUERY_LANE_MAX_PRIORITY = 5
+
+_scheduling_flow: ContextVar[tuple[str, float]] = ContextVar(
+    "lightrag_scheduling_flow", default=("", 1.0)
+)
+
+
+@contextmanager
+def scheduling_flow(key: str, weight: float = 1.0):
+    """Attribute the queued LLM and embedding calls made in this context to a flow
+
+    Calls of the same lane and priority are dispatched by weighted fair queuing
+    between flows: while both have calls queued, a flow of weight 2 gets twice
+    as many workers as a flow of weight 1, whatever the number of calls each
+    one queued.
+
+    Args:
+        key: Flow identifier, e.g. the workspace or the workspace and track id
+        weight: Share of the flow relative to the other flows
+    """
+    if weight <= 0:
+        raise ValueError(f"Flow weight must be positive, got {weight}")
+    token = _scheduling_flow.set((key, weight))
+    try:
+        yield
+    finally:
+        _scheduling_flow.reset(token)
+
+
+class LaneQueue:
+    """Task queue of priority_limit_async_func_call with a query lane and an ingest lane
+
+    A free worker always takes a queued query call first, so queries overtake
+    every ingestion call that has not started yet, and ingestion calls never
+    occupy the reserved_slots workers kept for queries. Each lane has its own
+    capacity, a backlog of ingestion calls never blocks queries from being
+    queued.
+
+    Within a lane, calls are ordered by priority, then by weighted fair queuing
+    between flows (see scheduling_flow): every call gets the virtual finish tag
+    of its flow advanced by 1 / weight, and the lane serves the smallest tag.
+
+    Args:
+        max_size: Number of workers
+        reserved_slots: Workers that only run query calls
+        max_queue_size: Capacity of each lane
+    """
+
+    def __init__(self, max_size: int, reserved_slots: int, max_queue_size: int):
+        # At least one worker is left to ingestion
+        self.reserved_slots = min(max(reserved_slots, 0), max_size - 1)
+        self.ingest_slots = max_size - self.reserved_slots
+        self.max_queue_size = max_queue_size
+        self._heaps: dict[str, list] = {QUERY_LANE: [], INGEST_LANE: []}
+        self._running = {QUERY_LANE: 0, INGEST_LANE: 0}
+        self._virtual_time = {QUERY_LANE: 0.0, INGEST_LANE: 0.0}
+        self._flow_tags: dict[str, dict[str, float]] = {
+            QUERY_LANE: {},
+            INGEST_LANE: {},
+        }
+        self._waits = {lane: [0, 0.0, 0.0] for lane in self._heaps}  # count, sum, max
+        self._unfinished = 0
+        self._changed = asyncio.Condition()
+
+    @staticmethod
+    def lane_of(priority: int) -> str:
+        return QUERY_LANE if priority <= QUERY_LANE_MAX_PRIORITY else INGEST_LANE
+
+    def _ready(self) -> bool:
+        return bool(self._heaps[QUERY_LANE]) or (
+            bool(self._heaps[INGEST_LANE])
+            and self._running[INGEST_LANE] < self.ingest_slots
+        )
+
+    async def put(self, priority: int, count: int, item: tuple) -> None:
+        """Queue an item, waiting while its lane is full"""
+        lane = self.lane_of(priority)
+        flow, weight = _scheduling_flow.get()
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: len(self._heaps[lane]) < self.max_queue_size
+            )
+            tags = self._flow_tags[lane]
+            start = max(self._virtual_time[lane], tags.get(flow, 0.0))
+            finish = start + 1.0 / weight
+            tags[flow] = finish
+            heapq.heappush(self._heaps[lane], (priority, finish, count, start, item))
+            self._unfinished += 1
+            self._changed.notify_all()
+
+    async def get(self) -> tuple[str, int, tuple]:
+        """Next item a worker may run, as (lane, priority, item)"""
+        async with self._changed:
+            await self._changed.wait_for(self._ready)
+            lane = QUERY_LANE if self._heaps[QUERY_LANE] else INGEST_LANE
+            heap = self._heaps[lane]
+            priority, _, _, start, item = heapq.heappop(heap)
+            self._running[lane] += 1
+            self._virtual_time[lane] = max(self._virtual_time[lane], start)
+            if not heap:
+                # Busy period over, the flows start again from equal tags
+                self._flow_tags[lane].clear()
+                self._virtual_time[lane] = 0.0
+            self._changed.notify_all()
+            return lane, priority, item
+
+    async def task_done(self, lane: str) -> None:
+        # Counted before waiting for the lock, a worker cancelled here leaves them right
+        self._running[lane] -= 1
+        self._unfinished -= 1
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def join(self) -> None:
+        """Wait until every queued item was processed"""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._unfinished == 0)
+
+    def record_wait(self, lane: str, wait: float) -> None:
+        stats = self._waits[lane]
+        stats[0] += 1
+        stats[1] += wait
+        stats[2] = max(stats[2], wait)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Queued and running calls and queue wait times of each lane"""
+        return {
+            lane: {
+                "queued": len(self._heaps[lane]),
+                "running": self._running[lane],
+                "slots": self.reserved_slots + self.ingest_slots
+                if lane == QUERY_LANE
+                else self.ingest_slots,
+                "calls": self._waits[lane][0],
+                "mean_wait": self._waits[lane][1] / self._waits[lane][0]
+                if self._waits[lane][0]
+                else 0.0,
+                "max_wait": self._waits[lane][2],
+            }
+            for lane in self._heaps
+        }
 
 
 @dataclass
@@ -452,6 +751,7 @@ def priority_limit_async_func_call(
     max_queue_size: int = 1000,
     cleanup_timeout: float = 2.0,
     queue_name: str = "limit_async",
+    reserved_slots: int = 0,
 ):
     """
     Enhanced priority-limited asynchronous function call decorator with robust timeout handling
@@ -461,18 +761,23 @@ def priority_limit_async_func_call(
     - Task state tracking to prevent race conditions
     - Enhanced health check system with stuck task detection
     - Proper resource cleanup and error recovery
+    - Separate query and ingestion lanes with reserved query workers and
+      weighted fair queuing between flows (see LaneQueue)
 
     Args:
         max_size: Maximum number of concurrent calls
-        max_queue_size: Maximum queue capacity to prevent memory overflow
+        max_queue_size: Maximum queue capacity of each lane to prevent memory overflow
         llm_timeout: LLM provider timeout (from global config), used to calculate other timeouts
         max_execution_timeout: Maximum time for worker to execute function (defaults to llm_timeout + 30s)
         max_task_duration: Maximum time before health check intervenes (defaults to llm_timeout + 60s)
         cleanup_timeout: Maximum time to wait for cleanup operations (defaults to 2.0s)
         queue_name: Optional queue name for logging identification (defaults to "limit_async")
+        reserved_slots: Workers only running query lane calls (priority <= 5), at
+            least one worker is always left to the ingest lane
 
     Returns:
-        Decorator function
+        Decorator function, the decorated function's lane_stats() returns the
+        queued and running calls and queue wait times of each lane
     """
 
     def final_decro(func):
@@ -492,7 +797,7 @@ def priority_limit_async_func_call(
                     llm_timeout * 2 + 15
                 )  # Reserved timeout buffer for health check phase
 
-        queue = asyncio.PriorityQueue(maxsize=max_queue_size)
+        queue = LaneQueue(max_size, reserved_slots, max_queue_size)
         tasks = set()
         initialization_lock = asyncio.Lock()
         counter = 0
@@ -514,11 +819,9 @@ def priority_limit_async_func_call(
                         # Get task from queue with timeout for shutdown checking
                         try:
                             (
+                                lane,
                                 priority,
-                                count,
-                                task_id,
-                                args,
-                                kwargs,
+                                (task_id, args, kwargs),
                             ) = await asyncio.wait_for(queue.get(), timeout=1.0)
                         except asyncio.TimeoutError:
                             continue
@@ -526,7 +829,7 @@ def priority_limit_async_func_call(
                         # Get task state and mark worker as started
                         async with task_states_lock:
                             if task_id not in task_states:
-                                queue.task_done()
+                                await queue.task_done(lane)
                                 continue
                             task_state = task_states[task_id]
                             task_state.worker_started = True
@@ -542,17 +845,34 @@ def priority_limit_async_func_call(
                         ):
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
-                            queue.task_done()
+                            await queue.task_done(lane)
                             continue
 
+                        queue_wait = (
+                            task_state.execution_start_time - task_state.start_time
+                        )
+                        queue.record_wait(lane, queue_wait)
+                        observe_queue_wait(queue_name, lane, queue_wait)
+
                         try:
-                            # Execute function with timeout protection
-                            if max_execution_timeout is not None:
-                                result = await asyncio.wait_for(
-                                    func(*args, **kwargs), timeout=max_execution_timeout
-                                )
-                            else:
-                                result = await func(*args, **kwargs)
+                            # Workers outlive callers, continue the caller's trace explicitly
+                            with span_in_context(
+                                task_state.trace_context,
+                                queue_name,
+                                {
+                                    "queue_wait": round(queue_wait, 4),
+                                    "priority": priority,
+                                    "lane": lane,
+                                },
+                            ):
+                                # Execute function with timeout protection
+                                if max_execution_timeout is not None:
+                                    result = await asyncio.wait_for(
+                                        func(*args, **kwargs),
+                                        timeout=max_execution_timeout,
+                                    )
+                                else:
+                                    result = await func(*args, **kwargs)
 
                             # Set result if future is still valid
                             if not task_state.future.done():
@@ -587,7 +907,7 @@ def priority_limit_async_func_call(
                             # Clean up task state
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
-                            queue.task_done()
+                            await queue.task_done(lane)
 
                     except Exception as e:
                         # Critical error in worker loop
@@ -721,8 +1041,13 @@ def priority_limit_async_func_call(
                 timeout_str = (
                     f"(Timeouts: {', '.join(timeout_info)})" if timeout_info else ""
                 )
+                lanes_str = (
+                    f" ({queue.reserved_slots} reserved for queries)"
+                    if queue.reserved_slots
+                    else ""
+                )
                 logger.info(
-                    f"{queue_name}: {workers_needed} new workers initialized {timeout_str}"
+                    f"{queue_name}: {workers_needed} new workers initialized{lanes_str} {timeout_str}"
                 )
 
         async def shutdown():
@@ -800,7 +1125,9 @@ def priority_limit_async_func_call(
 
             # Create task state
             task_state = TaskState(
-                future=future, start_time=asyncio.get_event_loop().time()
+                future=future,
+                start_time=asyncio.get_event_loop().time(),
+                trace_context=capture_context(),
             )
 
             try:
@@ -821,13 +1148,13 @@ def priority_limit_async_func_call(
                     if _queue_timeout is not None:
                         await asyncio.wait_for(
                             queue.put(
-                                (_priority, current_count, task_id, args, kwargs)
+                                _priority, current_count, (task_id, args, kwargs)
                             ),
                             timeout=_queue_timeout,
                         )
                     else:
                         await queue.put(
-                            (_priority, current_count, task_id, args, kwargs)
+                            _priority, current_count, (task_id, args, kwargs)
                         )
                 except asyncio.TimeoutError:
                     raise QueueFullError(
@@ -883,6 +1210,7 @@ def priority_limit_async_func_call(
 
         # Add shutdown method to decorated function
         wait_func.shutdown = shutdown
+        wait_func.lane_stats = queue.stats
 
         return wait_func
 
@@ -906,9 +1234,38 @@ def load_json(file_name):
         return json.load(f)
 
 
-def write_json(json_obj, file_name):
-    with open(file_name, "w", encoding="utf-8") as f:
-        json.dump(json_obj, f, indent=2, ensure_ascii=False)
+def write_file_atomic(file_name: str, write_func: Callable[[str], None]) -> int:
+    """Write a file through a temp file in the same directory and an atomic rename
+
+    Readers never observe a partially written file, and a crash mid-write leaves
+    the previous version intact.
+
+    Args:
+        file_name: Final path of the file
+        write_func: Callable writing the full content to the temp path it receives
+
+    Returns:
+        int: Number of bytes written
+    """
+    tmp_file = f"{file_name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        write_func(tmp_file)
+        size = os.path.getsize(tmp_file)
+        os.replace(tmp_file, file_name)
+        return size
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def write_json(json_obj, file_name) -> int:
+    """Atomically write json_obj to file_name, returns the number of bytes written"""
+
+    def _dump(path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(json_obj, f, indent=2, ensure_ascii=False)
+
+    return write_file_atomic(file_name, _dump)
 
 
 class TokenizerInterface(Protocol):
@@ -1189,6 +1546,294 @@ def always_get_an_event_loop() -> asyncio.AbstractEventLoop:
         return new_loop
 
 
+async def _get_vector_records(vdb, ids: list[str]) -> dict[str, dict[str, Any]]:
+    """Fetch vector records in bulk, keyed by id (missing ids are left out)"""
+    if not ids:
+        return {}
+    records = await vdb.get_by_ids(ids)
+    return {
+        requested_id: record
+        for requested_id, record in zip(ids, records)
+        if record is not None
+    }
+
+
+async def _iter_export_rows(
+    chunk_entity_relation_graph,
+    entities_vdb,
+    relationships_vdb,
+    include_vector_data: bool = False,
+    batch_size: int = 1000,
+    progress_callback: Callable[[str, int, int], None] | None = None,
+):
+    """Yield (section, rows) batches of the export: entities, then relations, then relationships
+
+    Entities and edges are read from the graph in batches of `batch_size` nodes and their
+    vector records fetched with one get_by_ids call per batch, so memory stays bounded
+    by the batch size instead of the graph size. Relationship rows found while reading
+    relations are spooled to a temporary file and yielded last.
+    """
+
+    def _report(section: str, processed: int, total: int) -> None:
+        logger.info(f"Export {section}: {processed}/{total} processed")
+        if progress_callback is not None:
+            progress_callback(section, processed, total)
+
+    all_entities = await chunk_entity_relation_graph.get_all_labels()
+    total = len(all_entities)
+
+    # --- Entities ---
+    for start in range(0, total, batch_size):
+        names = all_entities[start : start + batch_size]
+        nodes = await chunk_entity_relation_graph.get_nodes_batch(names)
+        entity_ids = [compute_mdhash_id(name, prefix="ent-") for name in names]
+        vectors = (
+            await _get_vector_records(entities_vdb, entity_ids)
+            if include_vector_data
+            else {}
+        )
+        rows = []
+        for entity_name, entity_id in zip(names, entity_ids):
+            node_data = nodes.get(entity_name)
+            entity_row = {
+                "entity_name": entity_name,
+                "source_id": node_data.get("source_id") if node_data else None,
+                "graph_data": str(node_data),  # Convert to string for compatibility
+            }
+            if include_vector_data:
+                entity_row["vector_data"] = str(vectors.get(entity_id))
+            rows.append(entity_row)
+        yield "entities", rows
+        _report("entities", start + len(names), total)
+
+    # --- Relations ---
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as relationships_spool:
+        for start in range(0, total, batch_size):
+            names = all_entities[start : start + batch_size]
+            nodes_edges = await chunk_entity_relation_graph.get_nodes_edges_batch(names)
+
+            pairs = []
+            seen = set()
+            for entity_name in names:
+                for src, tgt in nodes_edges.get(entity_name) or []:
+                    # Every edge is listed under both endpoints, export it once from the smaller one
+                    if min(src, tgt) != entity_name:
+                        continue
+                    edge_key = (src, tgt) if src <= tgt else (tgt, src)
+                    if edge_key not in seen:
+                        seen.add(edge_key)
+                        pairs.append((src, tgt))
+
+            if pairs:
+                edges = await chunk_entity_relation_graph.get_edges_batch(
+                    [{"src": src, "tgt": tgt} for src, tgt in pairs]
+                )
+                # Relation vectors may be stored under either direction of the pair
+                rel_ids = [
+                    (
+                        compute_mdhash_id(src + tgt, prefix="rel-"),
+                        compute_mdhash_id(tgt + src, prefix="rel-"),
+                    )
+                    for src, tgt in pairs
+                ]
+                vectors = await _get_vector_records(
+                    relationships_vdb, [rel_id for ids in rel_ids for rel_id in ids]
+                )
+
+                rows = []
+                for (src, tgt), (rel_id, rel_id_reverse) in zip(pairs, rel_ids):
+                    edge_data = edges.get((src, tgt))
+                    vector_data = vectors.get(rel_id) or vectors.get(rel_id_reverse)
+                    relation_row = {
+                        "src_entity": src,
+                        "tgt_entity": tgt,
+                        "source_id": edge_data.get("source_id") if edge_data else None,
+                        "graph_data": str(edge_data),  # Convert to string
+                    }
+                    if include_vector_data:
+                        relation_row["vector_data"] = str(vector_data)
+                    rows.append(relation_row)
+                    if vector_data is not None:
+                        relationships_spool.write(
+                            json.dumps(
+                                {
+                                    "relationship_id": vector_data.get(
+                                        "__id__", vector_data.get("id")
+                                    ),
+                                    "data": str(vector_data),
+                                },
+                                ensure_ascii=False,
+                            )
+                            + "\n"
+                        )
+                yield "relations", rows
+            _report("relations", start + len(names), total)
+
+        # --- Relationships (from VectorDB) ---
+        relationships_spool.seek(0)
+        rows = []
+        for line in relationships_spool:
+            rows.append(json.loads(line))
+            if len(rows) >= batch_size:
+                yield "relationships", rows
+                rows = []
+        if rows:
+            yield "relationships", rows
+
+
+class _CsvExportWriter:
+    """Write export sections incrementally to one CSV file, each with its own header"""
+
+    titles = {
+        "entities": "# ENTITIES",
+        "relations": "# RELATIONS",
+        "relationships": "# RELATIONSHIPS",
+    }
+
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", newline="", encoding="utf-8")
+        self._section = None
+        self._writer = None
+
+    def write(self, section: str, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if section != self._section:
+            if self._section is not None:
+                self._file.write("\n\n")
+            self._file.write(self.titles[section] + "\n")
+            self._writer = csv.DictWriter(self._file, fieldnames=rows[0].keys())
+            self._writer.writeheader()
+            self._section = section
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _MarkdownExportWriter:
+    """Write export sections incrementally as Markdown tables"""
+
+    sections = {
+        "entities": ("Entities", "entity"),
+        "relations": ("Relations", "relation"),
+        "relationships": ("Relationships", "relationship"),
+    }
+
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+        self._file.write("# LightRAG Data Export\n\n")
+        self._pending = list(self.sections)
+        self._section = None
+
+    def _close_section(self) -> None:
+        if self._section is not None:
+            self._file.write("\n\n")
+            self._section = None
+
+    def _skip_empty_sections(self, until: str | None = None) -> None:
+        while self._pending and self._pending[0] != until:
+            title, label = self.sections[self._pending.pop(0)]
+            self._file.write(f"## {title}\n\n*No {label} data available*\n\n")
+
+    def write(self, section: str, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if section != self._section:
+            self._close_section()
+            self._skip_empty_sections(until=section)
+            self._pending.remove(section)
+            keys = rows[0].keys()
+            self._file.write(f"## {self.sections[section][0]}\n\n")
+            self._file.write("| " + " | ".join(keys) + " |\n")
+            self._file.write("| " + " | ".join(["---"] * len(keys)) + " |\n")
+            self._section = section
+        for row in rows:
+            self._file.write("| " + " | ".join(str(v) for v in row.values()) + " |\n")
+
+    def close(self) -> None:
+        self._close_section()
+        self._skip_empty_sections()
+        self._file.close()
+
+
+class _JsonlExportWriter:
+    """Write every exported row as one JSON object tagged with its record type"""
+
+    record_types = {
+        "entities": "entity",
+        "relations": "relation",
+        "relationships": "relationship",
+    }
+
+    def __init__(self, output_path: str):
+        self._file = open(output_path, "w", encoding="utf-8")
+
+    def write(self, section: str, rows: list[dict[str, Any]]) -> None:
+        record_type = self.record_types[section]
+        self._file.writelines(
+            json.dumps({"type": record_type, **row}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetExportWriter:
+    """Write exported rows to a Parquet file, one row group per batch
+
+    All sections share one string schema; columns a record type does not use are null.
+    """
+
+    columns = (
+        "type",
+        "entity_name",
+        "src_entity",
+        "tgt_entity",
+        "source_id",
+        "graph_data",
+        "vector_data",
+        "relationship_id",
+        "data",
+    )
+
+    def __init__(self, output_path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in self.columns])
+        self._writer = pq.ParquetWriter(output_path, self._schema)
+
+    def write(self, section: str, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        record_type = _JsonlExportWriter.record_types[section]
+        table = self._pa.Table.from_pylist(
+            [
+                {
+                    "type": record_type,
+                    **{k: None if v is None else str(v) for k, v in row.items()},
+                }
+                for row in rows
+            ],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+_STREAMING_EXPORT_WRITERS = {
+    "csv": _CsvExportWriter,
+    "md": _MarkdownExportWriter,
+    "jsonl": _JsonlExportWriter,
+    "parquet": _ParquetExportWriter,
+}
+
+
 async def aexport_data(
     chunk_entity_relation_graph,
     entities_vdb,
@@ -1196,6 +1841,8 @@ async def aexport_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = 1000,
+    progress_callback: Callable[[str, int, int], None] | None = None,
 ) -> None:
     """
     Asynchronously exports all entities, relations, and relationships to various formats.
@@ -1205,287 +1852,161 @@ async def aexport_data(
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
+        file_format: Output format - "csv", "jsonl", "parquet", "excel", "md", "txt".
             - csv: Comma-separated values file
+            - jsonl: JSON Lines, one record per line tagged with its type
+            - parquet: Parquet file (requires pyarrow), one row group per batch
             - excel: Microsoft Excel file with multiple sheets
             - md: Markdown tables
             - txt: Plain text formatted output
+            csv, jsonl, parquet and md are written incrementally with bounded memory;
+            excel and txt need every row before writing.
         include_vector_data: Whether to include data from the vector database.
+        batch_size: Number of graph nodes read (and rows written) per batch.
+        progress_callback: Optional callable(section, processed, total) called after
+            each batch, where processed/total count graph nodes.
     """
-    # Collect data
-    entities_data = []
-    relations_data = []
-    relationships_data = []
+    if file_format not in _STREAMING_EXPORT_WRITERS and file_format not in (
+        "excel",
+        "txt",
+    ):
+        raise ValueError(
+            f"Unsupported file format: {file_format}. Choose from: csv, jsonl, parquet, excel, md, txt"
+        )
 
-    # --- Entities ---
-    all_entities = await chunk_entity_relation_graph.get_all_labels()
-    for entity_name in all_entities:
-        # Get entity information from graph
-        node_data = await chunk_entity_relation_graph.get_node(entity_name)
-        source_id = node_data.get("source_id") if node_data else None
-
-        entity_info = {
-            "graph_data": node_data,
-            "source_id": source_id,
-        }
+    export_rows = _iter_export_rows(
+        chunk_entity_relation_graph,
+        entities_vdb,
+        relationships_vdb,
+        include_vector_data=include_vector_data,
+        batch_size=batch_size,
+        progress_callback=progress_callback,
+    )
 
-        # Optional: Get vector database information
-        if include_vector_data:
-            entity_id = compute_mdhash_id(entity_name, prefix="ent-")
-            vector_data = await entities_vdb.get_by_id(entity_id)
-            entity_info["vector_data"] = vector_data
-
-        entity_row = {
-            "entity_name": entity_name,
-            "source_id": source_id,
-            "graph_data": str(
-                entity_info["graph_data"]
-            ),  # Convert to string to ensure compatibility
+    if file_format in _STREAMING_EXPORT_WRITERS:
+        writer = _STREAMING_EXPORT_WRITERS[file_format](output_path)
+        try:
+            async for section, rows in export_rows:
+                writer.write(section, rows)
+        finally:
+            writer.close()
+    else:
+        # Excel sheets and fixed-width text columns need all rows up front
+        entities_data = []
+        relations_data = []
+        relationships_data = []
+        collected = {
+            "entities": entities_data,
+            "relations": relations_data,
+            "relationships": relationships_data,
         }
-        if include_vector_data and "vector_data" in entity_info:
-            entity_row["vector_data"] = str(entity_info["vector_data"])
-        entities_data.append(entity_row)
+        async for section, rows in export_rows:
+            collected[section].extend(rows)
 
-    # --- Relations ---
-    for src_entity in all_entities:
-        for tgt_entity in all_entities:
-            if src_entity == tgt_entity:
-                continue
+        if file_format == "excel":
+            # Excel export
+            import pandas as pd
 
-            edge_exists = await chunk_entity_relation_graph.has_edge(
-                src_entity, tgt_entity
+            entities_df = (
+                pd.DataFrame(entities_data) if entities_data else pd.DataFrame()
+            )
+            relations_df = (
+                pd.DataFrame(relations_data) if relations_data else pd.DataFrame()
+            )
+            relationships_df = (
+                pd.DataFrame(relationships_data)
+                if relationships_data
+                else pd.DataFrame()
             )
-            if edge_exists:
-                # Get edge information from graph
-                edge_data = await chunk_entity_relation_graph.get_edge(
-                    src_entity, tgt_entity
-                )
-                source_id = edge_data.get("source_id") if edge_data else None
-
-                relation_info = {
-                    "graph_data": edge_data,
-                    "source_id": source_id,
-                }
-
-                # Optional: Get vector database information
-                if include_vector_data:
-                    rel_id = compute_mdhash_id(src_entity + tgt_entity, prefix="rel-")
-                    vector_data = await relationships_vdb.get_by_id(rel_id)
-                    relation_info["vector_data"] = vector_data
-
-                relation_row = {
-                    "src_entity": src_entity,
-                    "tgt_entity": tgt_entity,
-                    "source_id": relation_info["source_id"],
-                    "graph_data": str(relation_info["graph_data"]),  # Convert to string
-                }
-                if include_vector_data and "vector_data" in relation_info:
-                    relation_row["vector_data"] = str(relation_info["vector_data"])
-                relations_data.append(relation_row)
-
-    # --- Relationships (from VectorDB) ---
-    all_relationships = await relationships_vdb.client_storage
-    for rel in all_relationships["data"]:
-        relationships_data.append(
-            {
-                "relationship_id": rel["__id__"],
-                "data": str(rel),  # Convert to string for compatibility
-            }
-        )
-
-    # Export based on format
-    if file_format == "csv":
-        # CSV export
-        with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-            # Entities
-            if entities_data:
-                csvfile.write("# ENTITIES\n")
-                writer = csv.DictWriter(csvfile, fieldnames=entities_data[0].keys())
-                writer.writeheader()
-                writer.writerows(entities_data)
-                csvfile.write("\n\n")
-
-            # Relations
-            if relations_data:
-                csvfile.write("# RELATIONS\n")
-                writer = csv.DictWriter(csvfile, fieldnames=relations_data[0].keys())
-                writer.writeheader()
-                writer.writerows(relations_data)
-                csvfile.write("\n\n")
-
-            # Relationships
-            if relationships_data:
-                csvfile.write("# RELATIONSHIPS\n")
-                writer = csv.DictWriter(
-                    csvfile, fieldnames=relationships_data[0].keys()
-                )
-                writer.writeheader()
-                writer.writerows(relationships_data)
-
-    elif file_format == "excel":
-        # Excel export
-        import pandas as pd
-
-        entities_df = pd.DataFrame(entities_data) if entities_data else pd.DataFrame()
-        relations_df = (
-            pd.DataFrame(relations_data) if relations_data else pd.DataFrame()
-        )
-        relationships_df = (
-            pd.DataFrame(relationships_data) if relationships_data else pd.DataFrame()
-        )
-
-        with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
-            if not entities_df.empty:
-                entities_df.to_excel(writer, sheet_name="Entities", index=False)
-            if not relations_df.empty:
-                relations_df.to_excel(writer, sheet_name="Relations", index=False)
-            if not relationships_df.empty:
-                relationships_df.to_excel(
-                    writer, sheet_name="Relationships", index=False
-                )
-
-    elif file_format == "md":
-        # Markdown export
-        with open(output_path, "w", encoding="utf-8") as mdfile:
-            mdfile.write("# LightRAG Data Export\n\n")
-
-            # Entities
-            mdfile.write("## Entities\n\n")
-            if entities_data:
-                # Write header
-                mdfile.write("| " + " | ".join(entities_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(entities_data[0].keys())) + " |\n"
-                )
 
-                # Write rows
-                for entity in entities_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in entity.values()) + " |\n"
+            with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+                if not entities_df.empty:
+                    entities_df.to_excel(writer, sheet_name="Entities", index=False)
+                if not relations_df.empty:
+                    relations_df.to_excel(writer, sheet_name="Relations", index=False)
+                if not relationships_df.empty:
+                    relationships_df.to_excel(
+                        writer, sheet_name="Relationships", index=False
                     )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No entity data available*\n\n")
-
-            # Relations
-            mdfile.write("## Relations\n\n")
-            if relations_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relations_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| " + " | ".join(["---"] * len(relations_data[0].keys())) + " |\n"
-                )
 
-                # Write rows
-                for relation in relations_data:
-                    mdfile.write(
-                        "| " + " | ".join(str(v) for v in relation.values()) + " |\n"
+        elif file_format == "txt":
+            # Plain text export
+            with open(output_path, "w", encoding="utf-8") as txtfile:
+                txtfile.write("LIGHTRAG DATA EXPORT\n")
+                txtfile.write("=" * 80 + "\n\n")
+
+                # Entities
+                txtfile.write("ENTITIES\n")
+                txtfile.write("-" * 80 + "\n")
+                if entities_data:
+                    # Create fixed width columns
+                    col_widths = {
+                        k: max(len(k), max(len(str(e[k])) for e in entities_data))
+                        for k in entities_data[0]
+                    }
+                    header = "  ".join(k.ljust(col_widths[k]) for k in entities_data[0])
+                    txtfile.write(header + "\n")
+                    txtfile.write("-" * len(header) + "\n")
+
+                    # Write rows
+                    for entity in entities_data:
+                        row = "  ".join(
+                            str(v).ljust(col_widths[k]) for k, v in entity.items()
+                        )
+                        txtfile.write(row + "\n")
+                    txtfile.write("\n\n")
+                else:
+                    txtfile.write("No entity data available\n\n")
+
+                # Relations
+                txtfile.write("RELATIONS\n")
+                txtfile.write("-" * 80 + "\n")
+                if relations_data:
+                    # Create fixed width columns
+                    col_widths = {
+                        k: max(len(k), max(len(str(r[k])) for r in relations_data))
+                        for k in relations_data[0]
+                    }
+                    header = "  ".join(
+                        k.ljust(col_widths[k]) for k in relations_data[0]
                     )
-                mdfile.write("\n\n")
-            else:
-                mdfile.write("*No relation data available*\n\n")
-
-            # Relationships
-            mdfile.write("## Relationships\n\n")
-            if relationships_data:
-                # Write header
-                mdfile.write("| " + " | ".join(relationships_data[0].keys()) + " |\n")
-                mdfile.write(
-                    "| "
-                    + " | ".join(["---"] * len(relationships_data[0].keys()))
-                    + " |\n"
-                )
+                    txtfile.write(header + "\n")
+                    txtfile.write("-" * len(header) + "\n")
 
-                # Write rows
-                for relationship in relationships_data:
-                    mdfile.write(
-                        "| "
-                        + " | ".join(str(v) for v in relationship.values())
-                        + " |\n"
-                    )
-            else:
-                mdfile.write("*No relationship data available*\n\n")
-
-    elif file_format == "txt":
-        # Plain text export
-        with open(output_path, "w", encoding="utf-8") as txtfile:
-            txtfile.write("LIGHTRAG DATA EXPORT\n")
-            txtfile.write("=" * 80 + "\n\n")
-
-            # Entities
-            txtfile.write("ENTITIES\n")
-            txtfile.write("-" * 80 + "\n")
-            if entities_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(e[k])) for e in entities_data))
-                    for k in entities_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in entities_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for entity in entities_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in entity.items()
-                    )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No entity data available\n\n")
-
-            # Relations
-            txtfile.write("RELATIONS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relations_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relations_data))
-                    for k in relations_data[0]
-                }
-                header = "  ".join(k.ljust(col_widths[k]) for k in relations_data[0])
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
-
-                # Write rows
-                for relation in relations_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relation.items()
+                    # Write rows
+                    for relation in relations_data:
+                        row = "  ".join(
+                            str(v).ljust(col_widths[k]) for k, v in relation.items()
+                        )
+                        txtfile.write(row + "\n")
+                    txtfile.write("\n\n")
+                else:
+                    txtfile.write("No relation data available\n\n")
+
+                # Relationships
+                txtfile.write("RELATIONSHIPS\n")
+                txtfile.write("-" * 80 + "\n")
+                if relationships_data:
+                    # Create fixed width columns
+                    col_widths = {
+                        k: max(len(k), max(len(str(r[k])) for r in relationships_data))
+                        for k in relationships_data[0]
+                    }
+                    header = "  ".join(
+                        k.ljust(col_widths[k]) for k in relationships_data[0]
                     )
-                    txtfile.write(row + "\n")
-                txtfile.write("\n\n")
-            else:
-                txtfile.write("No relation data available\n\n")
-
-            # Relationships
-            txtfile.write("RELATIONSHIPS\n")
-            txtfile.write("-" * 80 + "\n")
-            if relationships_data:
-                # Create fixed width columns
-                col_widths = {
-                    k: max(len(k), max(len(str(r[k])) for r in relationships_data))
-                    for k in relationships_data[0]
-                }
-                header = "  ".join(
-                    k.ljust(col_widths[k]) for k in relationships_data[0]
-                )
-                txtfile.write(header + "\n")
-                txtfile.write("-" * len(header) + "\n")
+                    txtfile.write(header + "\n")
+                    txtfile.write("-" * len(header) + "\n")
 
-                # Write rows
-                for relationship in relationships_data:
-                    row = "  ".join(
-                        str(v).ljust(col_widths[k]) for k, v in relationship.items()
-                    )
-                    txtfile.write(row + "\n")
-            else:
-                txtfile.write("No relationship data available\n\n")
+                    # Write rows
+                    for relationship in relationships_data:
+                        row = "  ".join(
+                            str(v).ljust(col_widths[k]) for k, v in relationship.items()
+                        )
+                        txtfile.write(row + "\n")
+                else:
+                    txtfile.write("No relationship data available\n\n")
 
-    else:
-        raise ValueError(
-            f"Unsupported file format: {file_format}. Choose from: csv, excel, md, txt"
-        )
     if file_format is not None:
         print(f"Data exported to: {output_path} with format: {file_format}")
     else:
@@ -1499,6 +2020,8 @@ def export_data(
     output_path: str,
     file_format: str = "csv",
     include_vector_data: bool = False,
+    batch_size: int = 1000,
+    progress_callback: Callable[[str, int, int], None] | None = None,
 ) -> None:
     """
     Synchronously exports all entities, relations, and relationships to various formats.
@@ -1508,12 +2031,16 @@ def export_data(
         entities_vdb: Vector database storage for entities
         relationships_vdb: Vector database storage for relationships
         output_path: The path to the output file (including extension).
-        file_format: Output format - "csv", "excel", "md", "txt".
+        file_format: Output format - "csv", "jsonl", "parquet", "excel", "md", "txt".
             - csv: Comma-separated values file
+            - jsonl: JSON Lines, one record per line tagged with its type
+            - parquet: Parquet file (requires pyarrow)
             - excel: Microsoft Excel file with multiple sheets
             - md: Markdown tables
             - txt: Plain text formatted output
         include_vector_data: Whether to include data from the vector database.
+        batch_size: Number of graph nodes read (and rows written) per batch.
+        progress_callback: Optional callable(section, processed, total) called after each batch.
     """
     try:
         loop = asyncio.get_event_loop()
@@ -1529,6 +2056,8 @@ def export_data(
             output_path,
             file_format,
             include_vector_data,
+            batch_size,
+            progress_callback,
         )
     )
 
@@ -1552,6 +2081,40 @@ def lazy_external_import(module_name: str, class_name: str) -> Callable[..., Any
     return import_class
 
 
+def ensure_packages(requirements: Iterable[str]) -> None:
+    """Install the missing packages of an optional module before importing it
+
+    Requirements are pip specifiers such as "pymilvus>=2.6.2" or "lmdeploy[all]".
+    A package that is missing, or whose installed version does not satisfy the
+    specifier, is installed or upgraded. pipmaster is only imported then, so
+    resolving an installed backend costs a metadata lookup.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    from packaging.requirements import Requirement
+
+    for requirement in requirements:
+        parsed = Requirement(requirement)
+        if parsed.marker is not None and not parsed.marker.evaluate():
+            continue
+        try:
+            installed = version(parsed.name)
+        except PackageNotFoundError:
+            installed = None
+        if installed is not None and parsed.specifier.contains(
+            installed, prereleases=True
+        ):
+            continue
+
+        import pipmaster as pm
+
+        if installed is None:
+            logger.info(f"Installing {requirement}")
+        else:
+            logger.info(f"Upgrading {parsed.name} {installed} to {requirement}")
+        pm.install(requirement)
+
+
 async def update_chunk_cache_list(
     chunk_id: str,
     text_chunks_storage: "BaseKVStorage",
@@ -1780,6 +2343,26 @@ def sanitize_and_normalize_extracted_text(
     return ""
 
 
+# Patterns and tables of normalize_extracted_info, which runs on every extracted field
+_HTML_P_TAG = re.compile(r"</p\s*>|<p\s*>|<p/>", flags=re.IGNORECASE)
+_HTML_BR_TAG = re.compile(r"</br\s*>|<br\s*>|<br/>", flags=re.IGNORECASE)
+_FULLWIDTH_LETTERS = str.maketrans(
+    "ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ",
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
+)
+_FULLWIDTH_DIGITS = str.maketrans("０１２３４５６７８９", "0123456789")
+_CJK_INNER_SPACES = re.compile(r"(?<=[\u4e00-\u9fa5])\s+(?=[\u4e00-\u9fa5])")
+_CJK_LATIN_SPACES = re.compile(
+    r"(?<=[\u4e00-\u9fa5])\s+(?=[a-zA-Z0-9\(\)\[\]@#$%!&\*\-=+_])"
+)
+_LATIN_CJK_SPACES = re.compile(
+    r"(?<=[a-zA-Z0-9\(\)\[\]@#$%!&\*\-=+_])\s+(?=[\u4e00-\u9fa5])"
+)
+_QUOTES_BEFORE_CJK = re.compile(r"['\"]+(?=[\u4e00-\u9fa5])")
+_QUOTES_AFTER_CJK = re.compile(r"(?<=[\u4e00-\u9fa5])['\"]+")
+_NARROW_NBSP_AFTER_NON_DIGIT = re.compile(r"(?<=[^\d])\u202F")
+
+
 def normalize_extracted_info(name: str, remove_inner_quotes=False) -> str:
     """Normalize entity/relation names and description with the following rules:
     - Clean HTML tags (paragraph and line break tags)
@@ -1807,19 +2390,14 @@ def normalize_extracted_info(name: str, remove_inner_quotes=False) -> str:
         Normalized entity name
     """
     # Clean HTML tags - remove paragraph and line break tags
-    name = re.sub(r"</p\s*>|<p\s*>|<p/>", "", name, flags=re.IGNORECASE)
-    name = re.sub(r"</br\s*>|<br\s*>|<br/>", "", name, flags=re.IGNORECASE)
+    name = _HTML_P_TAG.sub("", name)
+    name = _HTML_BR_TAG.sub("", name)
 
     # Chinese full-width letters to half-width (A-Z, a-z)
-    name = name.translate(
-        str.maketrans(
-            "ＡＢＣＤＥＦＧＨＩＪＫＬＭＮＯＰＱＲＳＴＵＶＷＸＹＺａｂｃｄｅｆｇｈｉｊｋｌｍｎｏｐｑｒｓｔｕｖｗｘｙｚ",
-            "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz",
-        )
-    )
+    name = name.translate(_FULLWIDTH_LETTERS)
 
     # Chinese full-width numbers to half-width
-    name = name.translate(str.maketrans("０１２３４５６７８９", "0123456789"))
+    name = name.translate(_FULLWIDTH_DIGITS)
 
     # Chinese full-width symbols to half-width
     name = name.replace("－", "-")  # Chinese minus
@@ -1841,15 +2419,11 @@ def normalize_extracted_info(name: str, remove_inner_quotes=False) -> str:
     # (?<=[\u4e00-\u9fa5]): Positive lookbehind for Chinese character
     # \s+: One or more whitespace characters
     # (?=[\u4e00-\u9fa5]): Positive lookahead for Chinese character
-    name = re.sub(r"(?<=[\u4e00-\u9fa5])\s+(?=[\u4e00-\u9fa5])", "", name)
+    name = _CJK_INNER_SPACES.sub("", name)
 
     # Remove spaces between Chinese and English/numbers/symbols
-    name = re.sub(
-        r"(?<=[\u4e00-\u9fa5])\s+(?=[a-zA-Z0-9\(\)\[\]@#$%!&\*\-=+_])", "", name
-    )
-    name = re.sub(
-        r"(?<=[a-zA-Z0-9\(\)\[\]@#$%!&\*\-=+_])\s+(?=[\u4e00-\u9fa5])", "", name
-    )
+    name = _CJK_LATIN_SPACES.sub("", name)
+    name = _LATIN_CJK_SPACES.sub("", name)
 
     # Remove outer quotes
     if len(name) >= 2:
@@ -1885,12 +2459,12 @@ def normalize_extracted_info(name: str, remove_inner_quotes=False) -> str:
         # Remove Chinese quotes
         name = name.replace("“", "").replace("”", "").replace("‘", "").replace("’", "")
         # Remove English queotes in and around chinese
-        name = re.sub(r"['\"]+(?=[\u4e00-\u9fa5])", "", name)
-        name = re.sub(r"(?<=[\u4e00-\u9fa5])['\"]+", "", name)
+        name = _QUOTES_BEFORE_CJK.sub("", name)
+        name = _QUOTES_AFTER_CJK.sub("", name)
         # Convert non-breaking space to regular space
         name = name.replace("\u00a0", " ")
         # Convert narrow non-breaking space to regular space when after non-digits
-        name = re.sub(r"(?<=[^\d])\u202F", " ", name)
+        name = _NARROW_NBSP_AFTER_NON_DIGIT.sub(" ", name)
 
     # Remove spaces from the beginning and end of the text
     name = name.strip()
@@ -2284,6 +2858,13 @@ class TokenTracker:
         )
 
 
+def _accepts_document_ids(func: Callable) -> bool:
+    try:
+        return "document_ids" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 async def apply_rerank_if_enabled(
     query: str,
     retrieved_docs: list[dict],
@@ -2328,11 +2909,19 @@ async def apply_rerank_if_enabled(
             )
             document_texts.append(content)
 
+        # Chunk ids let the rerank functions of lightrag.rerank reuse cached scores
+        rerank_kwargs = {}
+        if _accepts_document_ids(rerank_func):
+            chunk_ids = [doc.get("chunk_id") for doc in retrieved_docs]
+            if all(chunk_ids):
+                rerank_kwargs["document_ids"] = chunk_ids
+
         # Call the new rerank function that returns index-based results
         rerank_results = await rerank_func(
             query=query,
             documents=document_texts,
             top_n=top_n,
+            **rerank_kwargs,
         )
 
         # Process rerank results based on return format
@@ -2368,6 +2957,54 @@ async def apply_rerank_if_enabled(
         return retrieved_docs
 
 
+async def hydrate_chunks(
+    chunks: list[dict], text_chunks_db: "BaseKVStorage"
+) -> list[dict]:
+    """Fetch the content of chunk handles in one batch
+
+    Chunk handles are chunks without "content", carrying the chunk_id and the
+    token count ("tokens") of the chunk text; they are replaced by the chunk
+    with its content, without the token count. Handles of chunks that no longer
+    exist are dropped.
+    """
+    handle_ids = [chunk["chunk_id"] for chunk in chunks if "content" not in chunk]
+    if not handle_ids:
+        return chunks
+
+    records = await text_chunks_db.get_fields_by_ids(handle_ids, ["content"])
+    contents = {
+        chunk_id: record["content"]
+        for chunk_id, record in zip(handle_ids, records)
+        if record is not None and "content" in record
+    }
+    hydrated = []
+    for chunk in chunks:
+        if "content" in chunk:
+            hydrated.append(chunk)
+            continue
+        content = contents.get(chunk["chunk_id"])
+        if content is not None:
+            handle = {key: value for key, value in chunk.items() if key != "tokens"}
+            hydrated.append({"content": content, **handle})
+    logger.debug(f"Hydrated {len(contents)} of {len(chunks)} chunks")
+    return hydrated
+
+
+def _chunks_within_token_estimate(
+    chunks: list[dict], max_token_size: int
+) -> list[dict]:
+    # The token count of a handle's text is a lower bound of the tokens of the
+    # serialized chunk, so chunks after the first one exceeding the budget by
+    # that count are cut by the token truncation anyway
+    tokens = 0
+    for i, chunk in enumerate(chunks):
+        if "content" not in chunk:
+            tokens += chunk.get("tokens") or 0
+        if tokens > max_token_size:
+            return chunks[: i + 1]
+    return chunks
+
+
 async def process_chunks_unified(
     query: str,
     unique_chunks: list[dict],
@@ -2375,6 +3012,7 @@ async def process_chunks_unified(
     global_config: dict,
     source_type: str = "mixed",
     chunk_token_limit: int = None,  # Add parameter for dynamic token limit
+    text_chunks_db: "BaseKVStorage" = None,
 ) -> list[dict]:
     """
     Unified processing for text chunks: deduplication, chunk_top_k limiting, reranking, and token truncation.
@@ -2386,6 +3024,8 @@ async def process_chunks_unified(
         global_config: Global configuration dictionary
         source_type: Source type for logging ("vector", "entity", "relationship", "mixed")
         chunk_token_limit: Dynamic token limit for chunks (if None, uses default)
+        text_chunks_db: Storage to fetch the content of chunk handles from, only
+            chunks kept after truncation are fetched unless reranking needs them
 
     Returns:
         Processed and filtered list of text chunks
@@ -2397,6 +3037,9 @@ async def process_chunks_unified(
 
     # 1. Apply reranking if enabled and query is provided
     if query_param.enable_rerank and query and unique_chunks:
+        if text_chunks_db is not None:
+            # The reranker scores the chunk texts
+            unique_chunks = await hydrate_chunks(unique_chunks, text_chunks_db)
         rerank_top_k = query_param.chunk_top_k or len(unique_chunks)
         unique_chunks = await apply_rerank_if_enabled(
             query=query,
@@ -2451,6 +3094,11 @@ async def process_chunks_unified(
                 global_config.get("MAX_TOTAL_TOKENS", DEFAULT_MAX_TOTAL_TOKENS),
             )
 
+        if text_chunks_db is not None:
+            unique_chunks = await hydrate_chunks(
+                _chunks_within_token_estimate(unique_chunks, chunk_token_limit),
+                text_chunks_db,
+            )
         original_count = len(unique_chunks)
 
         unique_chunks = truncate_list_by_token_size(
@@ -2467,6 +3115,9 @@ async def process_chunks_unified(
             f"(chunk available tokens: {chunk_token_limit}, source: {source_type})"
         )
 
+    if text_chunks_db is not None:
+        unique_chunks = await hydrate_chunks(unique_chunks, text_chunks_db)
+
     # 5. add id field to each chunk
     final_chunks = []
     for i, chunk in enumerate(unique_chunks):
@@ -2612,7 +3263,9 @@ def get_pinyin_sort_key(text: str) -> str:
     if not text:
         return ""
 
-    if _PYPINYIN_AVAILABLE:
+    # Text without Chinese characters sorts as is, without loading pypinyin
+    pypinyin = None if text.isascii() else _load_pypinyin()
+    if pypinyin is not None:
         try:
             # Convert Chinese characters to pinyin, keep non-Chinese as-is
             pinyin_list = pypinyin.lazy_pinyin(text, style=pypinyin.Style.NORMAL)
@@ -2621,10 +3274,47 @@ def get_pinyin_sort_key(text: str) -> str:
             # Silently fall back to simple string sorting on any error
             return text.lower()
     else:
-        # pypinyin not available, use simple string sorting
+        # pypinyin not available or not needed, use simple string sorting
         return text.lower()
 
 
+@lru_cache(maxsize=32)
+def _tuple_delimiter_fix_patterns(delimiter_core: str) -> tuple[re.Pattern, ...]:
+    """Compiled patterns of fix_tuple_delimiter_corruption, in the order they are applied"""
+    core = re.escape(delimiter_core)
+    return tuple(
+        re.compile(pattern)
+        for pattern in (
+            # Fix: <|##|> -> <|#|>, <|#||#|> -> <|#|>, <|#|||#|> -> <|#|>
+            rf"<\|{core}\|*?{core}\|>",
+            # Fix: <|\#|> -> <|#|>
+            rf"<\|\\{core}\|>",
+            # Fix: <|> -> <|#|>, <||> -> <|#|>
+            r"<\|+>",
+            # Fix: <X|#|> -> <|#|>, <|#|Y> -> <|#|>, <X|#|Y> -> <|#|>, <||#||> -> <|#|> (one extra characters outside pipes)
+            rf"<.?\|{core}\|.?>",
+            # Fix: <#>, <#|>, <|#> -> <|#|> (missing one or both pipes)
+            rf"<\|?{core}\|?>",
+            # Fix: <X#|> -> <|#|>, <|#X> -> <|#|> (one pipe is replaced by other character)
+            rf"<[^|]{core}\|>|<\|{core}[^|]>",
+            # Fix: <|#| -> <|#|>, <|#|| -> <|#|> (missing closing >)
+            rf"<\|{core}\|+(?!>)",
+            # Fix <|#: -> <|#|> (missing closing >)
+            rf"<\|{core}:(?!>)",
+            # Fix: <||#> -> <|#|> (double pipe at start, missing pipe at end)
+            rf"<\|+{core}>",
+            # Fix: <|| -> <|#|>
+            r"<\|\|(?!>)",
+            # Fix: |#|> -> <|#|> (missing opening <)
+            rf"(?<!<)\|{core}\|>",
+            # Fix: <|#|>| -> <|#|>  ( this is a fix for: <|#|| -> <|#|> )
+            rf"<\|{core}\|>\|",
+            # Fix: ||#|| -> <|#|> (double pipes on both sides without angle brackets)
+            rf"\|\|{core}\|\|",
+        )
+    )
+
+
 def fix_tuple_delimiter_corruption(
     record: str, delimiter_core: str, tuple_delimiter: str
 ) -> str:
@@ -2646,101 +3336,124 @@ def fix_tuple_delimiter_corruption(
     if not record or not delimiter_core or not tuple_delimiter:
         return record
 
-    # Escape the delimiter core for regex use
-    escaped_delimiter_core = re.escape(delimiter_core)
+    for pattern in _tuple_delimiter_fix_patterns(delimiter_core):
+        record = pattern.sub(tuple_delimiter, record)
+    return record
 
-    # Fix: <|##|> -> <|#|>, <|#||#|> -> <|#|>, <|#|||#|> -> <|#|>
-    record = re.sub(
-        rf"<\|{escaped_delimiter_core}\|*?{escaped_delimiter_core}\|>",
-        tuple_delimiter,
-        record,
-    )
 
-    # Fix: <|\#|> -> <|#|>
-    record = re.sub(
-        rf"<\|\\{escaped_delimiter_core}\|>",
-        tuple_delimiter,
-        record,
-    )
+class ExtractionRecordParser:
+    """Single-pass parser of the tuple-delimited records of an extraction result
 
-    # Fix: <|> -> <|#|>, <||> -> <|#|>
-    record = re.sub(
-        r"<\|+>",
-        tuple_delimiter,
-        record,
-    )
+    The result is scanned once: it is cut into lines at new-lines and completion
+    delimiters, every line is cut again where the LLM used the tuple delimiter
+    instead of a new-line to start the next entity or relation record, and
+    every record is split into its fields. All patterns are compiled once per
+    delimiter pair (see get_extraction_record_parser), and the delimiter
+    corruption fixes only run on records holding delimiter characters that are
+    not part of a well-formed tuple delimiter.
 
-    # Fix: <X|#|> -> <|#|>, <|#|Y> -> <|#|>, <X|#|Y> -> <|#|>, <||#||> -> <|#|> (one extra characters outside pipes)
-    record = re.sub(
-        rf"<.?\|{escaped_delimiter_core}\|.?>",
-        tuple_delimiter,
-        record,
-    )
+    Args:
+        tuple_delimiter: Delimiter of the fields of a record, e.g. "<|#|>"
+        completion_delimiter: Marker the LLM appends when done, e.g. "<|COMPLETE|>"
+    """
 
-    # Fix: <#>, <#|>, <|#> -> <|#|> (missing one or both pipes)
-    record = re.sub(
-        rf"<\|?{escaped_delimiter_core}\|?>",
-        tuple_delimiter,
-        record,
-    )
+    def __init__(self, tuple_delimiter: str, completion_delimiter: str):
+        self.tuple_delimiter = tuple_delimiter
+        self.completion_delimiter = completion_delimiter
 
-    # Fix: <X#|> -> <|#|>, <|#X> -> <|#|> (one pipe is replaced by other character)
-    record = re.sub(
-        rf"<[^|]{escaped_delimiter_core}\|>|<\|{escaped_delimiter_core}[^|]>",
-        tuple_delimiter,
-        record,
-    )
+        line_markers = dict.fromkeys(
+            ["\n", completion_delimiter, completion_delimiter.lower()]
+        )
+        self._line_split = re.compile(
+            "|".join(re.escape(marker) for marker in line_markers if marker)
+        )
+        # Record keywords following a tuple delimiter start a new record, the
+        # captured keyword tells which one ("relationship" and "relation" are
+        # interchangeable)
+        escaped_delimiter = re.escape(tuple_delimiter)
+        self._record_split = re.compile(
+            f"{escaped_delimiter}(entity|relationship|relation){escaped_delimiter}"
+        )
 
-    # Fix: <|#| -> <|#|>, <|#|| -> <|#|> (missing closing >)
-    record = re.sub(
-        rf"<\|{escaped_delimiter_core}\|+(?!>)",
-        tuple_delimiter,
-        record,
-    )
+        delimiter_core = tuple_delimiter[2:-2]  # Extract "#" from "<|#|>"
+        fix_patterns = _tuple_delimiter_fix_patterns(delimiter_core)
+        if delimiter_core != delimiter_core.lower():
+            # Fix again with the lower case delimiter core
+            fix_patterns += _tuple_delimiter_fix_patterns(delimiter_core.lower())
+        self._fix_patterns = fix_patterns if delimiter_core else ()
 
-    # Fix <|#: -> <|#|> (missing closing >)
-    record = re.sub(
-        rf"<\|{escaped_delimiter_core}:(?!>)",
-        tuple_delimiter,
-        record,
-    )
+    def split_records(self, result: str) -> tuple[list[str], int]:
+        """Split the result into records
 
-    # Fix: <||#> -> <|#|> (double pipe at start, missing pipe at end)
-    record = re.sub(
-        rf"<\|+{escaped_delimiter_core}>",
-        tuple_delimiter,
-        record,
-    )
+        Returns:
+            tuple: (records, number of lines), more records than lines means the
+                LLM separated records with the tuple delimiter
+        """
+        records = []
+        lines = 0
+        for line in self._line_split.split(result):
+            line = line.strip()
+            if not line:
+                continue
+            lines += 1
+            parts = self._record_split.split(line)
+            # parts alternate record text and the keyword starting the next record
+            first = parts[0].strip()
+            if first:
+                records.append(first)
+            for i in range(1, len(parts), 2):
+                record = parts[i + 1].strip()
+                if not record:
+                    continue
+                if not record.startswith("entity") and not record.startswith(
+                    "relation"
+                ):
+                    keyword = "entity" if parts[i] == "entity" else "relation"
+                    record = f"{keyword}{self.tuple_delimiter}{record}"
+                records.append(record)
+        return records, lines
+
+    def fix_record(self, record: str) -> str:
+        """Repair corrupted tuple delimiters in a record"""
+        if not self._fix_patterns:
+            return record
+        # Every corruption pattern holds one of "<", "|" or ">" outside a
+        # well-formed delimiter, clean records skip the regex passes
+        residue = record.replace(self.tuple_delimiter, "")
+        if "<" not in residue and "|" not in residue and ">" not in residue:
+            return record
+        for pattern in self._fix_patterns:
+            record = pattern.sub(self.tuple_delimiter, record)
+        return record
 
-    # Fix: <|| -> <|#|>
-    record = re.sub(
-        r"<\|\|(?!>)",
-        tuple_delimiter,
-        record,
-    )
+    def split_fields(self, record: str) -> list[str]:
+        """Fields of a record, stripped and without empty fields"""
+        return [
+            field
+            for field in (
+                part.strip()
+                for part in self.fix_record(record).split(self.tuple_delimiter)
+            )
+            if field
+        ]
 
-    # Fix: |#|> -> <|#|> (missing opening <)
-    record = re.sub(
-        rf"(?<!<)\|{escaped_delimiter_core}\|>",
-        tuple_delimiter,
-        record,
-    )
+    def parse(self, result: str) -> tuple[list[list[str]], bool]:
+        """Parse the result into the field lists of its records
 
-    # Fix: <|#|>| -> <|#|>  ( this is a fix for: <|#|| -> <|#|> )
-    record = re.sub(
-        rf"<\|{escaped_delimiter_core}\|>\|",
-        tuple_delimiter,
-        record,
-    )
+        Returns:
+            tuple: (field lists, whether the LLM separated records with the
+                tuple delimiter instead of new-lines)
+        """
+        records, lines = self.split_records(result)
+        return [self.split_fields(record) for record in records], len(records) != lines
 
-    # Fix: ||#|| -> <|#|> (double pipes on both sides without angle brackets)
-    record = re.sub(
-        rf"\|\|{escaped_delimiter_core}\|\|",
-        tuple_delimiter,
-        record,
-    )
 
-    return record
+@lru_cache(maxsize=8)
+def get_extraction_record_parser(
+    tuple_delimiter: str, completion_delimiter: str
+) -> ExtractionRecordParser:
+    """Shared ExtractionRecordParser of a delimiter pair"""
+    return ExtractionRecordParser(tuple_delimiter, completion_delimiter)
 
 
 def create_prefixed_exception(original_exception: Exception, prefix: str) -> Exception:
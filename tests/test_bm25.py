@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+import pytest
+
+from lightrag.bm25 import ChunkBM25Index
+
+
+def _chunk(i: int) -> dict:
+    return {"content": f"part AX-{i} code{i} shared term"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_search_and_upsert(tmp_path):
+    index_file = str(tmp_path / "bm25.npz")
+    writer = ChunkBM25Index(index_file)
+    await writer.upsert({"seed": _chunk(0)})
+    await writer.persist()
+
+    index = ChunkBM25Index(index_file)
+
+    async def upsert(i: int) -> None:
+        await index.upsert({f"chunk-{i}": _chunk(i)})
+
+    async def search() -> list[tuple[str, float]]:
+        return await index.search("shared", top_k=100)
+
+    results = await asyncio.gather(
+        *(coro for i in range(1, 50) for coro in (upsert(i), search()))
+    )
+    for hits in results[1::2]:
+        assert all(chunk_id is not None for chunk_id, _ in hits)
+
+    hits = await index.search("shared", top_k=100)
+    assert {chunk_id for chunk_id, _ in hits} == {"seed"} | {
+        f"chunk-{i}" for i in range(1, 50)
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_keeps_unflushed_changes(tmp_path):
+    index_file = str(tmp_path / "bm25.npz")
+    other = ChunkBM25Index(index_file)
+    await other.upsert({"seed": _chunk(0)})
+    await other.persist()
+
+    index = ChunkBM25Index(index_file)
+    await index.upsert({"local": _chunk(1)})
+
+    # The file changes on disk while the local upsert is not persisted
+    await other.upsert({"remote": _chunk(2)})
+    await other.persist()
+    mtime = os.path.getmtime(index_file) + 10
+    os.utime(index_file, (mtime, mtime))
+
+    hits = await index.search("code1", top_k=10)
+    assert [chunk_id for chunk_id, _ in hits] == ["local"]
+
+    await index.persist()
+    reloaded = ChunkBM25Index(index_file)
+    hits = await reloaded.search("shared", top_k=10)
+    assert {chunk_id for chunk_id, _ in hits} == {"seed", "local"}
+
+
+@pytest.mark.asyncio
+async def test_search_reloads_persisted_changes(tmp_path):
+    index_file = str(tmp_path / "bm25.npz")
+    writer = ChunkBM25Index(index_file)
+    await writer.upsert({"seed": _chunk(0)})
+    await writer.persist()
+
+    reader = ChunkBM25Index(index_file)
+    assert len(await reader.search("shared", top_k=10)) == 1
+
+    await writer.upsert({"new": _chunk(1)})
+    await writer.persist()
+    mtime = os.path.getmtime(index_file) + 10
+    os.utime(index_file, (mtime, mtime))
+
+    hits = await reader.search("shared", top_k=10)
+    assert {chunk_id for chunk_id, _ in hits} == {"seed", "new"}
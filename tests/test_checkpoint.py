@@ -0,0 +1,141 @@
+"""
+Tests of document checkpoints and resuming an interrupted document.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag import LightRAG
+from lightrag.base import DocStatus
+from lightrag.bench.corpus import generate_corpus
+from lightrag.bench.fakes import FakeEmbedding, FakeLLM, FakeLLMError, FakeTokenizer
+from lightrag.checkpoint import CheckpointStage, DocumentCheckpoint
+from lightrag.kg.shared_storage import initialize_pipeline_status
+
+
+def test_metadata_round_trip():
+    checkpoint = DocumentCheckpoint(CheckpointStage.CHUNKS_UPSERTED, ["c1", "c2", "c1"])
+    metadata = checkpoint.to_metadata()
+    assert metadata == {
+        "checkpoint": {"stage": "chunks_upserted", "extracted_chunks": ["c1", "c2"]}
+    }
+
+    restored = DocumentCheckpoint.from_metadata(metadata)
+    assert restored.stage == CheckpointStage.CHUNKS_UPSERTED
+    assert list(restored.extracted_chunks) == ["c1", "c2"]
+    assert restored.reached(CheckpointStage.CHUNKS_UPSERTED)
+    assert not restored.reached(CheckpointStage.MERGING)
+
+
+@pytest.mark.parametrize(
+    "metadata",
+    [None, {}, {"checkpoint": {}}, {"checkpoint": {"stage": "unknown"}}],
+)
+def test_missing_or_unknown_checkpoint_starts_from_scratch(metadata):
+    checkpoint = DocumentCheckpoint.from_metadata(metadata)
+    assert checkpoint.stage is None
+    assert not checkpoint.extracted_chunks
+    assert not checkpoint.reached(CheckpointStage.CHUNKS_UPSERTED)
+    assert checkpoint.to_metadata() == {}
+
+
+@pytest.mark.asyncio
+async def test_extraction_recorder_saves_every_interval():
+    saved = []
+
+    async def save(metadata):
+        saved.append(metadata["checkpoint"]["extracted_chunks"])
+
+    checkpoint = DocumentCheckpoint(CheckpointStage.CHUNKS_UPSERTED)
+    record = checkpoint.extraction_recorder(save, interval=3600)
+    await record("c1")
+    await record("c2")
+    assert saved == []
+    assert list(checkpoint.extracted_chunks) == ["c1", "c2"]
+
+    record = checkpoint.extraction_recorder(save, interval=0)
+    await record("c3")
+    assert saved == [["c1", "c2", "c3"]]
+
+
+class _FailingLLM(FakeLLM):
+    """FakeLLM whose extraction calls fail after the first fail_after"""
+
+    def __init__(self, fail_after: int | None = None):
+        super().__init__()
+        self.fail_after = fail_after
+
+    async def __call__(
+        self, prompt, system_prompt=None, history_messages=None, **kwargs
+    ):
+        kind = self._kind(
+            system_prompt, history_messages, kwargs.get("keyword_extraction", False)
+        )
+        if (
+            kind == "extract"
+            and self.fail_after is not None
+            and self.calls_by_kind["extract"] >= self.fail_after
+        ):
+            self.calls_by_kind[kind] += 1
+            await asyncio.sleep(0.01)
+            raise FakeLLMError("extraction failed")
+        return await super().__call__(prompt, system_prompt, history_messages, **kwargs)
+
+
+async def _make_rag(working_dir, llm, embedding, workspace):
+    rag = LightRAG(
+        working_dir=str(working_dir),
+        workspace=workspace,
+        llm_model_func=llm,
+        embedding_func=embedding.as_embedding_func(),
+        tokenizer=FakeTokenizer(),
+        chunk_token_size=120,
+        chunk_overlap_token_size=10,
+        entity_extract_max_gleaning=0,
+        llm_model_max_async=2,
+        checkpoint_interval=0,
+    )
+    await rag.initialize_storages()
+    await initialize_pipeline_status()
+    return rag
+
+
+@pytest.mark.asyncio
+async def test_interrupted_document_resumes_from_checkpoint(tmp_path):
+    docs, _ = generate_corpus(1, sentences_per_doc=60, seed=3)
+
+    llm = _FailingLLM(fail_after=5)
+    rag = await _make_rag(tmp_path, llm, FakeEmbedding(dim=64), "resume")
+    await rag.ainsert(docs, ids=["doc1"])
+    status = await rag.doc_status.get_by_id("doc1")
+    assert status["status"] == DocStatus.FAILED
+    checkpoint = DocumentCheckpoint.from_metadata(status["metadata"])
+    assert checkpoint.reached(CheckpointStage.CHUNKS_UPSERTED)
+    assert len(checkpoint.extracted_chunks) == 5
+    num_chunks = status["chunks_count"]
+    await rag.finalize_storages()
+
+    # Only the chunk that failed is extracted again, no chunk is embedded again
+    llm = _FailingLLM()
+    embedding = FakeEmbedding(dim=64)
+    rag = await _make_rag(tmp_path, llm, embedding, "resume")
+    await rag.apipeline_process_enqueue_documents()
+    status = await rag.doc_status.get_by_id("doc1")
+    assert status["status"] == DocStatus.PROCESSED
+    assert "checkpoint" not in status["metadata"]
+    assert llm.calls_by_kind["extract"] == num_chunks - 5
+    resumed_labels = sorted(await rag.chunk_entity_relation_graph.get_all_labels())
+    resumed_embedded = embedding.texts
+    await rag.finalize_storages()
+
+    llm = _FailingLLM()
+    embedding = FakeEmbedding(dim=64)
+    rag = await _make_rag(tmp_path, llm, embedding, "reference")
+    await rag.ainsert(docs, ids=["doc1"])
+    assert llm.calls_by_kind["extract"] == num_chunks
+    assert sorted(await rag.chunk_entity_relation_graph.get_all_labels()) == (
+        resumed_labels
+    )
+    assert resumed_embedded == embedding.texts - num_chunks
+    await rag.finalize_storages()
@@ -0,0 +1,159 @@
+"""
+Tests of ChunkDedupIndex and the handling of matched chunks without extraction.
+"""
+
+import os
+
+import pytest
+
+from lightrag.base import DocStatus
+from lightrag.dedup import ChunkDedupIndex, find_stale_sources
+
+_TEXT = "Boilerplate disclaimer repeated in every quarterly report of the company."
+
+
+class _KV:
+    def __init__(self, data: dict[str, dict]):
+        self.data = data
+
+    async def get_by_ids(self, ids):
+        return [self.data.get(i) for i in ids]
+
+
+@pytest.mark.asyncio
+async def test_find_duplicates_exact_and_near(tmp_path):
+    index = ChunkDedupIndex(str(tmp_path / "dedup.npz"))
+    assert await index.find_duplicates({"a": {"content": _TEXT}}) == {}
+
+    duplicates = await index.find_duplicates(
+        {
+            "b": {"content": "  " + _TEXT.upper()},
+            "c": {"content": _TEXT.replace("company.", "company!")},
+            "d": {"content": "Unrelated text about something else entirely."},
+        }
+    )
+    assert duplicates["b"] == ("a", "exact")
+    # "a" and "b" have the same signature, either one is the near match
+    assert duplicates["c"] in {("a", "near"), ("b", "near")}
+    assert "d" not in duplicates
+
+
+@pytest.mark.asyncio
+async def test_removed_source_is_not_matched(tmp_path):
+    index = ChunkDedupIndex(str(tmp_path / "dedup.npz"))
+    await index.find_duplicates({"a": {"content": _TEXT}})
+    await index.remove(["a"])
+    assert await index.find_duplicates({"b": {"content": _TEXT}}) == {}
+
+
+@pytest.mark.asyncio
+async def test_index_persists(tmp_path):
+    index_file = str(tmp_path / "dedup.npz")
+    index = ChunkDedupIndex(index_file)
+    await index.find_duplicates({"a": {"content": _TEXT}})
+    await index.persist()
+
+    reloaded = ChunkDedupIndex(index_file)
+    assert await reloaded.find_duplicates({"b": {"content": _TEXT}}) == {
+        "b": ("a", "exact")
+    }
+
+
+@pytest.mark.asyncio
+async def test_find_stale_sources():
+    text_chunks = _KV(
+        {
+            "processing": {"full_doc_id": "doc-processing"},
+            "pending": {"full_doc_id": "doc-pending"},
+            "failed": {"full_doc_id": "doc-failed"},
+            "processed": {"full_doc_id": "doc-processed"},
+            "deleted-doc": {"full_doc_id": "doc-deleted"},
+        }
+    )
+    doc_status = _KV(
+        {
+            "doc-processing": {"status": DocStatus.PROCESSING},
+            "doc-pending": {"status": DocStatus.PENDING},
+            "doc-failed": {"status": DocStatus.FAILED},
+            "doc-processed": {"status": "processed"},
+        }
+    )
+    # "not-stored" is registered by a document that did not store its chunks yet
+    stale = await find_stale_sources(
+        [
+            "processing",
+            "pending",
+            "failed",
+            "processed",
+            "deleted-doc",
+            "not-stored",
+        ],
+        text_chunks,
+        doc_status,
+    )
+    assert stale == {"processed", "deleted-doc"}
+    assert await find_stale_sources([], text_chunks, doc_status) == set()
+
+
+@pytest.mark.asyncio
+async def test_remove_keeps_registrations_of_other_instances(tmp_path):
+    index_file = str(tmp_path / "dedup.npz")
+    index = ChunkDedupIndex(index_file)
+    await index.find_duplicates({"a": {"content": _TEXT}})
+    await index.persist()
+
+    # Another worker registers a chunk and persists after this one loaded
+    other = ChunkDedupIndex(index_file)
+    await other.find_duplicates({"b": {"content": "Another chunk of the report."}})
+    await other.persist()
+    mtime = os.path.getmtime(index_file) + 10
+    os.utime(index_file, (mtime, mtime))
+
+    await index.remove(["a"])
+    await index.persist()
+
+    reloaded = ChunkDedupIndex(index_file)
+    assert await reloaded.find_duplicates(
+        {"c": {"content": "Another chunk of the report."}, "d": {"content": _TEXT}}
+    ) == {"c": ("b", "exact")}
+
+
+@pytest.mark.asyncio
+async def test_find_duplicates_keeps_unpersisted_registrations(tmp_path):
+    index_file = str(tmp_path / "dedup.npz")
+    other = ChunkDedupIndex(index_file)
+    await other.find_duplicates({"a": {"content": _TEXT}})
+    await other.persist()
+
+    index = ChunkDedupIndex(index_file)
+    await index.find_duplicates({"local": {"content": "Local chunk text."}})
+
+    # The file changes on disk while the local registration is not persisted
+    await other.find_duplicates({"b": {"content": "Remote chunk text."}})
+    await other.persist()
+    mtime = os.path.getmtime(index_file) + 10
+    os.utime(index_file, (mtime, mtime))
+
+    assert await index.find_duplicates({"c": {"content": "Local chunk text."}}) == {
+        "c": ("local", "exact")
+    }
+
+
+@pytest.mark.asyncio
+async def test_persist_merges_registrations_of_other_instances(tmp_path):
+    index_file = str(tmp_path / "dedup.npz")
+    first = ChunkDedupIndex(index_file)
+    second = ChunkDedupIndex(index_file)
+    await first.find_duplicates({"a": {"content": _TEXT}})
+    await second.find_duplicates({"b": {"content": "Another chunk of the report."}})
+
+    # Both persist changes made without seeing each other's registrations
+    await first.persist()
+    mtime = os.path.getmtime(index_file) + 10
+    os.utime(index_file, (mtime, mtime))
+    await second.persist()
+
+    reloaded = ChunkDedupIndex(index_file)
+    assert await reloaded.find_duplicates(
+        {"c": {"content": "Another chunk of the report."}, "d": {"content": _TEXT}}
+    ) == {"c": ("b", "exact"), "d": ("a", "exact")}
@@ -0,0 +1,100 @@
+"""
+Tests of ChunkIdSet against the list-based source id helpers it replaces.
+"""
+
+import random
+
+import pytest
+
+from lightrag import chunk_id_set
+from lightrag.chunk_id_set import ChunkIdSet, release_chunk_ids
+from lightrag.constants import (
+    GRAPH_FIELD_SEP,
+    SOURCE_IDS_LIMIT_METHOD_FIFO,
+    SOURCE_IDS_LIMIT_METHOD_KEEP,
+)
+from lightrag.utils import (
+    apply_source_ids_limit,
+    merge_source_ids,
+    subtract_source_ids,
+)
+
+
+def _random_ids(rng: random.Random, size: int) -> list[str]:
+    ids = [f"chunk-{rng.randrange(2 * size + 1)}" for _ in range(size)]
+    return ids + [""] * rng.randrange(2)
+
+
+@pytest.mark.parametrize("size", [0, 5, 300, 2000])
+def test_matches_list_helpers(size):
+    rng = random.Random(size)
+    for _ in range(20):
+        existing = _random_ids(rng, size)
+        new = _random_ids(rng, size // 2 + 1)
+        removed = _random_ids(rng, size // 3 + 1)
+        merged = merge_source_ids(existing, new)
+
+        chunk_ids = ChunkIdSet.from_ids(existing).union(new)
+        assert chunk_ids.to_list() == merged
+        assert len(chunk_ids) == len(merged)
+        assert ChunkIdSet.from_joined(GRAPH_FIELD_SEP.join(existing)).union(
+            new
+        ) == ChunkIdSet.from_ids(merged)
+
+        remaining = chunk_ids.difference(removed)
+        assert remaining.to_list() == subtract_source_ids(merged, removed)
+
+        for method in (SOURCE_IDS_LIMIT_METHOD_FIFO, SOURCE_IDS_LIMIT_METHOD_KEEP):
+            for limit in (0, 1, size // 2, len(merged) + 1):
+                assert remaining.limit(limit, method).join() == GRAPH_FIELD_SEP.join(
+                    apply_source_ids_limit(remaining.to_list(), limit, method)
+                )
+
+
+def test_membership_and_stored_list_reuse():
+    stored = ChunkIdSet.from_ids([f"chunk-{i}" for i in range(500)], "ws").to_list()
+    chunk_ids = ChunkIdSet.from_ids(stored, "ws")
+    assert ChunkIdSet.from_ids(stored, "ws") is chunk_ids
+    assert "chunk-7" in chunk_ids
+    assert "chunk-500" not in chunk_ids
+    assert list(chunk_ids.union(["chunk-0", "chunk-500"]))[-2:] == [
+        "chunk-499",
+        "chunk-500",
+    ]
+    release_chunk_ids("ws")
+
+
+def test_release_keeps_existing_sets_usable():
+    before = ChunkIdSet.from_ids(["a", "b", "c"], "ws").difference(["b"])
+    release_chunk_ids("ws")
+    assert "ws" not in chunk_id_set._tables
+
+    after = ChunkIdSet.from_ids(["c", "d"], "ws")
+    assert before.union(after).to_list() == ["a", "c", "d"]
+    assert after.difference(before).to_list() == ["d"]
+    assert before == ChunkIdSet.from_ids(["a", "c"], "ws")
+    assert "a" in before
+    release_chunk_ids("ws")
+
+
+def test_release_drops_cached_lists_of_the_workspace():
+    kept = ChunkIdSet.from_ids([f"k-{i}" for i in range(300)], "other").to_list()
+    dropped = ChunkIdSet.from_ids([f"d-{i}" for i in range(300)], "ws").to_list()
+    assert id(dropped) in chunk_id_set._list_cache
+
+    release_chunk_ids("ws")
+    assert id(dropped) not in chunk_id_set._list_cache
+    assert id(kept) in chunk_id_set._list_cache
+    release_chunk_ids("other")
+
+
+def test_list_cache_is_bounded_by_total_ids(monkeypatch):
+    monkeypatch.setattr(chunk_id_set, "_CACHE_MAX_IDS", 1000)
+    lists = [
+        ChunkIdSet.from_ids([f"{n}-{i}" for i in range(400)], "ws").to_list()
+        for n in range(5)
+    ]
+    assert chunk_id_set._cached_ids <= 1000
+    assert id(lists[-1]) in chunk_id_set._list_cache
+    assert id(lists[0]) not in chunk_id_set._list_cache
+    release_chunk_ids("ws")
@@ -0,0 +1,74 @@
+"""
+Tests of DocumentExtractor's process pool: a file that exceeds the timeout
+must fail alone, files extracted at the same time must still succeed.
+
+The workers are spawned, they import the test extractor from this module.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from lightrag.api import document_extraction
+from lightrag.api.document_extraction import DocumentExtractionError, DocumentExtractor
+
+
+def _extract_slow(file: bytes, file_path: str, ext: str, loading_engine: str) -> str:
+    if file == b"crash":
+        # Count the attempts, then die like a worker killed by the OOM killer
+        with open(file_path, "a") as f:
+            f.write("attempt\n")
+        os._exit(1)
+    time.sleep(float(file.decode()))
+    return f"slept {file.decode()}"
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    monkeypatch.setattr(document_extraction, "extract_document_content", _extract_slow)
+    extractor = DocumentExtractor(max_workers=3, timeout=3)
+    yield extractor
+    extractor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timeout_fails_alone(extractor):
+    async def extract(name: str, seconds: float, delay: float = 0) -> str:
+        await asyncio.sleep(delay)
+        return await extractor.extract(
+            str(seconds).encode(), Path(f"{name}.slow"), ".slow"
+        )
+
+    results = await asyncio.gather(
+        extract("hanging", 30),
+        extract("healthy1", 1.5, delay=2),
+        extract("healthy2", 1.6, delay=2.2),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], DocumentExtractionError)
+    assert results[0].error_description == "[File Extraction]Extraction timeout"
+    # Both healthy files were running when the hanging worker was killed
+    assert results[1:] == ["slept 1.5", "slept 1.6"]
+
+
+@pytest.mark.asyncio
+async def test_pool_recovers_after_timeout(extractor):
+    with pytest.raises(DocumentExtractionError):
+        await extractor.extract(b"30", Path("hanging.slow"), ".slow")
+    assert await extractor.extract(b"0", Path("next.slow"), ".slow") == "slept 0"
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_not_retried(extractor, tmp_path):
+    attempts_file = tmp_path / "attempts.crash"
+    with pytest.raises(DocumentExtractionError) as exc_info:
+        await extractor.extract(b"crash", attempts_file, ".crash")
+    assert (
+        exc_info.value.error_description == "[File Extraction]Extraction worker crashed"
+    )
+    assert attempts_file.read_text().splitlines() == ["attempt"]
+    assert await extractor.extract(b"0", Path("next.slow"), ".slow") == "slept 0"
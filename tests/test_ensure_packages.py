@@ -0,0 +1,50 @@
+"""
+Tests of ensure_packages, the installation of optional packages on selection.
+"""
+
+import sys
+import types
+from importlib.metadata import PackageNotFoundError
+
+import pytest
+
+from lightrag import utils
+
+_INSTALLED = {"pymilvus": "2.5.0", "numpy": "2.1.0"}
+
+
+@pytest.fixture
+def installs(monkeypatch):
+    calls = []
+
+    def version(distribution):
+        # Distribution names are case insensitive
+        if distribution.lower() not in _INSTALLED:
+            raise PackageNotFoundError(distribution)
+        return _INSTALLED[distribution.lower()]
+
+    monkeypatch.setattr("importlib.metadata.version", version)
+    monkeypatch.setitem(
+        sys.modules, "pipmaster", types.SimpleNamespace(install=calls.append)
+    )
+    return calls
+
+
+def test_installs_missing_package(installs):
+    utils.ensure_packages(["lmdeploy[all]"])
+    assert installs == ["lmdeploy[all]"]
+
+
+def test_upgrades_package_not_satisfying_the_pin(installs):
+    utils.ensure_packages(["pymilvus>=2.6.2"])
+    assert installs == ["pymilvus>=2.6.2"]
+
+
+def test_keeps_satisfying_packages(installs):
+    utils.ensure_packages(["pymilvus>=2.5", "numpy", "NumPy[extra]<3"])
+    assert installs == []
+
+
+def test_skips_requirements_for_other_platforms(installs):
+    utils.ensure_packages(['lmdeploy; sys_platform == "nonexistent"'])
+    assert installs == []
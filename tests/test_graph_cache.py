@@ -0,0 +1,105 @@
+"""
+Tests of SubgraphCache, the /graphs response cache.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from lightrag.api.graph_cache import SubgraphCache
+from lightrag.types import KnowledgeGraph, KnowledgeGraphNode
+
+
+class _Graph:
+    def __init__(self, shared: bool):
+        self.shared = shared
+        self.version = 0
+
+    async def get_graph_version(self):
+        return self.version
+
+    def is_shared_graph(self):
+        return self.shared
+
+
+class _Rag:
+    workspace = ""
+    max_graph_nodes = 1000
+
+    def __init__(self, shared: bool = False):
+        self.chunk_entity_relation_graph = _Graph(shared)
+        self.labels = ["A"]
+        self.traversals = 0
+
+    async def get_knowledge_graph(self, node_label, max_depth, max_nodes):
+        self.traversals += 1
+        return KnowledgeGraph(
+            nodes=[
+                KnowledgeGraphNode(id=label, labels=[label], properties={})
+                for label in self.labels
+            ]
+        )
+
+
+def _node_ids(payload: bytes) -> list[str]:
+    return [node["id"] for node in json.loads(gzip.decompress(payload))["nodes"]]
+
+
+@pytest.mark.asyncio
+async def test_cached_until_version_changes():
+    rag = _Rag()
+    cache = SubgraphCache(rag)
+    payload, etag = await cache.get("*", 3, None)
+    assert await cache.get("*", 3, None) == (payload, etag)
+    assert rag.traversals == 1
+
+    rag.labels = ["A", "B"]
+    rag.chunk_entity_relation_graph.version += 1
+    payload, new_etag = await cache.get("*", 3, None)
+    assert _node_ids(payload) == ["A", "B"]
+    assert new_etag != etag
+
+
+@pytest.mark.asyncio
+async def test_etag_survives_restart_only_for_same_content():
+    rag = _Rag()
+    _, etag = await SubgraphCache(rag).get("*", 3, None)
+
+    # A restarted server starts with graph version 0 again
+    restarted = _Rag()
+    _, same_etag = await SubgraphCache(restarted).get("*", 3, None)
+    assert same_etag == etag
+
+    changed = _Rag()
+    changed.labels = ["A", "B"]
+    _, changed_etag = await SubgraphCache(changed).get("*", 3, None)
+    assert changed_etag != etag
+
+
+@pytest.mark.asyncio
+async def test_shared_graph_entries_expire(monkeypatch):
+    rag = _Rag(shared=True)
+    cache = SubgraphCache(rag, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr("lightrag.api.graph_cache.time.monotonic", lambda: now[0])
+
+    await cache.get("*", 3, None)
+    # Another server changes the graph, the local version does not move
+    rag.labels = ["A", "B"]
+    payload, _ = await cache.get("*", 3, None)
+    assert _node_ids(payload) == ["A"]
+
+    now[0] += 61
+    payload, _ = await cache.get("*", 3, None)
+    assert _node_ids(payload) == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_shared_graph_not_cached_without_ttl():
+    rag = _Rag(shared=True)
+    cache = SubgraphCache(rag, ttl=0)
+    await cache.get("*", 3, None)
+    await cache.get("*", 3, None)
+    assert rag.traversals == 2
+    assert cache.stats()["entries"] == 0
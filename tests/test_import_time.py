@@ -0,0 +1,67 @@
+"""
+Import time budget of the common API server configuration.
+
+Importing the server, the OpenAI binding and the PostgreSQL storages must not
+load package installers or heavy optional libraries, and must stay within a
+time budget, so that gunicorn workers and CLI tools start quickly.
+
+The budget can be adjusted with LIGHTRAG_IMPORT_BUDGET_SECONDS for slow CI
+machines.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+IMPORT_BUDGET_SECONDS = float(os.getenv("LIGHTRAG_IMPORT_BUDGET_SECONDS", "3.0"))
+RUNS = 3
+
+# Modules that must only be loaded when a feature needs them
+LAZY_MODULES = ["pipmaster", "pypinyin", "torch", "transformers"]
+
+_CHECK_MODULES = f"""
+import sys
+loaded = [name for name in {LAZY_MODULES!r} if name in sys.modules]
+assert not loaded, f"Loaded at import time: {{loaded}}"
+"""
+
+
+def _import_seconds(modules: list[str]) -> float:
+    """Best wall time of importing modules in a fresh interpreter"""
+    code = "".join(f"import {module}\n" for module in modules) + _CHECK_MODULES
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - start
+        assert result.returncode == 0, result.stderr
+        best = min(best, elapsed)
+    return best
+
+
+def test_core_import_time():
+    elapsed = _import_seconds(["lightrag", "lightrag.lightrag"])
+    assert (
+        elapsed < IMPORT_BUDGET_SECONDS
+    ), f"import lightrag took {elapsed:.2f}s, budget {IMPORT_BUDGET_SECONDS}s"
+
+
+def test_server_import_time():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("openai")
+    pytest.importorskip("asyncpg")
+    elapsed = _import_seconds(
+        [
+            "lightrag.api.lightrag_server",
+            "lightrag.llm.openai",
+            "lightrag.kg.postgres_impl",
+        ]
+    )
+    assert (
+        elapsed < IMPORT_BUDGET_SECONDS
+    ), f"Server import took {elapsed:.2f}s, budget {IMPORT_BUDGET_SECONDS}s"
@@ -0,0 +1,146 @@
+"""
+Tests of incremental summarization on nodes stored before description fingerprints.
+"""
+
+import pytest
+
+from lightrag.constants import GRAPH_FIELD_SEP
+from lightrag.operate import (
+    _description_fingerprint,
+    _merge_edges_then_upsert,
+    _merge_nodes_then_upsert,
+)
+from lightrag.utils import Tokenizer
+
+_SUMMARY = "Acme is a manufacturer of industrial tools."
+
+
+class _WordTokenizer:
+    def encode(self, content: str) -> list[int]:
+        return list(range(len(content.split())))
+
+    def decode(self, tokens: list[int]) -> str:
+        return ""
+
+
+class _Graph:
+    def __init__(self, nodes=None, edges=None):
+        self.nodes = dict(nodes or {})
+        self.edges = dict(edges or {})
+
+    async def get_node(self, node_id):
+        return self.nodes.get(node_id)
+
+    async def upsert_node(self, node_id, node_data):
+        self.nodes[node_id] = node_data
+
+    async def has_node(self, node_id):
+        return node_id in self.nodes
+
+    async def has_edge(self, src, tgt):
+        return (src, tgt) in self.edges
+
+    async def get_edge(self, src, tgt):
+        return self.edges.get((src, tgt))
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        self.edges[(src, tgt)] = edge_data
+
+
+async def _no_llm(*args, **kwargs):
+    raise AssertionError("the LLM must not be called")
+
+
+def _config() -> dict:
+    return {
+        "workspace": "",
+        "tokenizer": Tokenizer("words", _WordTokenizer()),
+        "summary_context_size": 10000,
+        "summary_max_tokens": 1000,
+        "force_llm_summary_on_merge": 8,
+        "summary_incremental": True,
+        "source_ids_limit_method": "FIFO",
+        "max_source_ids_per_entity": 100,
+        "max_source_ids_per_relation": 100,
+        "max_file_paths": 100,
+        "llm_model_func": _no_llm,
+    }
+
+
+def _legacy_node() -> dict:
+    # Written before fingerprints existed: no description_hashes
+    return {
+        "entity_id": "Acme",
+        "entity_type": "ORGANIZATION",
+        "description": _SUMMARY,
+        "source_id": "chunk-1",
+        "file_path": "a.txt",
+    }
+
+
+def _fragment(description: str, source_id: str) -> dict:
+    return {
+        "entity_type": "ORGANIZATION",
+        "description": description,
+        "source_id": source_id,
+        "file_path": "b.txt",
+        "timestamp": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_legacy_node_covered_fragment_keeps_summary():
+    graph = _Graph({"Acme": _legacy_node()})
+    await _merge_nodes_then_upsert(
+        "Acme", [_fragment(_SUMMARY, "chunk-2")], graph, None, _config()
+    )
+    node = graph.nodes["Acme"]
+    assert node["description"] == _SUMMARY
+    assert node["description_hashes"] == _description_fingerprint([_SUMMARY])
+
+
+@pytest.mark.asyncio
+async def test_legacy_node_folds_only_new_fragments():
+    graph = _Graph({"Acme": _legacy_node()})
+    fragments = [
+        # Re-merge of the chunk already folded into the summary
+        _fragment("Acme makes tools.", "chunk-1"),
+        _fragment("Acme opened a plant in Ohio.", "chunk-2"),
+    ]
+    await _merge_nodes_then_upsert("Acme", fragments, graph, None, _config())
+    node = graph.nodes["Acme"]
+    assert node["description"] == GRAPH_FIELD_SEP.join(
+        [_SUMMARY, "Acme opened a plant in Ohio."]
+    )
+    assert node["description_hashes"] == _description_fingerprint(
+        [_SUMMARY, "Acme opened a plant in Ohio."]
+    )
+
+
+@pytest.mark.asyncio
+async def test_legacy_edge_covered_fragment_keeps_summary():
+    edge = {
+        "description": _SUMMARY,
+        "keywords": "supply",
+        "weight": 1.0,
+        "source_id": "chunk-1",
+        "file_path": "a.txt",
+    }
+    graph = _Graph(
+        {"Acme": _legacy_node(), "Ohio": {**_legacy_node(), "entity_id": "Ohio"}},
+        {("Acme", "Ohio"): edge},
+    )
+    fragment = {
+        "description": _SUMMARY,
+        "keywords": "supply",
+        "weight": 1.0,
+        "source_id": "chunk-2",
+        "file_path": "b.txt",
+        "timestamp": 1,
+    }
+    await _merge_edges_then_upsert(
+        "Acme", "Ohio", [fragment], graph, None, None, _config()
+    )
+    stored = graph.edges[("Acme", "Ohio")]
+    assert stored["description"] == _SUMMARY
+    assert stored["description_hashes"] == _description_fingerprint([_SUMMARY])
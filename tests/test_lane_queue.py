@@ -0,0 +1,106 @@
+"""
+Tests of LaneQueue, the query and ingestion lanes of the LLM call queue.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.utils import (
+    INGEST_LANE,
+    QUERY_LANE,
+    LaneQueue,
+    priority_limit_async_func_call,
+    scheduling_flow,
+)
+
+
+@pytest.mark.asyncio
+async def test_query_lane_is_served_before_ingestion():
+    queue = LaneQueue(max_size=1, reserved_slots=0, max_queue_size=10)
+    for count in range(3):
+        await queue.put(10, count, ("ingest", count))
+    await queue.put(8, 3, ("summary", 3))
+    await queue.put(5, 4, ("query", 4))
+
+    order = []
+    for _ in range(5):
+        lane, _, item = await queue.get()
+        order.append(item[0])
+        await queue.task_done(lane)
+    assert order == ["query", "summary", "ingest", "ingest", "ingest"]
+
+
+@pytest.mark.asyncio
+async def test_reserved_slots_are_left_to_queries():
+    queue = LaneQueue(max_size=2, reserved_slots=1, max_queue_size=10)
+    await queue.put(10, 0, ("ingest", 0))
+    await queue.put(10, 1, ("ingest", 1))
+    lane, _, _ = await queue.get()
+    assert lane == INGEST_LANE
+
+    # The second ingestion call waits although a worker is free
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.get(), timeout=0.05)
+    await queue.put(5, 2, ("query", 2))
+    lane, _, item = await queue.get()
+    assert (lane, item) == (QUERY_LANE, ("query", 2))
+    assert queue.stats()[INGEST_LANE]["queued"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_ingest_lane_does_not_block_queries():
+    queue = LaneQueue(max_size=1, reserved_slots=0, max_queue_size=2)
+    await queue.put(10, 0, ("ingest", 0))
+    await queue.put(10, 1, ("ingest", 1))
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(queue.put(10, 2, ("ingest", 2)), timeout=0.05)
+    await asyncio.wait_for(queue.put(5, 3, ("query", 3)), timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_flows_share_the_lane_by_weight():
+    queue = LaneQueue(max_size=1, reserved_slots=0, max_queue_size=100)
+    with scheduling_flow("bulk"):
+        for count in range(6):
+            await queue.put(10, count, ("bulk", count))
+    with scheduling_flow("interactive", weight=2.0):
+        for count in range(6, 12):
+            await queue.put(10, count, ("interactive", count))
+
+    order = []
+    for _ in range(6):
+        lane, _, item = await queue.get()
+        order.append(item[0])
+        await queue.task_done(lane)
+    assert order.count("interactive") == 4
+    assert order.count("bulk") == 2
+
+
+@pytest.mark.asyncio
+async def test_queries_overtake_queued_ingestion_calls():
+    started = []
+    release = asyncio.Event()
+
+    @priority_limit_async_func_call(2, reserved_slots=1, queue_name="test")
+    async def llm(name):
+        started.append(name)
+        if name.startswith("ingest"):
+            await release.wait()
+        return name
+
+    try:
+        ingestion = [asyncio.create_task(llm(f"ingest-{i}")) for i in range(5)]
+        await asyncio.sleep(0.1)
+        # One ingestion call runs, the other worker is reserved for queries
+        assert started == ["ingest-0"]
+
+        assert await asyncio.wait_for(llm("query", _priority=5), timeout=2) == "query"
+        assert started == ["ingest-0", "query"]
+        assert llm.lane_stats()[INGEST_LANE]["queued"] == 4
+
+        release.set()
+        assert await asyncio.gather(*ingestion) == [f"ingest-{i}" for i in range(5)]
+    finally:
+        release.set()
+        await llm.shutdown()
@@ -0,0 +1,90 @@
+"""
+Tests of SQLiteCacheKVStorage, the LLM response cache storage.
+"""
+
+import pytest
+
+from lightrag.kg import verify_storage_implementation
+from lightrag.kg.sqlite_cache_impl import SQLiteCacheKVStorage
+
+
+def _storage(tmp_path, namespace="llm_response_cache", workspace=""):
+    return SQLiteCacheKVStorage(
+        namespace=namespace,
+        workspace=workspace,
+        global_config={"working_dir": str(tmp_path)},
+        embedding_func=None,
+    )
+
+
+def _entry(response: str, prompt: str = "prompt") -> dict:
+    return {
+        "return": response,
+        "cache_type": "extract",
+        "chunk_id": "chunk-1",
+        "original_prompt": prompt,
+        "queryparam": None,
+        "create_time": 100,
+    }
+
+
+@pytest.mark.asyncio
+async def test_round_trip(tmp_path):
+    storage = _storage(tmp_path)
+    await storage.initialize()
+    long_response = "entity<|#|>description " * 200
+    await storage.upsert(
+        {
+            "default:extract:a": _entry("short"),
+            "default:extract:b": _entry(long_response),
+        }
+    )
+
+    a, b, missing = await storage.get_by_ids(
+        ["default:extract:a", "default:extract:b", "default:extract:c"]
+    )
+    assert a["return"] == "short"
+    assert b["return"] == long_response
+    assert b["cache_type"] == "extract"
+    assert b["chunk_id"] == "chunk-1"
+    assert b["create_time"] == 100
+    assert missing is None
+    # Hash mode keeps only the hash of the prompt
+    assert b["original_prompt"] == ""
+    assert b["prompt_hash"]
+
+    assert await storage.filter_keys({"default:extract:a", "default:extract:c"}) == {
+        "default:extract:c"
+    }
+    await storage.delete(["default:extract:a"])
+    assert await storage.get_by_id("default:extract:a") is None
+    await storage.finalize()
+
+    # Entries survive reopening the database
+    storage = _storage(tmp_path)
+    await storage.initialize()
+    assert (await storage.get_by_id("default:extract:b"))["return"] == long_response
+    await storage.finalize()
+
+
+@pytest.mark.asyncio
+async def test_compressed_prompt_mode(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_PROMPT_MODE", "compressed")
+    storage = _storage(tmp_path)
+    await storage.initialize()
+    prompt = "Extract entities from the text below. " * 50
+    await storage.upsert({"default:extract:a": _entry("response", prompt)})
+    assert (await storage.get_by_id("default:extract:a"))["original_prompt"] == prompt
+    await storage.finalize()
+
+
+@pytest.mark.parametrize("namespace", ["text_chunks", "full_docs", "entity_chunks"])
+def test_rejects_other_namespaces(tmp_path, namespace):
+    with pytest.raises(ValueError, match="only stores the LLM response cache"):
+        _storage(tmp_path, namespace=namespace)
+
+
+def test_only_valid_as_llm_cache_storage():
+    verify_storage_implementation("LLM_CACHE_STORAGE", "SQLiteCacheKVStorage")
+    with pytest.raises(ValueError, match="not compatible with KV_STORAGE"):
+        verify_storage_implementation("KV_STORAGE", "SQLiteCacheKVStorage")
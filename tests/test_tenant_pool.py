@@ -0,0 +1,126 @@
+"""
+Tests of the workspace pool middleware: workspaces named in the request header
+are only loaded for authenticated requests to allowed workspaces.
+"""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from lightrag.api.tenant_pool import LightRAGPool, Tenant, TenantMiddleware  # noqa: E402
+from lightrag.kg.shared_storage import initialize_share_data  # noqa: E402
+
+# The server configuration parses the command line on import
+with patch.object(sys, "argv", sys.argv[:1]):
+    from lightrag.api.utils_api import check_credentials  # noqa: E402
+
+API_KEY = "secret"
+
+
+class _Rag:
+    def __init__(self, workspace: str):
+        self.pipeline_status_namespace = f"{workspace}_pipeline_status"
+
+    async def initialize_storages(self):
+        pass
+
+    async def check_and_migrate_data(self):
+        pass
+
+
+async def _app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.fixture
+def pool():
+    initialize_share_data()
+    return LightRAGPool(
+        Tenant(workspace="", rag=_Rag(""), doc_manager=None),
+        lambda workspace: (_Rag(workspace), None),
+        max_instances=2,
+    )
+
+
+def _middleware(pool, allowed_workspaces=None):
+    def authenticate(token, api_key_value):
+        check_credentials(None, token, api_key_value, api_key=API_KEY)
+
+    return TenantMiddleware(
+        _app,
+        pool=pool,
+        header_name="LIGHTRAG-WORKSPACE",
+        authenticate=authenticate,
+        allowed_workspaces=allowed_workspaces,
+    )
+
+
+async def _request(middleware, path: str, headers: dict[str, str]) -> int:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    return messages[0]["status"]
+
+
+@pytest.mark.asyncio
+async def test_unauthenticated_request_does_not_load_workspace(pool):
+    middleware = _middleware(pool)
+    # /health is whitelisted for the routes, but not for loading workspaces
+    for path in ("/query", "/health"):
+        status = await _request(middleware, path, {"LIGHTRAG-WORKSPACE": "intruder"})
+        assert status == 403
+    status = await _request(
+        middleware, "/query", {"LIGHTRAG-WORKSPACE": "intruder", "X-API-Key": "wrong"}
+    )
+    assert status == 403
+    assert pool.stats()["workspaces"] == []
+
+
+@pytest.mark.asyncio
+async def test_authenticated_request_loads_workspace(pool):
+    middleware = _middleware(pool)
+    status = await _request(
+        middleware, "/query", {"LIGHTRAG-WORKSPACE": "team_a", "X-API-Key": API_KEY}
+    )
+    assert status == 200
+    assert pool.stats()["workspaces"] == ["team_a"]
+
+
+@pytest.mark.asyncio
+async def test_workspace_allowlist(pool):
+    middleware = _middleware(pool, allowed_workspaces=["team_a"])
+    headers = {"X-API-Key": API_KEY}
+    assert (
+        await _request(
+            middleware, "/query", {**headers, "LIGHTRAG-WORKSPACE": "team_b"}
+        )
+        == 403
+    )
+    assert (
+        await _request(
+            middleware, "/query", {**headers, "LIGHTRAG-WORKSPACE": "team_a"}
+        )
+        == 200
+    )
+    assert pool.stats()["workspaces"] == ["team_a"]
+
+
+@pytest.mark.asyncio
+async def test_requests_without_workspace_header_pass_through(pool):
+    assert await _request(_middleware(pool), "/query", {}) == 200
@@ -0,0 +1,83 @@
+"""
+Tests of VectorUpsertCoalescer, the batching of entity and relation vector upserts.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.utils import VectorUpsertCoalescer
+
+
+class _Storage:
+    namespace = "entities"
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def upsert(self, data):
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("storage unavailable")
+        self.calls.append(("upsert", sorted(data)))
+
+    async def delete(self, ids):
+        self.calls.append(("delete", sorted(ids)))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_share_batches():
+    storage = _Storage()
+    coalescer = VectorUpsertCoalescer(storage, batch_size=4, max_delay=10)
+    await asyncio.gather(*(coalescer.upsert({f"e{i}": {}}) for i in range(8)))
+    assert storage.calls == [
+        ("upsert", ["e0", "e1", "e2", "e3"]),
+        ("upsert", ["e4", "e5", "e6", "e7"]),
+    ]
+    assert (coalescer.batches_written, coalescer.records_written) == (2, 8)
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_written_after_max_delay():
+    storage = _Storage()
+    coalescer = VectorUpsertCoalescer(storage, batch_size=100, max_delay=0.02)
+    await asyncio.wait_for(
+        asyncio.gather(coalescer.upsert({"e1": {}}), coalescer.upsert({"e2": {}})),
+        timeout=1,
+    )
+    assert storage.calls == [("upsert", ["e1", "e2"])]
+
+
+@pytest.mark.asyncio
+async def test_delete_supersedes_buffered_upserts():
+    storage = _Storage()
+    coalescer = VectorUpsertCoalescer(storage, batch_size=100, max_delay=10)
+    pending = asyncio.create_task(coalescer.upsert({"e1": {}, "e2": {}}))
+    await asyncio.sleep(0)
+    await coalescer.delete(["e1"])
+    await coalescer.flush()
+    await pending
+    assert storage.calls == [("delete", ["e1"]), ("upsert", ["e2"])]
+
+
+@pytest.mark.asyncio
+async def test_delete_waits_for_batches_being_written():
+    storage = _Storage()
+    coalescer = VectorUpsertCoalescer(storage, batch_size=1, max_delay=10)
+    pending = asyncio.create_task(coalescer.upsert({"e1": {}}))
+    await asyncio.sleep(0)
+    await coalescer.delete(["e1"])
+    await pending
+    assert storage.calls == [("upsert", ["e1"]), ("delete", ["e1"])]
+
+
+@pytest.mark.asyncio
+async def test_batch_error_reaches_every_caller():
+    coalescer = VectorUpsertCoalescer(_Storage(fail=True), batch_size=2, max_delay=10)
+    results = await asyncio.gather(
+        coalescer.upsert({"e1": {}}),
+        coalescer.upsert({"e2": {}}),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, Exception) for result in results)